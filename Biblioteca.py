@@ -24,35 +24,63 @@ class Usuario:
         return f"{self.nome} ({self.email}) - {len(self.livros_emprestados)} livros emprestados"
 
 
+def normalizar_isbn(isbn):
+    return str(isbn).replace("-", "").replace(" ", "").upper()
+
+
 class Biblioteca:
     def __init__(self):
         self.livros = []
         self.usuarios = []
+        # Índices: ISBN normalizado -> exemplares, e-mail -> usuário
+        self.livros_por_isbn = {}
+        self.usuarios_por_email = {}
 
     def adicionar_livro(self, livro):
         self.livros.append(livro)
+        self.livros_por_isbn.setdefault(normalizar_isbn(livro.isbn), []).append(livro)
         print(f"Livro '{livro.titulo}' adicionado à biblioteca.")
 
     def cadastrar_usuario(self, usuario):
+        if usuario.email.lower() in self.usuarios_por_email:
+            print(f"E-mail {usuario.email} já está cadastrado.")
+            return
         self.usuarios.append(usuario)
+        self.usuarios_por_email[usuario.email.lower()] = usuario
         print(f"Usuário {usuario.nome} cadastrado.")
 
+    def remover_livro(self, livro):
+        self.livros.remove(livro)
+        copias = self.livros_por_isbn[normalizar_isbn(livro.isbn)]
+        copias.remove(livro)
+        if not copias:
+            del self.livros_por_isbn[normalizar_isbn(livro.isbn)]
+        print(f"Livro '{livro.titulo}' removido da biblioteca.")
+
+    def remover_usuario(self, usuario):
+        self.usuarios.remove(usuario)
+        if self.usuarios_por_email.get(usuario.email.lower()) is usuario:
+            del self.usuarios_por_email[usuario.email.lower()]
+        print(f"Usuário {usuario.nome} removido.")
+
+    def obter_livro_por_isbn(self, isbn):
+        # Retorna um exemplar disponível com o ISBN, se houver
+        for livro in self.livros_por_isbn.get(normalizar_isbn(isbn), []):
+            if livro.disponivel:
+                return livro
+        return None
+
+    def obter_usuario(self, email):
+        return self.usuarios_por_email.get(email.lower())
+
     def emprestar_livro(self, isbn, email_usuario):
-        livro = None
-        for l in self.livros:
-            if l.isbn == isbn and l.disponivel:
-                livro = l
-                break
+        livro = self.obter_livro_por_isbn(isbn)
 
         if not livro:
             print("Livro não encontrado ou não disponível.")
             return
 
-        usuario = None
-        for u in self.usuarios:
-            if u.email == email_usuario:
-                usuario = u
-                break
+        usuario = self.obter_usuario(email_usuario)
 
         if not usuario:
             print("Usuário não encontrado.")
@@ -63,11 +91,7 @@ class Biblioteca:
         print(f"Livro '{livro.titulo}' emprestado para {usuario.nome}.")
 
     def devolver_livro(self, isbn, email_usuario):
-        usuario = None
-        for u in self.usuarios:
-            if u.email == email_usuario:
-                usuario = u
-                break
+        usuario = self.obter_usuario(email_usuario)
 
         if not usuario:
             print("Usuário não encontrado.")
@@ -75,7 +99,7 @@ class Biblioteca:
 
         livro = None
         for l in usuario.livros_emprestados:
-            if l.isbn == isbn:
+            if normalizar_isbn(l.isbn) == normalizar_isbn(isbn):
                 livro = l
                 break
 
@@ -0,0 +1,83 @@
+"""
+Benchmark do diário de operações: vazão (ops/s) e tempo de recuperação
+Uso: python benchmarks/bench_diario.py [operacoes] [threads]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from biblioteca_melhorada import Biblioteca, Livro
+from diario import ArmazenamentoDiario
+from eventos import SinkNulo
+
+
+def medir_vazao(diretorio, operacoes, threads, sincrono):
+    """Operações por segundo registradas no diário."""
+    armazenamento = ArmazenamentoDiario(diretorio, sincrono=sincrono, intervalo_snapshot=0)
+    livros = [Livro(f"Livro {i}", "Autor", 2000) for i in range(operacoes)]
+    por_thread = operacoes // threads
+
+    def trabalhar(inicio):
+        for livro in livros[inicio:inicio + por_thread]:
+            armazenamento.livros_adicionados([livro])
+
+    inicio = time.perf_counter()
+    trabalhadores = [threading.Thread(target=trabalhar, args=(i * por_thread,)) for i in range(threads)]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+    armazenamento.fechar()
+    duracao = time.perf_counter() - inicio
+    return por_thread * threads / duracao, armazenamento.fsyncs
+
+
+def medir_recuperacao(diretorio, com_snapshot):
+    """Segundos para reconstruir a biblioteca a partir do disco."""
+    biblioteca = Biblioteca("Benchmark", sink=SinkNulo(), armazenamento=ArmazenamentoDiario(diretorio))
+    if com_snapshot:
+        biblioteca.armazenamento.snapshot()
+    biblioteca.armazenamento.fechar()
+
+    inicio = time.perf_counter()
+    restaurada = Biblioteca("Benchmark", sink=SinkNulo(), armazenamento=ArmazenamentoDiario(diretorio))
+    duracao = time.perf_counter() - inicio
+    restaurada.armazenamento.fechar()
+    return duracao
+
+
+def main():
+    """Executa o benchmark e exibe o resultado."""
+    operacoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    for sincrono, quantidade in ((True, 1), (True, threads), (False, 1)):
+        with tempfile.TemporaryDirectory() as diretorio:
+            vazao, fsyncs = medir_vazao(diretorio, operacoes, quantidade, sincrono)
+        modo = "síncrono " if sincrono else "assíncrono"
+        print(f"📝 {modo} {quantidade:2d} thread(s): {vazao:10.0f} ops/s ({fsyncs} fsyncs)")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        biblioteca = Biblioteca("Benchmark", sink=SinkNulo(),
+                                armazenamento=ArmazenamentoDiario(diretorio, sincrono=False))
+        biblioteca.importar_livros(
+            {"titulo": f"Livro {i}", "autor": "Autor", "ano": 2000} for i in range(operacoes)
+        )
+        for livro in biblioteca.livros[: operacoes // 2]:
+            livro.emprestar()
+            livro.devolver()
+        biblioteca.armazenamento.fechar()
+
+        replay = medir_recuperacao(diretorio, com_snapshot=False)
+        compactada = medir_recuperacao(diretorio, com_snapshot=True)
+    print(f"♻️  Recuperação só com diário:  {replay:.2f}s")
+    print(f"♻️  Recuperação com snapshot:   {compactada:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark da busca federada: filiais consultadas em série x em paralelo
+Uso: python benchmarks/bench_federacao.py [filiais] [latencia_ms] [livros_por_filial]
+
+Cada filial simula a latência de uma consulta remota (rede ou banco)
+antes de buscar no próprio acervo.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import eventos
+from biblioteca_melhorada import Biblioteca, Livro
+from federacao import Federacao
+
+PALAVRAS = ["amor", "guerra", "tempo", "casa", "mar", "noite", "cidade", "sombra", "rio", "fogo"]
+TERMOS = ["amor", "guerra do", "noite", "cidade", "rio"]
+
+
+class FilialRemota(Biblioteca):
+    """Biblioteca com latência fixa por busca."""
+
+    def __init__(self, nome, latencia):
+        super().__init__(nome, sink=eventos.SinkNulo())
+        self.latencia = latencia
+
+    def buscar_livro(self, termo, exibir=True):
+        time.sleep(self.latencia)
+        return super().buscar_livro(termo, exibir)
+
+
+def montar(filiais, latencia, livros):
+    """Filiais com acervos sobrepostos (mesmos ISBNs em várias filiais)."""
+    aleatorio = random.Random(42)
+    resultado = []
+    for indice in range(filiais):
+        filial = FilialRemota(f"Filial {indice}", latencia)
+        for i in range(livros):
+            numero = aleatorio.randrange(livros * 2)
+            titulo = " ".join(PALAVRAS[(numero + k) % len(PALAVRAS)] for k in range(3))
+            filial.adicionar_livro(Livro(f"{titulo} {numero}", f"Autor {numero % 50}", 2000, f"isbn-{numero}"))
+        resultado.append(filial)
+    return resultado
+
+
+def main():
+    """Executa o benchmark."""
+    filiais = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    latencia = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    livros = int(sys.argv[3]) if len(sys.argv) > 3 else 5000
+
+    eventos.definir_sink_padrao(eventos.SinkNulo())
+    rede = montar(filiais, latencia, livros)
+
+    inicio = time.perf_counter()
+    for termo in TERMOS:
+        for filial in rede:
+            filial.buscar_livro(termo, exibir=False)
+    serie = (time.perf_counter() - inicio) / len(TERMOS)
+
+    with Federacao(rede, tempo_limite=10 * latencia + 1) as federacao:
+        inicio = time.perf_counter()
+        for termo in TERMOS:
+            federacao.buscar(termo, limite=20, exibir=False)
+        paralelo = (time.perf_counter() - inicio) / len(TERMOS)
+
+    print(f"⚙️  {filiais} filiais, {latencia * 1000:.0f} ms de latência, {livros} livros cada")
+    print(f"🐢 Em série:   {serie * 1000:8.1f} ms por busca")
+    print(f"🚀 Federada:   {paralelo * 1000:8.1f} ms por busca ({serie / paralelo:.1f}x)")
+    print(f"🎯 Filial mais lenta: {latencia * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark da Biblioteca fragmentada: vazão por quantidade de processos
+Uso: python benchmarks/bench_fragmentos.py [livros] [operacoes] [max_fragmentos]
+
+A escala só aparece com vários núcleos livres: cada fragmento é um processo.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from biblioteca_melhorada import Livro, Usuario
+from fragmentos import BibliotecaFragmentada
+
+PALAVRAS = ["amor", "guerra", "tempo", "casa", "mar", "noite", "cidade", "sombra", "rio", "fogo"]
+USUARIOS = 1_000
+
+
+def carregar(biblioteca, livros):
+    aleatorio = random.Random(42)
+    biblioteca.adicionar_livros(
+        Livro(f"{' '.join(aleatorio.sample(PALAVRAS, 3))} {i}", f"Autor {i % 500}", 2000, f"isbn-{i}")
+        for i in range(livros)
+    )
+    for i in range(USUARIOS):
+        biblioteca.registrar_usuario(Usuario(f"usuario{i}", limite_livros=5))
+
+
+def medir(fragmentos, livros, operacoes):
+    """Operações por segundo com uma thread cliente por fragmento."""
+    with BibliotecaFragmentada("Bench", fragmentos=fragmentos) as biblioteca:
+        carregar(biblioteca, livros)
+        clientes = max(4, 2 * fragmentos)
+        por_cliente = operacoes // clientes
+
+        def trabalhar(semente):
+            aleatorio = random.Random(semente)
+            for _ in range(por_cliente):
+                sorteio = aleatorio.random()
+                isbn = f"isbn-{aleatorio.randrange(livros)}"
+                usuario = f"usuario{aleatorio.randrange(USUARIOS)}"
+                if sorteio < 0.1:
+                    biblioteca.buscar_livro(f"{aleatorio.choice(PALAVRAS)} {aleatorio.randrange(livros)}")
+                elif sorteio < 0.55:
+                    biblioteca.emprestar_livro(isbn, usuario)
+                else:
+                    biblioteca.devolver_livro(isbn, usuario)
+
+        threads = [threading.Thread(target=trabalhar, args=(i,)) for i in range(clientes)]
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return por_cliente * clientes / (time.perf_counter() - inicio)
+
+
+def main():
+    livros = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    operacoes = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    maximo = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+
+    print(f"Livros: {livros:,} | operações: {operacoes:,} | núcleos: {os.cpu_count()}")
+    base = None
+    fragmentos = 1
+    while fragmentos <= maximo:
+        vazao = medir(fragmentos, livros, operacoes)
+        base = base or vazao
+        print(f"{fragmentos:>3} fragmento(s): {vazao:>10,.0f} ops/s  ({vazao / base:.2f}x)")
+        fragmentos *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark da análise do histórico: consultas vetorizadas x laço em Python
+Uso: python benchmarks/bench_historico.py [emprestimos] [amostra_laco]
+
+Gera um histórico sintético com o número de empréstimos pedido (padrão:
+10 milhões), mede cada consulta de AnaliseHistorico e compara com um
+laço em Python equivalente para popularidade e duração média, medido em
+uma amostra e extrapolado para o total.
+"""
+
+import os
+import sys
+import time
+from array import array
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analise_historico import DIA, HORA, AnaliseHistorico
+from historico import ColunasHistorico
+
+TITULOS = 100_000
+USUARIOS = 50_000
+FILIAIS = ["Central", "Norte", "Sul", "Leste"]
+PERIODO = 365 * DIA
+
+
+def coluna(tipo, valores):
+    """Converte um vetor NumPy para array sem passar por objetos Python."""
+    resultado = array(tipo)
+    resultado.frombytes(np.ascontiguousarray(valores).tobytes())
+    return resultado
+
+
+def gerar(emprestimos):
+    """Histórico sintético: títulos com popularidade de Zipf e ~10% em aberto."""
+    aleatorio = np.random.default_rng(42)
+    agora = time.time()
+    inicios = agora - PERIODO + np.sort(aleatorio.uniform(0, PERIODO, emprestimos))
+    fins = inicios + aleatorio.exponential(10 * DIA, emprestimos)
+    fins[(fins > agora) | (aleatorio.random(emprestimos) < 0.02)] = np.nan
+    titulos = (aleatorio.zipf(1.3, emprestimos) - 1) % TITULOS
+    colunas = ColunasHistorico(
+        livros=coluna("q", aleatorio.integers(1, 10 * TITULOS, emprestimos, dtype=np.int64)),
+        titulos=coluna("i", titulos.astype(np.int32)),
+        usuarios=coluna("i", aleatorio.integers(0, USUARIOS, emprestimos, dtype=np.int32)),
+        filiais=coluna("i", aleatorio.integers(0, len(FILIAIS), emprestimos, dtype=np.int32)),
+        inicios=coluna("d", inicios),
+        fins=coluna("d", fins),
+        nomes_titulos=[f"Título {i}" for i in range(TITULOS)],
+        nomes_usuarios=[f"usuario{i}" for i in range(USUARIOS)],
+        nomes_filiais=FILIAIS,
+    )
+    return colunas, agora
+
+
+def laco_python(colunas, quantidade):
+    """Popularidade e duração média com um laço por empréstimo."""
+    contagens = {}
+    soma = devolvidos = 0
+    for i in range(quantidade):
+        titulo = colunas.titulos[i]
+        contagens[titulo] = contagens.get(titulo, 0) + 1
+        fim = colunas.fins[i]
+        if fim == fim:
+            soma += fim - colunas.inicios[i]
+            devolvidos += 1
+    sorted(contagens.items(), key=lambda item: -item[1])[:10]
+    return soma / devolvidos if devolvidos else 0.0
+
+
+def medir(descricao, funcao):
+    """Executa e imprime o tempo de uma consulta."""
+    inicio = time.perf_counter()
+    funcao()
+    duracao = time.perf_counter() - inicio
+    print(f"   {descricao:<28} {duracao:8.3f} s")
+    return duracao
+
+
+def main():
+    """Executa o benchmark."""
+    emprestimos = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    amostra = min(emprestimos, int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
+
+    print(f"⚙️  Gerando {emprestimos:,} empréstimos...")
+    colunas, agora = gerar(emprestimos)
+
+    print("📊 Consultas vetorizadas:")
+    analise = AnaliseHistorico(colunas, agora=agora)
+    total = medir("popularidade (top 10)", lambda: analise.popularidade(10))
+    total += medir("duração média", analise.duracao_media)
+    total += medir("duração média por título", analise.duracao_media_por_titulo)
+    total += medir("utilização por hora", lambda: analise.utilizacao(HORA))
+    total += medir("utilização por dia", lambda: analise.utilizacao(DIA))
+    total += medir("resumo por filial", analise.por_filial)
+    print(f"   {'total':<28} {total:8.3f} s")
+
+    inicio = time.perf_counter()
+    laco_python(colunas, amostra)
+    estimado = (time.perf_counter() - inicio) * emprestimos / amostra
+    vetorizado = medir("popularidade + duração", lambda: (analise.popularidade(10), analise.duracao_media()))
+    print(f"🐍 Laço Python (popularidade + duração): {estimado:8.3f} s (estimado a partir de {amostra:,})")
+    print(f"🚀 Aceleração: {estimado / vetorizado:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark de memória: lista de Livro (dataclass) x CatalogoCompacto
+Uso: python benchmarks/bench_memoria.py [quantidade]
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from biblioteca_melhorada import Livro
+from catalogo_compacto import CatalogoCompacto
+
+
+def _registros(quantidade):
+    """Gera dados bibliográficos sintéticos."""
+    for i in range(quantidade):
+        yield f"Título do livro número {i}", f"Autor {i % 5000}", 1800 + i % 220, f"978-{i:09d}"
+
+
+def medir_lista(quantidade):
+    """Memória (bytes) de uma lista de Livro."""
+    tracemalloc.start()
+    livros = [Livro(titulo, autor, ano, isbn) for titulo, autor, ano, isbn in _registros(quantidade)]
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del livros
+    return memoria
+
+
+def medir_catalogo(quantidade):
+    """Memória (bytes) de um CatalogoCompacto."""
+    tracemalloc.start()
+    catalogo = CatalogoCompacto()
+    for titulo, autor, ano, isbn in _registros(quantidade):
+        catalogo.adicionar_registro(titulo, autor, ano, isbn, ano_maximo=2100)
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del catalogo
+    return memoria
+
+
+def main():
+    """Executa o benchmark e exibe o resultado."""
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    lista = medir_lista(quantidade)
+    catalogo = medir_catalogo(quantidade)
+
+    print(f"📚 Livros: {quantidade}")
+    print(f"🐍 Lista de dataclasses: {lista / 2**20:8.1f} MiB ({lista / quantidade:.0f} B/livro)")
+    print(f"📦 CatalogoCompacto:     {catalogo / 2**20:8.1f} MiB ({catalogo / quantidade:.0f} B/livro)")
+    print(f"📉 Economia: {lista / catalogo:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Custo da instrumentação: operações sem métricas, após ativar/desativar e com métricas ligadas
+Uso: python benchmarks/bench_metricas.py [operacoes] [tolerancia]
+
+Termina com código 1 se, depois de desligadas, as métricas deixarem um
+custo acima da tolerância (padrão: 5%) em relação à execução original.
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import eventos
+import metricas
+from biblioteca_melhorada import Biblioteca, Livro, Usuario
+
+LIVROS = 20_000
+USUARIOS = 1_000
+PALAVRAS = ["amor", "guerra", "tempo", "casa", "mar", "noite", "cidade", "sombra", "rio", "fogo"]
+
+
+def montar_biblioteca():
+    """Acervo sintético com vários exemplares por ISBN."""
+    biblioteca = Biblioteca("Bench", sink=eventos.SinkNulo())
+    aleatorio = random.Random(42)
+    for i in range(LIVROS):
+        titulo = " ".join(aleatorio.sample(PALAVRAS, 3))
+        biblioteca.adicionar_livro(Livro(f"{titulo} {i}", f"Autor {i % 500}", 1900 + i % 120, f"isbn-{i % 5000}"))
+    for i in range(USUARIOS):
+        biblioteca.registrar_usuario(Usuario(f"usuario{i}", limite_livros=5))
+    return biblioteca
+
+
+def carga(biblioteca, operacoes):
+    """Mistura de buscas, consultas, empréstimos e devoluções."""
+    aleatorio = random.Random(7)
+    pedidos = [
+        (aleatorio.random(), f"isbn-{aleatorio.randrange(5000)}", f"usuario{aleatorio.randrange(USUARIOS)}")
+        for _ in range(operacoes)
+    ]
+
+    def executar():
+        for sorteio, isbn, usuario in pedidos:
+            if sorteio < 0.6:
+                biblioteca.buscar_livro(isbn[-3:], exibir=False)
+            elif sorteio < 0.7:
+                biblioteca.obter_estatisticas()
+            elif sorteio < 0.85:
+                biblioteca.emprestar_livro(isbn, usuario)
+            else:
+                biblioteca.devolver_livro(isbn, usuario)
+
+    return executar
+
+
+def melhor_tempo(funcao):
+    """Menor tempo entre várias repetições, o menos afetado por ruído."""
+    return min(timeit.repeat(funcao, number=1, repeat=7))
+
+
+def main():
+    """Executa o benchmark e verifica o custo com as métricas desligadas."""
+    operacoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    tolerancia = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+
+    eventos.definir_sink_padrao(eventos.SinkNulo())
+    biblioteca = montar_biblioteca()
+    executar = carga(biblioteca, operacoes)
+
+    with open(os.devnull, "w") as nulo:
+        saida, sys.stdout = sys.stdout, nulo
+        try:
+            executar()  # aquece caches
+            original = melhor_tempo(executar)
+            metricas.ativar()
+            ligado = melhor_tempo(executar)
+            metricas.desativar()
+            desligado = melhor_tempo(executar)
+        finally:
+            sys.stdout = saida
+
+    custo_desligado = desligado / original - 1
+    print(f"⚙️  Operações por rodada: {operacoes}")
+    print(f"⏱️  Original:   {original / operacoes * 1e6:7.2f} µs/op")
+    print(f"📊 Ligadas:    {ligado / operacoes * 1e6:7.2f} µs/op ({ligado / original - 1:+.1%})")
+    print(f"💤 Desligadas: {desligado / operacoes * 1e6:7.2f} µs/op ({custo_desligado:+.1%})")
+    if custo_desligado > tolerancia:
+        print(f"❌ Custo com métricas desligadas acima de {tolerancia:.0%}")
+        sys.exit(1)
+    print(f"✅ Custo com métricas desligadas dentro de {tolerancia:.0%}")
+
+
+if __name__ == "__main__":
+    main()
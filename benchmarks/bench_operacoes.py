@@ -0,0 +1,374 @@
+"""
+Benchmark das operações da Biblioteca: Biblioteca.py (legado) x src/biblioteca_melhorada.py
+Uso: python benchmarks/bench_operacoes.py [--tamanhos 1000 10000 ...] [--saida resultados.json]
+                                          [--repeticoes 3] [--referencia referencia.json] [--tolerancia 0.5]
+                                          [--salvar-referencia referencia.json]
+
+Para cada tamanho gera um acervo sintético (tamanho livros, tamanho/10
+usuários) e mede, por operação, vazão, latência p50/p99 e pico de
+memória alocada. Com --referencia, termina com código 1 se alguma
+operação da implementação melhorada piorar além da tolerância.
+"""
+
+import argparse
+import contextlib
+import gc
+import importlib.util
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+import eventos
+from biblioteca_melhorada import Biblioteca, Livro, Usuario
+
+PALAVRAS = [
+    "amor", "guerra", "tempo", "casa", "mar", "noite", "cidade", "sombra", "rio", "fogo",
+    "sertão", "memórias", "coração", "viagem", "jardim", "pedra", "vento", "lua", "sol", "ilha",
+]
+CONSULTAS = 10_000
+METRICAS_MAIOR_MELHOR = ("ops_por_segundo",)
+METRICAS_MENOR_MELHOR = ("p99_us", "memoria_pico_bytes")
+AMOSTRAS_MINIMAS_P99 = 5_000
+
+
+def carregar_legado():
+    """Importa o Biblioteca.py original da raiz do repositório."""
+    especificacao = importlib.util.spec_from_file_location(
+        "biblioteca_legado", os.path.join(RAIZ, "Biblioteca.py")
+    )
+    modulo = importlib.util.module_from_spec(especificacao)
+    especificacao.loader.exec_module(modulo)
+    return modulo
+
+
+# Dados sintéticos ------------------------------------------------------------
+
+def gerar_livros(tamanho, semente=42):
+    """Registros (titulo, autor, ano, isbn), com dois exemplares por ISBN."""
+    aleatorio = random.Random(semente)
+    for i in range(tamanho):
+        titulo = " ".join(aleatorio.sample(PALAVRAS, 3))
+        yield f"{titulo} {i}", f"Autor {i % max(1, tamanho // 20)}", 1800 + i % 220, f"978-{i // 2:09d}"
+
+
+def gerar_usuarios(tamanho):
+    """Registros (nome, email), um usuário para cada dez livros."""
+    for i in range(max(10, tamanho // 10)):
+        yield f"Usuário {i}", f"usuario{i}@email.com"
+
+
+def gerar_consultas(tamanho, semente=7):
+    """Termos de busca com frequência de lei de potência (poucos termos dominam)."""
+    aleatorio = random.Random(semente)
+    termos = PALAVRAS + [f"autor {i}" for i in range(max(1, tamanho // 20))]
+    pesos = [1 / posicao for posicao in range(1, len(termos) + 1)]
+    return aleatorio.choices(termos, pesos, k=min(tamanho, CONSULTAS))
+
+
+# Implementações --------------------------------------------------------------
+
+class ImplementacaoMelhorada:
+    """Adaptador para src/biblioteca_melhorada.py."""
+
+    nome = "melhorada"
+
+    def __init__(self):
+        self.biblioteca = Biblioteca("Bench", sink=eventos.SinkNulo())
+
+    def adicionar_livro(self, titulo, autor, ano, isbn):
+        self.biblioteca.adicionar_livro(Livro(titulo, autor, ano, isbn))
+
+    def registrar_usuario(self, nome, email):
+        self.biblioteca.registrar_usuario(Usuario(nome, email))
+
+    def obter_livro_por_isbn(self, isbn):
+        return self.biblioteca.obter_livro_por_isbn(isbn)
+
+    def buscar_livro(self, termo):
+        return self.biblioteca.buscar_livro(termo, exibir=False)
+
+    def estatisticas(self):
+        return self.biblioteca.obter_estatisticas()
+
+    def emprestar_livro(self, isbn, email):
+        return self.biblioteca.emprestar_livro(isbn, email)
+
+    def devolver_livro(self, isbn, email):
+        return self.biblioteca.devolver_livro(isbn, email)
+
+
+class ImplementacaoLegado:
+    """Adaptador para o Biblioteca.py original (sem busca nem estatísticas)."""
+
+    nome = "legado"
+    modulo = None
+
+    def __init__(self):
+        if ImplementacaoLegado.modulo is None:
+            ImplementacaoLegado.modulo = carregar_legado()
+        self.biblioteca = self.modulo.Biblioteca()
+
+    def adicionar_livro(self, titulo, autor, ano, isbn):
+        self.biblioteca.adicionar_livro(self.modulo.Livro(titulo, autor, isbn, ano))
+
+    def registrar_usuario(self, nome, email):
+        self.biblioteca.cadastrar_usuario(self.modulo.Usuario(nome, email))
+
+    def obter_livro_por_isbn(self, isbn):
+        return self.biblioteca.obter_livro_por_isbn(isbn)
+
+    def emprestar_livro(self, isbn, email):
+        return self.biblioteca.emprestar_livro(isbn, email)
+
+    def devolver_livro(self, isbn, email):
+        return self.biblioteca.devolver_livro(isbn, email)
+
+
+IMPLEMENTACOES = {classe.nome: classe for classe in (ImplementacaoLegado, ImplementacaoMelhorada)}
+
+
+# Medição ---------------------------------------------------------------------
+
+def percentil(valores, fracao):
+    """Percentil por posição em uma lista ordenada."""
+    return valores[min(len(valores) - 1, int(len(valores) * fracao))]
+
+
+def cronometrar(funcao, argumentos):
+    """
+    Executa funcao(*args) para cada item e devolve as latências em segundos.
+
+    Como no timeit, o coletor de lixo fica desligado durante a medição
+    para que suas pausas não sejam atribuídas à operação da vez.
+    """
+    latencias = []
+    relogio = time.perf_counter
+    gc.collect()
+    gc.disable()
+    try:
+        for args in argumentos:
+            inicio = relogio()
+            funcao(*args)
+            latencias.append(relogio() - inicio)
+    finally:
+        gc.enable()
+    return latencias
+
+
+def pico_memoria(funcao, argumentos):
+    """Pico de memória (bytes) alocada ao executar as operações."""
+    tracemalloc.start()
+    for args in argumentos:
+        funcao(*args)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return pico
+
+
+def resultado(implementacao, tamanho, operacao, latencias, memoria):
+    """Resumo de uma operação em formato serializável."""
+    total = sum(latencias)
+    ordenadas = sorted(latencias)
+    return {
+        "implementacao": implementacao,
+        "tamanho": tamanho,
+        "operacao": operacao,
+        "operacoes": len(latencias),
+        "segundos": round(total, 6),
+        "ops_por_segundo": round(len(latencias) / total, 1) if total else None,
+        "p50_us": round(percentil(ordenadas, 0.50) * 1e6, 2),
+        "p99_us": round(percentil(ordenadas, 0.99) * 1e6, 2),
+        "memoria_pico_bytes": memoria,
+    }
+
+
+def medir(classe, tamanho, com_memoria=True):
+    """Mede todas as operações suportadas por uma implementação."""
+    livros = list(gerar_livros(tamanho))
+    usuarios = list(gerar_usuarios(tamanho))
+    consultas = [(termo,) for termo in gerar_consultas(tamanho)]
+    aleatorio = random.Random(tamanho)
+    isbns = [(livro[3],) for livro in aleatorio.sample(livros, min(tamanho, CONSULTAS))]
+    emprestimos = [
+        (isbn, email) for (isbn,), (_, email) in zip(aleatorio.sample(isbns, len(isbns)), usuarios)
+    ]
+
+    resultados = []
+
+    def registrar(operacao, preparar, argumentos, chamada):
+        """Mede o tempo em uma instância e o pico de memória em outra idêntica."""
+        latencias = cronometrar(chamada(preparar()), argumentos)
+        memoria = pico_memoria(chamada(preparar()), argumentos) if com_memoria else None
+        resultados.append(resultado(classe.nome, tamanho, operacao, latencias, memoria))
+
+    def com_acervo():
+        instancia = classe()
+        for registro in livros:
+            instancia.adicionar_livro(*registro)
+        for registro in usuarios:
+            instancia.registrar_usuario(*registro)
+        return instancia
+
+    # O legado imprime a cada operação; a saída vai para o nulo nas duas implementações.
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        registrar("adicionar_livro", classe, livros, lambda i: i.adicionar_livro)
+        registrar("registrar_usuario", classe, usuarios, lambda i: i.registrar_usuario)
+        acervo = com_acervo()
+
+        consultas_por_operacao = [
+            ("obter_livro_por_isbn", isbns),
+            ("buscar_livro", consultas),
+            ("estatisticas", [()] * len(isbns)),
+        ]
+        for operacao, argumentos in consultas_por_operacao:
+            if hasattr(acervo, operacao):
+                latencias = cronometrar(getattr(acervo, operacao), argumentos)
+                memoria = pico_memoria(getattr(acervo, operacao), argumentos) if com_memoria else None
+                resultados.append(resultado(classe.nome, tamanho, operacao, latencias, memoria))
+
+        # Empréstimos alteram o estado: cada medição usa um acervo novo.
+        latencias = cronometrar(acervo.emprestar_livro, emprestimos)
+        memoria = None
+        if com_memoria:
+            memoria = pico_memoria(com_acervo().emprestar_livro, emprestimos)
+        resultados.append(resultado(classe.nome, tamanho, "emprestar_livro", latencias, memoria))
+
+        latencias = cronometrar(acervo.devolver_livro, emprestimos)
+        if com_memoria:
+            outro = com_acervo()
+            for args in emprestimos:
+                outro.emprestar_livro(*args)
+            memoria = pico_memoria(outro.devolver_livro, emprestimos)
+        resultados.append(resultado(classe.nome, tamanho, "devolver_livro", latencias, memoria))
+    return resultados
+
+
+def melhor_de(rodadas):
+    """
+    Combina repetições de medir() ficando com o melhor valor de cada métrica.
+
+    O melhor valor é o menos afetado por ruído da máquina; a memória só
+    é medida na primeira rodada.
+    """
+    combinados = [dict(item) for item in rodadas[0]]
+    for rodada in rodadas[1:]:
+        for combinado, item in zip(combinados, rodada):
+            if item["segundos"] < combinado["segundos"]:
+                for chave in ("segundos", "ops_por_segundo"):
+                    combinado[chave] = item[chave]
+            for chave in ("p50_us", "p99_us"):
+                combinado[chave] = min(combinado[chave], item[chave])
+    return combinados
+
+
+# Referência ------------------------------------------------------------------
+
+def comparar(resultados, referencia, tolerancia):
+    """
+    Regressões da implementação melhorada em relação à referência.
+
+    O legado serve apenas de comparação e não é verificado. O p99 só
+    é verificado com amostras suficientes para não oscilar com ruído.
+    """
+    anteriores = {
+        (item["implementacao"], item["tamanho"], item["operacao"]): item
+        for item in referencia["resultados"]
+    }
+    regressoes = []
+    for atual in resultados:
+        if atual["implementacao"] != ImplementacaoMelhorada.nome:
+            continue
+        anterior = anteriores.get((atual["implementacao"], atual["tamanho"], atual["operacao"]))
+        if anterior is None:
+            continue
+        for metrica in METRICAS_MAIOR_MELHOR + METRICAS_MENOR_MELHOR:
+            antes, depois = anterior.get(metrica), atual.get(metrica)
+            if not antes or depois is None:
+                continue
+            if metrica == "p99_us" and atual["operacoes"] < AMOSTRAS_MINIMAS_P99:
+                continue
+            if metrica in METRICAS_MAIOR_MELHOR:
+                piorou = depois < antes * (1 - tolerancia)
+            else:
+                piorou = depois > antes * (1 + tolerancia)
+            if piorou:
+                regressoes.append(
+                    f"{atual['operacao']} (n={atual['tamanho']}): {metrica} {antes} -> {depois}"
+                )
+    return regressoes
+
+
+def exibir(resultados):
+    """Tabela legível com o ganho da implementação melhorada sobre o legado."""
+    legado = {
+        (item["tamanho"], item["operacao"]): item
+        for item in resultados if item["implementacao"] == ImplementacaoLegado.nome
+    }
+    print(f"{'operação':<22}{'n':>10}{'impl.':>11}{'ops/s':>13}{'p50 µs':>10}{'p99 µs':>10}{'pico MiB':>10}{'ganho':>8}")
+    for item in resultados:
+        base = legado.get((item["tamanho"], item["operacao"]))
+        ganho = ""
+        if item["implementacao"] != ImplementacaoLegado.nome and base and base["ops_por_segundo"]:
+            ganho = f"{item['ops_por_segundo'] / base['ops_por_segundo']:.1f}x"
+        print(
+            f"{item['operacao']:<22}{item['tamanho']:>10}{item['implementacao']:>11}"
+            f"{item['ops_por_segundo'] or 0:>13,.0f}{item['p50_us']:>10.1f}{item['p99_us']:>10.1f}"
+            f"{item['memoria_pico_bytes'] / 2**20:>10.1f}{ganho:>8}"
+        )
+
+
+def main():
+    """Executa o benchmark, salva os resultados e verifica regressões."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--implementacoes", nargs="+", choices=sorted(IMPLEMENTACOES),
+                        default=sorted(IMPLEMENTACOES))
+    parser.add_argument("--repeticoes", type=int, default=3,
+                        help="rodadas por tamanho; vale o melhor resultado (padrão: 3)")
+    parser.add_argument("--saida", help="arquivo JSON com os resultados")
+    parser.add_argument("--referencia", help="resultados anteriores para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.5,
+                        help="piora relativa aceita por métrica (padrão: 0.5)")
+    parser.add_argument("--salvar-referencia", help="grava os resultados como nova referência")
+    argumentos = parser.parse_args()
+
+    eventos.definir_sink_padrao(eventos.SinkNulo())
+    resultados = []
+    for tamanho in argumentos.tamanhos:
+        for nome in argumentos.implementacoes:
+            classe = IMPLEMENTACOES[nome]
+            rodadas = [medir(classe, tamanho)]
+            rodadas += [medir(classe, tamanho, com_memoria=False) for _ in range(argumentos.repeticoes - 1)]
+            resultados.extend(melhor_de(rodadas))
+
+    relatorio = {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+    exibir(resultados)
+    for caminho in (argumentos.saida, argumentos.salvar_referencia):
+        if caminho:
+            with open(caminho, "w", encoding="utf-8") as arquivo:
+                json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+    if argumentos.referencia:
+        with open(argumentos.referencia, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultados, json.load(arquivo), argumentos.tolerancia)
+        if regressoes:
+            print(f"\n❌ {len(regressoes)} regressão(ões) acima de {argumentos.tolerancia:.0%}:")
+            for regressao in regressoes:
+                print(f"  • {regressao}")
+            sys.exit(1)
+        print(f"\n✅ Sem regressões acima de {argumentos.tolerancia:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark da replicação: custo do fluxo de mudanças e atraso da réplica
+Uso: python benchmarks/bench_replicacao.py [operacoes] [livros]
+
+Mede a vazão de empréstimos e devoluções na biblioteca principal sem e
+com o fluxo de mudanças, e o atraso de uma réplica que acompanha o fluxo
+em outra thread enquanto as operações acontecem.
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import eventos
+from biblioteca_melhorada import Biblioteca, Usuario
+from mudancas import FluxoMudancas
+from replicacao import Replica
+
+USUARIOS = 100
+
+
+def montar(livros, fluxo=None):
+    """Biblioteca com acervo e usuários, opcionalmente ligada a um fluxo."""
+    biblioteca = Biblioteca("Principal", sink=eventos.SinkNulo(), mudancas=fluxo)
+    biblioteca.importar_livros(
+        {"titulo": f"Livro {i}", "autor": f"Autor {i % 500}", "ano": 2000, "isbn": f"isbn-{i}"}
+        for i in range(livros)
+    )
+    for i in range(USUARIOS):
+        biblioteca.registrar_usuario(Usuario(f"usuario{i}", limite_livros=livros))
+    return biblioteca
+
+
+def operar(biblioteca, operacoes):
+    """Empresta e devolve em sequência; retorna operações por segundo."""
+    livros = biblioteca.livros
+    usuarios = biblioteca.usuarios
+    inicio = time.perf_counter()
+    for i in range(operacoes // 2):
+        usuario = usuarios[i % len(usuarios)]
+        livro = livros[i % len(livros)]
+        biblioteca.emprestar(usuario, livro)
+        biblioteca.devolver(usuario, livro)
+    return operacoes / (time.perf_counter() - inicio)
+
+
+def main():
+    """Executa o benchmark."""
+    operacoes = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    livros = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+
+    eventos.definir_sink_padrao(eventos.SinkNulo())
+    print(f"⚙️  {operacoes:,} operações sobre {livros:,} livros")
+
+    sem_fluxo = operar(montar(livros), operacoes)
+    print(f"🐢 Sem fluxo:          {sem_fluxo:12,.0f} op/s")
+
+    fluxo = FluxoMudancas(retencao=operacoes)
+    principal = montar(livros, fluxo)
+    com_fluxo = operar(principal, operacoes)
+    print(f"📜 Com fluxo:          {com_fluxo:12,.0f} op/s ({com_fluxo / sem_fluxo:.0%})")
+
+    seguidora = Biblioteca("Réplica", sink=eventos.SinkNulo())
+    inicio = time.perf_counter()
+    aplicadas = Replica(fluxo, seguidora).sincronizar()
+    print(f"📥 Aplicação:          {aplicadas / (time.perf_counter() - inicio):12,.0f} mudanças/s")
+
+    fluxo = FluxoMudancas(retencao=operacoes)
+    principal = montar(livros, fluxo)
+    seguidora = Biblioteca("Réplica", sink=eventos.SinkNulo())
+    atrasos = []
+    with Replica(fluxo, seguidora, espera=0.01) as replica:
+        replica.aguardar(fluxo.versao)
+        escritor = threading.Thread(target=operar, args=(principal, operacoes))
+        escritor.start()
+        while escritor.is_alive():
+            atrasos.append(replica.atraso)
+            time.sleep(0.001)
+        escritor.join()
+        inicio = time.perf_counter()
+        replica.aguardar(fluxo.versao)
+        alcance = time.perf_counter() - inicio
+
+    atrasos.sort()
+    print(f"⏱️  Atraso da réplica:  p50 {atrasos[len(atrasos) // 2]:,} | "
+          f"p99 {atrasos[len(atrasos) * 99 // 100]:,} | máximo {atrasos[-1]:,} mudanças")
+    print(f"🏁 Alcance final:      {alcance * 1000:12.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Teste de carga do servidor: latência p50/p99 e pedidos por segundo
+Uso: python benchmarks/bench_servidor.py [conexoes] [pedidos_por_conexao] [host:porta]
+
+Sem endereço, sobe um servidor local em outra thread com um acervo de exemplo.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import eventos
+from biblioteca_melhorada import Biblioteca, Livro, Usuario
+from servidor import ClienteBiblioteca, ServidorBiblioteca
+
+LIVROS = 20_000
+USUARIOS = 2_000
+PALAVRAS = ["amor", "guerra", "tempo", "casa", "mar", "noite", "cidade", "sombra", "rio", "fogo"]
+
+
+def montar_biblioteca():
+    """Acervo sintético com vários exemplares por ISBN."""
+    eventos.definir_sink_padrao(eventos.SinkNulo())
+    biblioteca = Biblioteca("Bench", sink=eventos.SinkNulo())
+    aleatorio = random.Random(42)
+    for i in range(LIVROS):
+        titulo = " ".join(aleatorio.sample(PALAVRAS, 3))
+        biblioteca.adicionar_livro(Livro(f"{titulo} {i}", f"Autor {i % 500}", 1900 + i % 120, f"isbn-{i % 5000}"))
+    for i in range(USUARIOS):
+        biblioteca.registrar_usuario(Usuario(f"usuario{i}", limite_livros=5))
+    return biblioteca
+
+
+def servidor_em_thread():
+    """Sobe o servidor em um laço de eventos próprio e devolve a porta."""
+    pronto = threading.Event()
+    estado = {}
+
+    def executar():
+        async def principal():
+            servidor = ServidorBiblioteca(montar_biblioteca())
+            await servidor.iniciar()
+            estado["porta"] = servidor.porta
+            pronto.set()
+            await asyncio.Event().wait()
+        asyncio.run(principal())
+
+    threading.Thread(target=executar, daemon=True).start()
+    pronto.wait()
+    return estado["porta"]
+
+
+async def balcao(host, porta, pedidos, semente, latencias):
+    """Um terminal: um pedido por vez, com mistura de leitura e escrita."""
+    aleatorio = random.Random(semente)
+    cliente = await ClienteBiblioteca.conectar(host, porta)
+    for _ in range(pedidos):
+        sorteio = aleatorio.random()
+        usuario = f"usuario{aleatorio.randrange(USUARIOS)}"
+        isbn = f"isbn-{aleatorio.randrange(5000)}"
+        inicio = time.perf_counter()
+        if sorteio < 0.7:
+            await cliente.pedir("buscar", termo=aleatorio.choice(PALAVRAS), limite=20)
+        elif sorteio < 0.85:
+            await cliente.pedir("emprestar", isbn=isbn, usuario=usuario)
+        elif sorteio < 0.99:
+            await cliente.pedir("devolver", isbn=isbn, usuario=usuario)
+        else:
+            await cliente.pedir("estatisticas")
+        latencias.append(time.perf_counter() - inicio)
+    await cliente.fechar()
+
+
+def percentil(valores, fracao):
+    """Percentil por posição em uma lista ordenada."""
+    return valores[min(len(valores) - 1, int(len(valores) * fracao))]
+
+
+async def carga(host, porta, conexoes, pedidos):
+    latencias = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(balcao(host, porta, pedidos, i, latencias) for i in range(conexoes)))
+    return latencias, time.perf_counter() - inicio
+
+
+def main():
+    conexoes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    pedidos = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    if len(sys.argv) > 3:
+        host, porta = sys.argv[3].rsplit(":", 1)
+        porta = int(porta)
+    else:
+        host, porta = "127.0.0.1", servidor_em_thread()
+
+    latencias, duracao = asyncio.run(carga(host, porta, conexoes, pedidos))
+    latencias.sort()
+    print(f"Conexões: {conexoes} | pedidos: {len(latencias):,}")
+    print(f"Vazão: {len(latencias) / duracao:,.0f} pedidos/s")
+    print(f"Latência p50: {percentil(latencias, 0.50) * 1000:.2f} ms | "
+          f"p99: {percentil(latencias, 0.99) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
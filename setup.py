@@ -38,6 +38,7 @@ setup(
     extras_require={
         "dev": requirements,
         "test": ["pytest>=7.0.0", "pytest-cov>=4.0.0"],
+        "analise": ["numpy>=1.20.0"],
     },
     entry_points={
         "console_scripts": [
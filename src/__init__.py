@@ -8,6 +8,41 @@ __version__ = "1.0.0"
 __author__ = "Wenderson José"
 __email__ = "wenderson@email.com"
 
-from .biblioteca_melhorada import Livro, Usuario, Biblioteca
+from .biblioteca_melhorada import Livro, Obra, Usuario, Biblioteca, Estatisticas, EmprestimosUsuario
+from .armazenamento import Armazenamento, ArmazenamentoSQLite
+from .cache_buscas import CacheBuscas
+from .catalogo_compacto import CatalogoCompacto, LivroCompacto
+from .diario import ArmazenamentoDiario
+from .federacao import Federacao
+from .historico import HistoricoEmprestimos
+from .mudancas import FluxoMudancas, Mudanca
+from .replicacao import Replica
+from .snapshot_binario import CatalogoMapeado
+from .reservas import CentralReservas, Reserva
+from .vencimentos import AgendaVencimentos
+from .metricas import Metricas
 
-__all__ = ["Livro", "Usuario", "Biblioteca"]
\ No newline at end of file
+__all__ = [
+    "Livro",
+    "Obra",
+    "Usuario",
+    "Biblioteca",
+    "Estatisticas",
+    "EmprestimosUsuario",
+    "CatalogoCompacto",
+    "LivroCompacto",
+    "Armazenamento",
+    "ArmazenamentoSQLite",
+    "ArmazenamentoDiario",
+    "CatalogoMapeado",
+    "CentralReservas",
+    "Reserva",
+    "AgendaVencimentos",
+    "CacheBuscas",
+    "HistoricoEmprestimos",
+    "Federacao",
+    "FluxoMudancas",
+    "Mudanca",
+    "Replica",
+    "Metricas",
+]
\ No newline at end of file
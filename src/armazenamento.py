@@ -0,0 +1,381 @@
+"""
+Persistência do estado da Biblioteca
+Define a interface de armazenamento e uma implementação em SQLite
+(modo WAL, escritas em lote e pool de conexões de leitura).
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from .indices import normalizar_isbn
+except ImportError:  # executado como script ou com src/ no sys.path
+    from indices import normalizar_isbn  # type: ignore[import-not-found,no-redef]
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .biblioteca_melhorada import Biblioteca, Livro, Usuario
+
+
+@dataclass
+class RegistroLivro:
+    """Livro como guardado no armazenamento."""
+
+    codigo: int
+    titulo: str
+    autor: str
+    ano: int
+    isbn: Optional[str] = None
+    disponivel: bool = True
+    data_emprestimo: Optional[datetime] = None
+
+
+@dataclass
+class RegistroUsuario:
+    """Usuário como guardado no armazenamento."""
+
+    nome: str
+    email: Optional[str] = None
+    limite_livros: int = 3
+
+
+@dataclass
+class RegistroEmprestimo:
+    """Vínculo entre um livro emprestado e o usuário que o pegou."""
+
+    codigo_livro: int
+    nome_usuario: str
+
+
+@dataclass
+class EstadoArmazenado:
+    """Estado completo lido do armazenamento."""
+
+    livros: List[RegistroLivro] = field(default_factory=list)
+    usuarios: List[RegistroUsuario] = field(default_factory=list)
+    emprestimos: List[RegistroEmprestimo] = field(default_factory=list)
+
+
+class Armazenamento:
+    """
+    Interface de armazenamento usada pela Biblioteca.
+
+    A biblioteca chama ``carregar`` ao ser criada e, depois, um método
+    por mutação. A implementação base não guarda nada.
+    """
+
+    def anexar(self, biblioteca: "Biblioteca") -> None:
+        """Recebe a biblioteca que usa este armazenamento."""
+
+    def carregar(self) -> EstadoArmazenado:
+        """Lê o estado salvo."""
+        return EstadoArmazenado()
+
+    def livros_adicionados(self, livros: Iterable["Livro"]) -> None:
+        """Novos livros no acervo."""
+
+    def livro_removido(self, livro: "Livro") -> None:
+        """Livro retirado do acervo."""
+
+    def usuario_registrado(self, usuario: "Usuario") -> None:
+        """Novo usuário registrado."""
+
+    def usuario_removido(self, usuario: "Usuario") -> None:
+        """Usuário removido."""
+
+    def emprestimo(self, livro: "Livro", usuario: Optional["Usuario"]) -> None:
+        """Livro emprestado (usuario é None quando emprestado diretamente)."""
+
+    def devolucao(self, livro: "Livro", usuario: Optional["Usuario"]) -> None:
+        """Livro devolvido."""
+
+    def emprestimos(self, pares: Sequence[Tuple["Livro", Optional["Usuario"]]]) -> None:
+        """Vários empréstimos de uma vez; as implementações podem gravá-los juntos."""
+        for livro, usuario in pares:
+            self.emprestimo(livro, usuario)
+
+    def devolucoes(self, pares: Sequence[Tuple["Livro", Optional["Usuario"]]]) -> None:
+        """Várias devoluções de uma vez; as implementações podem gravá-las juntas."""
+        for livro, usuario in pares:
+            self.devolucao(livro, usuario)
+
+    def sincronizar(self) -> None:
+        """Grava o que estiver pendente."""
+
+    def fechar(self) -> None:
+        """Grava o que estiver pendente e libera recursos."""
+        self.sincronizar()
+
+    def __enter__(self) -> "Armazenamento":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS livros (
+    codigo INTEGER PRIMARY KEY,
+    titulo TEXT NOT NULL,
+    autor TEXT NOT NULL,
+    ano INTEGER NOT NULL,
+    isbn TEXT,
+    isbn_normalizado TEXT,
+    disponivel INTEGER NOT NULL DEFAULT 1,
+    data_emprestimo TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_livros_isbn ON livros (isbn_normalizado);
+CREATE INDEX IF NOT EXISTS idx_livros_autor ON livros (autor COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_livros_ano ON livros (ano);
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chave TEXT NOT NULL UNIQUE,
+    nome TEXT NOT NULL,
+    email TEXT,
+    limite_livros INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS emprestimos (
+    codigo_livro INTEGER PRIMARY KEY REFERENCES livros (codigo) ON DELETE CASCADE,
+    chave_usuario TEXT NOT NULL REFERENCES usuarios (chave)
+);
+"""
+
+_INSERIR_LIVRO = (
+    "INSERT OR REPLACE INTO livros "
+    "(codigo, titulo, autor, ano, isbn, isbn_normalizado, disponivel, data_emprestimo) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERIR_USUARIO = (
+    "INSERT OR REPLACE INTO usuarios (chave, nome, email, limite_livros) VALUES (?, ?, ?, ?)"
+)
+_SELECIONAR_LIVROS = (
+    "SELECT codigo, titulo, autor, ano, isbn, disponivel, data_emprestimo FROM livros"
+)
+
+
+def _linha_livro(livro: "Livro") -> Tuple:
+    data = livro.data_emprestimo.isoformat() if livro.data_emprestimo else None
+    return (
+        livro.codigo, livro.titulo, livro.autor, livro.ano, livro.isbn,
+        normalizar_isbn(livro.isbn) if livro.isbn else None, int(livro.disponivel), data,
+    )
+
+
+def _registro_livro(linha: Tuple) -> RegistroLivro:
+    codigo, titulo, autor, ano, isbn, disponivel, data = linha
+    return RegistroLivro(
+        codigo, titulo, autor, ano, isbn, bool(disponivel),
+        datetime.fromisoformat(data) if data else None,
+    )
+
+
+class _PoolConexoes:
+    """Pool fixo de conexões somente leitura."""
+
+    def __init__(self, caminho: str, tamanho: int):
+        self._livres: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._todas = []
+        for _ in range(tamanho):
+            conexao = sqlite3.connect(
+                f"file:{caminho}?mode=ro", uri=True, check_same_thread=False
+            )
+            self._todas.append(conexao)
+            self._livres.put(conexao)
+
+    @contextmanager
+    def conexao(self) -> Iterator[sqlite3.Connection]:
+        conexao = self._livres.get()
+        try:
+            yield conexao
+        finally:
+            self._livres.put(conexao)
+
+    def fechar(self) -> None:
+        for conexao in self._todas:
+            conexao.close()
+
+
+class ArmazenamentoSQLite(Armazenamento):
+    """
+    Armazenamento em um arquivo SQLite.
+
+    Usa o modo WAL para que leitores não bloqueiem o escritor, acumula
+    inclusões de livros e usuários para gravá-las com ``executemany`` e
+    grava cada empréstimo ou devolução em uma transação própria.
+
+    As inclusões acumuladas só ficam duráveis quando são gravadas: ao
+    completar ``tamanho_lote``, na próxima escrita de outro tipo
+    (remoção, empréstimo ou devolução), em ``sincronizar`` ou em
+    ``fechar``. Uma queda antes disso perde as inclusões pendentes.
+    """
+
+    def __init__(self, caminho: str, leitores: int = 4, tamanho_lote: int = 1000):
+        """
+        Abre (ou cria) o banco.
+
+        Args:
+            caminho: Arquivo do banco de dados
+            leitores: Tamanho do pool de conexões de leitura
+            tamanho_lote: Inclusões acumuladas antes de uma gravação
+        """
+        if caminho == ":memory:":
+            raise ValueError("ArmazenamentoSQLite exige um arquivo")
+        self.caminho = caminho
+        self._tamanho_lote = tamanho_lote
+        self._trava = threading.RLock()
+        self._livros_pendentes: List[Tuple] = []
+        self._usuarios_pendentes: List[Tuple] = []
+
+        self._conexao = sqlite3.connect(caminho, isolation_level=None, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute("PRAGMA foreign_keys=ON")
+        self._conexao.executescript(_ESQUEMA)
+        self._leitores = _PoolConexoes(caminho, leitores)
+
+    @contextmanager
+    def _transacao(self) -> Iterator[sqlite3.Connection]:
+        with self._trava:
+            self._conexao.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conexao
+            except BaseException:
+                self._conexao.execute("ROLLBACK")
+                raise
+            self._conexao.execute("COMMIT")
+
+    def _gravar_pendentes(self, conexao: sqlite3.Connection) -> None:
+        if self._livros_pendentes:
+            conexao.executemany(_INSERIR_LIVRO, self._livros_pendentes)
+            self._livros_pendentes.clear()
+        if self._usuarios_pendentes:
+            conexao.executemany(_INSERIR_USUARIO, self._usuarios_pendentes)
+            self._usuarios_pendentes.clear()
+
+    def sincronizar(self) -> None:
+        """Grava as inclusões acumuladas."""
+        with self._trava:
+            if self._livros_pendentes or self._usuarios_pendentes:
+                with self._transacao() as conexao:
+                    self._gravar_pendentes(conexao)
+
+    def _enfileirar(self, fila: List[Tuple], linhas: Iterable[Tuple]) -> None:
+        with self._trava:
+            fila.extend(linhas)
+            if len(self._livros_pendentes) + len(self._usuarios_pendentes) >= self._tamanho_lote:
+                self.sincronizar()
+
+    def carregar(self) -> EstadoArmazenado:
+        """Lê livros, usuários e empréstimos em ordem de cadastro."""
+        self.sincronizar()
+        with self._leitores.conexao() as conexao:
+            livros = [
+                _registro_livro(linha)
+                for linha in conexao.execute(_SELECIONAR_LIVROS + " ORDER BY codigo")
+            ]
+            usuarios = [
+                RegistroUsuario(nome, email, limite)
+                for nome, email, limite in conexao.execute(
+                    "SELECT nome, email, limite_livros FROM usuarios ORDER BY id"
+                )
+            ]
+            emprestimos = [
+                RegistroEmprestimo(codigo, nome)
+                for codigo, nome in conexao.execute(
+                    "SELECT e.codigo_livro, u.nome FROM emprestimos e "
+                    "JOIN usuarios u ON u.chave = e.chave_usuario ORDER BY e.rowid"
+                )
+            ]
+        return EstadoArmazenado(livros, usuarios, emprestimos)
+
+    def livros_adicionados(self, livros: Iterable["Livro"]) -> None:
+        """
+        Acumula novos livros para gravação em lote.
+
+        Abaixo de ``tamanho_lote`` as inclusões ainda não estão no banco;
+        chame ``sincronizar`` para torná-las duráveis.
+        """
+        self._enfileirar(self._livros_pendentes, (_linha_livro(livro) for livro in livros))
+
+    def livro_removido(self, livro: "Livro") -> None:
+        with self._transacao() as conexao:
+            self._gravar_pendentes(conexao)
+            conexao.execute("DELETE FROM livros WHERE codigo = ?", (livro.codigo,))
+
+    def usuario_registrado(self, usuario: "Usuario") -> None:
+        linha = (usuario.nome.casefold(), usuario.nome, usuario.email, usuario.limite_livros)
+        self._enfileirar(self._usuarios_pendentes, [linha])
+
+    def usuario_removido(self, usuario: "Usuario") -> None:
+        with self._transacao() as conexao:
+            self._gravar_pendentes(conexao)
+            conexao.execute("DELETE FROM usuarios WHERE chave = ?", (usuario.nome.casefold(),))
+
+    def emprestimo(self, livro: "Livro", usuario: Optional["Usuario"]) -> None:
+        self.emprestimos([(livro, usuario)])
+
+    def devolucao(self, livro: "Livro", usuario: Optional["Usuario"]) -> None:
+        self.devolucoes([(livro, usuario)])
+
+    def emprestimos(self, pares: Sequence[Tuple["Livro", Optional["Usuario"]]]) -> None:
+        """Grava todos os empréstimos em uma única transação."""
+        livros = [
+            (livro.data_emprestimo.isoformat() if livro.data_emprestimo else None, livro.codigo)
+            for livro, _ in pares
+        ]
+        vinculos = [(livro.codigo, usuario.nome.casefold()) for livro, usuario in pares if usuario is not None]
+        with self._transacao() as conexao:
+            self._gravar_pendentes(conexao)
+            conexao.executemany("UPDATE livros SET disponivel = 0, data_emprestimo = ? WHERE codigo = ?", livros)
+            conexao.executemany(
+                "INSERT OR REPLACE INTO emprestimos (codigo_livro, chave_usuario) VALUES (?, ?)", vinculos
+            )
+
+    def devolucoes(self, pares: Sequence[Tuple["Livro", Optional["Usuario"]]]) -> None:
+        """Grava todas as devoluções em uma única transação."""
+        codigos = [(livro.codigo,) for livro, _ in pares]
+        with self._transacao() as conexao:
+            self._gravar_pendentes(conexao)
+            conexao.executemany(
+                "UPDATE livros SET disponivel = 1, data_emprestimo = NULL WHERE codigo = ?", codigos
+            )
+            conexao.executemany("DELETE FROM emprestimos WHERE codigo_livro = ?", codigos)
+
+    def buscar_por_isbn(self, isbn: str) -> List[RegistroLivro]:
+        """Consulta exemplares pelo ISBN (usa o pool de leitura)."""
+        self.sincronizar()
+        with self._leitores.conexao() as conexao:
+            cursor = conexao.execute(
+                _SELECIONAR_LIVROS + " WHERE isbn_normalizado = ? ORDER BY codigo",
+                (normalizar_isbn(isbn),),
+            )
+            return [_registro_livro(linha) for linha in cursor]
+
+    def buscar_por_autor(self, autor: str) -> List[RegistroLivro]:
+        """Consulta livros de um autor, sem diferenciar maiúsculas."""
+        self.sincronizar()
+        with self._leitores.conexao() as conexao:
+            cursor = conexao.execute(
+                _SELECIONAR_LIVROS + " WHERE autor = ? COLLATE NOCASE ORDER BY codigo", (autor,)
+            )
+            return [_registro_livro(linha) for linha in cursor]
+
+    def buscar_por_ano(self, inicio: int, fim: int) -> List[RegistroLivro]:
+        """Consulta livros publicados entre dois anos (inclusive)."""
+        self.sincronizar()
+        with self._leitores.conexao() as conexao:
+            cursor = conexao.execute(
+                _SELECIONAR_LIVROS + " WHERE ano BETWEEN ? AND ? ORDER BY ano, codigo",
+                (inicio, fim),
+            )
+            return [_registro_livro(linha) for linha in cursor]
+
+    def fechar(self) -> None:
+        """Grava o que estiver pendente e fecha todas as conexões."""
+        self.sincronizar()
+        self._leitores.fechar()
+        self._conexao.close()
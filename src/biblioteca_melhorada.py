@@ -5,10 +5,52 @@ Autor: Wenderson José
 Data: Outubro 2025
 """
 
+import base64
+import json
+import threading
 from datetime import datetime
-from typing import List, Optional
+from itertools import count, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
 from dataclasses import dataclass, field
 
+try:
+    from . import eventos
+    from .armazenamento import Armazenamento, EstadoArmazenado
+    from .cache_buscas import CacheBuscas
+    from .concorrencia import TravaLeituraEscrita, TravasParticionadas
+    from .historico import HistoricoEmprestimos
+    from .importacao import Fonte, LinhaRejeitada, RelatorioImportacao, em_lotes, ler_registros
+    from .indices import IndiceOrdenado, IndiceTextual, normalizar_isbn
+    from .mudancas import FluxoMudancas
+    from .reservas import CentralReservas, Reserva
+    from .vencimentos import AgendaVencimentos, Emprestimo
+except ImportError:  # executado como script ou com src/ no sys.path
+    import eventos  # type: ignore[import-not-found,no-redef]
+    from armazenamento import Armazenamento, EstadoArmazenado  # type: ignore[import-not-found,no-redef]
+    from cache_buscas import CacheBuscas  # type: ignore[import-not-found,no-redef]
+    from concorrencia import TravaLeituraEscrita, TravasParticionadas  # type: ignore[import-not-found,no-redef]
+    from historico import HistoricoEmprestimos  # type: ignore[import-not-found,no-redef]
+    from importacao import Fonte, LinhaRejeitada, RelatorioImportacao, em_lotes, ler_registros  # type: ignore[import-not-found,no-redef]
+    from indices import IndiceOrdenado, IndiceTextual, normalizar_isbn  # type: ignore[import-not-found,no-redef]
+    from mudancas import FluxoMudancas  # type: ignore[import-not-found,no-redef]
+    from reservas import CentralReservas, Reserva  # type: ignore[import-not-found,no-redef]
+    from vencimentos import AgendaVencimentos, Emprestimo  # type: ignore[import-not-found,no-redef]
+
+
+_codigos = count(1)
+
+
+def _gerar_codigo() -> int:
+    """Gera o próximo código interno de exemplar."""
+    return next(_codigos)
+
+
+def _reservar_codigo(codigo: int) -> None:
+    """Garante que códigos restaurados de um armazenamento não sejam gerados de novo."""
+    global _codigos
+    proximo = next(_codigos)
+    _codigos = count(max(proximo, codigo + 1))
+
 
 @dataclass
 class Livro:
@@ -20,93 +62,427 @@ class Livro:
     isbn: Optional[str] = None
     disponivel: bool = True
     data_emprestimo: Optional[datetime] = None
+    codigo: int = field(default_factory=_gerar_codigo, init=False, repr=False, compare=False)
+    obra: Optional["Obra"] = field(default=None, init=False, repr=False, compare=False)
+    _observadores: List[Callable[["Livro", str, Optional["Usuario"]], None]] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
     
     def __post_init__(self):
         """Validações após inicialização."""
-        if self.ano < 0 or self.ano > datetime.now().year:
+        self._validar(self.titulo, self.autor, self.ano, datetime.now().year)
+
+    @staticmethod
+    def _validar(titulo: str, autor: str, ano: int, ano_maximo: int) -> None:
+        """
+        Valida os dados bibliográficos de um livro.
+        
+        Args:
+            titulo: Título do livro
+            autor: Autor do livro
+            ano: Ano de publicação
+            ano_maximo: Maior ano aceito (normalmente o ano corrente)
+        """
+        if ano < 0 or ano > ano_maximo:
             raise ValueError("Ano inválido para o livro")
-        if not self.titulo.strip():
+        if not titulo.strip():
             raise ValueError("Título não pode estar vazio")
-        if not self.autor.strip():
+        if not autor.strip():
             raise ValueError("Autor não pode estar vazio")
 
-    def emprestar(self) -> bool:
+    @classmethod
+    def _criar_validado(cls, titulo: str, autor: str, ano: int, isbn: Optional[str]) -> "Livro":
+        """
+        Cria um livro cujos dados já passaram por ``_validar``.
+        
+        Usado pela importação em massa para não consultar o relógio
+        a cada registro em ``__post_init__``.
+        """
+        livro = cls.__new__(cls)
+        livro.titulo = titulo
+        livro.autor = autor
+        livro.ano = ano
+        livro.isbn = isbn
+        livro.disponivel = True
+        livro.data_emprestimo = None
+        livro.codigo = _gerar_codigo()
+        livro.obra = None
+        livro._observadores = []
+        return livro
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Estado usado por pickle e copy: os dados do livro, sem os observadores
+        e a obra, que pertencem à biblioteca (e guardam travas).
+        
+        A cópia é um exemplar avulso, com o mesmo código, fora de qualquer biblioteca.
+        """
+        estado = self.__dict__.copy()
+        estado["obra"] = None
+        estado["_observadores"] = []
+        return estado
+
+    def emprestar(self, usuario: Optional["Usuario"] = None) -> bool:
         """
         Empresta o livro se estiver disponível.
         
+        Args:
+            usuario: Quem está pegando o livro (repassado aos observadores)
+        
         Returns:
             bool: True se emprestado com sucesso, False caso contrário
         """
         if self.disponivel:
             self.disponivel = False
             self.data_emprestimo = datetime.now()
+            try:
+                self._notificar("emprestado", usuario)
+            except BaseException:
+                self.disponivel = True
+                self.data_emprestimo = None
+                raise
             return True
         return False
         
-    def devolver(self) -> None:
-        """Devolve o livro, tornando-o disponível novamente."""
+    def devolver(self, usuario: Optional["Usuario"] = None) -> None:
+        """
+        Devolve o livro, tornando-o disponível novamente.
+        
+        Args:
+            usuario: Quem está devolvendo o livro (repassado aos observadores)
+        """
+        estava_emprestado = not self.disponivel
         self.disponivel = True
+        if estava_emprestado:
+            try:
+                self._notificar("devolvido", usuario)  # Observadores ainda veem a data, para desfazer
+            except BaseException:
+                self.disponivel = False
+                raise
         self.data_emprestimo = None
 
+    def _notificar(self, evento: str, usuario: Optional["Usuario"] = None) -> None:
+        """
+        Avisa os observadores (ex.: a biblioteca) sobre uma mudança de estado.
+        
+        Se um observador falhar (ex.: erro ao gravar), os que já foram
+        avisados recebem o evento inverso antes de o erro ser propagado.
+        """
+        avisados = 0
+        try:
+            for observador in self._observadores:
+                observador(self, evento, usuario)
+                avisados += 1
+        except BaseException:
+            inverso = "devolvido" if evento == "emprestado" else "emprestado"
+            for observador in reversed(self._observadores[:avisados]):
+                observador(self, inverso, usuario)
+            raise
+
     def __str__(self) -> str:
         """Representação em string do livro."""
         status = "Disponível" if self.disponivel else "Emprestado"
         return f"{self.titulo} ({self.ano}) - {self.autor} | Status: {status}"
 
 
+_codigos_obra = count(1)
+
+
+class Obra:
+    """
+    Título do acervo (registro bibliográfico) e seus exemplares.
+    
+    Os dados bibliográficos ficam uma única vez na obra: os campos de
+    cada exemplar (Livro) iguais aos da obra passam a apontar para as
+    mesmas strings, sem mudar de valor, e o exemplar guarda apenas o
+    próprio estado. A obra observa empréstimos e devoluções dos
+    exemplares e mantém um contador de disponíveis, então saber se há
+    algum exemplar livre custa O(1).
+    """
+    
+    __slots__ = ("titulo", "autor", "ano", "isbn", "codigo", "_exemplares", "_disponiveis", "_trava_contador")
+    
+    def __init__(self, titulo: str, autor: str, ano: int, isbn: Optional[str] = None):
+        """
+        Cria uma obra sem exemplares.
+        
+        Args:
+            titulo: Título
+            autor: Autor
+            ano: Ano de publicação
+            isbn: ISBN (opcional)
+        """
+        Livro._validar(titulo, autor, ano, datetime.now().year)
+        self.titulo = titulo
+        self.autor = autor
+        self.ano = ano
+        self.isbn = isbn
+        self.codigo = next(_codigos_obra)
+        self._exemplares: List[Livro] = []
+        self._disponiveis = 0
+        self._trava_contador = threading.Lock()
+    
+    @classmethod
+    def _de_livro(cls, livro: Livro) -> "Obra":
+        """Cria a obra de um exemplar já validado, sem consultar o relógio."""
+        obra = cls.__new__(cls)
+        obra.titulo = livro.titulo
+        obra.autor = livro.autor
+        obra.ano = livro.ano
+        obra.isbn = livro.isbn
+        obra.codigo = next(_codigos_obra)
+        obra._exemplares = []
+        obra._disponiveis = 0
+        obra._trava_contador = threading.Lock()
+        return obra
+    
+    @staticmethod
+    def chave(livro: Livro) -> Tuple[str, str, str, int]:
+        """Exemplares com a mesma chave pertencem à mesma obra."""
+        isbn = normalizar_isbn(livro.isbn) if livro.isbn else ""
+        return isbn, livro.titulo, livro.autor, livro.ano
+    
+    def __len__(self) -> int:
+        """Quantidade de exemplares."""
+        return len(self._exemplares)
+    
+    @property
+    def exemplares(self) -> List[Livro]:
+        """Exemplares, na ordem em que foram incluídos."""
+        return list(self._exemplares)
+    
+    @property
+    def disponiveis(self) -> int:
+        """Quantidade de exemplares disponíveis."""
+        return self._disponiveis
+    
+    @property
+    def tem_disponivel(self) -> bool:
+        """True se algum exemplar estiver disponível (O(1))."""
+        return self._disponiveis > 0
+    
+    def exemplar_disponivel(self) -> Optional[Livro]:
+        """Primeiro exemplar disponível, ou None se todos estiverem emprestados."""
+        if not self._disponiveis:
+            return None
+        for livro in self._exemplares:
+            if livro.disponivel:
+                return livro
+        return None
+    
+    def incluir(self, livro: Livro) -> None:
+        """
+        Inclui um exemplar, deixando de pertencer à obra anterior, se houver.
+        
+        Args:
+            livro: Exemplar com os mesmos dados bibliográficos da obra
+        """
+        if livro.obra is self:
+            return
+        if livro.obra is not None:
+            livro.obra.remover(livro)
+        if "titulo" in vars(livro):  # Vistas como LivroCompacto guardam os dados em outro lugar
+            # Só compartilha strings iguais: um ISBN com outra pontuação fica como o chamador o deu
+            for campo in ("titulo", "autor", "isbn"):
+                valor = getattr(self, campo)
+                if getattr(livro, campo) == valor:
+                    setattr(livro, campo, valor)
+        livro.obra = self
+        livro._observadores.append(self._ao_alterar_exemplar)
+        self._exemplares.append(livro)
+        if livro.disponivel:
+            with self._trava_contador:
+                self._disponiveis += 1
+    
+    def remover(self, livro: Livro) -> bool:
+        """
+        Retira um exemplar da obra.
+        
+        Args:
+            livro: Exemplar a retirar
+            
+        Returns:
+            bool: True se o exemplar pertencia à obra
+        """
+        for posicao, exemplar in enumerate(self._exemplares):
+            if exemplar.codigo == livro.codigo:
+                break
+        else:
+            return False
+        del self._exemplares[posicao]
+        exemplar._observadores.remove(self._ao_alterar_exemplar)
+        exemplar.obra = None
+        if exemplar.disponivel:
+            with self._trava_contador:
+                self._disponiveis -= 1
+        return True
+    
+    def _ao_alterar_exemplar(self, livro: Livro, evento: str, usuario: Optional["Usuario"]) -> None:
+        """Mantém o contador de disponíveis."""
+        with self._trava_contador:
+            if evento == "emprestado":
+                self._disponiveis -= 1
+            elif evento == "devolvido":
+                self._disponiveis += 1
+    
+    def __str__(self) -> str:
+        """Representação em string da obra."""
+        return f"{self.titulo} ({self.ano}) - {self.autor} | {self._disponiveis}/{len(self)} disponíveis"
+
+
+class EmprestimosUsuario:
+    """
+    Livros emprestados a um usuário, indexados pelo código do exemplar.
+    
+    Pertinência, inclusão e remoção custam O(1) e distinguem exemplares
+    idênticos, ao contrário de uma lista comparada pelo ``__eq__`` de
+    Livro. A ordem de empréstimo é preservada e a coleção se comporta
+    como uma sequência (iteração, ``len``, índice e comparação com listas).
+    """
+    
+    __slots__ = ("_por_codigo",)
+    
+    def __init__(self, livros: Iterable[Livro] = ()):
+        """
+        Args:
+            livros: Empréstimos iniciais
+        """
+        self._por_codigo: Dict[int, Livro] = {}
+        for livro in livros:
+            self.adicionar(livro)
+    
+    def __len__(self) -> int:
+        return len(self._por_codigo)
+    
+    def __iter__(self) -> Iterator[Livro]:
+        return iter(list(self._por_codigo.values()))
+    
+    def __contains__(self, livro: object) -> bool:
+        return isinstance(livro, Livro) and livro.codigo in self._por_codigo
+    
+    def __getitem__(self, indice: int) -> Livro:
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("Posição fora dos empréstimos")
+        return next(islice(self._por_codigo.values(), indice, None))
+    
+    def __eq__(self, outro: object) -> bool:
+        if isinstance(outro, EmprestimosUsuario):
+            return list(self) == list(outro)
+        if isinstance(outro, list):
+            return list(self) == outro
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return repr(list(self))
+    
+    def obter(self, codigo: int) -> Optional[Livro]:
+        """Livro emprestado com o código informado, se houver."""
+        return self._por_codigo.get(codigo)
+    
+    def adicionar(self, livro: Livro) -> None:
+        """Registra o empréstimo de um exemplar."""
+        self._por_codigo[livro.codigo] = livro
+    
+    def remover(self, livro: Livro) -> bool:
+        """
+        Retira o empréstimo de um exemplar.
+        
+        Returns:
+            bool: True se o exemplar estava emprestado ao usuário
+        """
+        return self._por_codigo.pop(livro.codigo, None) is not None
+    
+    def append(self, livro: Livro) -> None:
+        """Compatível com a lista usada anteriormente (ver ``adicionar``)."""
+        self.adicionar(livro)
+    
+    def remove(self, livro: Livro) -> None:
+        """Compatível com a lista usada anteriormente (ver ``remover``)."""
+        if not self.remover(livro):
+            raise ValueError("Livro não está entre os empréstimos")
+
+
 @dataclass 
 class Usuario:
     """Classe que representa um usuário da biblioteca."""
     
     nome: str
     email: Optional[str] = None
-    livros_emprestados: List[Livro] = field(default_factory=list)
+    livros_emprestados: EmprestimosUsuario = field(default_factory=EmprestimosUsuario)
     limite_livros: int = 3
     
     def __post_init__(self):
         """Validações após inicialização."""
         if not self.nome.strip():
             raise ValueError("Nome não pode estar vazio")
+        if not isinstance(self.livros_emprestados, EmprestimosUsuario):
+            self.livros_emprestados = EmprestimosUsuario(self.livros_emprestados)
 
-    def pegar_livro(self, livro: Livro) -> bool:
+    def pegar_livro(self, livro: Union[Livro, Obra],
+                    emitir: Optional[Callable[[eventos.Evento], None]] = None) -> bool:
         """
         Tenta emprestar um livro para o usuário.
         
         Args:
-            livro: O livro a ser emprestado
+            livro: O exemplar a ser emprestado, ou uma obra para levar
+                qualquer exemplar disponível dela
+            emitir: Destino dos eventos (padrão: o destino padrão; a
+                biblioteca passa o seu)
             
         Returns:
             bool: True se emprestado com sucesso, False caso contrário
         """
+        emitir = emitir or eventos.emitir
         if len(self.livros_emprestados) >= self.limite_livros:
-            print(f"❌ {self.nome} atingiu o limite de {self.limite_livros} livros")
+            emitir(eventos.EmprestimoRecusadoLimite(self, livro))
             return False
             
-        if livro.emprestar():
-            self.livros_emprestados.append(livro)
-            print(f"✅ {self.nome} emprestou '{livro.titulo}'")
+        if isinstance(livro, Obra):
+            return self._pegar_exemplar(livro, emitir)
+            
+        if livro.emprestar(self):
+            self.livros_emprestados.adicionar(livro)
+            emitir(eventos.EmprestimoRealizado(self, livro))
             return True
         else:
-            print(f"❌ O livro '{livro.titulo}' não está disponível")
+            emitir(eventos.EmprestimoRecusadoIndisponivel(self, livro))
             return False
 
-    def devolver_livro(self, livro: Livro) -> bool:
+    def _pegar_exemplar(self, obra: Obra, emitir: Callable[[eventos.Evento], None]) -> bool:
+        """Empresta qualquer exemplar disponível da obra."""
+        while True:
+            livro = obra.exemplar_disponivel()
+            if livro is None:
+                emitir(eventos.EmprestimoRecusadoIndisponivel(self, obra))
+                return False
+            if livro.emprestar(self):  # Falha se outro usuário levou o exemplar antes
+                self.livros_emprestados.adicionar(livro)
+                emitir(eventos.EmprestimoRealizado(self, livro))
+                return True
+
+    def devolver_livro(self, livro: Livro,
+                       emitir: Optional[Callable[[eventos.Evento], None]] = None) -> bool:
         """
         Devolve um livro emprestado.
         
         Args:
             livro: O livro a ser devolvido
+            emitir: Destino dos eventos (padrão: o destino padrão; a
+                biblioteca passa o seu)
             
         Returns:
             bool: True se devolvido com sucesso, False caso contrário
         """
+        emitir = emitir or eventos.emitir
         if livro in self.livros_emprestados:
-            livro.devolver()
-            self.livros_emprestados.remove(livro)
-            print(f"✅ {self.nome} devolveu '{livro.titulo}'")
+            livro.devolver(self)
+            self.livros_emprestados.remover(livro)
+            emitir(eventos.DevolucaoRealizada(self, livro))
             return True
         else:
-            print(f"❌ {self.nome} não possui o livro '{livro.titulo}'")
+            emitir(eventos.DevolucaoRecusada(self, livro))
             return False
 
     def listar_livros_emprestados(self) -> None:
@@ -124,22 +500,168 @@ class Usuario:
         return f"{self.nome} ({len(self.livros_emprestados)}/{self.limite_livros} livros)"
 
 
+@dataclass(frozen=True)
+class PaginaLivros:
+    """Página de uma listagem ordenada do acervo."""
+    
+    livros: List[Livro]
+    proximo_cursor: Optional[str]
+
+
+# Chave de cada ordenação disponível em listar_livros/iterar_livros
+ORDENS: Dict[str, Callable[[Livro], Any]] = {
+    "titulo": lambda livro: livro.titulo.casefold(),
+    "autor": lambda livro: livro.autor.casefold(),
+    "ano": lambda livro: livro.ano,
+}
+
+
+def _codificar_cursor(ordem: str, entrada: Tuple) -> str:
+    dados = json.dumps([ordem, *entrada], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(dados).decode("ascii")
+
+
+def _decodificar_cursor(ordem: str, cursor: str) -> Tuple:
+    try:
+        dados = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        ordem_cursor, chave, codigo = dados
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido") from None
+    if ordem_cursor != ordem:
+        raise ValueError(f"Cursor pertence à ordenação '{ordem_cursor}'")
+    return (chave, codigo)
+
+
+@dataclass(frozen=True)
+class Estatisticas:
+    """Retrato das estatísticas de uma biblioteca."""
+    
+    total_livros: int
+    livros_disponiveis: int
+    livros_emprestados: int
+    total_usuarios: int
+    
+    @property
+    def taxa_utilizacao(self) -> float:
+        """Percentual de livros emprestados (0 se o acervo estiver vazio)."""
+        if self.total_livros == 0:
+            return 0.0
+        return (self.livros_emprestados / self.total_livros) * 100
+
+
 class Biblioteca:
-    """Classe principal que gerencia a biblioteca."""
+    """
+    Classe principal que gerencia a biblioteca.
+    
+    Empréstimos e devoluções feitos pela biblioteca são seguros entre
+    threads: cada operação trava apenas as partições do usuário e do
+    livro envolvidos, de modo que operações disjuntas correm em paralelo.
+    Alterações no cadastro (livros e usuários) são serializadas.
+    """
     
-    def __init__(self, nome: str):
+    def __init__(
+        self,
+        nome: str,
+        sink: Optional[eventos.Sink] = None,
+        armazenamento: Optional[Armazenamento] = None,
+        vencimentos: Optional[AgendaVencimentos] = None,
+        reservas: Optional[CentralReservas] = None,
+        cache_buscas: Optional[CacheBuscas] = None,
+        historico: Optional[HistoricoEmprestimos] = None,
+        mudancas: Optional[FluxoMudancas] = None,
+    ):
         """
         Inicializa a biblioteca.
         
         Args:
             nome: Nome da biblioteca
+            sink: Destino dos eventos (padrão: eventos.obter_sink_padrao())
+            armazenamento: Onde persistir o estado; o conteúdo já salvo é
+                carregado na criação (padrão: somente em memória)
+            vencimentos: Agenda de vencimentos com prazo e relógio próprios
+                (padrão: prazo de 14 dias e relógio do sistema)
+            reservas: Filas de reserva por título (padrão: retirada em 3 dias,
+                com o mesmo relógio da agenda de vencimentos)
+            cache_buscas: Cache dos resultados de buscar_livro (padrão:
+                1024 termos, sem prazo de validade)
+            historico: Onde registrar cada empréstimo e devolução para
+                análise posterior, com o nome da biblioteca como filial
+                (padrão: nenhum)
+            mudancas: Fluxo versionado das mutações, para réplicas de
+                leitura; o estado atual entra como as primeiras mudanças
+                (padrão: nenhum)
         """
         if not nome.strip():
             raise ValueError("Nome da biblioteca não pode estar vazio")
             
         self.nome = nome
-        self.livros: List[Livro] = []
-        self.usuarios: List[Usuario] = []
+        self.sink = sink
+        self._livros: Dict[int, Livro] = {}
+        self._indice_textual = IndiceTextual()
+        self._trava_indice_textual = TravaLeituraEscrita()  # Buscas leem em paralelo; cadastros escrevem
+        self._indices_ordenados = {ordem: IndiceOrdenado() for ordem in ORDENS}
+        self._obras: Dict[Tuple[str, str, str, int], Obra] = {}
+        self._obras_por_codigo: Dict[int, Obra] = {}
+        self._obras_por_isbn: Dict[str, List[Obra]] = {}
+        self._usuarios_por_nome: Dict[str, Usuario] = {}
+        self._usuarios_por_email: Dict[str, Usuario] = {}
+        self._livros_disponiveis = 0
+        self._portadores: Dict[int, Usuario] = {}
+        self._travas = TravasParticionadas()
+        self._trava_cadastro = threading.RLock()
+        self._trava_contadores = threading.Lock()
+        self._lote_atual = threading.local()
+        self.vencimentos = vencimentos if vencimentos is not None else AgendaVencimentos()
+        self.reservas = reservas if reservas is not None else CentralReservas(relogio=self.vencimentos.relogio)
+        self.cache_buscas = cache_buscas if cache_buscas is not None else CacheBuscas()
+        self.historico = historico
+        self.armazenamento = Armazenamento()
+        if armazenamento is not None:
+            armazenamento.anexar(self)
+            self._restaurar(armazenamento.carregar())
+            self.armazenamento = armazenamento
+        self.mudancas = mudancas
+        if mudancas is not None:
+            mudancas.anexar(self)
+
+    def _restaurar(self, estado: EstadoArmazenado) -> None:
+        """Reconstrói acervo, usuários e empréstimos a partir do armazenamento."""
+        for registro_livro in estado.livros:
+            livro = Livro._criar_validado(
+                registro_livro.titulo, registro_livro.autor, registro_livro.ano, registro_livro.isbn
+            )
+            livro.codigo = registro_livro.codigo
+            livro.disponivel = registro_livro.disponivel
+            livro.data_emprestimo = registro_livro.data_emprestimo
+            _reservar_codigo(livro.codigo)
+            self._incluir(livro)
+
+        for registro_usuario in estado.usuarios:
+            self._indexar_usuario(Usuario(
+                registro_usuario.nome, registro_usuario.email,
+                limite_livros=registro_usuario.limite_livros,
+            ))
+
+        for emprestimo in estado.emprestimos:
+            usuario = self._usuarios_por_nome.get(emprestimo.nome_usuario.casefold())
+            emprestado = self._livros.get(emprestimo.codigo_livro)
+            if usuario is not None and emprestado is not None:
+                usuario.livros_emprestados.adicionar(emprestado)
+                self._portadores[emprestado.codigo] = usuario
+
+        for livro in self._livros.values():
+            if not livro.disponivel:  # Uma vez por livro, já com o portador
+                self.vencimentos.registrar(livro, self._portadores.get(livro.codigo))
+
+    @property
+    def livros(self) -> List[Livro]:
+        """Livros do acervo, na ordem de cadastro."""
+        return list(self._livros.values())
+
+    @property
+    def usuarios(self) -> List[Usuario]:
+        """Usuários registrados, na ordem de registro."""
+        return list(self._usuarios_por_nome.values())
 
     def adicionar_livro(self, livro: Livro) -> None:
         """
@@ -148,8 +670,239 @@ class Biblioteca:
         Args:
             livro: Livro a ser adicionado
         """
-        self.livros.append(livro)
-        print(f"📖 Livro '{livro.titulo}' adicionado ao acervo")
+        with self._trava_cadastro:
+            if livro.codigo in self._livros:
+                self._emitir(eventos.LivroDuplicado(livro))
+                return
+
+            self._incluir(livro)
+            self.armazenamento.livros_adicionados([livro])
+            if self.mudancas is not None:
+                self.mudancas.livros_adicionados([livro])
+        self._emitir(eventos.LivroAdicionado(livro))
+        if livro.disponivel:
+            self._separar_para_reserva(livro)
+
+    def _incluir(self, livro: Livro) -> None:
+        """Registra o livro no acervo e em todos os índices."""
+        self._livros[livro.codigo] = livro
+        if livro.disponivel:
+            with self._trava_contadores:
+                self._livros_disponiveis += 1
+        livro._observadores.append(self._ao_alterar_livro)
+        chave_obra = Obra.chave(livro)
+        obra = self._obras.get(chave_obra)
+        if obra is None:
+            obra = self._obras[chave_obra] = Obra._de_livro(livro)
+            self._obras_por_codigo[obra.codigo] = obra
+            if livro.isbn:
+                self._obras_por_isbn.setdefault(chave_obra[0], []).append(obra)
+            with self._trava_indice_textual.escrita():
+                self._indice_textual.adicionar(obra.codigo, obra.titulo, obra.autor)
+        obra.incluir(livro)
+        for ordem, chave in ORDENS.items():
+            self._indices_ordenados[ordem].adicionar(chave(livro), livro.codigo)
+        self.cache_buscas.invalidar(livro.titulo, livro.autor)
+
+    def importar_livros(
+        self,
+        fonte: Fonte,
+        formato: Optional[str] = None,
+        tamanho_lote: int = 10_000,
+    ) -> RelatorioImportacao:
+        """
+        Importa livros em massa a partir de CSV, JSONL ou um iterador.
+        
+        Os registros são lidos em fluxo e processados em lotes: o limite
+        de ano é calculado uma única vez, cada lote é validado e depois
+        incluído nos índices em uma só passada, e um único evento é
+        publicado por lote.
+        
+        Args:
+            fonte: Caminho, arquivo aberto ou iterador de dicionários com
+                as chaves titulo, autor, ano e isbn (opcional)
+            formato: "csv" ou "jsonl" (deduzido da extensão do caminho)
+            tamanho_lote: Quantidade de registros por lote
+            
+        Returns:
+            RelatorioImportacao com o total importado e as linhas rejeitadas
+        """
+        relatorio = RelatorioImportacao()
+        ano_maximo = datetime.now().year
+
+        for lote in em_lotes(ler_registros(fonte, formato), tamanho_lote):
+            validos = []
+            rejeitados = len(relatorio.rejeitados)
+            for linha, registro in lote:
+                try:
+                    validos.append(self._livro_de_registro(registro, ano_maximo))
+                except (TypeError, ValueError) as erro:
+                    relatorio.rejeitados.append(LinhaRejeitada(linha, registro, str(erro)))
+
+            with self._trava_cadastro:
+                for livro in validos:
+                    self._incluir(livro)
+                self.armazenamento.livros_adicionados(validos)
+                if self.mudancas is not None:
+                    self.mudancas.livros_adicionados(validos)
+            relatorio.importados += len(validos)
+            self._emitir(eventos.LoteImportado(len(validos), len(relatorio.rejeitados) - rejeitados))
+            if self.reservas.ha_reservas_aguardando():
+                for livro in validos:
+                    self._separar_para_reserva(livro)
+
+        return relatorio
+
+    @staticmethod
+    def _livro_de_registro(registro: Any, ano_maximo: int) -> Livro:
+        """Valida um registro importado e cria o Livro correspondente."""
+        if isinstance(registro, Exception):
+            raise registro
+        if not isinstance(registro, (dict, Mapping)):
+            raise TypeError("Registro deve ser um objeto com titulo, autor e ano")
+        
+        faltando = [chave for chave in ("titulo", "autor", "ano") if registro.get(chave) in (None, "")]
+        if faltando:
+            raise ValueError(f"Campos obrigatórios ausentes: {', '.join(faltando)}")
+        
+        titulo = str(registro["titulo"])
+        autor = str(registro["autor"])
+        try:
+            ano = int(registro["ano"])
+        except (TypeError, ValueError):
+            raise ValueError("Ano inválido para o livro") from None
+        isbn = registro.get("isbn") or None
+        
+        Livro._validar(titulo, autor, ano, ano_maximo)
+        return Livro._criar_validado(titulo, autor, ano, str(isbn) if isbn else None)
+
+    def remover_livro(self, livro: Livro) -> bool:
+        """
+        Remove um livro do acervo.
+        
+        Args:
+            livro: Livro a ser removido
+            
+        Returns:
+            bool: True se removido com sucesso, False caso contrário
+        """
+        with self._trava_cadastro, self._travas.travar(("livro", livro.codigo)):
+            if livro.codigo not in self._livros:
+                self._emitir(eventos.LivroRemocaoRecusada(livro, "não pertence ao acervo"))
+                return False
+            if not livro.disponivel:
+                self._emitir(eventos.LivroRemocaoRecusada(livro, "está emprestado e não pode ser removido"))
+                return False
+            if self.reservas.separada_para(livro) is not None:
+                self._emitir(eventos.LivroRemocaoRecusada(livro, "está separado para uma reserva"))
+                return False
+
+            self.armazenamento.livro_removido(livro)
+            if self.mudancas is not None:
+                self.mudancas.livro_removido(livro)
+            del self._livros[livro.codigo]
+            with self._trava_contadores:
+                self._livros_disponiveis -= 1
+            livro._observadores.remove(self._ao_alterar_livro)
+            for ordem, chave in ORDENS.items():
+                self._indices_ordenados[ordem].remover(chave(livro), livro.codigo)
+            obra = self._obras[Obra.chave(livro)]
+            obra.remover(livro)
+            if not len(obra):
+                self._descartar_obra(obra)
+            self.cache_buscas.invalidar(livro.titulo, livro.autor)
+        self._emitir(eventos.LivroRemovido(livro))
+        return True
+
+    def _emitir(self, evento: eventos.Evento) -> None:
+        """Publica um evento no destino desta biblioteca."""
+        (self.sink or eventos.obter_sink_padrao()).emitir(evento)
+
+    def _ao_alterar_livro(self, livro: Livro, evento: str, usuario: Optional[Usuario]) -> None:
+        """Mantém os contadores quando um livro do acervo muda de estado."""
+        if usuario is not None and self._usuarios_por_nome.get(usuario.nome.casefold()) is not usuario:
+            usuario = None  # Apenas usuários registrados aqui são persistidos
+
+        # Dentro de um lote, gravação, histórico e reservas ficam para o fim (ou são descartados).
+        # Fora dele, a memória é atualizada primeiro e a gravação vem por último; se algo
+        # falhar, os passos já feitos são desfeitos antes de o erro chegar ao livro.
+        adiados = getattr(self._lote_atual, "adiados", None)
+        emprestado = evento == "emprestado"
+        portador = self._portadores.get(livro.codigo)
+        self._contabilizar(livro, emprestado, usuario)
+        if adiados is not None:
+            adiados.append((livro, usuario))
+            return
+        try:
+            self._persistir(livro, emprestado, usuario)
+        except BaseException:
+            self._contabilizar(livro, not emprestado, portador)
+            raise
+        if not emprestado:
+            self._separar_para_reserva(livro)
+
+    def _contabilizar(self, livro: Livro, emprestado: bool, usuario: Optional[Usuario]) -> None:
+        """Atualiza contador de disponíveis, portadores e agenda de vencimentos (só memória)."""
+        with self._trava_contadores:
+            self._livros_disponiveis += -1 if emprestado else 1
+        if emprestado:
+            if usuario is not None:
+                self._portadores[livro.codigo] = usuario
+            self.vencimentos.registrar(livro, usuario)
+        else:
+            self._portadores.pop(livro.codigo, None)
+            self.vencimentos.remover(livro)
+
+    def _persistir(self, livro: Livro, emprestado: bool, usuario: Optional[Usuario]) -> None:
+        """
+        Grava um empréstimo ou devolução avulso no armazenamento, no fluxo
+        de mudanças e no histórico.
+        
+        Se um passo falhar, os anteriores recebem a operação inversa antes
+        de o erro ser propagado. O histórico vem por último, então nunca
+        precisa ser desfeito.
+        """
+        desfazer: List[Callable[[Livro, Optional[Usuario]], None]] = []
+        try:
+            if emprestado:
+                self.armazenamento.emprestimo(livro, usuario)
+                desfazer.append(self.armazenamento.devolucao)
+                if self.mudancas is not None:
+                    self.mudancas.emprestimo(livro, usuario)
+                    desfazer.append(self.mudancas.devolucao)
+                if self.historico is not None:
+                    self.historico.emprestimo(livro, usuario, self.nome)
+            else:
+                self.armazenamento.devolucao(livro, usuario)
+                desfazer.append(self.armazenamento.emprestimo)
+                if self.mudancas is not None:
+                    self.mudancas.devolucao(livro, usuario)
+                    desfazer.append(self.mudancas.emprestimo)
+                if self.historico is not None:
+                    self.historico.devolucao(livro, self.nome)
+        except BaseException:
+            for inverso in reversed(desfazer):
+                inverso(livro, usuario)
+            raise
+
+    def _separar_para_reserva(self, livro: Livro) -> None:
+        """Separa um exemplar devolvido ou recém-incluído para a próxima reserva da fila, se houver."""
+        reserva = self.reservas.livro_devolvido(livro)
+        if reserva is not None:
+            self._emitir(eventos.ReservaDisponivel(reserva, livro))
+
+    def _descartar_obra(self, obra: Obra) -> None:
+        """Retira dos índices uma obra que ficou sem exemplares."""
+        chave_obra = (normalizar_isbn(obra.isbn) if obra.isbn else "", obra.titulo, obra.autor, obra.ano)
+        del self._obras[chave_obra]
+        del self._obras_por_codigo[obra.codigo]
+        with self._trava_indice_textual.escrita():
+            self._indice_textual.remover(obra.codigo)
+        if obra.isbn:
+            obras = self._obras_por_isbn[chave_obra[0]]
+            obras.remove(obra)
+            if not obras:
+                del self._obras_por_isbn[chave_obra[0]]
 
     def registrar_usuario(self, usuario: Usuario) -> None:
         """
@@ -159,66 +912,766 @@ class Biblioteca:
             usuario: Usuário a ser registrado
         """
         # Verifica se usuário já existe
-        if any(u.nome.lower() == usuario.nome.lower() for u in self.usuarios):
-            print(f"❌ Usuário '{usuario.nome}' já está registrado")
-            return
+        chave = usuario.nome.casefold()
+        with self._trava_cadastro:
+            if chave in self._usuarios_por_nome:
+                self._emitir(eventos.UsuarioDuplicado(usuario))
+                return
+            if usuario.email and usuario.email.casefold() in self._usuarios_por_email:
+                self._emitir(eventos.EmailDuplicado(usuario))
+                return
+                
+            self._indexar_usuario(usuario)
+            self.armazenamento.usuario_registrado(usuario)
+            if self.mudancas is not None:
+                self.mudancas.usuario_registrado(usuario)
+        self._emitir(eventos.UsuarioRegistrado(usuario))
+
+    def _indexar_usuario(self, usuario: Usuario) -> None:
+        """Inclui o usuário nos índices por nome e e-mail."""
+        self._usuarios_por_nome[usuario.nome.casefold()] = usuario
+        if usuario.email:
+            self._usuarios_por_email[usuario.email.casefold()] = usuario
+
+    def remover_usuario(self, usuario: Usuario) -> bool:
+        """
+        Remove o registro de um usuário.
+        
+        Args:
+            usuario: Usuário a ser removido
+            
+        Returns:
+            bool: True se removido com sucesso, False caso contrário
+        """
+        chave = usuario.nome.casefold()
+        with self._trava_cadastro, self._travas.travar(("usuario", chave)):
+            if self._usuarios_por_nome.get(chave) is not usuario:
+                self._emitir(eventos.UsuarioRemocaoRecusada(usuario, "não está registrado"))
+                return False
+            if usuario.livros_emprestados:
+                self._emitir(eventos.UsuarioRemocaoRecusada(usuario, "possui livros emprestados"))
+                return False
+
+            self.armazenamento.usuario_removido(usuario)
+            if self.mudancas is not None:
+                self.mudancas.usuario_removido(usuario)
+            del self._usuarios_por_nome[chave]
+            if usuario.email:
+                self._usuarios_por_email.pop(usuario.email.casefold(), None)
+        self._emitir(eventos.UsuarioRemovido(usuario))
+        return True
+
+    def obter_livro(self, codigo: int) -> Optional[Livro]:
+        """
+        Obtém um exemplar do acervo pelo código interno.
+        
+        Args:
+            codigo: Código do exemplar (Livro.codigo)
+            
+        Returns:
+            Livro encontrado ou None
+        """
+        return self._livros.get(codigo)
+
+    def obter_livro_por_isbn(self, isbn: str) -> Optional[Livro]:
+        """
+        Obtém um exemplar pelo ISBN, preferindo um disponível.
+        
+        Args:
+            isbn: ISBN do livro (hífens e espaços são ignorados)
+            
+        Returns:
+            Exemplar encontrado ou None
+        """
+        obras = list(self._obras_por_isbn.get(normalizar_isbn(isbn), ()))  # O cadastro pode mudar em outra thread
+        for obra in obras:
+            livro = obra.exemplar_disponivel()
+            if livro is not None:
+                return livro
+        for obra in obras:
+            for livro in obra.exemplares:
+                return livro
+        return None
+
+    def obter_obra(self, isbn: str) -> Optional[Obra]:
+        """
+        Obtém a obra (título) de um ISBN, com seus exemplares e disponibilidade.
+        
+        Args:
+            isbn: ISBN do livro (hífens e espaços são ignorados)
+            
+        Returns:
+            Obra encontrada ou None; havendo mais de uma com o mesmo ISBN
+            (dados bibliográficos diferentes), a primeira cadastrada
+        """
+        obras = self._obras_por_isbn.get(normalizar_isbn(isbn))
+        return obras[0] if obras else None
+
+    @property
+    def obras(self) -> List[Obra]:
+        """Obras do acervo, na ordem de cadastro do primeiro exemplar."""
+        return list(self._obras.values())
+
+    def obter_usuario(self, identificador: str) -> Optional[Usuario]:
+        """
+        Obtém um usuário pelo e-mail ou pelo nome.
+        
+        Args:
+            identificador: E-mail ou nome do usuário (sem diferenciar maiúsculas)
+            
+        Returns:
+            Usuário encontrado ou None
+        """
+        chave = identificador.casefold()
+        usuario = self._usuarios_por_email.get(chave)
+        if usuario is None:
+            usuario = self._usuarios_por_nome.get(chave)
+        return usuario
+
+    def obter_portador(self, livro: Livro) -> Optional[Usuario]:
+        """
+        Obtém o usuário registrado que está com um exemplar.
+        
+        Args:
+            livro: Exemplar do acervo
+            
+        Returns:
+            Usuário com o exemplar ou None (disponível ou emprestado sem usuário)
+        """
+        return self._portadores.get(livro.codigo)
+
+    def emprestar_livro(self, isbn: str, identificador: str) -> bool:
+        """
+        Empresta um exemplar do ISBN informado a um usuário registrado.
+        
+        Args:
+            isbn: ISBN do livro
+            identificador: E-mail ou nome do usuário
+            
+        Returns:
+            bool: True se emprestado com sucesso, False caso contrário
+        """
+        if self.obter_livro_por_isbn(isbn) is None:
+            self._emitir(eventos.IsbnNaoEncontrado(isbn))
+            return False
+
+        usuario = self.obter_usuario(identificador)
+        if usuario is None:
+            self._emitir(eventos.UsuarioNaoEncontrado(identificador))
+            return False
+
+        livro = self._exemplar_para(isbn, usuario)
+        while livro is not None:
+            with self._travar_emprestimo(usuario, livro):
+                # Outra thread pode ter levado ou removido este exemplar enquanto outro ficou livre
+                escolhido = self._exemplar_para(isbn, usuario)
+                if escolhido is livro or (
+                    escolhido is not None and not self._livre_para(escolhido, usuario)
+                    and self._livros.get(livro.codigo) is livro
+                ):
+                    return self._emprestar_travado(usuario, livro)
+            livro = escolhido
+        self._emitir(eventos.IsbnNaoEncontrado(isbn))  # Todos os exemplares foram removidos
+        return False
+
+    def _livre_para(self, livro: Livro, usuario: Usuario) -> bool:
+        """Exemplar disponível e não separado para a reserva de outra pessoa."""
+        reserva = self.reservas.separada_para(livro)
+        return livro.disponivel and (reserva is None or reserva.usuario is usuario)
+
+    def _exemplar_para(self, isbn: str, usuario: Usuario) -> Optional[Livro]:
+        """
+        Exemplar a emprestar: o separado para o usuário, o primeiro livre ou,
+        se nenhum estiver livre, o primeiro do ISBN (None se não houver mais
+        nenhum no acervo).
+        """
+        reserva = self.reservas.reserva_de(usuario, isbn)
+        if reserva is not None and reserva.livro is not None:
+            return reserva.livro
+        # Cópias: cadastro e remoção podem alterar as listas durante a procura
+        obras = list(self._obras_por_isbn.get(normalizar_isbn(isbn), ()))
+        primeiro = None
+        for obra in obras:
+            exemplares = obra.exemplares
+            if primeiro is None and exemplares:
+                primeiro = exemplares[0]
+            if obra.tem_disponivel:
+                for livro in exemplares:
+                    if self._livre_para(livro, usuario):
+                        return livro
+        return primeiro
+
+    def _emprestar_travado(self, usuario: Usuario, livro: Livro) -> bool:
+        """Empresta respeitando reservas (as travas já devem estar adquiridas)."""
+        reserva = self.reservas.separada_para(livro)
+        if reserva is not None and reserva.usuario is not usuario:
+            self._emitir(eventos.EmprestimoRecusadoReservado(usuario, livro))
+            return False
+        if not usuario.pegar_livro(livro, self._emitir):
+            return False
+        if reserva is not None:
+            self.reservas.retirar(reserva)
+        return True
+
+    def devolver_livro(self, isbn: str, identificador: str) -> bool:
+        """
+        Devolve o exemplar do ISBN informado emprestado a um usuário.
+        
+        Args:
+            isbn: ISBN do livro
+            identificador: E-mail ou nome do usuário
+            
+        Returns:
+            bool: True se devolvido com sucesso, False caso contrário
+        """
+        usuario = self.obter_usuario(identificador)
+        if usuario is None:
+            self._emitir(eventos.UsuarioNaoEncontrado(identificador))
+            return False
+
+        chave = normalizar_isbn(isbn)
+        for livro in list(usuario.livros_emprestados):
+            if livro.isbn and normalizar_isbn(livro.isbn) == chave:
+                return self.devolver(usuario, livro)
+
+        self._emitir(eventos.DevolucaoRecusadaIsbn(usuario, isbn))
+        return False
+
+    def _travar_emprestimo(self, usuario: Usuario, livro: Livro):
+        """Trava as partições do usuário e do livro (sempre na mesma ordem)."""
+        return self._travas.travar(("usuario", usuario.nome.casefold()), ("livro", livro.codigo))
+
+    def emprestar(self, usuario: Usuario, livro: Union[Livro, Obra]) -> bool:
+        """
+        Empresta um livro a um usuário de forma segura entre threads.
+        
+        A verificação do limite do usuário e da disponibilidade do livro
+        e a efetivação do empréstimo acontecem sob as travas de ambos.
+        
+        Args:
+            usuario: Usuário que pega o livro
+            livro: Exemplar a ser emprestado, ou uma obra para emprestar
+                qualquer exemplar livre dela
             
-        self.usuarios.append(usuario)
-        print(f"👤 Usuário '{usuario.nome}' registrado com sucesso")
+        Returns:
+            bool: True se emprestado com sucesso, False caso contrário
+        """
+        if isinstance(livro, Obra):
+            return self._emprestar_da_obra(usuario, livro)
+        with self._travar_emprestimo(usuario, livro):
+            return self._emprestar_travado(usuario, livro)
+
+    def _emprestar_da_obra(self, usuario: Usuario, obra: Obra) -> bool:
+        """Empresta o primeiro exemplar livre da obra, tentando outro se for levado antes."""
+        while True:
+            livro = None
+            if obra.tem_disponivel:
+                livro = next((l for l in obra.exemplares if self._livre_para(l, usuario)), None)
+            if livro is None:
+                self._emitir(eventos.EmprestimoRecusadoIndisponivel(usuario, obra))
+                return False
+            with self._travar_emprestimo(usuario, livro):
+                if self._livre_para(livro, usuario):
+                    return self._emprestar_travado(usuario, livro)
 
-    def listar_livros(self) -> None:
-        """Lista todos os livros do acervo."""
-        if not self.livros:
+    def devolver(self, usuario: Usuario, livro: Livro) -> bool:
+        """
+        Devolve um livro emprestado de forma segura entre threads.
+        
+        Args:
+            usuario: Usuário que devolve o livro
+            livro: Livro a ser devolvido
+            
+        Returns:
+            bool: True se devolvido com sucesso, False caso contrário
+        """
+        with self._travar_emprestimo(usuario, livro):
+            return usuario.devolver_livro(livro, self._emitir)
+
+    def emprestar_lote(self, usuario: Usuario, livros: Iterable[Union[Livro, Obra]]) -> bool:
+        """
+        Empresta vários livros a um usuário de uma só vez, tudo ou nada.
+        
+        As travas do usuário e de todos os exemplares são adquiridas em
+        uma única passada ordenada; o limite e a disponibilidade são
+        verificados uma vez para o lote inteiro. Se algum item for
+        recusado, nada é emprestado, e se a efetivação falhar no meio
+        (inclusive ao gravar no armazenamento) os empréstimos já feitos
+        são desfeitos. O lote é gravado de uma vez e gera um único evento.
+        
+        Args:
+            usuario: Usuário que pega os livros
+            livros: Exemplares e/ou obras (de uma obra sai qualquer exemplar livre)
+            
+        Returns:
+            bool: True se todos foram emprestados, False se o lote foi recusado
+        """
+        pedidos = list(livros)
+        while True:
+            exemplares = self._exemplares_do_lote(usuario, pedidos)
+            if exemplares is None:
+                self._emitir(eventos.EmprestimoLoteRecusado(usuario, pedidos, "obra sem exemplar disponível"))
+                return False
+            with self._travar_lote(usuario, exemplares):
+                escolhidos = (livro for pedido, livro in zip(pedidos, exemplares) if isinstance(pedido, Obra))
+                if not all(self._livre_para(livro, usuario) for livro in escolhidos):
+                    continue  # Outra thread levou um exemplar escolhido para uma obra
+                motivo = self._recusa_emprestimo_lote(usuario, exemplares)
+                if motivo is None:
+                    motivo = self._efetivar_emprestimos(usuario, exemplares)
+                if motivo is None:
+                    return True
+                self._emitir(eventos.EmprestimoLoteRecusado(usuario, pedidos, motivo))
+                return False
+
+    def _exemplares_do_lote(self, usuario: Usuario, pedidos: List[Union[Livro, Obra]]) -> Optional[List[Livro]]:
+        """Troca cada obra do lote por um exemplar livre ainda não escolhido (None se faltar)."""
+        usados = {pedido.codigo for pedido in pedidos if not isinstance(pedido, Obra)}
+        exemplares = []
+        for pedido in pedidos:
+            if isinstance(pedido, Obra):
+                livro = None
+                if pedido.tem_disponivel:
+                    livro = next((l for l in pedido.exemplares
+                                  if l.codigo not in usados and self._livre_para(l, usuario)), None)
+                if livro is None:
+                    return None
+                usados.add(livro.codigo)
+                pedido = livro
+            exemplares.append(pedido)
+        return exemplares
+
+    def _travar_lote(self, usuario: Usuario, livros: List[Livro]):
+        """Trava as partições do usuário e de todos os livros em uma passada ordenada."""
+        return self._travas.travar(("usuario", usuario.nome.casefold()), *(("livro", l.codigo) for l in livros))
+
+    def _recusa_emprestimo_lote(self, usuario: Usuario, livros: List[Livro]) -> Optional[str]:
+        """Motivo para recusar o lote inteiro, ou None (as travas já devem estar adquiridas)."""
+        if len(usuario.livros_emprestados) + len(livros) > usuario.limite_livros:
+            return f"limite de {usuario.limite_livros} livros"
+        vistos = set()
+        for livro in livros:
+            if livro.codigo in vistos:
+                return f"'{livro.titulo}' aparece mais de uma vez"
+            vistos.add(livro.codigo)
+            if livro.codigo not in self._livros:
+                return f"'{livro.titulo}' não está no acervo"
+            if not self._livre_para(livro, usuario):
+                if livro.disponivel:
+                    return f"'{livro.titulo}' está separado para uma reserva"
+                return f"'{livro.titulo}' não está disponível"
+        return None
+
+    def _efetivar_emprestimos(self, usuario: Usuario, livros: List[Livro]) -> Optional[str]:
+        """Empresta o lote já validado, desfazendo tudo se algum passo falhar."""
+        adiados: List[Tuple[Livro, Optional[Usuario]]] = []
+        self._lote_atual.adiados = adiados
+        feitos: List[Livro] = []
+        concluido = False
+        try:
+            for livro in livros:
+                if not livro.emprestar(usuario):  # Emprestado por fora da biblioteca
+                    return f"'{livro.titulo}' não está disponível"
+                feitos.append(livro)
+            self.armazenamento.emprestimos(adiados)
+            concluido = True
+        finally:
+            if not concluido:
+                for livro in reversed(feitos):
+                    livro.devolver(usuario)
+            self._lote_atual.adiados = None
+
+        if self.mudancas is not None:
+            self.mudancas.emprestimos(adiados)
+        if self.historico is not None:
+            for livro, registrado in adiados:
+                self.historico.emprestimo(livro, registrado, self.nome)
+        emprestados = usuario.livros_emprestados
+        for livro in livros:
+            emprestados.adicionar(livro)
+            reserva = self.reservas.separada_para(livro)
+            if reserva is not None:
+                self.reservas.retirar(reserva)
+        self._emitir(eventos.EmprestimoLoteRealizado(usuario, livros))
+        return None
+
+    def devolver_lote(self, usuario: Usuario, livros: Iterable[Livro]) -> bool:
+        """
+        Devolve vários livros de um usuário de uma só vez, tudo ou nada.
+        
+        Como em emprestar_lote, as travas são adquiridas em uma passada,
+        a posse de todos os livros é verificada antes de qualquer
+        devolução e uma falha na efetivação restaura os empréstimos
+        (com as datas originais). As reservas dos títulos devolvidos só
+        são atendidas depois que o lote inteiro for gravado.
+        
+        Args:
+            usuario: Usuário que devolve os livros
+            livros: Livros emprestados a ele
+            
+        Returns:
+            bool: True se todos foram devolvidos, False se o lote foi recusado
+        """
+        livros = list(livros)
+        with self._travar_lote(usuario, livros):
+            motivo = self._recusa_devolucao_lote(usuario, livros)
+            if motivo is not None:
+                self._emitir(eventos.DevolucaoLoteRecusada(usuario, livros, motivo))
+                return False
+            self._efetivar_devolucoes(usuario, livros)
+            for livro in livros:
+                self._separar_para_reserva(livro)
+        return True
+
+    @staticmethod
+    def _recusa_devolucao_lote(usuario: Usuario, livros: List[Livro]) -> Optional[str]:
+        """Motivo para recusar a devolução do lote inteiro, ou None."""
+        vistos = set()
+        for livro in livros:
+            if livro.codigo in vistos:
+                return f"'{livro.titulo}' aparece mais de uma vez"
+            vistos.add(livro.codigo)
+            if livro not in usuario.livros_emprestados:
+                return f"{usuario.nome} não possui o livro '{livro.titulo}'"
+        return None
+
+    def _efetivar_devolucoes(self, usuario: Usuario, livros: List[Livro]) -> None:
+        """Devolve o lote já validado, restaurando os empréstimos se algum passo falhar."""
+        adiados: List[Tuple[Livro, Optional[Usuario]]] = []
+        self._lote_atual.adiados = adiados
+        feitos: List[Tuple[Livro, Optional[datetime]]] = []
+        concluido = False
+        try:
+            for livro in livros:
+                data = livro.data_emprestimo
+                livro.devolver(usuario)
+                feitos.append((livro, data))
+            self.armazenamento.devolucoes(adiados)
+            concluido = True
+        finally:
+            if not concluido:
+                for livro, data in reversed(feitos):
+                    livro.emprestar(usuario)
+                    livro.data_emprestimo = data
+                    self.vencimentos.registrar(livro, self._portadores.get(livro.codigo))
+            self._lote_atual.adiados = None
+
+        if self.mudancas is not None:
+            self.mudancas.devolucoes(adiados)
+        if self.historico is not None:
+            for livro, _ in adiados:
+                self.historico.devolucao(livro, self.nome)
+        emprestados = usuario.livros_emprestados
+        for livro in livros:
+            emprestados.remover(livro)
+        self._emitir(eventos.DevolucaoLoteRealizada(usuario, livros))
+
+    def reservar(self, isbn: str, identificador: str, prioridade: int = 0) -> Optional[Reserva]:
+        """
+        Entra na fila de espera de um título sem exemplares livres.
+        
+        Quando um exemplar for devolvido ele fica separado para a próxima
+        reserva da fila até o fim do prazo de retirada.
+        
+        Args:
+            isbn: ISBN do título
+            identificador: E-mail ou nome do usuário
+            prioridade: Menor é atendido antes (padrão: ordem de chegada)
+            
+        Returns:
+            A reserva criada ou None se recusada
+        """
+        if self.obter_livro_por_isbn(isbn) is None:
+            self._emitir(eventos.IsbnNaoEncontrado(isbn))
+            return None
+
+        usuario = self.obter_usuario(identificador)
+        if usuario is None:
+            self._emitir(eventos.UsuarioNaoEncontrado(identificador))
+            return None
+
+        livro = self._exemplar_para(isbn, usuario)
+        if livro is None:
+            self._emitir(eventos.IsbnNaoEncontrado(isbn))
+            return None
+        if self._livre_para(livro, usuario):
+            self._emitir(eventos.ReservaRecusada(usuario, isbn, "há exemplar disponível"))
+            return None
+        reserva = self.reservas.reservar(usuario, isbn, prioridade)
+        if reserva is None:
+            self._emitir(eventos.ReservaRecusada(usuario, isbn, "reserva já existente"))
+            return None
+        self._emitir(eventos.ReservaRealizada(reserva))
+        return reserva
+
+    def cancelar_reserva(self, reserva: Reserva) -> bool:
+        """
+        Cancela uma reserva; um exemplar separado passa ao próximo da fila.
+        
+        Args:
+            reserva: Reserva a cancelar
+            
+        Returns:
+            bool: True se a reserva estava ativa
+        """
+        livro = reserva.livro
+        if not self.reservas.cancelar(reserva):
+            return False
+        if livro is not None:
+            proxima = self.reservas.separada_para(livro)
+            if proxima is not None:
+                self._emitir(eventos.ReservaDisponivel(proxima, livro))
+        return True
+
+    def processar_reservas(self, agora: Optional[datetime] = None) -> int:
+        """
+        Expira as reservas não retiradas no prazo e repassa os exemplares.
+        
+        Args:
+            agora: Momento de referência (padrão: relógio das reservas)
+            
+        Returns:
+            Quantidade de reservas expiradas
+        """
+        expiradas, separadas = self.reservas.expirar(agora)
+        # expirar só devolve reservas com exemplar; a checagem é para o verificador de tipos
+        for reserva in expiradas:
+            if reserva.livro is not None:
+                self._emitir(eventos.ReservaExpirada(reserva, reserva.livro))
+        for reserva in separadas:
+            if reserva.livro is not None:
+                self._emitir(eventos.ReservaDisponivel(reserva, reserva.livro))
+        return len(expiradas)
+
+    def emprestimos_vencidos(self, ate: Optional[datetime] = None) -> List[Emprestimo]:
+        """
+        Lista os empréstimos vencidos, do mais antigo ao mais recente.
+        
+        Args:
+            ate: Limite de vencimento (padrão: agora, segundo a agenda)
+            
+        Returns:
+            Empréstimos vencidos até o limite
+        """
+        return self.vencimentos.emprestimos_vencidos(ate)
+
+    def _indice_ordenado(self, ordem: str) -> IndiceOrdenado:
+        indice = self._indices_ordenados.get(ordem)
+        if indice is None:
+            raise ValueError(f"Ordenação desconhecida: {ordem!r} (use {', '.join(ORDENS)})")
+        return indice
+
+    def iterar_livros(self, ordem: str = "titulo", cursor: Optional[str] = None) -> Iterator[Livro]:
+        """
+        Percorre o acervo ordenado sem montar a lista completa.
+        
+        Args:
+            ordem: "titulo", "autor" ou "ano" (empates pelo código do exemplar)
+            cursor: Continua logo após o cursor de uma página anterior
+            
+        Returns:
+            Iterador de livros
+        """
+        indice = self._indice_ordenado(ordem)
+        inicio = None if cursor is None else _decodificar_cursor(ordem, cursor)
+        for _, codigo in indice.iterar(inicio, inclusivo=False):
+            livro = self._livros.get(codigo)
+            if livro is not None:
+                yield livro
+
+    def paginar_livros(
+        self,
+        ordem: str = "titulo",
+        cursor: Optional[str] = None,
+        limite: int = 50,
+    ) -> PaginaLivros:
+        """
+        Obtém uma página da listagem ordenada.
+        
+        Args:
+            ordem: "titulo", "autor" ou "ano"
+            cursor: Cursor retornado pela página anterior (None para a primeira)
+            limite: Máximo de livros na página
+            
+        Returns:
+            PaginaLivros com os livros e o cursor da próxima página
+            (None quando não há mais livros)
+        """
+        if limite < 1:
+            raise ValueError("Limite deve ser positivo")
+        livros = list(islice(self.iterar_livros(ordem, cursor), limite + 1))
+        if len(livros) <= limite:
+            return PaginaLivros(livros, None)
+        ultimo = livros[limite - 1]
+        return PaginaLivros(livros[:limite], _codificar_cursor(ordem, (ORDENS[ordem](ultimo), ultimo.codigo)))
+
+    def livros_entre(self, ano_inicial: int, ano_final: int) -> List[Livro]:
+        """
+        Livros publicados entre dois anos (inclusive), em ordem de ano.
+        
+        Args:
+            ano_inicial: Primeiro ano
+            ano_final: Último ano
+            
+        Returns:
+            Lista de livros do intervalo
+        """
+        # Um livro removido durante a listagem pode ainda aparecer no índice
+        codigos = self._indices_ordenados["ano"].intervalo(ano_inicial, ano_final)
+        livros = (self._livros.get(codigo) for codigo in codigos)
+        return [livro for livro in livros if livro is not None]
+
+    def listar_livros(
+        self,
+        ordem: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limite: Optional[int] = None,
+    ) -> Optional[str]:
+        """
+        Lista os livros do acervo.
+        
+        Sem argumentos exibe o acervo inteiro na ordem de cadastro. Com
+        ``limite`` exibe uma página da ordenação escolhida.
+        
+        Args:
+            ordem: "titulo", "autor" ou "ano" (padrão: ordem de cadastro;
+                "titulo" quando paginado)
+            cursor: Cursor devolvido pela página anterior
+            limite: Tamanho da página (padrão: sem paginação)
+            
+        Returns:
+            Cursor da próxima página, ou None se não houver mais livros
+        """
+        if not self._livros:
             print("📚 Nenhum livro no acervo")
-            return
+            return None
             
         print(f"\n📚 ═══ Catálogo da {self.nome} ═══")
         print("-" * 50)
         
-        for i, livro in enumerate(self.livros, 1):
+        if limite is not None:
+            pagina = self.paginar_livros(ordem or "titulo", cursor, limite)
+            for livro in pagina.livros:
+                print(f"  • {livro}")
+            return pagina.proximo_cursor
+
+        if ordem is None and cursor is None:
+            livros: Iterable[Livro] = self._livros.values()
+        else:
+            livros = self.iterar_livros(ordem or "titulo", cursor)
+        for i, livro in enumerate(livros, 1):
             print(f"{i:2d}. {livro}")
+        return None
 
-    def buscar_livro(self, termo: str) -> List[Livro]:
+    def buscar_livro(self, termo: str, exibir: bool = True) -> List[Livro]:
         """
         Busca livros por título ou autor.
         
+        Os resultados ficam em cache por termo normalizado; só a entrada
+        ou saída de livros que casam com o termo os invalida.
+        
         Args:
             termo: Termo de busca
+            exibir: Imprime os resultados (False para uso programático)
             
         Returns:
-            Lista de livros encontrados
+            Lista de livros encontrados, em ordem de código (a de cadastro),
+            com exemplares de obras diferentes intercalados
         """
-        termo = termo.lower()
-        encontrados = [
-            livro for livro in self.livros 
-            if termo in livro.titulo.lower() or termo in livro.autor.lower()
-        ]
+        chave = IndiceTextual.normalizar(termo)
+        resultado = self.cache_buscas.obter(chave)
+        if resultado is None:
+            versao = self.cache_buscas.versao()
+            with self._trava_indice_textual.leitura():  # O índice não pode mudar durante a consulta
+                obras = self._indice_textual.buscar(chave)
+            resultado = tuple(sorted(self._exemplares(obras), key=lambda livro: livro.codigo))
+            self.cache_buscas.guardar(chave, resultado, versao)
+        encontrados = list(resultado)
         
+        if not exibir:
+            return encontrados
         if encontrados:
             print(f"\n🔍 Encontrados {len(encontrados)} livro(s):")
             for livro in encontrados:
                 print(f"  • {livro}")
         else:
             print(f"❌ Nenhum livro encontrado com o termo '{termo}'")
+            sugestoes = self.buscar_aproximado(termo, limite=3, exibir=False)
+            if sugestoes:
+                print("💡 Você quis dizer:")
+                for livro in sugestoes:
+                    print(f"  • {livro}")
+            
+        return encontrados
+
+    def _exemplares(self, codigos_obras: Iterable[int]) -> Iterator[Livro]:
+        """Exemplares das obras encontradas no índice textual, obra a obra."""
+        for codigo in codigos_obras:
+            obra = self._obras_por_codigo.get(codigo)
+            if obra is not None:
+                yield from obra.exemplares
+
+    def buscar_aproximado(self, termo: str, limite: int = 10, exibir: bool = True) -> List[Livro]:
+        """
+        Busca livros tolerando erros de digitação, do mais ao menos parecido.
+        
+        Acentos e maiúsculas são ignorados, e cada palavra do termo
+        casa com palavras semelhantes do título ou do autor
+        (ex.: "Machdo" encontra "Machado").
+        
+        Args:
+            termo: Termo de busca
+            limite: Máximo de obras retornadas (com todos os seus exemplares)
+            exibir: Imprime os resultados (False para uso programático)
+            
+        Returns:
+            Lista de livros encontrados, ordenada por relevância
+        """
+        with self._trava_indice_textual.leitura():
+            semelhantes = self._indice_textual.buscar_aproximado(termo, limite)
+        encontrados = list(self._exemplares(codigo for codigo, _ in semelhantes))
+        
+        if not exibir:
+            return encontrados
+        if encontrados:
+            print(f"\n🔍 {len(encontrados)} livro(s) parecido(s) com '{termo}':")
+            for livro in encontrados:
+                print(f"  • {livro}")
+        else:
+            print(f"❌ Nenhum livro parecido com o termo '{termo}'")
             
         return encontrados
 
+    def obter_estatisticas(self) -> Estatisticas:
+        """
+        Obtém as estatísticas da biblioteca sem exibi-las.
+        
+        Os contadores são mantidos a cada cadastro, empréstimo e
+        devolução, então a consulta tem custo constante.
+        
+        Returns:
+            Estatisticas atuais
+        """
+        total_livros = len(self._livros)
+        return Estatisticas(
+            total_livros=total_livros,
+            livros_disponiveis=self._livros_disponiveis,
+            livros_emprestados=total_livros - self._livros_disponiveis,
+            total_usuarios=len(self._usuarios_por_nome),
+        )
+
     def estatisticas(self) -> None:
         """Exibe estatísticas da biblioteca."""
-        total_livros = len(self.livros)
-        livros_disponiveis = sum(1 for livro in self.livros if livro.disponivel)
-        livros_emprestados = total_livros - livros_disponiveis
-        total_usuarios = len(self.usuarios)
+        estatisticas = self.obter_estatisticas()
         
         print(f"\n📊 ═══ Estatísticas da {self.nome} ═══")
-        print(f"📚 Total de livros: {total_livros}")
-        print(f"✅ Livros disponíveis: {livros_disponiveis}")
-        print(f"📤 Livros emprestados: {livros_emprestados}")
-        print(f"👥 Usuários registrados: {total_usuarios}")
-        
-        if total_livros > 0:
-            taxa_utilizacao = (livros_emprestados / total_livros) * 100
-            print(f"📈 Taxa de utilização: {taxa_utilizacao:.1f}%")
+        print(f"📚 Total de livros: {estatisticas.total_livros}")
+        print(f"✅ Livros disponíveis: {estatisticas.livros_disponiveis}")
+        print(f"📤 Livros emprestados: {estatisticas.livros_emprestados}")
+        print(f"👥 Usuários registrados: {estatisticas.total_usuarios}")
+        
+        if estatisticas.total_livros > 0:
+            print(f"📈 Taxa de utilização: {estatisticas.taxa_utilizacao:.1f}%")
 
 
 def main():
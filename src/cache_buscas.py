@@ -0,0 +1,198 @@
+"""
+Cache de resultados de busca
+Guarda os resultados das buscas mais frequentes (LRU com validade
+opcional) e invalida apenas os termos afetados quando um livro entra
+ou sai do acervo.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Generic, Iterable, Optional, Set, Tuple, TypeVar
+
+try:
+    from .indices import IndiceTextual
+except ImportError:  # executado como script ou com src/ no sys.path
+    from indices import IndiceTextual  # type: ignore[import-not-found,no-redef]
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class EstatisticasCache:
+    """Contadores de uso do cache."""
+
+    acertos: int
+    falhas: int
+    despejos: int
+    invalidacoes: int
+    entradas: int
+
+    @property
+    def taxa_acerto(self) -> float:
+        """Fração das consultas atendidas pelo cache."""
+        consultas = self.acertos + self.falhas
+        return self.acertos / consultas if consultas else 0.0
+
+
+class CacheBuscas(Generic[T]):
+    """
+    Cache LRU de resultados por termo normalizado.
+
+    Cada termo guardado é indexado por um único trigrama seu (ou pelo
+    próprio termo, se for mais curto que um trigrama). Um termo só pode
+    casar com um livro se esse trigrama estiver entre os do livro; assim
+    a inclusão ou remoção de um livro consulta apenas os trigramas dele
+    e descarta exatamente os termos cujo resultado mudou.
+
+    Para não guardar um resultado calculado enquanto o acervo mudava,
+    ``versao()`` deve ser lida antes da busca e repassada a ``guardar``.
+    """
+
+    def __init__(self, capacidade: int = 1024, validade: Optional[float] = None,
+                 relogio: Callable[[], float] = time.monotonic):
+        """
+        Cria um cache vazio.
+
+        Args:
+            capacidade: Máximo de termos guardados
+            validade: Segundos que um resultado permanece válido (padrão: sem limite)
+            relogio: Função que informa o momento atual (injetável em testes)
+        """
+        if capacidade <= 0:
+            raise ValueError("Capacidade do cache deve ser positiva")
+        if validade is not None and validade <= 0:
+            raise ValueError("Validade do cache deve ser positiva")
+        self.capacidade = capacidade
+        self.validade = validade
+        self.relogio = relogio
+        self._trava = threading.Lock()
+        self._entradas: "OrderedDict[str, Tuple[float, T]]" = OrderedDict()
+        self._termos_por_chave: Dict[str, Set[str]] = {}
+        self._versao = 0
+        self._acertos = 0
+        self._falhas = 0
+        self._despejos = 0
+        self._invalidacoes = 0
+
+    def __len__(self) -> int:
+        """Quantidade de termos guardados."""
+        return len(self._entradas)
+
+    @staticmethod
+    def _chave(termo: str) -> str:
+        return termo[:IndiceTextual.TAMANHO_GRAMA]
+
+    def versao(self) -> int:
+        """Contador de alterações do acervo vistas pelo cache."""
+        return self._versao
+
+    def obter(self, termo: str) -> Optional[T]:
+        """
+        Resultado guardado para um termo.
+
+        Args:
+            termo: Termo já normalizado
+
+        Returns:
+            Resultado ou None se ausente ou vencido
+        """
+        with self._trava:
+            entrada = self._entradas.get(termo)
+            if entrada is not None and self.validade is not None \
+                    and self.relogio() - entrada[0] > self.validade:
+                self._descartar(termo)
+                entrada = None
+            if entrada is None:
+                self._falhas += 1
+                return None
+            self._entradas.move_to_end(termo)
+            self._acertos += 1
+            return entrada[1]
+
+    def guardar(self, termo: str, resultado: T, versao: int) -> bool:
+        """
+        Guarda o resultado de uma busca.
+
+        Args:
+            termo: Termo já normalizado
+            resultado: Resultado calculado
+            versao: Valor de ``versao()`` lido antes de calcular o resultado
+
+        Returns:
+            bool: False se o acervo mudou desde então e o resultado foi descartado
+        """
+        with self._trava:
+            if versao != self._versao:
+                return False
+            if termo in self._entradas:
+                self._entradas.move_to_end(termo)
+            else:
+                self._termos_por_chave.setdefault(self._chave(termo), set()).add(termo)
+                while len(self._entradas) >= self.capacidade:
+                    self._descartar(next(iter(self._entradas)))
+                    self._despejos += 1
+            self._entradas[termo] = (self.relogio(), resultado)
+            return True
+
+    def _descartar(self, termo: str) -> None:
+        del self._entradas[termo]
+        chave = self._chave(termo)
+        termos = self._termos_por_chave[chave]
+        termos.discard(termo)
+        if not termos:
+            del self._termos_por_chave[chave]
+
+    def invalidar(self, *campos: str) -> int:
+        """
+        Descarta os termos cujo resultado inclui (ou incluiria) um registro.
+
+        Chamado quando um livro entra ou sai do acervo, com seus campos
+        pesquisáveis. Empréstimos e devoluções não alteram quais livros
+        casam com um termo e não precisam invalidar nada.
+
+        Args:
+            campos: Textos pesquisáveis do registro (ex.: título e autor)
+
+        Returns:
+            Quantidade de termos descartados
+        """
+        with self._trava:
+            self._versao += 1
+            if not self._entradas:
+                return 0
+            textos = [IndiceTextual.normalizar(campo) for campo in campos]
+            descartados = [
+                termo for termo in self._afetados(textos)
+                if any(termo in texto for texto in textos)
+            ]
+            for termo in descartados:
+                self._descartar(termo)
+            self._invalidacoes += len(descartados)
+            return len(descartados)
+
+    def _afetados(self, textos: Iterable[str]) -> Set[str]:
+        """Termos guardados que podem casar com algum dos textos."""
+        chaves = {""}
+        for texto in textos:
+            for grama in IndiceTextual.gramas(texto):
+                chaves.update(grama[:tamanho] for tamanho in range(1, len(grama) + 1))
+        afetados: Set[str] = set()
+        for chave in chaves:
+            afetados.update(self._termos_por_chave.get(chave, ()))
+        return afetados
+
+    def limpar(self) -> None:
+        """Descarta todos os resultados guardados."""
+        with self._trava:
+            self._versao += 1
+            self._entradas.clear()
+            self._termos_por_chave.clear()
+
+    def estatisticas(self) -> EstatisticasCache:
+        """Contadores de acertos, falhas, despejos e invalidações."""
+        with self._trava:
+            return EstatisticasCache(
+                self._acertos, self._falhas, self._despejos, self._invalidacoes, len(self._entradas)
+            )
@@ -0,0 +1,263 @@
+"""
+Armazenamento colunar e compacto do acervo
+Guarda os dados de milhões de livros em arrays tipados em vez de
+uma lista de objetos Livro, entregando vistas leves compatíveis.
+"""
+
+from array import array
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+
+try:
+    from .biblioteca_melhorada import Livro, Usuario, _gerar_codigo
+except ImportError:  # executado como script ou com src/ no sys.path
+    from biblioteca_melhorada import Livro, Usuario, _gerar_codigo  # type: ignore[import-not-found,no-redef]
+
+
+_EPOCA = datetime(1970, 1, 1)
+_MICROSSEGUNDO = timedelta(microseconds=1)
+SEM_DATA = -(2 ** 63)
+
+
+def _para_epoca(data: Optional[datetime]) -> int:
+    """Converte uma data em microssegundos desde a época (ou SEM_DATA)."""
+    if data is None:
+        return SEM_DATA
+    return (data - _EPOCA) // _MICROSSEGUNDO
+
+
+def _de_epoca(valor: int) -> Optional[datetime]:
+    """Converte microssegundos desde a época de volta em datetime."""
+    if valor == SEM_DATA:
+        return None
+    return _EPOCA + timedelta(microseconds=valor)
+
+
+class _TabelaTextos:
+    """Sequência de textos guardada como um único buffer UTF-8 e deslocamentos."""
+
+    def __init__(self):
+        self._dados = bytearray()
+        self._inicios = array("Q", [0])
+
+    def __len__(self) -> int:
+        return len(self._inicios) - 1
+
+    def anexar(self, texto: str) -> None:
+        self._dados += texto.encode("utf-8")
+        self._inicios.append(len(self._dados))
+
+    def __getitem__(self, indice: int) -> str:
+        inicio, fim = self._inicios[indice], self._inicios[indice + 1]
+        return self._dados[inicio:fim].decode("utf-8")
+
+    def __setitem__(self, indice: int, texto: str) -> None:
+        """Troca um texto, deslocando os seguintes (O(n), para correções raras)."""
+        inicio, fim = self._inicios[indice], self._inicios[indice + 1]
+        dados = texto.encode("utf-8")
+        self._dados[inicio:fim] = dados
+        diferenca = len(dados) - (fim - inicio)
+        if diferenca:
+            for posicao in range(indice + 1, len(self._inicios)):
+                self._inicios[posicao] += diferenca
+
+
+class LivroCompacto(Livro):
+    """
+    Vista leve sobre uma linha do CatalogoCompacto.
+
+    Expõe os mesmos atributos e métodos de Livro, lendo e escrevendo
+    diretamente nas colunas do catálogo. Os dados bibliográficos não
+    ficam na vista; só o que a biblioteca anexa a ela (como a obra) vai
+    para o dicionário da instância.
+    """
+
+    def __init__(self, catalogo: "CatalogoCompacto", linha: int):
+        """
+        Cria a vista de uma linha.
+
+        Args:
+            catalogo: Catálogo que contém os dados
+            linha: Posição do livro no catálogo
+        """
+        self._catalogo = catalogo
+        self._linha = linha
+
+    @property
+    def titulo(self) -> str:
+        return self._catalogo._titulos[self._linha]
+
+    @titulo.setter
+    def titulo(self, valor: str) -> None:
+        self._catalogo._titulos[self._linha] = valor
+
+    @property
+    def autor(self) -> str:
+        return self._catalogo._autores[self._catalogo._autor_por_linha[self._linha]]
+
+    @autor.setter
+    def autor(self, valor: str) -> None:
+        self._catalogo._autor_por_linha[self._linha] = self._catalogo._internar_autor(valor)
+
+    @property
+    def ano(self) -> int:
+        return self._catalogo._anos[self._linha]
+
+    @ano.setter
+    def ano(self, valor: int) -> None:
+        self._catalogo._anos[self._linha] = valor
+
+    @property
+    def isbn(self) -> Optional[str]:
+        return self._catalogo._isbns[self._linha] or None
+
+    @isbn.setter
+    def isbn(self, valor: Optional[str]) -> None:
+        self._catalogo._isbns[self._linha] = valor or ""
+
+    @property
+    def codigo(self) -> int:
+        return self._catalogo._codigos[self._linha]
+
+    @codigo.setter
+    def codigo(self, valor: int) -> None:
+        self._catalogo._codigos[self._linha] = valor
+
+    @property
+    def disponivel(self) -> bool:
+        return self._catalogo._disponivel(self._linha)
+
+    @disponivel.setter
+    def disponivel(self, valor: bool) -> None:
+        self._catalogo._marcar_disponivel(self._linha, valor)
+
+    @property
+    def data_emprestimo(self) -> Optional[datetime]:
+        return _de_epoca(self._catalogo._datas[self._linha])
+
+    @data_emprestimo.setter
+    def data_emprestimo(self, valor: Optional[datetime]) -> None:
+        self._catalogo._datas[self._linha] = _para_epoca(valor)
+
+    @property
+    def _observadores(self) -> List[Callable[[Livro, str, Optional[Usuario]], None]]:
+        return self._catalogo._observadores.setdefault(self._linha, [])
+
+    @_observadores.setter
+    def _observadores(self, valor: List[Callable[[Livro, str, Optional[Usuario]], None]]) -> None:
+        self._catalogo._observadores[self._linha] = valor
+
+
+class CatalogoCompacto:
+    """
+    Acervo colunar baseado em arrays tipados.
+
+    Títulos e ISBNs ficam em buffers UTF-8, autores são internados
+    (cada nome é guardado uma única vez), o ano usa int16, a
+    disponibilidade é um mapa de bits e a data de empréstimo é um
+    int64 em microssegundos desde a época.
+    """
+
+    def __init__(self):
+        """Inicializa um catálogo vazio."""
+        self._titulos = _TabelaTextos()
+        self._isbns = _TabelaTextos()
+        self._autores: List[str] = []
+        self._id_autor: Dict[str, int] = {}
+        self._autor_por_linha = array("I")
+        self._anos = array("h")
+        self._codigos = array("q")
+        self._datas = array("q")
+        self._bits = bytearray()
+        self._observadores: Dict[int, List[Callable[[Livro, str, Optional[Usuario]], None]]] = {}
+        self.livros_disponiveis = 0
+
+    def __len__(self) -> int:
+        """Quantidade de livros no catálogo."""
+        return len(self._anos)
+
+    def __getitem__(self, linha: int) -> LivroCompacto:
+        """Vista do livro na posição informada."""
+        if linha < 0:
+            linha += len(self)
+        if not 0 <= linha < len(self):
+            raise IndexError("Posição fora do catálogo")
+        return LivroCompacto(self, linha)
+
+    def __iter__(self) -> Iterator[LivroCompacto]:
+        """Itera pelas vistas dos livros, na ordem de cadastro."""
+        for linha in range(len(self)):
+            yield LivroCompacto(self, linha)
+
+    def adicionar_registro(
+        self,
+        titulo: str,
+        autor: str,
+        ano: int,
+        isbn: Optional[str] = None,
+        ano_maximo: Optional[int] = None,
+    ) -> LivroCompacto:
+        """
+        Adiciona um livro a partir dos dados bibliográficos.
+
+        Args:
+            titulo: Título do livro
+            autor: Autor do livro
+            ano: Ano de publicação
+            isbn: ISBN opcional
+            ano_maximo: Limite de ano já calculado (evita consultar o relógio)
+
+        Returns:
+            Vista do livro adicionado
+        """
+        if ano_maximo is None:
+            ano_maximo = datetime.now().year
+        Livro._validar(titulo, autor, ano, ano_maximo)
+
+        linha = len(self)
+        self._titulos.anexar(titulo)
+        self._isbns.anexar(isbn or "")
+        self._autor_por_linha.append(self._internar_autor(autor))
+        self._anos.append(ano)
+        self._codigos.append(_gerar_codigo())
+        self._datas.append(SEM_DATA)
+        if linha % 8 == 0:
+            self._bits.append(0)
+        self._marcar_disponivel(linha, True)
+        return LivroCompacto(self, linha)
+
+    def adicionar(self, livro: Livro) -> LivroCompacto:
+        """
+        Copia um Livro para o catálogo.
+
+        Args:
+            livro: Livro a ser copiado
+
+        Returns:
+            Vista do livro adicionado
+        """
+        vista = self.adicionar_registro(livro.titulo, livro.autor, livro.ano, livro.isbn)
+        vista.disponivel = livro.disponivel
+        vista.data_emprestimo = livro.data_emprestimo
+        return vista
+
+    def _internar_autor(self, autor: str) -> int:
+        id_autor = self._id_autor.get(autor)
+        if id_autor is None:
+            id_autor = self._id_autor[autor] = len(self._autores)
+            self._autores.append(autor)
+        return id_autor
+
+    def _disponivel(self, linha: int) -> bool:
+        return bool(self._bits[linha >> 3] & (1 << (linha & 7)))
+
+    def _marcar_disponivel(self, linha: int, valor: bool) -> None:
+        atual = self._disponivel(linha)
+        if valor == atual:
+            return
+        if valor:
+            self._bits[linha >> 3] |= 1 << (linha & 7)
+            self.livros_disponiveis += 1
+        else:
+            self._bits[linha >> 3] &= ~(1 << (linha & 7)) & 0xFF
+            self.livros_disponiveis -= 1
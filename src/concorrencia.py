@@ -0,0 +1,106 @@
+"""
+Primitivas de concorrência usadas pela Biblioteca
+Travas particionadas permitem que operações sobre livros e usuários
+diferentes avancem em paralelo sem uma trava global.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Hashable, Iterator, List
+
+
+class TravasParticionadas:
+    """
+    Conjunto fixo de travas indexado pelo hash da chave.
+
+    Cada chave (ex.: o código de um livro ou o nome de um usuário) cai
+    sempre na mesma partição. Ao travar várias chaves de uma vez, as
+    partições são adquiridas em ordem crescente e sem repetição; como
+    todo caminho segue a mesma ordem, não há espera circular (deadlock).
+    """
+
+    def __init__(self, particoes: int = 64):
+        """
+        Cria as travas.
+
+        Args:
+            particoes: Quantidade de travas (mais partições, menos colisões)
+        """
+        if particoes < 1:
+            raise ValueError("Quantidade de partições deve ser positiva")
+        self._travas: List[threading.Lock] = [threading.Lock() for _ in range(particoes)]
+
+    def __len__(self) -> int:
+        """Quantidade de partições."""
+        return len(self._travas)
+
+    def particao(self, chave: Hashable) -> int:
+        """Partição responsável pela chave."""
+        return hash(chave) % len(self._travas)
+
+    @contextmanager
+    def travar(self, *chaves: Hashable) -> Iterator[None]:
+        """
+        Adquire as travas de todas as chaves, em ordem de partição.
+
+        Args:
+            chaves: Chaves a proteger durante o bloco
+        """
+        travas = [self._travas[indice] for indice in sorted({self.particao(chave) for chave in chaves})]
+        adquiridas = []
+        try:
+            for trava in travas:
+                trava.acquire()
+                adquiridas.append(trava)
+            yield
+        finally:
+            for trava in reversed(adquiridas):
+                trava.release()
+
+
+class TravaLeituraEscrita:
+    """
+    Trava que admite vários leitores ao mesmo tempo ou um único escritor.
+
+    Um escritor à espera barra a entrada de novos leitores, para que
+    consultas frequentes não o deixem esperando indefinidamente.
+    """
+
+    def __init__(self):
+        self._condicao = threading.Condition()
+        self._leitores = 0
+        self._escrevendo = False
+        self._escritores_aguardando = 0
+
+    @contextmanager
+    def leitura(self) -> Iterator[None]:
+        """Bloco de leitura, compartilhado com outros leitores."""
+        with self._condicao:
+            while self._escrevendo or self._escritores_aguardando:
+                self._condicao.wait()
+            self._leitores += 1
+        try:
+            yield
+        finally:
+            with self._condicao:
+                self._leitores -= 1
+                if not self._leitores:
+                    self._condicao.notify_all()
+
+    @contextmanager
+    def escrita(self) -> Iterator[None]:
+        """Bloco de escrita, exclusivo."""
+        with self._condicao:
+            self._escritores_aguardando += 1
+            try:
+                while self._escrevendo or self._leitores:
+                    self._condicao.wait()
+            finally:
+                self._escritores_aguardando -= 1
+            self._escrevendo = True
+        try:
+            yield
+        finally:
+            with self._condicao:
+                self._escrevendo = False
+                self._condicao.notify_all()
@@ -0,0 +1,389 @@
+"""
+Diário de operações (write-ahead log) com snapshots
+Cada mutação da Biblioteca é anexada a um diário com fsync em grupo;
+snapshots periódicos compactam o histórico e a recuperação carrega o
+último snapshot e reaplica apenas o final do diário.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from .armazenamento import (
+        Armazenamento,
+        EstadoArmazenado,
+        RegistroEmprestimo,
+        RegistroLivro,
+        RegistroUsuario,
+    )
+except ImportError:  # executado como script ou com src/ no sys.path
+    from armazenamento import (  # type: ignore[import-not-found,no-redef]
+        Armazenamento,
+        EstadoArmazenado,
+        RegistroEmprestimo,
+        RegistroLivro,
+        RegistroUsuario,
+    )
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .biblioteca_melhorada import Livro, Usuario
+
+ARQUIVO_DIARIO = "diario.log"
+ARQUIVO_SNAPSHOT = "snapshot.json"
+VERSAO_SNAPSHOT = 1
+
+
+def _data(data: Optional[datetime]) -> Optional[str]:
+    return data.isoformat() if data else None
+
+
+def _sincronizar_diretorio(diretorio: str) -> None:
+    """Torna duráveis as entradas da pasta (arquivos criados ou renomeados) em POSIX."""
+    if os.name != "posix":
+        return
+    descritor = os.open(diretorio, os.O_RDONLY)
+    try:
+        os.fsync(descritor)
+    finally:
+        os.close(descritor)
+
+
+class DiarioIndisponivel(Exception):
+    """Uma escrita do diário falhou; nenhuma operação posterior é aceita."""
+
+
+class ArmazenamentoDiario(Armazenamento):
+    """
+    Armazenamento baseado em diário de operações e snapshots.
+
+    As operações recebem um número de sequência crescente e são escritas
+    por uma thread dedicada: tudo o que chega enquanto um fsync está em
+    andamento é gravado no fsync seguinte (commit em grupo). Com
+    ``sincrono=True`` cada operação só retorna depois de estar em disco.
+    Se uma escrita falhar, o erro fica em ``erro`` e quem aguarda o fsync,
+    as operações seguintes, ``sincronizar`` e ``fechar`` levantam
+    DiarioIndisponivel.
+
+    O diário mantém sua própria cópia do estado, atualizada com cada
+    operação no momento em que ela recebe a sequência: os snapshots são
+    gerados dela, sem ler a biblioteca, e cobrem exatamente as operações
+    até a sequência gravada.
+    """
+
+    def __init__(
+        self,
+        diretorio: str,
+        sincrono: bool = True,
+        intervalo_snapshot: int = 100_000,
+    ):
+        """
+        Abre (ou cria) o diário.
+
+        Args:
+            diretorio: Pasta onde ficam o diário e o snapshot
+            sincrono: Aguarda o fsync antes de retornar de cada operação
+            intervalo_snapshot: Operações entre snapshots automáticos (0 desativa)
+        """
+        os.makedirs(diretorio, exist_ok=True)
+        self.diretorio = diretorio
+        self.sincrono = sincrono
+        self.intervalo_snapshot = intervalo_snapshot
+        self._caminho_diario = os.path.join(diretorio, ARQUIVO_DIARIO)
+        self._caminho_snapshot = os.path.join(diretorio, ARQUIVO_SNAPSHOT)
+        self._estado: Optional[Tuple[Dict[int, RegistroLivro], Dict[str, RegistroUsuario], Dict[int, str]]] = None
+
+        self._condicao = threading.Condition()
+        self._trava_arquivo = threading.Lock()
+        self._pendentes: List[str] = []
+        self._sequencia = 0
+        self._sequencia_duravel = 0
+        self._desde_snapshot = 0
+        self._encerrado = False
+        self.erro: Optional[BaseException] = None
+        self.fsyncs = 0
+
+        self._arquivo = open(self._caminho_diario, "a", encoding="utf-8")
+        _sincronizar_diretorio(diretorio)
+        self._escritor = threading.Thread(target=self._escrever, name="Diario", daemon=True)
+        self._escritor.start()
+
+    # Recuperação -----------------------------------------------------------
+
+    def carregar(self) -> EstadoArmazenado:
+        """Carrega o último snapshot e reaplica as operações posteriores."""
+        livros: Dict[int, RegistroLivro] = OrderedDict()
+        usuarios: Dict[str, RegistroUsuario] = OrderedDict()
+        emprestimos: Dict[int, str] = OrderedDict()
+        sequencia = 0
+
+        if os.path.exists(self._caminho_snapshot):
+            with open(self._caminho_snapshot, encoding="utf-8") as arquivo:
+                snapshot = json.load(arquivo)
+            if snapshot.get("versao") != VERSAO_SNAPSHOT:
+                raise ValueError("Versão de snapshot não suportada")
+            sequencia = snapshot["sequencia"]
+            for codigo, titulo, autor, ano, isbn, disponivel, data in snapshot["livros"]:
+                livros[codigo] = RegistroLivro(
+                    codigo, titulo, autor, ano, isbn, disponivel,
+                    datetime.fromisoformat(data) if data else None,
+                )
+            for nome, email, limite in snapshot["usuarios"]:
+                usuarios[nome.casefold()] = RegistroUsuario(nome, email, limite)
+            for codigo, nome in snapshot["emprestimos"]:
+                emprestimos[codigo] = nome
+
+        for registro in self._ler_diario():
+            if registro["seq"] <= sequencia:
+                continue
+            sequencia = registro["seq"]
+            self._aplicar(registro, livros, usuarios, emprestimos)
+
+        with self._condicao:
+            self._sequencia = self._sequencia_duravel = max(self._sequencia, sequencia)
+            self._estado = (livros, usuarios, emprestimos)
+
+        return EstadoArmazenado(
+            list(livros.values()),
+            list(usuarios.values()),
+            [RegistroEmprestimo(codigo, nome) for codigo, nome in emprestimos.items()],
+        )
+
+    def _ler_diario(self) -> Iterable[Dict[str, Any]]:
+        with open(self._caminho_diario, encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                if not linha.endswith("\n"):
+                    return  # Última escrita interrompida por uma queda
+                yield json.loads(linha)
+
+    @staticmethod
+    def _aplicar(
+        registro: Dict[str, Any],
+        livros: Dict[int, RegistroLivro],
+        usuarios: Dict[str, RegistroUsuario],
+        emprestimos: Dict[int, str],
+    ) -> None:
+        """Reaplica uma operação (todas são idempotentes)."""
+        operacao = registro["op"]
+        if operacao == "livro":
+            livros[registro["codigo"]] = RegistroLivro(
+                registro["codigo"], registro["titulo"], registro["autor"],
+                registro["ano"], registro["isbn"],
+            )
+        elif operacao == "remover_livro":
+            livros.pop(registro["codigo"], None)
+            emprestimos.pop(registro["codigo"], None)
+        elif operacao == "usuario":
+            usuarios[registro["nome"].casefold()] = RegistroUsuario(
+                registro["nome"], registro["email"], registro["limite"]
+            )
+        elif operacao == "remover_usuario":
+            usuarios.pop(registro["nome"].casefold(), None)
+        elif operacao == "emprestimo":
+            livro = livros.get(registro["codigo"])
+            if livro is not None:
+                livro.disponivel = False
+                livro.data_emprestimo = datetime.fromisoformat(registro["data"]) if registro["data"] else None
+            if registro["usuario"] is not None:
+                emprestimos[registro["codigo"]] = registro["usuario"]
+        elif operacao == "devolucao":
+            livro = livros.get(registro["codigo"])
+            if livro is not None:
+                livro.disponivel = True
+                livro.data_emprestimo = None
+            emprestimos.pop(registro["codigo"], None)
+
+    # Escrita ---------------------------------------------------------------
+
+    def _registrar(self, registros: Iterable[Dict[str, Any]]) -> None:
+        """Atribui sequências, enfileira as operações e aguarda o fsync se síncrono."""
+        if self.intervalo_snapshot and self._desde_snapshot >= self.intervalo_snapshot and self._estado is not None:
+            self.snapshot()
+
+        with self._condicao:
+            self._verificar()
+            estado = self._estado
+            for registro in registros:
+                self._sequencia += 1
+                self._desde_snapshot += 1
+                registro["seq"] = self._sequencia
+                self._pendentes.append(json.dumps(registro, ensure_ascii=False))
+                if estado is not None:
+                    self._aplicar(registro, *estado)
+            alvo = self._sequencia
+            self._condicao.notify_all()
+            if self.sincrono:
+                while self._sequencia_duravel < alvo and not self._encerrado and self.erro is None:
+                    self._condicao.wait()
+                if self._sequencia_duravel < alvo:
+                    self._verificar()
+
+    def _verificar(self) -> None:
+        """Levanta DiarioIndisponivel se uma escrita já falhou (a condição deve estar adquirida)."""
+        if self.erro is not None:
+            raise DiarioIndisponivel("Falha ao gravar o diário de operações") from self.erro
+
+    def _falhou(self, erro: BaseException) -> None:
+        """Guarda o erro de escrita e acorda quem aguarda o fsync."""
+        with self._condicao:
+            self.erro = erro
+            self._condicao.notify_all()
+
+    def _escrever(self) -> None:
+        """Thread de escrita: grava e sincroniza tudo o que estiver pendente."""
+        while True:
+            with self._condicao:
+                while not self._pendentes and not self._encerrado:
+                    self._condicao.wait()
+                if (self._encerrado and not self._pendentes) or self.erro is not None:
+                    return
+            try:
+                self.sincronizar()
+            except Exception:
+                return  # Guardado em self.erro e levantado para quem registra ou fecha
+
+    def sincronizar(self) -> None:
+        """
+        Grava e sincroniza (fsync) as operações pendentes.
+
+        Raises:
+            DiarioIndisponivel: Se esta ou uma escrita anterior falhou
+        """
+        with self._trava_arquivo:
+            with self._condicao:
+                self._verificar()
+                lote, self._pendentes = self._pendentes, []
+                alvo = self._sequencia
+            if lote:
+                try:
+                    self._arquivo.write("\n".join(lote) + "\n")
+                    self._arquivo.flush()
+                    os.fsync(self._arquivo.fileno())
+                except BaseException as erro:
+                    self._falhou(erro)
+                    raise DiarioIndisponivel("Falha ao gravar o diário de operações") from erro
+                self.fsyncs += 1
+            with self._condicao:
+                self._sequencia_duravel = max(self._sequencia_duravel, alvo)
+                self._condicao.notify_all()
+
+    def snapshot(self) -> int:
+        """
+        Grava um snapshot e reinicia o diário.
+
+        O estado gravado é o do próprio diário na sequência do snapshot;
+        as operações registradas enquanto ele é escrito continuam
+        pendentes e vão para o diário reiniciado.
+
+        Returns:
+            Número de sequência coberto pelo snapshot
+
+        Raises:
+            RuntimeError: Se o estado ainda não foi carregado (``carregar``)
+        """
+        if self._estado is None:
+            raise RuntimeError("Snapshot exige o estado carregado; chame carregar() antes")
+
+        with self._trava_arquivo:
+            with self._condicao:
+                self._verificar()
+                sequencia = self._sequencia
+                cobertos = len(self._pendentes)  # Todos com sequência até a do snapshot
+                self._desde_snapshot = 0
+                livros, usuarios, emprestimos = self._estado
+                conteudo = {
+                    "versao": VERSAO_SNAPSHOT,
+                    "sequencia": sequencia,
+                    "livros": [
+                        [livro.codigo, livro.titulo, livro.autor, livro.ano, livro.isbn,
+                         livro.disponivel, _data(livro.data_emprestimo)]
+                        for livro in livros.values()
+                    ],
+                    "usuarios": [
+                        [usuario.nome, usuario.email, usuario.limite_livros]
+                        for usuario in usuarios.values()
+                    ],
+                    "emprestimos": [[codigo, nome] for codigo, nome in emprestimos.items()],
+                }
+
+            temporario = self._caminho_snapshot + ".tmp"
+            with open(temporario, "w", encoding="utf-8") as arquivo:
+                json.dump(conteudo, arquivo, ensure_ascii=False)
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            os.replace(temporario, self._caminho_snapshot)
+            _sincronizar_diretorio(self.diretorio)
+
+            try:
+                self._arquivo.close()
+                self._arquivo = open(self._caminho_diario, "w", encoding="utf-8")
+                os.fsync(self._arquivo.fileno())
+            except BaseException as erro:
+                self._falhou(erro)
+                raise DiarioIndisponivel("Falha ao reiniciar o diário de operações") from erro
+
+            with self._condicao:
+                del self._pendentes[:cobertos]
+                self._sequencia_duravel = max(self._sequencia_duravel, sequencia)
+                self._condicao.notify_all()
+        return sequencia
+
+    # Operações -------------------------------------------------------------
+
+    def livros_adicionados(self, livros: Iterable["Livro"]) -> None:
+        self._registrar(
+            {"op": "livro", "codigo": livro.codigo, "titulo": livro.titulo,
+             "autor": livro.autor, "ano": livro.ano, "isbn": livro.isbn}
+            for livro in livros
+        )
+
+    def livro_removido(self, livro: "Livro") -> None:
+        self._registrar([{"op": "remover_livro", "codigo": livro.codigo}])
+
+    def usuario_registrado(self, usuario: "Usuario") -> None:
+        self._registrar([{"op": "usuario", "nome": usuario.nome, "email": usuario.email,
+                          "limite": usuario.limite_livros}])
+
+    def usuario_removido(self, usuario: "Usuario") -> None:
+        self._registrar([{"op": "remover_usuario", "nome": usuario.nome}])
+
+    def emprestimo(self, livro: "Livro", usuario: Optional["Usuario"]) -> None:
+        self.emprestimos([(livro, usuario)])
+
+    def devolucao(self, livro: "Livro", usuario: Optional["Usuario"]) -> None:
+        self.devolucoes([(livro, usuario)])
+
+    def emprestimos(self, pares: Sequence[Tuple["Livro", Optional["Usuario"]]]) -> None:
+        """Registra os empréstimos juntos, aguardando um único fsync."""
+        self._registrar({"op": "emprestimo", "codigo": livro.codigo,
+                         "usuario": usuario.nome if usuario else None,
+                         "data": _data(livro.data_emprestimo)} for livro, usuario in pares)
+
+    def devolucoes(self, pares: Sequence[Tuple["Livro", Optional["Usuario"]]]) -> None:
+        """Registra as devoluções juntas, aguardando um único fsync."""
+        self._registrar({"op": "devolucao", "codigo": livro.codigo} for livro, _ in pares)
+
+    def fechar(self) -> None:
+        """
+        Grava o que estiver pendente e encerra a thread de escrita.
+
+        Raises:
+            DiarioIndisponivel: Se uma escrita falhou (o arquivo é fechado mesmo assim)
+        """
+        with self._condicao:
+            self._encerrado = True
+            self._condicao.notify_all()
+        self._escritor.join()
+        try:
+            self.sincronizar()
+        finally:
+            self._arquivo.close()
+
+    @property
+    def sequencia(self) -> Tuple[int, int]:
+        """Par (última sequência atribuída, última sequência em disco)."""
+        with self._condicao:
+            return self._sequencia, self._sequencia_duravel
@@ -0,0 +1,463 @@
+"""
+Eventos estruturados da Biblioteca
+As operações publicam eventos tipados em um destino (sink) configurável,
+e a mensagem só é formatada quando o destino realmente a exibe.
+"""
+
+import sys
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Deque, List, Optional, Sequence, TextIO, Union
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .biblioteca_melhorada import Livro, Obra, Usuario
+    from .reservas import Reserva
+
+
+class Evento:
+    """Classe base dos eventos publicados pela biblioteca."""
+
+    __slots__ = ()
+
+    def mensagem(self) -> str:
+        """Texto legível do evento (formatado sob demanda)."""
+        raise NotImplementedError
+
+
+@dataclass
+class LivroAdicionado(Evento):
+    """Livro incluído no acervo."""
+
+    livro: "Livro"
+
+    def mensagem(self) -> str:
+        return f"📖 Livro '{self.livro.titulo}' adicionado ao acervo"
+
+
+@dataclass
+class LivroDuplicado(Evento):
+    """Tentativa de incluir um exemplar que já está no acervo."""
+
+    livro: "Livro"
+
+    def mensagem(self) -> str:
+        return f"❌ Livro '{self.livro.titulo}' já está no acervo"
+
+
+@dataclass
+class LivroRemovido(Evento):
+    """Livro retirado do acervo."""
+
+    livro: "Livro"
+
+    def mensagem(self) -> str:
+        return f"🗑️ Livro '{self.livro.titulo}' removido do acervo"
+
+
+@dataclass
+class LivroRemocaoRecusada(Evento):
+    """Remoção de livro recusada."""
+
+    livro: "Livro"
+    motivo: str
+
+    def mensagem(self) -> str:
+        return f"❌ Livro '{self.livro.titulo}' {self.motivo}"
+
+
+@dataclass
+class IsbnNaoEncontrado(Evento):
+    """Operação por ISBN recusada porque nenhum livro do acervo o possui."""
+
+    isbn: str
+
+    def mensagem(self) -> str:
+        return f"❌ Nenhum livro com ISBN '{self.isbn}' no acervo"
+
+
+@dataclass
+class LoteImportado(Evento):
+    """Lote de uma importação em massa processado."""
+
+    importados: int
+    rejeitados: int
+
+    def mensagem(self) -> str:
+        return f"📦 Lote importado: {self.importados} livro(s), {self.rejeitados} rejeitado(s)"
+
+
+@dataclass
+class UsuarioRegistrado(Evento):
+    """Usuário registrado na biblioteca."""
+
+    usuario: "Usuario"
+
+    def mensagem(self) -> str:
+        return f"👤 Usuário '{self.usuario.nome}' registrado com sucesso"
+
+
+@dataclass
+class UsuarioDuplicado(Evento):
+    """Registro recusado porque o nome já existe."""
+
+    usuario: "Usuario"
+
+    def mensagem(self) -> str:
+        return f"❌ Usuário '{self.usuario.nome}' já está registrado"
+
+
+@dataclass
+class EmailDuplicado(Evento):
+    """Registro recusado porque o e-mail já existe."""
+
+    usuario: "Usuario"
+
+    def mensagem(self) -> str:
+        return f"❌ E-mail '{self.usuario.email}' já está registrado"
+
+
+@dataclass
+class UsuarioRemovido(Evento):
+    """Registro de usuário removido."""
+
+    usuario: "Usuario"
+
+    def mensagem(self) -> str:
+        return f"🗑️ Usuário '{self.usuario.nome}' removido"
+
+
+@dataclass
+class UsuarioRemocaoRecusada(Evento):
+    """Remoção de usuário recusada."""
+
+    usuario: "Usuario"
+    motivo: str
+
+    def mensagem(self) -> str:
+        return f"❌ Usuário '{self.usuario.nome}' {self.motivo}"
+
+
+@dataclass
+class UsuarioNaoEncontrado(Evento):
+    """Operação recusada porque nenhum usuário tem o nome ou e-mail informado."""
+
+    identificador: str
+
+    def mensagem(self) -> str:
+        return f"❌ Usuário '{self.identificador}' não encontrado"
+
+
+@dataclass
+class EmprestimoRealizado(Evento):
+    """Empréstimo concluído."""
+
+    usuario: "Usuario"
+    livro: "Livro"
+
+    def mensagem(self) -> str:
+        return f"✅ {self.usuario.nome} emprestou '{self.livro.titulo}'"
+
+
+@dataclass
+class EmprestimoRecusadoLimite(Evento):
+    """Empréstimo recusado porque o usuário atingiu o limite."""
+
+    usuario: "Usuario"
+    livro: Union["Livro", "Obra"]
+
+    def mensagem(self) -> str:
+        return f"❌ {self.usuario.nome} atingiu o limite de {self.usuario.limite_livros} livros"
+
+
+@dataclass
+class EmprestimoRecusadoIndisponivel(Evento):
+    """Empréstimo recusado porque o livro não está disponível."""
+
+    usuario: "Usuario"
+    livro: Union["Livro", "Obra"]
+
+    def mensagem(self) -> str:
+        return f"❌ O livro '{self.livro.titulo}' não está disponível"
+
+
+@dataclass
+class EmprestimoRecusadoReservado(Evento):
+    """Empréstimo recusado porque o exemplar está separado para outra reserva."""
+
+    usuario: "Usuario"
+    livro: "Livro"
+
+    def mensagem(self) -> str:
+        return f"❌ O livro '{self.livro.titulo}' está separado para uma reserva"
+
+
+@dataclass
+class DevolucaoRealizada(Evento):
+    """Devolução concluída."""
+
+    usuario: "Usuario"
+    livro: "Livro"
+
+    def mensagem(self) -> str:
+        return f"✅ {self.usuario.nome} devolveu '{self.livro.titulo}'"
+
+
+@dataclass
+class DevolucaoRecusada(Evento):
+    """Devolução recusada porque o usuário não possui o livro."""
+
+    usuario: "Usuario"
+    livro: "Livro"
+
+    def mensagem(self) -> str:
+        return f"❌ {self.usuario.nome} não possui o livro '{self.livro.titulo}'"
+
+
+@dataclass
+class DevolucaoRecusadaIsbn(Evento):
+    """Devolução por ISBN recusada porque o usuário não tem exemplar emprestado dele."""
+
+    usuario: "Usuario"
+    isbn: str
+
+    def mensagem(self) -> str:
+        return f"❌ {self.usuario.nome} não possui livro com ISBN '{self.isbn}'"
+
+
+@dataclass
+class EmprestimoLoteRealizado(Evento):
+    """Lote de empréstimos concluído por inteiro."""
+
+    usuario: "Usuario"
+    livros: List["Livro"]
+
+    def mensagem(self) -> str:
+        return f"✅ {self.usuario.nome} emprestou {len(self.livros)} livro(s) de uma vez"
+
+
+@dataclass
+class EmprestimoLoteRecusado(Evento):
+    """Lote de empréstimos recusado; nenhum livro foi emprestado."""
+
+    usuario: "Usuario"
+    livros: Sequence[Union["Livro", "Obra"]]
+    motivo: str
+
+    def mensagem(self) -> str:
+        return f"❌ Empréstimo de {len(self.livros)} livro(s) para {self.usuario.nome} recusado: {self.motivo}"
+
+
+@dataclass
+class DevolucaoLoteRealizada(Evento):
+    """Lote de devoluções concluído por inteiro."""
+
+    usuario: "Usuario"
+    livros: List["Livro"]
+
+    def mensagem(self) -> str:
+        return f"✅ {self.usuario.nome} devolveu {len(self.livros)} livro(s) de uma vez"
+
+
+@dataclass
+class DevolucaoLoteRecusada(Evento):
+    """Lote de devoluções recusado; nenhum livro foi devolvido."""
+
+    usuario: "Usuario"
+    livros: List["Livro"]
+    motivo: str
+
+    def mensagem(self) -> str:
+        return f"❌ Devolução de {len(self.livros)} livro(s) de {self.usuario.nome} recusada: {self.motivo}"
+
+
+@dataclass
+class ReservaRealizada(Evento):
+    """Usuário entrou na fila de espera de um título."""
+
+    reserva: "Reserva"
+
+    def mensagem(self) -> str:
+        return f"📌 {self.reserva.usuario.nome} reservou o ISBN '{self.reserva.isbn}'"
+
+
+@dataclass
+class ReservaRecusada(Evento):
+    """Reserva não aceita."""
+
+    usuario: "Usuario"
+    isbn: str
+    motivo: str
+
+    def mensagem(self) -> str:
+        return f"❌ Reserva de {self.usuario.nome} para o ISBN '{self.isbn}' recusada: {self.motivo}"
+
+
+@dataclass
+class ReservaDisponivel(Evento):
+    """Exemplar separado para uma reserva, aguardando retirada."""
+
+    reserva: "Reserva"
+    livro: "Livro"
+
+    def mensagem(self) -> str:
+        return (f"📬 '{self.livro.titulo}' separado para {self.reserva.usuario.nome} "
+                f"até {self.reserva.expira_em:%d/%m/%Y %H:%M}")
+
+
+@dataclass
+class ReservaExpirada(Evento):
+    """Reserva separada não retirada dentro do prazo."""
+
+    reserva: "Reserva"
+    livro: "Livro"
+
+    def mensagem(self) -> str:
+        return f"⌛ Reserva de {self.reserva.usuario.nome} para '{self.livro.titulo}' expirou"
+
+
+class Sink:
+    """Destino de eventos. Subclasses implementam ``emitir``."""
+
+    def emitir(self, evento: Evento) -> None:
+        """Recebe um evento."""
+        raise NotImplementedError
+
+    def fechar(self) -> None:
+        """Libera recursos e entrega eventos pendentes."""
+
+    def __enter__(self) -> "Sink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+
+class SinkNulo(Sink):
+    """Descarta todos os eventos (sem custo de formatação ou E/S)."""
+
+    def emitir(self, evento: Evento) -> None:
+        pass
+
+
+class SinkConsole(Sink):
+    """Exibe cada evento imediatamente, como o comportamento original."""
+
+    def __init__(self, fluxo: Optional[TextIO] = None):
+        """
+        Args:
+            fluxo: Onde escrever (padrão: sys.stdout no momento da escrita)
+        """
+        self._fluxo = fluxo
+
+    def emitir(self, evento: Evento) -> None:
+        print(evento.mensagem(), file=self._fluxo or sys.stdout)
+
+
+class SinkColetor(Sink):
+    """Guarda os eventos recebidos para consumo estruturado."""
+
+    def __init__(self):
+        self.eventos: List[Evento] = []
+
+    def emitir(self, evento: Evento) -> None:
+        self.eventos.append(evento)
+
+
+class SinkBuffer(Sink):
+    """
+    Acumula eventos e os escreve em lote por uma thread de fundo.
+
+    O caminho crítico apenas enfileira o evento; a formatação e a
+    escrita acontecem quando o lote enche ou o intervalo expira. Depois
+    de ``fechar``, cada evento é escrito na hora.
+    """
+
+    def __init__(
+        self,
+        fluxo: Optional[TextIO] = None,
+        tamanho_lote: int = 1000,
+        intervalo: float = 0.5,
+    ):
+        """
+        Args:
+            fluxo: Onde escrever (padrão: sys.stdout no momento da escrita)
+            tamanho_lote: Quantidade de eventos que dispara a escrita
+            intervalo: Tempo máximo (segundos) entre escritas
+        """
+        if tamanho_lote < 1:
+            raise ValueError("Tamanho do lote deve ser positivo")
+        self._fluxo = fluxo
+        self._tamanho_lote = tamanho_lote
+        self._intervalo = intervalo
+        self._pendentes: Deque[Evento] = deque()
+        self._trava = threading.Lock()
+        self._acordar = threading.Event()
+        self._encerrado = False
+        self._thread = threading.Thread(target=self._executar, name="SinkBuffer", daemon=True)
+        self._thread.start()
+
+    def emitir(self, evento: Evento) -> None:
+        self._pendentes.append(evento)
+        if self._encerrado:  # Sem a thread de fundo, ninguém mais descarregaria
+            self.descarregar()
+        elif len(self._pendentes) >= self._tamanho_lote:
+            self._acordar.set()
+
+    def descarregar(self) -> int:
+        """
+        Escreve imediatamente todos os eventos pendentes.
+
+        Returns:
+            Quantidade de eventos escritos
+        """
+        with self._trava:
+            lote = []
+            while self._pendentes:
+                lote.append(self._pendentes.popleft())
+            if lote:
+                fluxo = self._fluxo or sys.stdout
+                fluxo.write("\n".join(evento.mensagem() for evento in lote) + "\n")
+                fluxo.flush()
+            return len(lote)
+
+    def _executar(self) -> None:
+        while not self._encerrado:
+            self._acordar.wait(self._intervalo)
+            self._acordar.clear()
+            self.descarregar()
+
+    def fechar(self) -> None:
+        """Encerra a thread de fundo e escreve o que restou."""
+        self._encerrado = True
+        self._acordar.set()
+        self._thread.join()
+        self.descarregar()
+
+
+_sink_padrao: Sink = SinkConsole()
+
+
+def obter_sink_padrao() -> Sink:
+    """Destino usado pelas operações que não têm um destino próprio."""
+    return _sink_padrao
+
+
+def definir_sink_padrao(sink: Sink) -> Sink:
+    """
+    Troca o destino padrão de eventos.
+
+    Args:
+        sink: Novo destino
+
+    Returns:
+        Destino anterior (útil para restaurar)
+    """
+    global _sink_padrao
+    anterior, _sink_padrao = _sink_padrao, sink
+    return anterior
+
+
+def emitir(evento: Evento) -> None:
+    """Publica um evento no destino padrão."""
+    _sink_padrao.emitir(evento)
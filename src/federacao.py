@@ -0,0 +1,321 @@
+"""
+Busca federada entre bibliotecas
+Consulta várias bibliotecas (uma por filial) ao mesmo tempo em um pool
+de threads, com prazo por filial, entrega das respostas à medida que
+chegam e combinação dos resultados por ISBN em um ranking único.
+"""
+
+import functools
+import heapq
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple, Union
+
+try:
+    from .biblioteca_melhorada import Biblioteca, Livro
+    from .indices import IndiceTextual, normalizar_isbn
+except ImportError:  # executado como script ou com src/ no sys.path
+    from biblioteca_melhorada import Biblioteca, Livro  # type: ignore[import-not-found,no-redef]
+    from indices import IndiceTextual, normalizar_isbn  # type: ignore[import-not-found,no-redef]
+
+ChaveTitulo = Union[str, Tuple[str, str, int]]
+Titulo = Tuple[ChaveTitulo, float, int, List[Livro]]  # chave, relevância, disponíveis, exemplares
+
+
+@dataclass(frozen=True)
+class RespostaFilial:
+    """Resposta (ou ausência dela) de uma filial a uma busca."""
+
+    filial: str
+    livros: List[Livro]
+    duracao: float
+    expirou: bool = False
+    erro: Optional[BaseException] = None
+
+    @property
+    def completa(self) -> bool:
+        """True se a filial respondeu dentro do prazo e sem erro."""
+        return not self.expirou and self.erro is None
+
+
+@dataclass
+class ResultadoFederado:
+    """Um título encontrado na rede, com os exemplares de cada filial."""
+
+    titulo: str
+    autor: str
+    ano: int
+    isbn: Optional[str]
+    relevancia: float
+    exemplares: Dict[str, List[Livro]] = field(default_factory=dict)
+
+    @property
+    def filiais(self) -> List[str]:
+        """Filiais que têm o título, na ordem em que responderam."""
+        return list(self.exemplares)
+
+    @property
+    def disponiveis(self) -> int:
+        """Exemplares disponíveis somando todas as filiais."""
+        return sum(livro.disponivel for livros in self.exemplares.values() for livro in livros)
+
+    def __str__(self) -> str:
+        """Representação em string do resultado."""
+        return (f"{self.titulo} ({self.ano}) - {self.autor} | "
+                f"{self.disponiveis} disponível(is) em {', '.join(self.filiais)}")
+
+
+@dataclass
+class BuscaFederada:
+    """Resultado combinado de uma busca federada."""
+
+    resultados: List[ResultadoFederado]
+    respostas: List[RespostaFilial]
+
+    @property
+    def incompletas(self) -> List[str]:
+        """Filiais que não responderam a tempo ou falharam."""
+        return [resposta.filial for resposta in self.respostas if not resposta.completa]
+
+
+def relevancia(termo: str, livro: Livro) -> float:
+    """
+    Pontuação de um livro encontrado por um termo já normalizado.
+
+    Título igual ao termo vale mais que título começando por ele, que
+    vale mais que o termo como palavra inteira do título, que vale mais
+    que o termo no meio do título; casar apenas pelo autor vale menos.
+
+    Args:
+        termo: Termo normalizado (IndiceTextual.normalizar)
+        livro: Livro encontrado
+
+    Returns:
+        Pontuação entre 0.5 e 4
+    """
+    titulo = IndiceTextual.normalizar(livro.titulo)
+    if titulo == termo:
+        return 4.0
+    if titulo.startswith(termo):
+        return 3.0
+    if _palavra_inteira(termo).search(titulo):
+        return 2.0
+    if termo in titulo:
+        return 1.0
+    return 0.5
+
+
+@functools.lru_cache(maxsize=256)
+def _palavra_inteira(termo: str) -> Pattern[str]:
+    """Expressão que encontra o termo como palavra inteira."""
+    return re.compile(rf"(?<!\w){re.escape(termo)}(?!\w)")
+
+
+def _chave_titulo(livro: Livro) -> ChaveTitulo:
+    """Identidade de um título entre filiais: o ISBN ou, sem ele, título, autor e ano."""
+    if livro.isbn:
+        return normalizar_isbn(livro.isbn)
+    return (IndiceTextual.normalizar(livro.titulo), IndiceTextual.normalizar(livro.autor), livro.ano)
+
+
+class Federacao:
+    """
+    Busca em várias bibliotecas em paralelo.
+
+    Cada filial é consultada em uma thread do pool, com seu próprio
+    prazo; a latência total fica próxima da filial mais lenta (limitada
+    pelo prazo), não da soma de todas. Uma filial que estourou o prazo
+    e ainda não terminou não recebe novas buscas até terminar, para que
+    uma filial travada não esgote o pool.
+
+    As threads ajudam quando as filiais esperam por E/S (bancos, rede);
+    para paralelizar CPU entre núcleos, use filiais que sejam uma
+    BibliotecaFragmentada ou servidores remotos. Qualquer objeto com
+    ``nome`` e ``buscar_livro(termo, exibir=False)`` serve como filial.
+    """
+
+    def __init__(self, filiais: Iterable[Biblioteca], tempo_limite: float = 1.0,
+                 tempos_limite: Optional[Dict[str, float]] = None, threads: Optional[int] = None):
+        """
+        Cria o pool de consultas.
+
+        Args:
+            filiais: Bibliotecas participantes (nomes distintos)
+            tempo_limite: Prazo padrão de cada filial, em segundos
+            tempos_limite: Prazos específicos por nome de filial
+            threads: Tamanho do pool (padrão: duas por filial)
+        """
+        self.filiais: List[Biblioteca] = list(filiais)
+        if not self.filiais:
+            raise ValueError("A federação precisa de pelo menos uma filial")
+        nomes = [filial.nome for filial in self.filiais]
+        if len(set(nomes)) != len(nomes):
+            raise ValueError("Filiais da federação devem ter nomes distintos")
+        if tempo_limite <= 0:
+            raise ValueError("Tempo limite deve ser positivo")
+        self.tempo_limite = tempo_limite
+        self.tempos_limite = dict(tempos_limite or {})
+        self._pool = ThreadPoolExecutor(
+            max_workers=threads or 2 * len(self.filiais), thread_name_prefix="Federacao"
+        )
+        self._trava = threading.Lock()
+        self._atrasadas: Dict[str, Future] = {}
+
+    def __len__(self) -> int:
+        """Quantidade de filiais."""
+        return len(self.filiais)
+
+    def __enter__(self) -> "Federacao":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+    def fechar(self) -> None:
+        """Encerra o pool sem esperar por filiais atrasadas."""
+        self._pool.shutdown(wait=False)
+
+    def prazo(self, filial: str) -> float:
+        """Prazo de resposta de uma filial, em segundos."""
+        return self.tempos_limite.get(filial, self.tempo_limite)
+
+    @staticmethod
+    def _consultar(filial: Biblioteca, termo: str, limite: Optional[int]) -> Tuple[List[Livro], List[Titulo]]:
+        """
+        Busca em uma filial e prepara os candidatos ao ranking (executado no pool).
+
+        Os exemplares são agrupados por obra, com chave e pontuação
+        calculadas uma vez por obra, para que o trabalho se sobreponha à
+        espera pelas outras filiais. Títulos com pontuação abaixo da
+        k-ésima maior da filial são descartados: há ao menos k títulos
+        melhores que eles na rede.
+        """
+        livros = filial.buscar_livro(termo, exibir=False)
+        if not limite or limite < 1:
+            return livros, []
+        normalizado = IndiceTextual.normalizar(termo)
+        titulos: Dict[object, List[Any]] = {}
+        for livro in livros:
+            obra = livro.obra if livro.obra is not None else livro.codigo
+            titulo = titulos.get(obra)
+            if titulo is None:
+                titulo = titulos[obra] = [_chave_titulo(livro), relevancia(normalizado, livro), 0, []]
+            titulo[2] += livro.disponivel
+            titulo[3].append(livro)
+        candidatos = list(titulos.values())
+        if len(candidatos) > limite:
+            corte = heapq.nlargest(limite, (titulo[1] for titulo in candidatos))[-1]
+            candidatos = [titulo for titulo in candidatos if titulo[1] >= corte]
+        return livros, [tuple(titulo) for titulo in candidatos]  # type: ignore[misc]
+
+    def buscar_por_filial(self, termo: str) -> Iterator[RespostaFilial]:
+        """
+        Busca em todas as filiais, entregando cada resposta assim que chega.
+
+        Filiais que estouram o prazo (ou que ainda estão presas em uma
+        busca anterior) são entregues com ``expirou=True`` e sem livros.
+
+        Args:
+            termo: Termo de busca
+
+        Returns:
+            Iterador de RespostaFilial, na ordem de chegada
+        """
+        for resposta, _ in self._buscar(termo, None):
+            yield resposta
+
+    def _buscar(self, termo: str, limite: Optional[int]) -> Iterator[Tuple[RespostaFilial, List[Titulo]]]:
+        """Respostas na ordem de chegada, com os candidatos ao ranking de cada filial."""
+        inicio = time.monotonic()
+        pendentes: Dict[Future, Tuple[str, float]] = {}
+        ocupadas = []
+        with self._trava:
+            for filial in self.filiais:
+                atrasada = self._atrasadas.get(filial.nome)
+                if atrasada is not None and not atrasada.done():
+                    ocupadas.append(filial.nome)
+                    continue
+                self._atrasadas.pop(filial.nome, None)
+                futuro = self._pool.submit(self._consultar, filial, termo, limite)
+                pendentes[futuro] = (filial.nome, inicio + self.prazo(filial.nome))
+        for nome in ocupadas:
+            yield RespostaFilial(nome, [], 0.0, expirou=True), []
+
+        while pendentes:
+            proximo_prazo = min(prazo for _, prazo in pendentes.values())
+            prontos, _ = wait(pendentes, timeout=max(0.0, proximo_prazo - time.monotonic()),
+                              return_when=FIRST_COMPLETED)
+            agora = time.monotonic()
+            for futuro in prontos:
+                nome, _ = pendentes.pop(futuro)
+                erro = futuro.exception()
+                livros, titulos = ([], []) if erro is not None else futuro.result()
+                yield RespostaFilial(nome, livros, agora - inicio, erro=erro), titulos
+            for futuro, (nome, prazo) in list(pendentes.items()):
+                if prazo <= agora:
+                    del pendentes[futuro]
+                    if not futuro.cancel():
+                        with self._trava:
+                            self._atrasadas[nome] = futuro
+                    yield RespostaFilial(nome, [], agora - inicio, expirou=True), []
+
+    def buscar(self, termo: str, limite: int = 10, exibir: bool = True,
+               ao_receber: Optional[Callable[[RespostaFilial], None]] = None) -> BuscaFederada:
+        """
+        Busca em todas as filiais e combina os resultados.
+
+        Exemplares do mesmo título (mesmo ISBN ou, sem ISBN, mesmo título,
+        autor e ano) em filiais diferentes viram um único resultado. O
+        ranking considera a relevância do título e, em empate, quantos
+        exemplares estão disponíveis na rede.
+
+        Args:
+            termo: Termo de busca
+            limite: Máximo de títulos retornados
+            exibir: Imprime os resultados (False para uso programático)
+            ao_receber: Chamado com cada resposta parcial, assim que chega
+
+        Returns:
+            BuscaFederada com os títulos e a resposta de cada filial
+        """
+        # Por título: [relevância, disponíveis, exemplares por filial]
+        agregados: Dict[ChaveTitulo, List[Any]] = {}
+        respostas = []
+        for resposta, titulos in self._buscar(termo, limite):
+            respostas.append(resposta)
+            if ao_receber is not None:
+                ao_receber(resposta)
+            for chave, pontuacao, disponiveis, exemplares in titulos:
+                agregado = agregados.get(chave)
+                if agregado is None:
+                    agregados[chave] = [pontuacao, disponiveis, {resposta.filial: exemplares}]
+                else:
+                    agregado[0] = max(agregado[0], pontuacao)
+                    agregado[1] += disponiveis
+                    agregado[2].setdefault(resposta.filial, []).extend(exemplares)
+
+        # Só os k melhores viram ResultadoFederado
+        melhores = []
+        for pontuacao, _, por_filial in heapq.nsmallest(limite, agregados.values(), key=lambda agregado: (
+            -agregado[0], -agregado[1], next(iter(agregado[2].values()))[0].titulo.casefold()
+        )):
+            livro = next(iter(por_filial.values()))[0]
+            melhores.append(ResultadoFederado(livro.titulo, livro.autor, livro.ano, livro.isbn, pontuacao, por_filial))
+        busca = BuscaFederada(melhores, respostas)
+        if exibir:
+            self._exibir(termo, busca)
+        return busca
+
+    @staticmethod
+    def _exibir(termo: str, busca: BuscaFederada) -> None:
+        if busca.resultados:
+            print(f"\n🔍 Encontrados {len(busca.resultados)} título(s) na rede:")
+            for resultado in busca.resultados:
+                print(f"  • {resultado}")
+        else:
+            print(f"❌ Nenhum livro encontrado na rede com o termo '{termo}'")
+        if busca.incompletas:
+            print(f"⚠️ Sem resposta de: {', '.join(busca.incompletas)}")
@@ -0,0 +1,473 @@
+"""
+Biblioteca fragmentada entre processos
+Livros (todos com ISBN) são distribuídos pelo hash do ISBN e usuários pelo hash do nome
+entre processos trabalhadores, cada um com sua própria Biblioteca.
+Operações pontuais vão direto ao fragmento dono; buscas e estatísticas
+consultam todos os fragmentos em paralelo e combinam os resultados.
+"""
+
+import heapq
+import multiprocessing
+import os
+import threading
+import zlib
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from . import eventos
+    from .biblioteca_melhorada import Biblioteca, Estatisticas, Livro, Usuario, normalizar_isbn
+except ImportError:  # executado como script ou com src/ no sys.path
+    import eventos  # type: ignore[import-not-found,no-redef]
+    from biblioteca_melhorada import Biblioteca, Estatisticas, Livro, Usuario, normalizar_isbn  # type: ignore[import-not-found,no-redef]
+
+DadosLivro = Dict[str, Any]
+
+
+def _dados_livro(livro: Livro) -> DadosLivro:
+    return {
+        "codigo": livro.codigo,
+        "titulo": livro.titulo,
+        "autor": livro.autor,
+        "ano": livro.ano,
+        "isbn": livro.isbn,
+        "disponivel": livro.disponivel,
+    }
+
+
+def _livro_de_dados(dados: DadosLivro) -> Livro:
+    """Cria uma cópia desvinculada de um livro de outro fragmento."""
+    livro = Livro._criar_validado(dados["titulo"], dados["autor"], dados["ano"], dados["isbn"])
+    livro.codigo = dados["codigo"]
+    livro.disponivel = dados["disponivel"]
+    return livro
+
+
+class _Fragmento:
+    """
+    Estado de um processo trabalhador.
+
+    Além da Biblioteca local, guarda as cotas reservadas para empréstimos
+    cujo livro está em outro fragmento, para os livros locais
+    emprestados a usuários de fora, quem está com cada exemplar e, para
+    os e-mails que este fragmento arbitra, o nome do usuário que os usa.
+    """
+
+    def __init__(self, nome: str):
+        eventos.definir_sink_padrao(eventos.SinkNulo())
+        self.biblioteca = Biblioteca(nome, sink=eventos.SinkNulo())
+        self.reservas: Dict[str, int] = {}
+        self.externos: Dict[int, Tuple[str, Livro]] = {}
+        self.emails: Dict[str, str] = {}
+
+    def adicionar_livros(self, registros: List[DadosLivro]) -> int:
+        for dados in registros:
+            self.biblioteca.adicionar_livro(_livro_de_dados(dados))
+        return len(registros)
+
+    def registrar_usuario(self, nome: str, email: Optional[str], limite: int) -> bool:
+        usuario = Usuario(nome, email, limite_livros=limite)
+        self.biblioteca.registrar_usuario(usuario)
+        return self.biblioteca.obter_usuario(nome) is usuario
+
+    def reservar_email(self, email: str, nome: str) -> bool:
+        chave = email.casefold()
+        if chave in self.emails:
+            return False
+        self.emails[chave] = nome
+        return True
+
+    def liberar_email(self, email: str) -> None:
+        self.emails.pop(email.casefold(), None)
+
+    def buscar(self, termo: str, limite: Optional[int]) -> List[DadosLivro]:
+        # A busca local agrupa exemplares por obra: ordena por código antes de
+        # cortar, para que o coordenador possa intercalar os fragmentos
+        encontrados = sorted(self.biblioteca.buscar_livro(termo, exibir=False), key=lambda livro: livro.codigo)
+        return [_dados_livro(livro) for livro in encontrados[:limite]]
+
+    def obter_livro(self, isbn: str) -> Optional[DadosLivro]:
+        livro = self.biblioteca.obter_livro_por_isbn(isbn)
+        return None if livro is None else _dados_livro(livro)
+
+    def estatisticas(self) -> Estatisticas:
+        return self.biblioteca.obter_estatisticas()
+
+    def _tem_cota(self, usuario: Usuario) -> bool:
+        ocupados = len(usuario.livros_emprestados) + self.reservas.get(usuario.nome, 0)
+        return ocupados < usuario.limite_livros
+
+    # Usuário e livro no mesmo fragmento
+
+    def emprestar_local(self, isbn: str, nome: str) -> bool:
+        usuario = self.biblioteca.obter_usuario(nome)
+        livro = self.biblioteca.obter_livro_por_isbn(isbn)
+        if usuario is None or livro is None or not self._tem_cota(usuario):
+            return False
+        return self.biblioteca.emprestar(usuario, livro)
+
+    def devolver_local(self, isbn: str, nome: str) -> bool:
+        usuario = self.biblioteca.obter_usuario(nome)
+        if usuario is None:
+            return False
+        chave = normalizar_isbn(isbn)
+        for livro in list(usuario.livros_emprestados):
+            if livro.isbn and normalizar_isbn(livro.isbn) == chave:
+                return self.biblioteca.devolver(usuario, livro)
+        return False
+
+    # Lado do usuário em empréstimos entre fragmentos
+
+    def reservar_cota(self, nome: str) -> bool:
+        usuario = self.biblioteca.obter_usuario(nome)
+        if usuario is None or not self._tem_cota(usuario):
+            return False
+        self.reservas[usuario.nome] = self.reservas.get(usuario.nome, 0) + 1
+        return True
+
+    def _liberar(self, usuario: Usuario) -> None:
+        restantes = self.reservas[usuario.nome] - 1
+        if restantes:
+            self.reservas[usuario.nome] = restantes
+        else:
+            del self.reservas[usuario.nome]
+
+    def liberar_cota(self, nome: str) -> bool:
+        usuario = self.biblioteca.obter_usuario(nome)
+        if usuario is None:
+            return False
+        self._liberar(usuario)
+        return True
+
+    def confirmar_cota(self, nome: str, dados: DadosLivro) -> bool:
+        usuario = self.biblioteca.obter_usuario(nome)
+        if usuario is None:
+            return False
+        self._liberar(usuario)
+        usuario.livros_emprestados.adicionar(_livro_de_dados(dados))
+        return True
+
+    def localizar_emprestimo(self, nome: str, isbn: str) -> Optional[int]:
+        usuario = self.biblioteca.obter_usuario(nome)
+        if usuario is None:
+            return None
+        chave = normalizar_isbn(isbn)
+        for livro in usuario.livros_emprestados:
+            if livro.isbn and normalizar_isbn(livro.isbn) == chave:
+                return livro.codigo
+        return None
+
+    def remover_emprestimo(self, nome: str, codigo: int) -> bool:
+        usuario = self.biblioteca.obter_usuario(nome)
+        if usuario is None:
+            return False
+        livro = usuario.livros_emprestados.obter(codigo)
+        return livro is not None and usuario.livros_emprestados.remover(livro)
+
+    # Lado do livro em empréstimos entre fragmentos
+
+    def emprestar_externo(self, isbn: str, nome: str) -> Optional[DadosLivro]:
+        livro = self.biblioteca.obter_livro_por_isbn(isbn)
+        if livro is None or not livro.emprestar():
+            return None
+        self.externos[livro.codigo] = (nome, livro)
+        return _dados_livro(livro)
+
+    def devolver_externo(self, codigo: int, nome: str) -> bool:
+        emprestimo = self.externos.get(codigo)
+        if emprestimo is None or emprestimo[0] != nome:
+            return False
+        del self.externos[codigo]
+        emprestimo[1].devolver()
+        return True
+
+
+def _trabalhador(conexao, nome: str) -> None:
+    """Laço de um processo trabalhador: executa comandos até receber None."""
+    fragmento = _Fragmento(nome)
+    while True:
+        comando = conexao.recv()
+        if comando is None:
+            break
+        operacao, argumentos = comando
+        try:
+            conexao.send((True, getattr(fragmento, operacao)(*argumentos)))
+        except Exception as erro:
+            conexao.send((False, erro))
+    conexao.close()
+
+
+class BibliotecaFragmentada:
+    """
+    Biblioteca distribuída entre vários processos.
+
+    Usuários são identificados pelo nome. Quando usuário e livro ficam
+    em fragmentos diferentes, o empréstimo é feito em duas fases: o
+    fragmento do usuário reserva uma cota do limite, o fragmento do
+    livro empresta um exemplar e, conforme o resultado, a reserva é
+    confirmada (com o registro do empréstimo) ou liberada. Assim o
+    limite do usuário e a disponibilidade do exemplar são sempre
+    decididos pelo fragmento que é dono de cada um.
+    """
+
+    def __init__(self, nome: str, fragmentos: Optional[int] = None):
+        """
+        Inicia os processos trabalhadores.
+
+        Args:
+            nome: Nome da biblioteca
+            fragmentos: Quantidade de processos (padrão: núcleos disponíveis)
+        """
+        if not nome.strip():
+            raise ValueError("Nome da biblioteca não pode estar vazio")
+        if fragmentos is None:
+            fragmentos = os.cpu_count() or 1
+        if fragmentos < 1:
+            raise ValueError("Quantidade de fragmentos deve ser positiva")
+
+        self.nome = nome
+        self._conexoes = []
+        self._processos = []
+        self._travas = [threading.Lock() for _ in range(fragmentos)]
+        for indice in range(fragmentos):
+            local, remota = multiprocessing.Pipe()
+            processo = multiprocessing.Process(
+                target=_trabalhador, args=(remota, f"{nome} #{indice}"), daemon=True
+            )
+            processo.start()
+            remota.close()
+            self._conexoes.append(local)
+            self._processos.append(processo)
+
+    def __len__(self) -> int:
+        """Quantidade de fragmentos."""
+        return len(self._conexoes)
+
+    def __enter__(self) -> "BibliotecaFragmentada":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+    def fechar(self) -> None:
+        """Encerra os processos trabalhadores."""
+        for indice, conexao in enumerate(self._conexoes):
+            with self._travas[indice]:
+                if not conexao.closed:
+                    conexao.send(None)
+                    conexao.close()
+        for processo in self._processos:
+            processo.join()
+
+    # Roteamento ------------------------------------------------------------
+
+    def fragmento_do_livro(self, livro: Livro) -> int:
+        """
+        Fragmento dono do livro (pelo ISBN).
+
+        Raises:
+            ValueError: Se o livro não tem ISBN: empréstimos e devoluções
+                são endereçados pelo ISBN, então ele não seria alcançável
+        """
+        if not livro.isbn:
+            raise ValueError(f"Livro '{livro.titulo}' sem ISBN não pode ser distribuído entre fragmentos")
+        return self._fragmento_do_isbn(livro.isbn)
+
+    def _fragmento_do_isbn(self, isbn: str) -> int:
+        return zlib.crc32(normalizar_isbn(isbn).encode("utf-8")) % len(self)
+
+    def fragmento_do_usuario(self, nome: str) -> int:
+        """Fragmento dono do usuário."""
+        return zlib.crc32(nome.casefold().encode("utf-8")) % len(self)
+
+    def fragmento_do_email(self, email: str) -> int:
+        """Fragmento que garante a unicidade do e-mail entre todos os fragmentos."""
+        return zlib.crc32(email.casefold().encode("utf-8")) % len(self)
+
+    def _chamar(self, indice: int, operacao: str, *argumentos: Any) -> Any:
+        with self._travas[indice]:
+            conexao = self._conexoes[indice]
+            conexao.send((operacao, argumentos))
+            sucesso, resultado = conexao.recv()
+        if not sucesso:
+            raise resultado
+        return resultado
+
+    def _chamar_todos(self, operacao: str, *argumentos: Any) -> List[Any]:
+        """Envia o comando a todos os fragmentos antes de aguardar as respostas."""
+        for trava in self._travas:  # Sempre na mesma ordem: sem deadlock
+            trava.acquire()
+        try:
+            for conexao in self._conexoes:
+                conexao.send((operacao, argumentos))
+            respostas = [conexao.recv() for conexao in self._conexoes]
+        finally:
+            for trava in self._travas:
+                trava.release()
+        for sucesso, resultado in respostas:
+            if not sucesso:
+                raise resultado
+        return [resultado for _, resultado in respostas]
+
+    # Cadastro --------------------------------------------------------------
+
+    def adicionar_livro(self, livro: Livro) -> None:
+        """
+        Adiciona um livro ao fragmento dono do seu ISBN.
+
+        Args:
+            livro: Livro a ser adicionado
+
+        Raises:
+            ValueError: Se o livro não tem ISBN
+        """
+        self.adicionar_livros([livro])
+
+    def adicionar_livros(self, livros: Iterable[Livro]) -> int:
+        """
+        Adiciona vários livros, com um único envio por fragmento.
+
+        Args:
+            livros: Livros a serem adicionados
+
+        Returns:
+            Quantidade de livros enviados
+
+        Raises:
+            ValueError: Se algum livro não tem ISBN (nenhum é adicionado)
+        """
+        por_fragmento: Dict[int, List[DadosLivro]] = {}
+        for livro in livros:
+            por_fragmento.setdefault(self.fragmento_do_livro(livro), []).append(_dados_livro(livro))
+        return sum(
+            self._chamar(indice, "adicionar_livros", registros)
+            for indice, registros in por_fragmento.items()
+        )
+
+    def registrar_usuario(self, usuario: Usuario) -> bool:
+        """
+        Registra um usuário no fragmento dono do seu nome.
+
+        O e-mail é antes reservado no fragmento dono dele, de modo que
+        dois usuários em fragmentos diferentes não compartilhem o mesmo
+        e-mail; a reserva é desfeita se o registro for recusado.
+
+        Args:
+            usuario: Usuário a ser registrado
+
+        Returns:
+            bool: True se registrado, False se o nome ou o e-mail já existir
+        """
+        do_usuario = self.fragmento_do_usuario(usuario.nome)
+        if not usuario.email:
+            return self._chamar(do_usuario, "registrar_usuario", usuario.nome, None, usuario.limite_livros)
+
+        do_email = self.fragmento_do_email(usuario.email)
+        if not self._chamar(do_email, "reservar_email", usuario.email, usuario.nome):
+            return False
+        registrado = False
+        try:
+            registrado = self._chamar(
+                do_usuario, "registrar_usuario", usuario.nome, usuario.email, usuario.limite_livros,
+            )
+        finally:
+            if not registrado:
+                self._chamar(do_email, "liberar_email", usuario.email)
+        return registrado
+
+    # Consultas -------------------------------------------------------------
+
+    def obter_livro_por_isbn(self, isbn: str) -> Optional[Livro]:
+        """
+        Obtém uma cópia de um exemplar pelo ISBN, preferindo um disponível.
+
+        Args:
+            isbn: ISBN do livro
+
+        Returns:
+            Cópia do exemplar ou None
+        """
+        dados = self._chamar(self._fragmento_do_isbn(isbn), "obter_livro", isbn)
+        return None if dados is None else _livro_de_dados(dados)
+
+    def buscar_livro(self, termo: str, limite: Optional[int] = None) -> List[Livro]:
+        """
+        Busca em todos os fragmentos e combina os resultados.
+
+        Args:
+            termo: Termo de busca
+            limite: Máximo de livros retornados
+
+        Returns:
+            Cópias dos livros encontrados, na ordem de cadastro
+        """
+        resultados = self._chamar_todos("buscar", termo, limite)
+        combinados = heapq.merge(*resultados, key=lambda dados: dados["codigo"])
+        return [_livro_de_dados(dados) for dados in islice(combinados, limite)]
+
+    def obter_estatisticas(self) -> Estatisticas:
+        """
+        Soma as estatísticas de todos os fragmentos.
+
+        Returns:
+            Estatisticas da biblioteca inteira
+        """
+        partes = self._chamar_todos("estatisticas")
+        return Estatisticas(
+            total_livros=sum(parte.total_livros for parte in partes),
+            livros_disponiveis=sum(parte.livros_disponiveis for parte in partes),
+            livros_emprestados=sum(parte.livros_emprestados for parte in partes),
+            total_usuarios=sum(parte.total_usuarios for parte in partes),
+        )
+
+    # Empréstimos -----------------------------------------------------------
+
+    def emprestar_livro(self, isbn: str, nome: str) -> bool:
+        """
+        Empresta um exemplar do ISBN ao usuário.
+
+        Args:
+            isbn: ISBN do livro
+            nome: Nome do usuário
+
+        Returns:
+            bool: True se emprestado com sucesso, False caso contrário
+        """
+        do_usuario = self.fragmento_do_usuario(nome)
+        do_livro = self._fragmento_do_isbn(isbn)
+        if do_usuario == do_livro:
+            return self._chamar(do_usuario, "emprestar_local", isbn, nome)
+
+        if not self._chamar(do_usuario, "reservar_cota", nome):
+            return False
+        dados: Optional[DadosLivro] = None
+        try:
+            dados = self._chamar(do_livro, "emprestar_externo", isbn, nome)
+        finally:
+            if dados is None:
+                self._chamar(do_usuario, "liberar_cota", nome)
+            else:
+                self._chamar(do_usuario, "confirmar_cota", nome, dados)
+        return dados is not None
+
+    def devolver_livro(self, isbn: str, nome: str) -> bool:
+        """
+        Devolve o exemplar do ISBN emprestado ao usuário.
+
+        Args:
+            isbn: ISBN do livro
+            nome: Nome do usuário
+
+        Returns:
+            bool: True se devolvido com sucesso, False caso contrário
+        """
+        do_usuario = self.fragmento_do_usuario(nome)
+        do_livro = self._fragmento_do_isbn(isbn)
+        if do_usuario == do_livro:
+            return self._chamar(do_usuario, "devolver_local", isbn, nome)
+
+        codigo = self._chamar(do_usuario, "localizar_emprestimo", nome, isbn)
+        if codigo is None or not self._chamar(do_livro, "devolver_externo", codigo, nome):
+            return False
+        self._chamar(do_usuario, "remover_emprestimo", nome, codigo)
+        return True
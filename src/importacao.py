@@ -0,0 +1,113 @@
+"""
+Leitura em fluxo de catálogos para importação em massa
+Lê registros de CSV ou JSONL (arquivo, caminho ou iterador) sem
+carregar o arquivo inteiro em memória.
+"""
+
+import csv
+import json
+import os
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import IO, Any, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+Registro = Mapping[str, Any]
+Fonte = Union[str, "os.PathLike[str]", IO[str], Iterable[Registro]]
+
+FORMATOS = ("csv", "jsonl")
+
+
+@dataclass
+class LinhaRejeitada:
+    """Registro que não pôde ser importado."""
+
+    linha: int
+    dados: Any
+    motivo: str
+
+
+@dataclass
+class RelatorioImportacao:
+    """Resultado de uma importação em massa."""
+
+    importados: int = 0
+    rejeitados: List[LinhaRejeitada] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        """Quantidade de registros lidos."""
+        return self.importados + len(self.rejeitados)
+
+
+def _formato_por_extensao(caminho: str) -> str:
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == ".csv":
+        return "csv"
+    if extensao in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Formato não reconhecido para '{caminho}'")
+
+
+def _ler_texto(arquivo: IO[str], formato: str) -> Iterator[Tuple[int, Any]]:
+    if formato == "csv":
+        for numero, registro in enumerate(csv.DictReader(arquivo), 1):
+            yield numero, registro
+        return
+
+    for numero, texto in enumerate(arquivo, 1):
+        texto = texto.strip()
+        if not texto:
+            continue
+        try:
+            yield numero, json.loads(texto)
+        except json.JSONDecodeError as erro:
+            yield numero, ValueError(f"JSON inválido: {erro.msg}")
+
+
+def ler_registros(fonte: Fonte, formato: Optional[str] = None) -> Iterator[Tuple[int, Any]]:
+    """
+    Lê registros de uma fonte, um de cada vez.
+
+    Args:
+        fonte: Caminho de arquivo, arquivo de texto aberto ou iterador de dicionários
+        formato: "csv" ou "jsonl" (deduzido da extensão quando a fonte é um caminho)
+
+    Returns:
+        Iterador de pares (número da linha, registro). Linhas ilegíveis
+        chegam como uma exceção no lugar do registro.
+    """
+    if formato is not None and formato not in FORMATOS:
+        raise ValueError(f"Formato deve ser um de {FORMATOS}")
+
+    if isinstance(fonte, (str, os.PathLike)):
+        caminho = os.fspath(fonte)
+        formato = formato or _formato_por_extensao(caminho)
+        with open(caminho, "r", encoding="utf-8", newline="") as arquivo:
+            yield from _ler_texto(arquivo, formato)
+    elif hasattr(fonte, "read"):
+        if formato is None:
+            raise ValueError("Informe o formato ao importar de um arquivo aberto")
+        yield from _ler_texto(fonte, formato)  # type: ignore[arg-type]
+    else:
+        yield from enumerate(fonte, 1)  # type: ignore[arg-type]
+
+
+def em_lotes(registros: Iterable[Tuple[int, Any]], tamanho: int) -> Iterator[List[Tuple[int, Any]]]:
+    """
+    Agrupa registros em lotes de tamanho fixo.
+
+    Args:
+        registros: Iterador de registros
+        tamanho: Quantidade máxima por lote
+
+    Returns:
+        Iterador de listas de registros
+    """
+    if tamanho < 1:
+        raise ValueError("Tamanho do lote deve ser positivo")
+    iterador = iter(registros)
+    while True:
+        lote = list(islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
@@ -0,0 +1,465 @@
+"""
+Índices em memória usados pela Biblioteca
+Evitam varreduras completas do acervo nas operações mais frequentes.
+"""
+
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+def normalizar_isbn(isbn: str) -> str:
+    """
+    Normaliza um ISBN para uso como chave de índice.
+
+    Args:
+        isbn: ISBN com ou sem hífens e espaços
+
+    Returns:
+        ISBN apenas com dígitos e 'X' maiúsculo
+    """
+    return isbn.replace("-", "").replace(" ", "").upper()
+
+
+class IndiceTextual:
+    """
+    Índice invertido de trigramas sobre título e autor.
+
+    Cada campo é decomposto em todos os seus trigramas, com o final
+    completado por um caractere sentinela. Assim todo trecho de 1 ou 2
+    caracteres é prefixo de algum trigrama, o que cobre tokens e
+    prefixos e, diferente de um índice apenas de palavras, preserva a
+    semântica de substring da busca original (``termo in titulo.lower()``).
+
+    Os textos são normalizados uma única vez, na indexação, sem acentos
+    e sem diferença de maiúsculas. Para a busca aproximada há ainda um
+    vocabulário de palavras com seus próprios trigramas, no qual um
+    termo com erro de digitação encontra as palavras mais parecidas.
+    """
+
+    TAMANHO_GRAMA = 3
+    SENTINELA = "\x00"
+    SIMILARIDADE_MINIMA = 0.4
+    MAXIMO_CANDIDATOS = 2000
+    MAXIMO_PALAVRAS = 32
+    LIMITE_DOCUMENTOS = 5000
+
+    def __init__(self):
+        """Inicializa um índice vazio."""
+        self._postagens: Dict[str, Set[int]] = {}
+        self._gramas_por_prefixo: Dict[str, Set[str]] = defaultdict(set)
+        self._textos: Dict[int, Tuple[str, ...]] = {}
+        self._documento_por_codigo: Dict[int, int] = {}
+        self._codigo_por_documento: Dict[int, int] = {}
+        self._proximo_documento = 0
+        self._palavras: Dict[str, Set[int]] = {}
+        self._palavras_por_grama: Dict[str, Set[str]] = {}
+        self._gramas_por_palavra: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        """Quantidade de registros indexados."""
+        return len(self._textos)
+
+    @staticmethod
+    def normalizar(texto: str) -> str:
+        """
+        Normaliza um texto para indexação e consulta.
+
+        Decompõe os caracteres (NFKD), descarta as marcas de acentuação
+        e ignora maiúsculas, de modo que "Açúcar" e "acucar" coincidem.
+
+        Args:
+            texto: Texto original
+
+        Returns:
+            Texto normalizado
+        """
+        if texto.isascii():
+            return texto.lower()
+        decomposto = unicodedata.normalize("NFKD", texto)
+        return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+    @staticmethod
+    def palavras(texto: str) -> Set[str]:
+        """Palavras de um texto já normalizado."""
+        return set(re.findall(r"\w+", texto))
+
+    @staticmethod
+    def gramas_palavra(palavra: str) -> Set[str]:
+        """
+        Trigramas de uma palavra, com as bordas marcadas por espaços.
+
+        As bordas fazem o início e o fim da palavra pesarem na
+        similaridade, como no pg_trgm.
+
+        Args:
+            palavra: Palavra já normalizada
+
+        Returns:
+            Conjunto de trigramas
+        """
+        palavra = f"  {palavra} "
+        return {palavra[inicio:inicio + 3] for inicio in range(len(palavra) - 2)}
+
+    @classmethod
+    def gramas(cls, texto: str) -> Set[str]:
+        """
+        Gera os trigramas de um texto completado pelo sentinela.
+
+        Args:
+            texto: Texto já normalizado
+
+        Returns:
+            Conjunto de trigramas
+        """
+        tamanho = cls.TAMANHO_GRAMA
+        texto += cls.SENTINELA * (tamanho - 1)
+        return {texto[inicio:inicio + tamanho] for inicio in range(len(texto) - tamanho + 1)}
+
+    def adicionar(self, codigo: int, *campos: str) -> None:
+        """
+        Indexa um registro.
+
+        Args:
+            codigo: Identificador do registro
+            campos: Textos pesquisáveis (ex.: título e autor)
+        """
+        if codigo in self._textos:
+            self.remover(codigo)
+
+        textos = tuple(self.normalizar(campo) for campo in campos)
+        documento = self._proximo_documento
+        self._proximo_documento += 1
+
+        self._textos[codigo] = textos
+        self._documento_por_codigo[codigo] = documento
+        self._codigo_por_documento[documento] = codigo
+
+        postagens = self._postagens
+        for grama in set().union(*(self.gramas(texto) for texto in textos)):
+            postagem = postagens.get(grama)
+            if postagem is None:
+                postagem = postagens[grama] = set()
+                for tamanho in range(1, self.TAMANHO_GRAMA):
+                    self._gramas_por_prefixo[grama[:tamanho]].add(grama)
+            postagem.add(documento)
+
+        for palavra in set().union(*(self.palavras(texto) for texto in textos)):
+            documentos = self._palavras.get(palavra)
+            if documentos is None:
+                documentos = self._palavras[palavra] = set()
+                gramas = self.gramas_palavra(palavra)
+                self._gramas_por_palavra[palavra] = len(gramas)
+                for grama in gramas:
+                    self._palavras_por_grama.setdefault(grama, set()).add(palavra)
+            documentos.add(documento)
+
+    def remover(self, codigo: int) -> bool:
+        """
+        Remove um registro do índice.
+
+        Args:
+            codigo: Identificador do registro
+
+        Returns:
+            bool: True se o registro estava indexado
+        """
+        textos = self._textos.pop(codigo, None)
+        if textos is None:
+            return False
+
+        documento = self._documento_por_codigo.pop(codigo)
+        del self._codigo_por_documento[documento]
+
+        for grama in set().union(*(self.gramas(texto) for texto in textos)):
+            postagem = self._postagens.get(grama)
+            if postagem is not None:
+                postagem.discard(documento)
+                if not postagem:
+                    del self._postagens[grama]
+                    for tamanho in range(1, self.TAMANHO_GRAMA):
+                        prefixo = grama[:tamanho]
+                        self._gramas_por_prefixo[prefixo].discard(grama)
+                        if not self._gramas_por_prefixo[prefixo]:
+                            del self._gramas_por_prefixo[prefixo]
+
+        for palavra in set().union(*(self.palavras(texto) for texto in textos)):
+            documentos = self._palavras.get(palavra)
+            if documentos is None:
+                continue
+            documentos.discard(documento)
+            if not documentos:
+                del self._palavras[palavra]
+                del self._gramas_por_palavra[palavra]
+                for grama in self.gramas_palavra(palavra):
+                    palavras = self._palavras_por_grama[grama]
+                    palavras.discard(palavra)
+                    if not palavras:
+                        del self._palavras_por_grama[grama]
+        return True
+
+    def _candidatos(self, termo: str) -> Iterable[int]:
+        """Documentos que contêm todos os trigramas do termo."""
+        if len(termo) < self.TAMANHO_GRAMA:
+            gramas = self._gramas_por_prefixo.get(termo, ())
+            return set().union(*(self._postagens[grama] for grama in gramas))
+        if len(termo) == self.TAMANHO_GRAMA:
+            return self._postagens.get(termo, ())
+
+        gramas = {
+            termo[inicio:inicio + self.TAMANHO_GRAMA]
+            for inicio in range(len(termo) - self.TAMANHO_GRAMA + 1)
+        }
+        postagens = []
+        for grama in gramas:
+            postagem = self._postagens.get(grama)
+            if not postagem:
+                return ()
+            postagens.append(postagem)
+
+        postagens.sort(key=len)
+        return postagens[0].intersection(*postagens[1:])
+
+    def buscar(self, termo: str) -> List[int]:
+        """
+        Busca registros cujo algum campo contém o termo.
+
+        Args:
+            termo: Termo de busca
+
+        Returns:
+            Códigos encontrados, na ordem em que foram indexados
+        """
+        termo = self.normalizar(termo)
+        if not termo:
+            return [self._codigo_por_documento[d] for d in sorted(self._codigo_por_documento)]
+
+        verificar = len(termo) > self.TAMANHO_GRAMA
+        encontrados = []
+        for documento in sorted(self._candidatos(termo)):
+            codigo = self._codigo_por_documento[documento]
+            if verificar and not any(termo in texto for texto in self._textos[codigo]):
+                continue
+            encontrados.append(codigo)
+        return encontrados
+
+    def palavras_semelhantes(self, palavra: str,
+                             minimo: Optional[float] = None) -> List[Tuple[float, str]]:
+        """
+        Palavras do vocabulário parecidas com uma palavra normalizada.
+
+        A similaridade é o coeficiente de Dice entre os trigramas. Os
+        trigramas da consulta são visitados do mais raro ao mais comum;
+        novas candidatas só entram até MAXIMO_CANDIDATOS e, a partir
+        daí, um trigrama comum apenas pontua as candidatas existentes,
+        o que limita o trabalho independentemente do tamanho do acervo.
+
+        Args:
+            palavra: Palavra já normalizada
+            minimo: Similaridade mínima (padrão: SIMILARIDADE_MINIMA)
+
+        Returns:
+            Pares (similaridade, palavra), da mais para a menos parecida,
+            no máximo MAXIMO_PALAVRAS
+        """
+        if minimo is None:
+            minimo = self.SIMILARIDADE_MINIMA
+        gramas = self.gramas_palavra(palavra)
+        postagens = sorted(
+            (self._palavras_por_grama[grama] for grama in gramas if grama in self._palavras_por_grama),
+            key=len,
+        )
+
+        comuns: Dict[str, int] = defaultdict(int)
+        for postagem in postagens:
+            if len(comuns) < self.MAXIMO_CANDIDATOS:
+                for candidata in postagem:
+                    comuns[candidata] += 1
+            else:
+                for candidata in comuns:
+                    if candidata in postagem:
+                        comuns[candidata] += 1
+
+        tamanhos = self._gramas_por_palavra
+        semelhantes = []
+        for candidata, compartilhados in comuns.items():
+            similaridade = 2 * compartilhados / (len(gramas) + tamanhos[candidata])
+            if similaridade >= minimo:
+                semelhantes.append((similaridade, candidata))
+        return heapq.nlargest(self.MAXIMO_PALAVRAS, semelhantes)
+
+    def buscar_aproximado(self, termo: str, limite: int = 10,
+                          minimo: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        Busca tolerante a erros de digitação, ordenada por relevância.
+
+        Cada palavra do termo é casada com as palavras semelhantes do
+        vocabulário; a pontuação de um registro é a média, entre as
+        palavras do termo, da melhor similaridade encontrada nele.
+        As palavras do termo são processadas da mais rara à mais comum
+        e no máximo LIMITE_DOCUMENTOS registros entram na disputa;
+        depois disso as palavras seguintes só pontuam os já admitidos,
+        o que mantém consultas com palavras muito frequentes baratas.
+
+        Args:
+            termo: Termo de busca
+            limite: Máximo de resultados
+            minimo: Similaridade mínima por palavra (padrão: SIMILARIDADE_MINIMA)
+
+        Returns:
+            Pares (código, pontuação entre 0 e 1), do mais para o menos
+            relevante; empates seguem a ordem de indexação
+        """
+        palavras = self.palavras(self.normalizar(termo))
+        if not palavras or limite <= 0:
+            return []
+
+        casamentos = [self.palavras_semelhantes(palavra, minimo) for palavra in palavras]
+        casamentos.sort(key=lambda casamento: sum(len(self._palavras[p]) for _, p in casamento))
+
+        pontuacoes: Dict[int, float] = {}
+        for casamento in casamentos:
+            pontuados: Set[int] = set()
+            for similaridade, palavra in casamento:
+                documentos = self._palavras[palavra]
+                admitidos: Iterable[int] = documentos
+                vagas = self.LIMITE_DOCUMENTOS - len(pontuacoes)
+                if len(documentos) > vagas:
+                    novos = (d for d in documentos if d not in pontuacoes)
+                    admitidos = [d for d in pontuacoes if d in documentos] + list(islice(novos, vagas))
+                for documento in admitidos:
+                    if documento not in pontuados:
+                        pontuados.add(documento)
+                        pontuacoes[documento] = pontuacoes.get(documento, 0.0) + similaridade
+
+        melhores_documentos = heapq.nsmallest(
+            limite, pontuacoes.items(), key=lambda item: (-item[1], item[0])
+        )
+        return [
+            (self._codigo_por_documento[documento], pontuacao / len(palavras))
+            for documento, pontuacao in melhores_documentos
+        ]
+
+
+class IndiceOrdenado:
+    """
+    Índice secundário ordenado por (chave, código).
+
+    As entradas ficam em blocos ordenados de tamanho limitado, com o
+    maior elemento de cada bloco em uma lista à parte: localizar uma
+    posição custa duas buscas binárias e inserir ou remover move no
+    máximo um bloco, em vez da lista inteira.
+    """
+
+    TAMANHO_BLOCO = 512
+
+    def __init__(self):
+        """Inicializa um índice vazio."""
+        self._blocos: List[List[Tuple]] = []
+        self._maximos: List[Tuple] = []
+        self._tamanho = 0
+
+    def __len__(self) -> int:
+        """Quantidade de entradas."""
+        return self._tamanho
+
+    def adicionar(self, chave, codigo: int) -> None:
+        """
+        Inclui uma entrada.
+
+        Args:
+            chave: Valor ordenável (ex.: ano ou título normalizado)
+            codigo: Código do registro (desempata chaves iguais)
+        """
+        entrada = (chave, codigo)
+        self._tamanho += 1
+        if not self._blocos:
+            self._blocos.append([entrada])
+            self._maximos.append(entrada)
+            return
+
+        indice = bisect_left(self._maximos, entrada)
+        if indice == len(self._blocos):
+            indice -= 1
+            self._blocos[indice].append(entrada)
+            self._maximos[indice] = entrada
+        else:
+            insort(self._blocos[indice], entrada)
+
+        bloco = self._blocos[indice]
+        if len(bloco) > 2 * self.TAMANHO_BLOCO:
+            metade = bloco[self.TAMANHO_BLOCO:]
+            del bloco[self.TAMANHO_BLOCO:]
+            self._blocos.insert(indice + 1, metade)
+            self._maximos[indice] = bloco[-1]
+            self._maximos.insert(indice + 1, metade[-1])
+
+    def remover(self, chave, codigo: int) -> bool:
+        """
+        Remove uma entrada.
+
+        Returns:
+            bool: True se a entrada existia
+        """
+        entrada = (chave, codigo)
+        indice = bisect_left(self._maximos, entrada)
+        if indice == len(self._blocos):
+            return False
+        bloco = self._blocos[indice]
+        posicao = bisect_left(bloco, entrada)
+        if posicao == len(bloco) or bloco[posicao] != entrada:
+            return False
+
+        del bloco[posicao]
+        self._tamanho -= 1
+        if not bloco:
+            del self._blocos[indice]
+            del self._maximos[indice]
+        else:
+            self._maximos[indice] = bloco[-1]
+        return True
+
+    def iterar(self, inicio: Optional[Tuple] = None, inclusivo: bool = True) -> Iterator[Tuple]:
+        """
+        Percorre as entradas em ordem a partir de uma posição.
+
+        Args:
+            inicio: Entrada (chave, código) de onde começar (padrão: do início)
+            inclusivo: Inclui a própria entrada de início, se existir
+
+        Returns:
+            Iterador de pares (chave, código)
+        """
+        if inicio is None:
+            indice, posicao = 0, 0
+        else:
+            busca = bisect_left if inclusivo else bisect_right
+            indice = busca(self._maximos, inicio)
+            posicao = busca(self._blocos[indice], inicio) if indice < len(self._blocos) else 0
+
+        while indice < len(self._blocos):
+            bloco = self._blocos[indice]
+            # Cópia do restante do bloco: o índice pode mudar durante a iteração
+            yield from bloco[posicao:]
+            indice += 1
+            posicao = 0
+
+    def intervalo(self, minimo, maximo) -> Iterator[int]:
+        """
+        Códigos com chave entre dois limites (inclusive), em ordem.
+
+        Args:
+            minimo: Menor chave aceita
+            maximo: Maior chave aceita
+
+        Returns:
+            Iterador de códigos
+        """
+        for chave, codigo in self.iterar((minimo,)):
+            if chave > maximo:
+                return
+            yield codigo
@@ -0,0 +1,353 @@
+"""
+Métricas de operação da Biblioteca
+Contagens por resultado e histogramas de latência no estilo HDR, com
+exportação no formato texto do Prometheus. A instrumentação é opcional:
+``ativar()`` envolve os métodos medidos e ``desativar()`` devolve os
+originais, de modo que, desligada, não há custo algum.
+"""
+
+import functools
+import os
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from .biblioteca_melhorada import Biblioteca, Usuario
+except ImportError:  # executado como script ou com src/ no sys.path
+    from biblioteca_melhorada import Biblioteca, Usuario  # type: ignore[import-not-found,no-redef]
+
+OK = "ok"
+RECUSADO = "recusado"
+ERRO = "erro"
+
+# Operações instrumentadas: métodos que devolvem False quando recusados.
+OPERACOES: Dict[type, Tuple[str, ...]] = {
+    Biblioteca: (
+        "adicionar_livro", "remover_livro", "registrar_usuario", "remover_usuario",
+        "emprestar_livro", "devolver_livro", "emprestar", "devolver", "emprestar_lote",
+        "devolver_lote", "reservar", "buscar_livro", "buscar_aproximado", "obter_livro_por_isbn",
+        "obter_estatisticas",
+    ),
+    Usuario: ("pegar_livro", "devolver_livro"),
+}
+
+
+class Histograma:
+    """
+    Histograma de latências em nanossegundos com erro relativo limitado.
+
+    Como no HdrHistogram, cada potência de dois é dividida em
+    2**BITS_PRECISAO sub-baldes lineares: o erro relativo de qualquer
+    percentil fica abaixo de 1/2**BITS_PRECISAO (12,5%) e registrar um
+    valor custa apenas um ``bit_length`` e um deslocamento.
+    """
+
+    BITS_PRECISAO = 3
+
+    def __init__(self):
+        """Inicializa um histograma vazio."""
+        self._contagens: List[int] = []
+        self.total = 0
+        self.soma = 0
+        self.minimo: Optional[int] = None
+        self.maximo = 0
+
+    @classmethod
+    def balde(cls, valor: int) -> int:
+        """Índice do balde de um valor (em ns)."""
+        deslocamento = valor.bit_length() - cls.BITS_PRECISAO - 1
+        if deslocamento <= 0:
+            return valor
+        return (deslocamento << cls.BITS_PRECISAO) + (valor >> deslocamento)
+
+    @classmethod
+    def limite_superior(cls, indice: int) -> int:
+        """Maior valor (em ns) que cai no balde."""
+        sub_baldes = 1 << cls.BITS_PRECISAO
+        if indice < 2 * sub_baldes:
+            return indice
+        deslocamento, mantissa = divmod(indice, sub_baldes)
+        deslocamento -= 1
+        return ((mantissa + sub_baldes + 1) << deslocamento) - 1
+
+    def registrar(self, valor: int) -> None:
+        """
+        Registra um valor.
+
+        Args:
+            valor: Latência em nanossegundos
+        """
+        indice = self.balde(valor)
+        contagens = self._contagens
+        if indice >= len(contagens):
+            contagens.extend([0] * (indice + 1 - len(contagens)))
+        contagens[indice] += 1
+        self.total += 1
+        self.soma += valor
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def percentil(self, fracao: float) -> int:
+        """
+        Valor abaixo do qual está a fração pedida das amostras.
+
+        Args:
+            fracao: Entre 0 e 1 (ex.: 0.99)
+
+        Returns:
+            Limite superior do balde correspondente, em ns (0 se vazio)
+        """
+        if not self.total:
+            return 0
+        alvo = max(1, int(round(fracao * self.total)))
+        acumulado = 0
+        for indice, contagem in enumerate(self._contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return min(self.limite_superior(indice), self.maximo)
+        return self.maximo
+
+    def acumulado_ate(self, limite: int) -> int:
+        """Quantidade de amostras abaixo de um limite em ns (exata em potências de dois)."""
+        acumulado = 0
+        for indice, contagem in enumerate(self._contagens):
+            if self.limite_superior(indice) >= limite:
+                break
+            acumulado += contagem
+        return acumulado
+
+
+@dataclass(frozen=True)
+class EstatisticasOperacao:
+    """Retrato das métricas de uma operação (latências em segundos)."""
+
+    operacao: str
+    total: int
+    recusadas: int
+    erros: int
+    soma: float
+    minimo: float
+    maximo: float
+    p50: float
+    p90: float
+    p99: float
+    p999: float
+
+    @property
+    def media(self) -> float:
+        """Latência média (0 sem amostras)."""
+        return self.soma / self.total if self.total else 0.0
+
+
+class Metricas:
+    """
+    Registro de contagens e latências por operação, seguro entre threads.
+    """
+
+    PREFIXO = "biblioteca"
+    # Limites do histograma exportado: potências de dois de ~1 µs a ~8,6 s,
+    # que coincidem com inícios de balde e por isso são exatas.
+    LIMITES_EXPORTADOS = tuple(1 << expoente for expoente in range(10, 34))
+
+    def __init__(self):
+        """Inicializa um registro vazio."""
+        self._trava = threading.Lock()
+        self._histogramas: Dict[str, Histograma] = {}
+        self._resultados: Dict[Tuple[str, str], int] = {}
+
+    def registrar(self, operacao: str, nanossegundos: int, resultado: str = OK) -> None:
+        """
+        Registra uma execução de operação.
+
+        Args:
+            operacao: Nome da operação (ex.: "Biblioteca.buscar_livro")
+            nanossegundos: Duração
+            resultado: OK, RECUSADO ou ERRO
+        """
+        with self._trava:
+            histograma = self._histogramas.get(operacao)
+            if histograma is None:
+                histograma = self._histogramas[operacao] = Histograma()
+            histograma.registrar(nanossegundos)
+            chave = (operacao, resultado)
+            self._resultados[chave] = self._resultados.get(chave, 0) + 1
+
+    def instantaneo(self) -> Dict[str, EstatisticasOperacao]:
+        """
+        Retrato atual de todas as operações registradas.
+
+        Returns:
+            EstatisticasOperacao por nome de operação
+        """
+        retrato = {}
+        with self._trava:
+            for operacao, histograma in sorted(self._histogramas.items()):
+                retrato[operacao] = EstatisticasOperacao(
+                    operacao=operacao,
+                    total=histograma.total,
+                    recusadas=self._resultados.get((operacao, RECUSADO), 0),
+                    erros=self._resultados.get((operacao, ERRO), 0),
+                    soma=histograma.soma / 1e9,
+                    minimo=(histograma.minimo or 0) / 1e9,
+                    maximo=histograma.maximo / 1e9,
+                    p50=histograma.percentil(0.50) / 1e9,
+                    p90=histograma.percentil(0.90) / 1e9,
+                    p99=histograma.percentil(0.99) / 1e9,
+                    p999=histograma.percentil(0.999) / 1e9,
+                )
+        return retrato
+
+    def limpar(self) -> None:
+        """Descarta todas as amostras."""
+        with self._trava:
+            self._histogramas.clear()
+            self._resultados.clear()
+
+    # Exportação ------------------------------------------------------------
+
+    def para_prometheus(self) -> str:
+        """
+        Métricas no formato texto de exposição do Prometheus.
+
+        Returns:
+            Texto com o contador de operações por resultado e o
+            histograma de latência de cada operação
+        """
+        prefixo = self.PREFIXO
+        linhas = [
+            f"# HELP {prefixo}_operacoes_total Operações executadas por resultado.",
+            f"# TYPE {prefixo}_operacoes_total counter",
+        ]
+        with self._trava:
+            for (operacao, resultado), quantidade in sorted(self._resultados.items()):
+                linhas.append(
+                    f'{prefixo}_operacoes_total{{operacao="{operacao}",resultado="{resultado}"}} {quantidade}'
+                )
+            linhas += [
+                f"# HELP {prefixo}_operacao_segundos Latência das operações.",
+                f"# TYPE {prefixo}_operacao_segundos histogram",
+            ]
+            for operacao, histograma in sorted(self._histogramas.items()):
+                rotulo = f'operacao="{operacao}"'
+                for limite in self.LIMITES_EXPORTADOS:
+                    linhas.append(
+                        f'{prefixo}_operacao_segundos_bucket{{{rotulo},le="{limite / 1e9:.9g}"}} '
+                        f"{histograma.acumulado_ate(limite)}"
+                    )
+                linhas += [
+                    f'{prefixo}_operacao_segundos_bucket{{{rotulo},le="+Inf"}} {histograma.total}',
+                    f"{prefixo}_operacao_segundos_sum{{{rotulo}}} {histograma.soma / 1e9:.9g}",
+                    f"{prefixo}_operacao_segundos_count{{{rotulo}}} {histograma.total}",
+                ]
+        return "\n".join(linhas) + "\n"
+
+    def escrever(self, caminho: str) -> None:
+        """
+        Grava as métricas em um arquivo (ex.: para o textfile collector).
+
+        A escrita é atômica: o arquivo é substituído de uma só vez.
+
+        Args:
+            caminho: Arquivo de destino
+        """
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.para_prometheus())
+        os.replace(temporario, caminho)
+
+    def servir(self, host: str = "127.0.0.1", porta: int = 0) -> ThreadingHTTPServer:
+        """
+        Expõe as métricas por HTTP em uma thread de fundo.
+
+        Args:
+            host: Endereço local (padrão: apenas loopback)
+            porta: Porta TCP (0 escolhe uma livre)
+
+        Returns:
+            Servidor em execução; ``server_address`` informa a porta e
+            ``shutdown()`` o encerra
+        """
+        metricas = self
+
+        class Exportador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                corpo = metricas.para_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        servidor = ThreadingHTTPServer((host, porta), Exportador)
+        threading.Thread(target=servidor.serve_forever, name="Metricas", daemon=True).start()
+        return servidor
+
+
+# Instrumentação ---------------------------------------------------------------
+
+_originais: Dict[Tuple[type, str], Callable] = {}
+_metricas_ativas: Optional[Metricas] = None
+
+
+def _instrumentar(metricas: Metricas, operacao: str, metodo: Callable) -> Callable:
+    relogio = time.perf_counter_ns
+
+    @functools.wraps(metodo)
+    def medido(*args, **kwargs):
+        inicio = relogio()
+        try:
+            retorno = metodo(*args, **kwargs)
+        except Exception:
+            metricas.registrar(operacao, relogio() - inicio, ERRO)
+            raise
+        metricas.registrar(operacao, relogio() - inicio, RECUSADO if retorno is False else OK)
+        return retorno
+
+    return medido
+
+
+def ativar(metricas: Optional[Metricas] = None) -> Metricas:
+    """
+    Liga a instrumentação das operações em OPERACOES.
+
+    Vale para todas as instâncias. Chamadas que devolvem False contam
+    como recusadas e as que levantam exceção, como erro.
+
+    Args:
+        metricas: Registro a alimentar (padrão: um novo)
+
+    Returns:
+        O registro em uso
+    """
+    global _metricas_ativas
+    desativar()
+    metricas = metricas if metricas is not None else Metricas()
+    for classe, metodos in OPERACOES.items():
+        for nome in metodos:
+            original = classe.__dict__[nome]
+            _originais[(classe, nome)] = original
+            setattr(classe, nome, _instrumentar(metricas, f"{classe.__name__}.{nome}", original))
+    _metricas_ativas = metricas
+    return metricas
+
+
+def desativar() -> None:
+    """Desliga a instrumentação, restaurando os métodos originais."""
+    global _metricas_ativas
+    for (classe, nome), original in _originais.items():
+        setattr(classe, nome, original)
+    _originais.clear()
+    _metricas_ativas = None
+
+
+def metricas_ativas() -> Optional[Metricas]:
+    """Registro em uso, ou None se a instrumentação estiver desligada."""
+    return _metricas_ativas
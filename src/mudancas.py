@@ -0,0 +1,228 @@
+"""
+Fluxo de mudanças (change data capture) da Biblioteca
+Cada mutação confirmada (livros, usuários, empréstimos e devoluções)
+recebe uma versão crescente e fica disponível em ``mudancas_desde``,
+de onde réplicas de leitura a consomem incrementalmente (veja
+``replicacao``).
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from .armazenamento import Armazenamento
+except ImportError:  # executado como script ou com src/ no sys.path
+    from armazenamento import Armazenamento  # type: ignore[import-not-found,no-redef]
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .biblioteca_melhorada import Biblioteca, Livro, Usuario
+
+TAMANHO_LOTE = 1024
+
+
+class MudancasDescartadas(Exception):
+    """As mudanças pedidas já saíram da janela de retenção do fluxo."""
+
+
+@dataclass
+class Mudanca:
+    """
+    Uma mutação confirmada na biblioteca (compartilhada entre consumidores:
+    não deve ser alterada).
+
+    As operações e os dados seguem o formato do diário de operações:
+    "livro" (codigo, titulo, autor, ano, isbn), "remover_livro" (codigo),
+    "usuario" (nome, email, limite), "remover_usuario" (nome),
+    "emprestimo" (codigo, usuario, data como datetime) e "devolucao" (codigo).
+    """
+
+    versao: int
+    operacao: str
+    dados: Dict[str, Any]
+
+
+class FluxoMudancas(Armazenamento):
+    """
+    Registro versionado e em memória das mutações de uma biblioteca.
+
+    A biblioteca notifica o fluxo pelos mesmos ganchos do armazenamento,
+    ainda sob as travas da operação, e apenas depois que ela foi
+    confirmada: mudanças que tocam o mesmo livro ou usuário aparecem na
+    ordem em que aconteceram, e um lote desfeito não aparece. As versões
+    são consecutivas, a partir de 1.
+    """
+
+    def __init__(self, retencao: Optional[int] = 100_000):
+        """
+        Cria um fluxo vazio.
+
+        Args:
+            retencao: Quantidade mínima de mudanças recentes mantidas para
+                réplicas atrasadas (None mantém todas); o fluxo guarda no
+                máximo o dobro disso
+        """
+        if retencao is not None and retencao <= 0:
+            raise ValueError("Retenção deve ser positiva")
+        self.retencao = retencao
+        self._trava = threading.Lock()
+        self._condicao = threading.Condition(self._trava)
+        self._esperando = 0  # Consumidores bloqueados em mudancas_desde
+        self._mudancas: List[Mudanca] = []
+        self._primeira = 1  # Versão de _mudancas[0]
+        self._versao = 0
+        self._fechado = False
+
+    @property
+    def versao(self) -> int:
+        """Versão da última mudança registrada (0 se nenhuma)."""
+        with self._condicao:
+            return self._versao
+
+    @property
+    def versao_minima(self) -> int:
+        """Menor versão a partir da qual ``mudancas_desde`` ainda responde."""
+        with self._condicao:
+            return self._primeira - 1
+
+    @property
+    def fechado(self) -> bool:
+        """True depois de ``fechar()``."""
+        return self._fechado
+
+    def __len__(self) -> int:
+        """Quantidade de mudanças retidas."""
+        with self._condicao:
+            return len(self._mudancas)
+
+    # Consumo ---------------------------------------------------------------
+
+    def mudancas_desde(self, versao: int, tempo_limite: Optional[float] = 0.0) -> Iterator[Mudanca]:
+        """
+        Percorre, em ordem, as mudanças posteriores a uma versão.
+
+        As mudanças são copiadas em blocos e entregues fora da trava, de
+        modo que um consumidor lento não atrasa quem registra. Ao alcançar
+        a última, espera por novas mudanças.
+
+        Args:
+            versao: Última versão já aplicada pelo consumidor (0: desde o início)
+            tempo_limite: Segundos a esperar por novas mudanças depois de
+                alcançar a última (0: apenas as já registradas; None:
+                indefinidamente, até ``fechar()``)
+
+        Yields:
+            Mudanca, com versões consecutivas
+
+        Raises:
+            MudancasDescartadas: Se mudanças posteriores à versão já foram
+                descartadas (a réplica precisa ser recriada)
+            ValueError: Se a versão é posterior à última registrada
+        """
+        while True:
+            with self._condicao:
+                bloco = self._posteriores(versao)
+                if not bloco and tempo_limite != 0 and not self._fechado:
+                    self._esperando += 1
+                    try:
+                        self._condicao.wait_for(lambda: self._versao > versao or self._fechado, tempo_limite)
+                    finally:
+                        self._esperando -= 1
+                    bloco = self._posteriores(versao)
+            if not bloco:
+                return
+            yield from bloco
+            versao = bloco[-1].versao
+
+    def _posteriores(self, versao: int) -> List[Mudanca]:
+        """Próximo bloco de mudanças depois da versão (a trava deve estar adquirida)."""
+        if versao > self._versao:
+            raise ValueError(f"Versão {versao} ainda não existe (última: {self._versao})")
+        inicio = versao + 1 - self._primeira
+        if inicio < 0:
+            raise MudancasDescartadas(
+                f"Mudanças posteriores à versão {versao} já foram descartadas "
+                f"(disponíveis a partir da {self._primeira})"
+            )
+        return self._mudancas[inicio:inicio + TAMANHO_LOTE]
+
+    def fechar(self) -> None:
+        """Encerra os consumidores que esperam por novas mudanças."""
+        with self._condicao:
+            self._fechado = True
+            self._condicao.notify_all()
+
+    # Registro --------------------------------------------------------------
+
+    def _registrar(self, registros: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Atribui versões às mudanças e acorda os consumidores."""
+        with self._trava:  # Mesma trava da condição, sem o custo de entrar nela
+            versao = self._versao
+            mudancas = self._mudancas
+            for operacao, dados in registros:
+                versao += 1
+                mudancas.append(Mudanca(versao, operacao, dados))
+            self._versao = versao
+            if self.retencao is not None and len(self._mudancas) > 2 * self.retencao:
+                # Descarte em blocos: custo amortizado constante por mudança
+                excedente = len(self._mudancas) - self.retencao
+                del self._mudancas[:excedente]
+                self._primeira += excedente
+            if self._esperando:
+                self._condicao.notify_all()
+
+    def anexar(self, biblioteca: "Biblioteca") -> None:
+        """
+        Registra o estado atual da biblioteca como as primeiras mudanças.
+
+        Assim uma réplica vazia que começa da versão 0 reconstrói também o
+        que já existia quando o fluxo foi ligado.
+        """
+        livros = biblioteca.livros
+        registros = [self._livro(livro) for livro in livros]
+        registros.extend(self._usuario(usuario) for usuario in biblioteca.usuarios)
+        registros.extend(
+            self._emprestimo(livro, biblioteca.obter_portador(livro))
+            for livro in livros if not livro.disponivel
+        )
+        self._registrar(registros)
+
+    @staticmethod
+    def _livro(livro: "Livro") -> Tuple[str, Dict[str, Any]]:
+        return "livro", {"codigo": livro.codigo, "titulo": livro.titulo, "autor": livro.autor,
+                         "ano": livro.ano, "isbn": livro.isbn}
+
+    @staticmethod
+    def _usuario(usuario: "Usuario") -> Tuple[str, Dict[str, Any]]:
+        return "usuario", {"nome": usuario.nome, "email": usuario.email, "limite": usuario.limite_livros}
+
+    @staticmethod
+    def _emprestimo(livro: "Livro", usuario: Optional["Usuario"]) -> Tuple[str, Dict[str, Any]]:
+        return "emprestimo", {"codigo": livro.codigo, "usuario": usuario.nome if usuario else None,
+                              "data": livro.data_emprestimo}
+
+    def livros_adicionados(self, livros: Iterable["Livro"]) -> None:
+        self._registrar([self._livro(livro) for livro in livros])
+
+    def livro_removido(self, livro: "Livro") -> None:
+        self._registrar([("remover_livro", {"codigo": livro.codigo})])
+
+    def usuario_registrado(self, usuario: "Usuario") -> None:
+        self._registrar([self._usuario(usuario)])
+
+    def usuario_removido(self, usuario: "Usuario") -> None:
+        self._registrar([("remover_usuario", {"nome": usuario.nome})])
+
+    def emprestimo(self, livro: "Livro", usuario: Optional["Usuario"]) -> None:
+        self._registrar([self._emprestimo(livro, usuario)])
+
+    def devolucao(self, livro: "Livro", usuario: Optional["Usuario"]) -> None:
+        self._registrar([("devolucao", {"codigo": livro.codigo})])
+
+    def emprestimos(self, pares: Sequence[Tuple["Livro", Optional["Usuario"]]]) -> None:
+        """Registra os empréstimos de um lote em versões consecutivas."""
+        self._registrar([self._emprestimo(livro, usuario) for livro, usuario in pares])
+
+    def devolucoes(self, pares: Sequence[Tuple["Livro", Optional["Usuario"]]]) -> None:
+        """Registra as devoluções de um lote em versões consecutivas."""
+        self._registrar([("devolucao", {"codigo": livro.codigo}) for livro, _ in pares])
@@ -0,0 +1,215 @@
+"""
+Réplicas de leitura da Biblioteca
+Uma Replica consome o fluxo de mudanças de uma biblioteca principal e
+reaplica cada mutação, em ordem, em uma biblioteca seguidora. Buscas,
+listagens e estatísticas podem então ser atendidas pela seguidora sem
+disputar o objeto que processa os empréstimos.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from . import eventos
+    from .biblioteca_melhorada import Biblioteca, Livro, Usuario
+    from .mudancas import FluxoMudancas, Mudanca
+except ImportError:  # executado como script ou com src/ no sys.path
+    import eventos  # type: ignore[import-not-found,no-redef]
+    from biblioteca_melhorada import Biblioteca, Livro, Usuario  # type: ignore[import-not-found,no-redef]
+    from mudancas import FluxoMudancas, Mudanca  # type: ignore[import-not-found,no-redef]
+
+Dados = Dict[str, Any]
+
+
+class Replica:
+    """
+    Mantém uma biblioteca seguidora em dia com um fluxo de mudanças.
+
+    Com ``iniciar()`` uma thread acompanha o fluxo e aplica cada mudança
+    assim que ela é registrada, sem recarregar o estado: o atraso é o
+    tempo de aplicar o que chegou desde a última passada. A seguidora
+    deve ser usada apenas para leitura; ``aguardar(versao)`` permite ler
+    na réplica algo que acabou de ser escrito na principal.
+    """
+
+    def __init__(self, fluxo: FluxoMudancas, seguidora: Biblioteca, versao: int = 0,
+                 espera: float = 0.1):
+        """
+        Prepara a réplica.
+
+        Args:
+            fluxo: Fluxo de mudanças da biblioteca principal
+            seguidora: Biblioteca que recebe as mudanças (vazia se versao=0);
+                sem um destino de eventos próprio, passa a usar SinkNulo, para
+                que a reaplicação não repita no console as mensagens da principal
+            versao: Última versão já presente na seguidora
+            espera: Intervalo máximo, em segundos, para a thread perceber parar()
+        """
+        if seguidora.sink is None:
+            seguidora.sink = eventos.SinkNulo()
+        self.fluxo = fluxo
+        self.seguidora = seguidora
+        self.espera = espera
+        self.erro: Optional[BaseException] = None
+        self._versao = versao
+        self._condicao = threading.Condition(threading.Lock())
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def versao(self) -> int:
+        """Última versão aplicada na seguidora."""
+        with self._condicao:
+            return self._versao
+
+    @property
+    def atraso(self) -> int:
+        """Quantidade de mudanças registradas e ainda não aplicadas."""
+        return self.fluxo.versao - self.versao
+
+    def sincronizar(self, tempo_limite: Optional[float] = 0.0) -> int:
+        """
+        Aplica as mudanças pendentes na thread atual.
+
+        Args:
+            tempo_limite: Segundos a esperar por novas mudanças depois de
+                alcançar a última (0: apenas as já registradas)
+
+        Returns:
+            Quantidade de mudanças aplicadas
+
+        Raises:
+            MudancasDescartadas: Se a réplica ficou para trás da retenção do fluxo
+            RuntimeError: Se a thread da réplica está ativa ou a seguidora
+                divergiu da principal
+        """
+        if self._thread is not None:
+            raise RuntimeError("A réplica já está sendo sincronizada pela sua thread")
+        aplicadas = 0
+        for mudanca in self.fluxo.mudancas_desde(self.versao, tempo_limite):
+            self._aplicar(mudanca)
+            aplicadas += 1
+        return aplicadas
+
+    def iniciar(self) -> None:
+        """Passa a acompanhar o fluxo em uma thread dedicada."""
+        if self._thread is not None:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._acompanhar, name="Replica", daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        """Encerra a thread da réplica (as mudanças já aplicadas permanecem)."""
+        if self._thread is None:
+            return
+        self._parar.set()
+        self._thread.join()
+        self._thread = None
+
+    def _acompanhar(self) -> None:
+        """Thread da réplica: aplica as mudanças à medida que chegam."""
+        try:
+            while not self._parar.is_set():
+                for mudanca in self.fluxo.mudancas_desde(self.versao, self.espera):
+                    self._aplicar(mudanca)
+                    if self._parar.is_set():
+                        return
+                if self.fluxo.fechado and self.atraso == 0:
+                    return
+        except Exception as erro:  # Guardado para quem consulta a réplica
+            with self._condicao:
+                self.erro = erro
+                self._condicao.notify_all()
+
+    def aguardar(self, versao: int, tempo_limite: Optional[float] = None) -> bool:
+        """
+        Espera a réplica alcançar uma versão do fluxo.
+
+        Args:
+            versao: Versão a alcançar (ex.: fluxo.versao logo após uma escrita)
+            tempo_limite: Segundos de espera (None: sem limite)
+
+        Returns:
+            bool: True se a versão já foi aplicada, False se o prazo acabou
+            ou a réplica parou com erro
+        """
+        with self._condicao:
+            self._condicao.wait_for(lambda: self._versao >= versao or self.erro is not None, tempo_limite)
+            return self._versao >= versao
+
+    def __enter__(self) -> "Replica":
+        self.iniciar()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.parar()
+
+    # Aplicação -------------------------------------------------------------
+
+    def _aplicar(self, mudanca: Mudanca) -> None:
+        """Reaplica uma mudança na seguidora e avança a versão."""
+        self._APLICADORES[mudanca.operacao](self, mudanca.dados)
+        with self._condicao:
+            self._versao = mudanca.versao
+            self._condicao.notify_all()
+
+    def _exemplar(self, dados: Dados) -> Livro:
+        livro = self.seguidora.obter_livro(dados["codigo"])
+        if livro is None:
+            raise RuntimeError(f"Réplica divergente: livro {dados['codigo']} não existe na seguidora")
+        return livro
+
+    def _livro(self, dados: Dados) -> None:
+        if self.seguidora.obter_livro(dados["codigo"]) is None:
+            livro = Livro._criar_validado(dados["titulo"], dados["autor"], dados["ano"], dados["isbn"])
+            livro.codigo = dados["codigo"]
+            self.seguidora.adicionar_livro(livro)
+
+    def _remover_livro(self, dados: Dados) -> None:
+        livro = self.seguidora.obter_livro(dados["codigo"])
+        if livro is not None:
+            self.seguidora.remover_livro(livro)
+
+    def _usuario(self, dados: Dados) -> None:
+        if self.seguidora.obter_usuario(dados["nome"]) is None:
+            self.seguidora.registrar_usuario(Usuario(dados["nome"], dados["email"], limite_livros=dados["limite"]))
+
+    def _remover_usuario(self, dados: Dados) -> None:
+        usuario = self.seguidora.obter_usuario(dados["nome"])
+        if usuario is not None:
+            self.seguidora.remover_usuario(usuario)
+
+    def _emprestimo(self, dados: Dados) -> None:
+        livro = self._exemplar(dados)
+        if not livro.disponivel:
+            return  # Já aplicado
+        usuario = None
+        if dados["usuario"] is None:
+            livro.emprestar()
+        else:
+            usuario = self.seguidora.obter_usuario(dados["usuario"])
+            if usuario is None or not self.seguidora.emprestar(usuario, livro):
+                raise RuntimeError(f"Réplica divergente: empréstimo de '{livro.titulo}' recusado na seguidora")
+        # A data e o vencimento são os da principal, não os da aplicação
+        livro.data_emprestimo = dados["data"]
+        self.seguidora.vencimentos.registrar(livro, usuario)
+
+    def _devolucao(self, dados: Dados) -> None:
+        livro = self._exemplar(dados)
+        if livro.disponivel:
+            return  # Já aplicado
+        portador = self.seguidora.obter_portador(livro)
+        if portador is None:
+            livro.devolver()
+        else:
+            self.seguidora.devolver(portador, livro)
+
+    _APLICADORES: Dict[str, Callable[["Replica", Dados], None]] = {
+        "livro": _livro,
+        "remover_livro": _remover_livro,
+        "usuario": _usuario,
+        "remover_usuario": _remover_usuario,
+        "emprestimo": _emprestimo,
+        "devolucao": _devolucao,
+    }
@@ -0,0 +1,284 @@
+"""
+Reservas (fila de espera) por título
+Cada ISBN tem uma fila de prioridade de reservas; quando um exemplar é
+devolvido ele é separado para a próxima reserva da fila, que tem um
+prazo para retirá-lo. Todas as operações de fila custam O(log n).
+"""
+
+import bisect
+import heapq
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import count
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+try:
+    from .indices import normalizar_isbn
+except ImportError:  # executado como script ou com src/ no sys.path
+    from indices import normalizar_isbn  # type: ignore[import-not-found,no-redef]
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .biblioteca_melhorada import Livro, Usuario
+
+PRAZO_RETIRADA_PADRAO = timedelta(days=3)
+
+AGUARDANDO = "aguardando"
+SEPARADA = "separada"
+RETIRADA = "retirada"
+EXPIRADA = "expirada"
+CANCELADA = "cancelada"
+
+
+@dataclass(eq=False)
+class Reserva:
+    """Reserva de um usuário para um título (ISBN)."""
+
+    usuario: "Usuario"
+    isbn: str
+    prioridade: int = 0
+    criada_em: Optional[datetime] = None
+    estado: str = AGUARDANDO
+    livro: Optional["Livro"] = None
+    expira_em: Optional[datetime] = None
+    _sequencia: int = field(default=0, repr=False)
+
+    @property
+    def ativa(self) -> bool:
+        """True enquanto aguarda na fila ou está separada para retirada."""
+        return self.estado in (AGUARDANDO, SEPARADA)
+
+
+class CentralReservas:
+    """
+    Filas de reservas por título com separação automática de exemplares.
+
+    Cada fila é um heap ordenado por (prioridade, ordem de chegada):
+    prioridade menor é atendida antes e, entre iguais, vale a ordem de
+    chegada (FIFO). Cancelamentos só marcam a reserva e são descartados
+    ao chegar ao topo; o heap é reconstruído se os descartados passarem
+    a ser maioria. As reservas aguardando por título são mantidas em
+    baldes por contagem, cada um ordenado por ISBN, e as contagens não
+    vazias ficam em uma lista ordenada, o que torna a consulta dos
+    títulos mais requisitados proporcional ao tamanho da resposta.
+    """
+
+    def __init__(self, prazo_retirada: timedelta = PRAZO_RETIRADA_PADRAO,
+                 relogio: Callable[[], datetime] = datetime.now):
+        """
+        Cria a central de reservas.
+
+        Args:
+            prazo_retirada: Tempo para retirar um exemplar separado
+            relogio: Função que informa o momento atual (injetável em testes)
+        """
+        if prazo_retirada <= timedelta(0):
+            raise ValueError("Prazo de retirada deve ser positivo")
+        self.prazo_retirada = prazo_retirada
+        self.relogio = relogio
+        self._trava = threading.RLock()
+        self._sequencia = count()
+        self._filas: Dict[str, List[Tuple[int, int, Reserva]]] = {}
+        self._por_usuario: Dict[Tuple[str, str], Reserva] = {}
+        self._separadas: Dict[int, Reserva] = {}
+        self._expiracoes: List[Tuple[datetime, int, Reserva]] = []
+        self._aguardando: Dict[str, int] = {}
+        self._titulos_por_contagem: Dict[int, List[str]] = {}
+        self._contagens: List[int] = []  # Contagens com algum título, em ordem crescente
+
+    # Contagem incremental --------------------------------------------------
+
+    def _ajustar_contagem(self, isbn: str, delta: int) -> None:
+        anterior = self._aguardando.get(isbn, 0)
+        atual = anterior + delta
+        if anterior:
+            balde = self._titulos_por_contagem[anterior]
+            del balde[bisect.bisect_left(balde, isbn)]
+            if not balde:
+                del self._titulos_por_contagem[anterior]
+                del self._contagens[bisect.bisect_left(self._contagens, anterior)]
+        if atual:
+            self._aguardando[isbn] = atual
+            if atual not in self._titulos_por_contagem:
+                self._titulos_por_contagem[atual] = []
+                bisect.insort(self._contagens, atual)
+            bisect.insort(self._titulos_por_contagem[atual], isbn)
+        else:
+            del self._aguardando[isbn]
+
+    def aguardando(self, isbn: str) -> int:
+        """Quantidade de reservas aguardando na fila do título."""
+        return self._aguardando.get(normalizar_isbn(isbn), 0)
+
+    def ha_reservas_aguardando(self) -> bool:
+        """True se algum título tiver reservas aguardando na fila."""
+        return bool(self._aguardando)
+
+    def mais_requisitados(self, quantidade: int = 10) -> List[Tuple[str, int]]:
+        """
+        Títulos com mais reservas aguardando.
+
+        Args:
+            quantidade: Máximo de títulos retornados
+
+        Returns:
+            Pares (ISBN normalizado, reservas aguardando), do maior para o menor
+        """
+        resultado: List[Tuple[str, int]] = []
+        with self._trava:
+            for contagem in reversed(self._contagens):
+                for isbn in self._titulos_por_contagem[contagem]:
+                    if len(resultado) == quantidade:
+                        return resultado
+                    resultado.append((isbn, contagem))
+        return resultado
+
+    # Fila ------------------------------------------------------------------
+
+    def reservar(self, usuario: "Usuario", isbn: str, prioridade: int = 0) -> Optional[Reserva]:
+        """
+        Coloca o usuário na fila do título.
+
+        Args:
+            usuario: Quem reserva
+            isbn: Título reservado
+            prioridade: Menor é atendido antes (padrão 0, por ordem de chegada)
+
+        Returns:
+            A reserva criada ou None se o usuário já tiver uma ativa para o título
+        """
+        chave = normalizar_isbn(isbn)
+        with self._trava:
+            if (chave, usuario.nome.casefold()) in self._por_usuario:
+                return None
+            reserva = Reserva(usuario, chave, prioridade, self.relogio())
+            reserva._sequencia = next(self._sequencia)
+            heapq.heappush(self._filas.setdefault(chave, []), (prioridade, reserva._sequencia, reserva))
+            self._por_usuario[(chave, usuario.nome.casefold())] = reserva
+            self._ajustar_contagem(chave, 1)
+            return reserva
+
+    def reserva_de(self, usuario: "Usuario", isbn: str) -> Optional[Reserva]:
+        """Reserva ativa do usuário para o título, se houver."""
+        return self._por_usuario.get((normalizar_isbn(isbn), usuario.nome.casefold()))
+
+    def cancelar(self, reserva: Reserva) -> bool:
+        """
+        Cancela uma reserva ativa; um exemplar separado passa ao próximo da fila.
+
+        Args:
+            reserva: Reserva a cancelar
+
+        Returns:
+            bool: True se a reserva estava ativa
+        """
+        with self._trava:
+            if not reserva.ativa:
+                return False
+            estado = reserva.estado
+            self._encerrar(reserva, CANCELADA)
+            if estado == AGUARDANDO:
+                self._compactar(reserva.isbn)
+            elif reserva.livro is not None:
+                self._separadas.pop(reserva.livro.codigo, None)
+                self._separar(reserva.livro)
+            return True
+
+    def _encerrar(self, reserva: Reserva, estado: str) -> None:
+        if reserva.estado == AGUARDANDO:
+            self._ajustar_contagem(reserva.isbn, -1)
+        reserva.estado = estado
+        self._por_usuario.pop((reserva.isbn, reserva.usuario.nome.casefold()), None)
+
+    def _compactar(self, isbn: str) -> None:
+        """Reconstrói a fila quando as reservas descartadas passam a ser maioria."""
+        fila = self._filas.get(isbn)
+        if fila is None:
+            return
+        if len(fila) > 2 * self._aguardando.get(isbn, 0) + 16:
+            fila[:] = [entrada for entrada in fila if entrada[2].estado == AGUARDANDO]
+            heapq.heapify(fila)
+        if not fila:
+            del self._filas[isbn]
+
+    def _proxima(self, isbn: str) -> Optional[Reserva]:
+        fila = self._filas.get(isbn)
+        while fila:
+            reserva = heapq.heappop(fila)[2]
+            if reserva.estado == AGUARDANDO:
+                if not fila:
+                    del self._filas[isbn]
+                return reserva
+        self._filas.pop(isbn, None)
+        return None
+
+    # Separação e retirada --------------------------------------------------
+
+    def _separar(self, livro: "Livro") -> Optional[Reserva]:
+        if not livro.isbn:
+            return None
+        reserva = self._proxima(normalizar_isbn(livro.isbn))
+        if reserva is None:
+            return None
+        self._ajustar_contagem(reserva.isbn, -1)
+        reserva.estado = SEPARADA
+        reserva.livro = livro
+        reserva.expira_em = self.relogio() + self.prazo_retirada
+        self._separadas[livro.codigo] = reserva
+        heapq.heappush(self._expiracoes, (reserva.expira_em, reserva._sequencia, reserva))
+        return reserva
+
+    def livro_devolvido(self, livro: "Livro") -> Optional[Reserva]:
+        """
+        Separa um exemplar recém-devolvido para a próxima reserva do título.
+
+        Args:
+            livro: Exemplar devolvido
+
+        Returns:
+            Reserva que recebeu o exemplar, se havia fila
+        """
+        with self._trava:
+            if livro.codigo in self._separadas:
+                return self._separadas[livro.codigo]
+            return self._separar(livro)
+
+    def separada_para(self, livro: "Livro") -> Optional[Reserva]:
+        """Reserva para a qual o exemplar está separado, se houver."""
+        return self._separadas.get(livro.codigo)
+
+    def retirar(self, reserva: Reserva) -> None:
+        """Conclui uma reserva separada quando o usuário leva o exemplar."""
+        with self._trava:
+            if reserva.estado != SEPARADA:
+                return
+            if reserva.livro is not None:
+                self._separadas.pop(reserva.livro.codigo, None)
+            self._encerrar(reserva, RETIRADA)
+
+    def expirar(self, agora: Optional[datetime] = None) -> Tuple[List[Reserva], List[Reserva]]:
+        """
+        Encerra as separações com prazo vencido e passa os exemplares adiante.
+
+        Args:
+            agora: Momento de referência (padrão: relógio)
+
+        Returns:
+            Par (reservas expiradas, reservas que receberam os exemplares)
+        """
+        if agora is None:
+            agora = self.relogio()
+        expiradas, separadas = [], []
+        with self._trava:
+            while self._expiracoes and self._expiracoes[0][0] <= agora:
+                reserva = heapq.heappop(self._expiracoes)[2]
+                livro = reserva.livro
+                if reserva.estado != SEPARADA or livro is None:
+                    continue
+                self._separadas.pop(livro.codigo, None)
+                self._encerrar(reserva, EXPIRADA)
+                expiradas.append(reserva)
+                proxima = self._separar(livro)
+                if proxima is not None:
+                    separadas.append(proxima)
+        return expiradas, separadas
@@ -0,0 +1,368 @@
+"""
+Servidor de rede assíncrono para a Biblioteca
+Protocolo de linhas JSON sobre TCP: cada linha é um pedido
+``{"id": ..., "op": ..., ...}`` e recebe uma linha de resposta
+``{"id": ..., "ok": true, "resultado": ...}`` ou
+``{"id": ..., "ok": false, "erro": "..."}``, na ordem dos pedidos da conexão.
+
+Operações: ``buscar`` (termo, limite), ``emprestar`` (isbn, usuario),
+``devolver`` (isbn, usuario) e ``estatisticas``.
+"""
+
+import asyncio
+import json
+from collections import deque
+from dataclasses import asdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    from .biblioteca_melhorada import Biblioteca, Livro, normalizar_isbn
+except ImportError:  # executado como script ou com src/ no sys.path
+    from biblioteca_melhorada import Biblioteca, Livro, normalizar_isbn  # type: ignore[import-not-found,no-redef]
+
+Pedido = Dict[str, Any]
+Resposta = Dict[str, Any]
+
+TAMANHO_MAXIMO_LINHA = 64 * 1024
+PENDENTES_POR_CONEXAO = 1024
+
+
+class ErroPedido(Exception):
+    """Pedido inválido ou que não pôde ser atendido."""
+
+
+def _livro_para_dict(livro: Livro) -> Dict[str, Any]:
+    return {
+        "codigo": livro.codigo,
+        "titulo": livro.titulo,
+        "autor": livro.autor,
+        "ano": livro.ano,
+        "isbn": livro.isbn,
+        "disponivel": livro.disponivel,
+    }
+
+
+def _campo(pedido: Pedido, nome: str) -> str:
+    valor = pedido.get(nome)
+    if not isinstance(valor, str):
+        raise ErroPedido(f"Campo '{nome}' ausente ou inválido")
+    return valor
+
+
+class ServidorBiblioteca:
+    """
+    Front-end asyncio que agrupa pedidos concorrentes em micro-lotes.
+
+    As conexões apenas decodificam pedidos e os colocam em uma fila
+    limitada; uma tarefa única retira até ``tamanho_lote`` pedidos por vez
+    e os executa contra a Biblioteca em uma thread, evitando uma troca de
+    thread por pedido. Buscas repetidas e estatísticas são calculadas uma
+    vez por lote. Com a fila cheia (ou respostas demais pendentes em uma
+    conexão) a conexão deixa de ler o socket, e a pressão volta aos
+    clientes pelo próprio TCP.
+    """
+
+    def __init__(
+        self,
+        biblioteca: Biblioteca,
+        host: str = "127.0.0.1",
+        porta: int = 0,
+        tamanho_lote: int = 256,
+        janela: float = 0.0005,
+        limite_fila: int = 10_000,
+        limite_busca: int = 50,
+        leitura: Optional[Biblioteca] = None,
+    ):
+        """
+        Configura o servidor.
+
+        Args:
+            biblioteca: Biblioteca atendida
+            host: Endereço de escuta
+            porta: Porta de escuta (0 escolhe uma livre)
+            tamanho_lote: Máximo de pedidos executados por lote
+            janela: Espera (s) por mais pedidos antes de executar um lote incompleto
+            limite_fila: Pedidos aguardando execução antes de aplicar contrapressão
+            limite_busca: Máximo padrão de livros por resposta de busca
+            leitura: Biblioteca que atende buscas e estatísticas, como a
+                seguidora de uma replicacao.Replica (padrão: a própria
+                biblioteca)
+        """
+        self.biblioteca = biblioteca
+        self.leitura = leitura if leitura is not None else biblioteca
+        self.host = host
+        self.porta = porta
+        self.tamanho_lote = tamanho_lote
+        self.janela = janela
+        self.limite_fila = limite_fila
+        self.limite_busca = limite_busca
+        self.lotes = 0
+        self.pedidos = 0
+        # Criada em iniciar(): até o Python 3.9 a fila se prende ao laço de eventos atual
+        self._fila: Optional["asyncio.Queue[Tuple[Pedido, asyncio.Future]]"] = None
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._agrupador: Optional[asyncio.Task] = None
+
+    async def iniciar(self) -> None:
+        """Abre a porta e começa a atender."""
+        self._fila = asyncio.Queue(self.limite_fila)
+        self._agrupador = asyncio.ensure_future(self._agrupar())
+        self._servidor = await asyncio.start_server(
+            self._atender, self.host, self.porta, limit=TAMANHO_MAXIMO_LINHA
+        )
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+
+    def _fila_ativa(self) -> "asyncio.Queue[Tuple[Pedido, asyncio.Future]]":
+        """Fila de pedidos do servidor em execução."""
+        if self._fila is None:
+            raise RuntimeError("Servidor não iniciado; chame iniciar() antes")
+        return self._fila
+
+    async def encerrar(self) -> None:
+        """Para de aceitar conexões e encerra o agrupador."""
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        if self._agrupador is not None:
+            self._agrupador.cancel()
+            try:
+                await self._agrupador
+            except asyncio.CancelledError:
+                pass
+
+    async def __aenter__(self) -> "ServidorBiblioteca":
+        await self.iniciar()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.encerrar()
+
+    # Conexões --------------------------------------------------------------
+
+    async def _atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        """Lê pedidos de uma conexão e responde na mesma ordem."""
+        respostas: "asyncio.Queue[Optional[Awaitable[Resposta]]]" = asyncio.Queue(PENDENTES_POR_CONEXAO)
+        envio = asyncio.ensure_future(self._enviar(respostas, escritor))
+        try:
+            while True:
+                try:
+                    linha = await leitor.readline()
+                except ValueError:
+                    await respostas.put(self._pronta({"id": None, "ok": False, "erro": "Linha muito longa"}))
+                    break
+                except ConnectionError:
+                    break
+                if not linha:
+                    break
+                if not linha.strip():
+                    continue
+                await respostas.put(await self._enfileirar(linha))
+        finally:
+            await respostas.put(None)
+            await envio
+            escritor.close()
+
+    async def _enfileirar(self, linha: bytes) -> Awaitable[Resposta]:
+        """Decodifica um pedido e o coloca na fila (aguarda se estiver cheia)."""
+        try:
+            pedido = json.loads(linha)
+            if not isinstance(pedido, dict):
+                raise ValueError
+        except ValueError:
+            return self._pronta({"id": None, "ok": False, "erro": "JSON inválido"})
+
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila_ativa().put((pedido, futuro))
+        return futuro
+
+    @staticmethod
+    def _pronta(resposta: Resposta) -> Awaitable[Resposta]:
+        futuro = asyncio.get_running_loop().create_future()
+        futuro.set_result(resposta)
+        return futuro
+
+    @staticmethod
+    async def _enviar(
+        respostas: "asyncio.Queue[Optional[Awaitable[Resposta]]]",
+        escritor: asyncio.StreamWriter,
+    ) -> None:
+        """Escreve as respostas conforme ficam prontas, respeitando a ordem."""
+        aberto = True
+        while True:
+            pendente = await respostas.get()
+            if pendente is None:
+                return
+            resposta = await pendente
+            if not aberto:
+                continue
+            escritor.write(json.dumps(resposta, ensure_ascii=False).encode("utf-8") + b"\n")
+            try:
+                await escritor.drain()
+            except ConnectionError:
+                aberto = False
+
+    # Execução em lotes -----------------------------------------------------
+
+    async def _agrupar(self) -> None:
+        """Retira micro-lotes da fila e os executa fora do laço de eventos."""
+        loop = asyncio.get_running_loop()
+        fila = self._fila_ativa()
+        while True:
+            lote = [await fila.get()]
+            if self.janela and fila.qsize() < self.tamanho_lote:
+                await asyncio.sleep(self.janela)
+            while len(lote) < self.tamanho_lote and not fila.empty():
+                lote.append(fila.get_nowait())
+
+            pedidos = [pedido for pedido, _ in lote]
+            try:
+                respostas = await loop.run_in_executor(None, self.processar_lote, pedidos)
+            except Exception as erro:  # pragma: no cover - falha inesperada no núcleo
+                respostas = [{"id": p.get("id"), "ok": False, "erro": str(erro)} for p in pedidos]
+
+            for (_, futuro), resposta in zip(lote, respostas):
+                if not futuro.done():
+                    futuro.set_result(resposta)
+
+    def processar_lote(self, pedidos: List[Pedido]) -> List[Resposta]:
+        """
+        Executa um lote de pedidos contra a Biblioteca.
+
+        Args:
+            pedidos: Pedidos decodificados
+
+        Returns:
+            Respostas na mesma ordem dos pedidos
+        """
+        self.lotes += 1
+        self.pedidos += len(pedidos)
+        buscas: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+        estatisticas: Optional[Dict[str, Any]] = None
+        respostas = []
+
+        for pedido in pedidos:
+            resposta: Resposta = {"id": pedido.get("id"), "ok": True}
+            try:
+                operacao = pedido.get("op")
+                if operacao == "buscar":
+                    limite = pedido.get("limite", self.limite_busca)
+                    if not isinstance(limite, int) or limite < 0:
+                        raise ErroPedido("Campo 'limite' inválido")
+                    chave = (_campo(pedido, "termo"), limite)
+                    if chave not in buscas:
+                        encontrados = self.leitura.buscar_livro(chave[0], exibir=False)
+                        buscas[chave] = [_livro_para_dict(livro) for livro in encontrados[:limite]]
+                    resposta["resultado"] = buscas[chave]
+                elif operacao == "estatisticas":
+                    if estatisticas is None:
+                        retrato = self.leitura.obter_estatisticas()
+                        estatisticas = asdict(retrato)
+                        estatisticas["taxa_utilizacao"] = retrato.taxa_utilizacao
+                    resposta["resultado"] = estatisticas
+                elif operacao in self._OPERACOES:
+                    resposta["resultado"] = self._OPERACOES[operacao](self, pedido)
+                else:
+                    raise ErroPedido(f"Operação desconhecida: {operacao!r}")
+            except ErroPedido as erro:
+                resposta = {"id": pedido.get("id"), "ok": False, "erro": str(erro)}
+            respostas.append(resposta)
+        return respostas
+
+    def _emprestar(self, pedido: Pedido) -> Dict[str, Any]:
+        usuario = self.biblioteca.obter_usuario(_campo(pedido, "usuario"))
+        if usuario is None:
+            raise ErroPedido("Usuário não encontrado")
+        isbn = _campo(pedido, "isbn")
+        if self.biblioteca.obter_livro_por_isbn(isbn) is None:
+            raise ErroPedido("Nenhum livro com este ISBN")
+        if not self.biblioteca.emprestar_livro(isbn, usuario.nome):
+            if len(usuario.livros_emprestados) >= usuario.limite_livros:
+                raise ErroPedido("Limite de empréstimos atingido")
+            raise ErroPedido("Nenhum exemplar disponível")
+        return {"emprestado": True}
+
+    def _devolver(self, pedido: Pedido) -> Dict[str, Any]:
+        usuario = self.biblioteca.obter_usuario(_campo(pedido, "usuario"))
+        if usuario is None:
+            raise ErroPedido("Usuário não encontrado")
+        chave = normalizar_isbn(_campo(pedido, "isbn"))
+        for livro in list(usuario.livros_emprestados):
+            if livro.isbn and normalizar_isbn(livro.isbn) == chave:
+                if self.biblioteca.devolver(usuario, livro):
+                    return {"devolvido": True}
+        raise ErroPedido("Usuário não possui livro com este ISBN")
+
+    _OPERACOES: Dict[str, Callable[["ServidorBiblioteca", Pedido], Dict[str, Any]]] = {
+        "emprestar": _emprestar,
+        "devolver": _devolver,
+    }
+
+
+class ClienteBiblioteca:
+    """
+    Cliente assíncrono do protocolo de linhas JSON.
+
+    Vários pedidos podem estar em andamento na mesma conexão; como o
+    servidor responde na ordem de chegada, as respostas são associadas
+    aos pedidos pela ordem.
+    """
+
+    def __init__(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        self._leitor = leitor
+        self._escritor = escritor
+        self._aguardando: "deque[asyncio.Future]" = deque()
+        self._proximo_id = 0
+        self._recepcao = asyncio.ensure_future(self._receber())
+
+    @classmethod
+    async def conectar(cls, host: str = "127.0.0.1", porta: int = 0) -> "ClienteBiblioteca":
+        """
+        Abre uma conexão com o servidor.
+
+        Args:
+            host: Endereço do servidor
+            porta: Porta do servidor
+
+        Returns:
+            Cliente conectado
+        """
+        leitor, escritor = await asyncio.open_connection(host, porta, limit=TAMANHO_MAXIMO_LINHA)
+        return cls(leitor, escritor)
+
+    async def pedir(self, operacao: str, **campos: Any) -> Resposta:
+        """
+        Envia um pedido e aguarda a resposta.
+
+        Args:
+            operacao: Nome da operação (ex.: "buscar")
+            campos: Demais campos do pedido
+
+        Returns:
+            Resposta decodificada
+        """
+        self._proximo_id += 1
+        pedido = dict(campos, id=self._proximo_id, op=operacao)
+        futuro = asyncio.get_running_loop().create_future()
+        self._aguardando.append(futuro)
+        self._escritor.write(json.dumps(pedido, ensure_ascii=False).encode("utf-8") + b"\n")
+        await self._escritor.drain()
+        return await futuro
+
+    async def _receber(self) -> None:
+        try:
+            while True:
+                linha = await self._leitor.readline()
+                if not linha:
+                    break
+                self._aguardando.popleft().set_result(json.loads(linha))
+        finally:
+            while self._aguardando:
+                self._aguardando.popleft().set_exception(ConnectionError("Conexão encerrada"))
+
+    async def fechar(self) -> None:
+        """Encerra a conexão."""
+        self._escritor.close()
+        try:
+            await self._recepcao
+        except ConnectionError:
+            pass
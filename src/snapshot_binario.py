@@ -0,0 +1,346 @@
+"""
+Snapshot binário do catálogo, lido via mmap
+Réplicas somente leitura abrem o arquivo mapeado em memória e atendem
+buscas e consultas por ISBN direto dele, materializando objetos Livro
+apenas para os registros retornados.
+
+Formato (little-endian, versão 2; a versão 1 guardava trigramas sem
+remover acentos e não é mais aceita):
+
+* cabeçalho: assinatura, versão, contagens e deslocamentos das seções;
+* registros de largura fixa, um por livro, na ordem de cadastro;
+* tabela de trigramas (de textos normalizados por IndiceTextual.normalizar)
+  ordenada por bytes, apontando para as postagens;
+* postagens: índices de registro (uint32) em ordem crescente;
+* tabela de ISBNs normalizados ordenada por bytes;
+* tabela de textos UTF-8 endereçada por deslocamento.
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set, Tuple
+
+try:
+    from .biblioteca_melhorada import Livro
+    from .indices import IndiceTextual, normalizar_isbn
+except ImportError:  # executado como script ou com src/ no sys.path
+    from biblioteca_melhorada import Livro  # type: ignore[import-not-found,no-redef]
+    from indices import IndiceTextual, normalizar_isbn  # type: ignore[import-not-found,no-redef]
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .biblioteca_melhorada import Biblioteca
+
+ASSINATURA = b"BIBLIOMM"
+VERSAO = 2
+
+_CABECALHO = struct.Struct("<8sIIII5Q")
+_REGISTRO = struct.Struct("<qqQIQIQIhBx")
+_GRAMA = struct.Struct("<QIQI")
+_ISBN = struct.Struct("<QII")
+
+_EPOCA = datetime(1970, 1, 1)
+_SEM_DATA = -(2 ** 63)
+
+
+class _TabelaTextos:
+    """Acumula textos UTF-8 distintos e devolve (deslocamento, tamanho)."""
+
+    def __init__(self):
+        self.dados = bytearray()
+        self._posicoes: Dict[bytes, Tuple[int, int]] = {}
+
+    def incluir(self, texto: str) -> Tuple[int, int]:
+        codificado = texto.encode("utf-8")
+        posicao = self._posicoes.get(codificado)
+        if posicao is None:
+            posicao = self._posicoes[codificado] = (len(self.dados), len(codificado))
+            self.dados += codificado
+        return posicao
+
+
+def escrever_snapshot(biblioteca: "Biblioteca", caminho: str) -> int:
+    """
+    Grava o acervo e seus índices de busca e ISBN em formato binário.
+
+    Args:
+        biblioteca: Biblioteca de origem
+        caminho: Arquivo de destino (substituído de forma atômica)
+
+    Returns:
+        Quantidade de livros gravados
+    """
+    textos = _TabelaTextos()
+    registros = bytearray()
+    postagens: Dict[bytes, List[int]] = {}
+    isbns: List[Tuple[bytes, int, int, int]] = []
+
+    livros = biblioteca.livros
+    for indice, livro in enumerate(livros):
+        titulo = textos.incluir(livro.titulo)
+        autor = textos.incluir(livro.autor)
+        isbn = textos.incluir(livro.isbn or "")
+        data = _SEM_DATA
+        if livro.data_emprestimo is not None:
+            data = (livro.data_emprestimo - _EPOCA) // timedelta(microseconds=1)
+        registros += _REGISTRO.pack(
+            livro.codigo, data, titulo[0], titulo[1], autor[0], autor[1],
+            isbn[0], isbn[1], livro.ano, int(livro.disponivel),
+        )
+
+        campos = (IndiceTextual.normalizar(livro.titulo), IndiceTextual.normalizar(livro.autor))
+        for grama in set().union(*(IndiceTextual.gramas(campo) for campo in campos)):
+            postagens.setdefault(grama.encode("utf-8"), []).append(indice)
+
+        if livro.isbn:
+            chave = normalizar_isbn(livro.isbn)
+            isbns.append((chave.encode("utf-8"), *textos.incluir(chave), indice))
+
+    tabela_gramas = bytearray()
+    dados_postagens = array("I")
+    for grama_bytes in sorted(postagens):
+        deslocamento, tamanho = textos.incluir(grama_bytes.decode("utf-8"))
+        lista = postagens[grama_bytes]
+        tabela_gramas += _GRAMA.pack(deslocamento, tamanho, len(dados_postagens), len(lista))
+        dados_postagens.extend(lista)
+    if dados_postagens.itemsize != 4:  # pragma: no cover - plataformas exóticas
+        raise RuntimeError("Plataforma sem inteiros de 32 bits em array('I')")
+
+    tabela_isbns = bytearray()
+    for _, deslocamento, tamanho, indice in sorted(isbns):
+        tabela_isbns += _ISBN.pack(deslocamento, tamanho, indice)
+
+    inicio_registros = _CABECALHO.size
+    inicio_gramas = inicio_registros + len(registros)
+    inicio_postagens = inicio_gramas + len(tabela_gramas)
+    inicio_isbns = inicio_postagens + len(dados_postagens) * 4
+    inicio_textos = inicio_isbns + len(tabela_isbns)
+    cabecalho = _CABECALHO.pack(
+        ASSINATURA, VERSAO, len(livros), len(postagens), len(isbns),
+        inicio_registros, inicio_gramas, inicio_postagens, inicio_isbns, inicio_textos,
+    )
+
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as arquivo:
+        for parte in (cabecalho, registros, tabela_gramas, dados_postagens.tobytes(),
+                      tabela_isbns, textos.dados):
+            arquivo.write(parte)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+    return len(livros)
+
+
+class CatalogoMapeado:
+    """
+    Catálogo somente leitura servido a partir de um snapshot mapeado.
+
+    Abrir o arquivo custa apenas a leitura do cabeçalho; as buscas
+    percorrem as tabelas ordenadas no próprio mapa de memória.
+    """
+
+    def __init__(self, caminho: str):
+        """
+        Abre e mapeia um snapshot.
+
+        Args:
+            caminho: Arquivo gerado por ``escrever_snapshot``
+        """
+        self._arquivo = open(caminho, "rb")
+        try:
+            self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._arquivo.close()
+            raise ValueError("Snapshot binário inválido") from None
+
+        if len(self._mapa) < _CABECALHO.size:
+            self.fechar()
+            raise ValueError("Snapshot binário inválido")
+        (assinatura, versao, self._total, self._total_gramas, self._total_isbns,
+         self._inicio_registros, self._inicio_gramas, self._inicio_postagens,
+         self._inicio_isbns, self._inicio_textos) = _CABECALHO.unpack_from(self._mapa, 0)
+        if assinatura != ASSINATURA:
+            self.fechar()
+            raise ValueError("Snapshot binário inválido")
+        if versao != VERSAO:
+            self.fechar()
+            raise ValueError(f"Versão de snapshot não suportada: {versao}")
+
+    def __len__(self) -> int:
+        """Quantidade de livros no snapshot."""
+        return self._total
+
+    def __getitem__(self, indice: int) -> Livro:
+        """Materializa o livro de uma posição."""
+        if indice < 0:
+            indice += self._total
+        if not 0 <= indice < self._total:
+            raise IndexError("Posição fora do catálogo")
+        return self._livro(indice)
+
+    def __iter__(self) -> Iterator[Livro]:
+        """Materializa os livros um a um, na ordem de cadastro."""
+        for indice in range(self._total):
+            yield self._livro(indice)
+
+    def __enter__(self) -> "CatalogoMapeado":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+    def fechar(self) -> None:
+        """Desfaz o mapeamento e fecha o arquivo."""
+        if not self._mapa.closed:
+            self._mapa.close()
+        self._arquivo.close()
+
+    def _texto(self, deslocamento: int, tamanho: int) -> str:
+        inicio = self._inicio_textos + deslocamento
+        return self._mapa[inicio:inicio + tamanho].decode("utf-8")
+
+    def _bytes(self, deslocamento: int, tamanho: int) -> bytes:
+        inicio = self._inicio_textos + deslocamento
+        return self._mapa[inicio:inicio + tamanho]
+
+    def _registro(self, indice: int) -> Tuple:
+        return _REGISTRO.unpack_from(self._mapa, self._inicio_registros + indice * _REGISTRO.size)
+
+    def _livro(self, indice: int) -> Livro:
+        (codigo, data, titulo_ini, titulo_tam, autor_ini, autor_tam,
+         isbn_ini, isbn_tam, ano, disponivel) = self._registro(indice)
+        livro = Livro._criar_validado(
+            self._texto(titulo_ini, titulo_tam),
+            self._texto(autor_ini, autor_tam),
+            ano,
+            self._texto(isbn_ini, isbn_tam) or None,
+        )
+        livro.codigo = codigo
+        livro.disponivel = bool(disponivel)
+        if data != _SEM_DATA:
+            livro.data_emprestimo = _EPOCA + timedelta(microseconds=data)
+        return livro
+
+    def _campos_normalizados(self, indice: int) -> Tuple[str, str]:
+        registro = self._registro(indice)
+        return (
+            IndiceTextual.normalizar(self._texto(registro[2], registro[3])),
+            IndiceTextual.normalizar(self._texto(registro[4], registro[5])),
+        )
+
+    def _grama(self, posicao: int) -> Tuple[bytes, int, int]:
+        deslocamento, tamanho, inicio, quantidade = _GRAMA.unpack_from(
+            self._mapa, self._inicio_gramas + posicao * _GRAMA.size
+        )
+        return self._bytes(deslocamento, tamanho), inicio, quantidade
+
+    def _primeira_grama(self, chave: bytes) -> int:
+        """Primeira posição da tabela de trigramas com valor >= chave."""
+        baixo, alto = 0, self._total_gramas
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            if self._grama(meio)[0] < chave:
+                baixo = meio + 1
+            else:
+                alto = meio
+        return baixo
+
+    def _postagens(self, inicio: int, quantidade: int) -> array:
+        dados = array("I")
+        posicao = self._inicio_postagens + inicio * 4
+        dados.frombytes(self._mapa[posicao:posicao + quantidade * 4])
+        return dados
+
+    def _candidatos(self, termo: str) -> List[int]:
+        tamanho = IndiceTextual.TAMANHO_GRAMA
+        if len(termo) < tamanho:
+            prefixo = termo.encode("utf-8")
+            encontrados: Set[int] = set()
+            posicao = self._primeira_grama(prefixo)
+            while posicao < self._total_gramas:
+                grama_bytes, inicio, quantidade = self._grama(posicao)
+                if not grama_bytes.startswith(prefixo):
+                    break
+                encontrados.update(self._postagens(inicio, quantidade))
+                posicao += 1
+            return sorted(encontrados)
+
+        listas = []
+        for grama in {termo[i:i + tamanho] for i in range(len(termo) - tamanho + 1)}:
+            chave = grama.encode("utf-8")
+            posicao = self._primeira_grama(chave)
+            if posicao == self._total_gramas:
+                return []
+            encontrada, inicio, quantidade = self._grama(posicao)
+            if encontrada != chave:
+                return []
+            listas.append((quantidade, inicio))
+
+        listas.sort()
+        quantidade, inicio = listas[0]
+        candidatos = set(self._postagens(inicio, quantidade))
+        for quantidade, inicio in listas[1:]:
+            candidatos.intersection_update(self._postagens(inicio, quantidade))
+            if not candidatos:
+                return []
+        return sorted(candidatos)
+
+    def buscar_livro(self, termo: str) -> List[Livro]:
+        """
+        Busca livros por título ou autor (mesma semântica da Biblioteca).
+
+        Args:
+            termo: Termo de busca
+
+        Returns:
+            Livros encontrados, materializados sob demanda
+        """
+        termo = IndiceTextual.normalizar(termo)
+        if not termo:
+            return list(self)
+
+        verificar = len(termo) > IndiceTextual.TAMANHO_GRAMA
+        return [
+            self._livro(indice)
+            for indice in self._candidatos(termo)
+            if not verificar or any(termo in campo for campo in self._campos_normalizados(indice))
+        ]
+
+    def obter_livro_por_isbn(self, isbn: str) -> Optional[Livro]:
+        """
+        Obtém um exemplar pelo ISBN, preferindo um disponível.
+
+        Args:
+            isbn: ISBN (hífens e espaços são ignorados)
+
+        Returns:
+            Livro encontrado ou None
+        """
+        chave = normalizar_isbn(isbn).encode("utf-8")
+        baixo, alto = 0, self._total_isbns
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            if self._isbn(meio)[0] < chave:
+                baixo = meio + 1
+            else:
+                alto = meio
+
+        primeiro = None
+        while baixo < self._total_isbns:
+            encontrada, indice = self._isbn(baixo)
+            if encontrada != chave:
+                break
+            if self._registro(indice)[9]:
+                return self._livro(indice)
+            if primeiro is None:
+                primeiro = indice
+            baixo += 1
+        return None if primeiro is None else self._livro(primeiro)
+
+    def _isbn(self, posicao: int) -> Tuple[bytes, int]:
+        deslocamento, tamanho, indice = _ISBN.unpack_from(
+            self._mapa, self._inicio_isbns + posicao * _ISBN.size
+        )
+        return self._bytes(deslocamento, tamanho), indice
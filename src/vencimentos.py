@@ -0,0 +1,238 @@
+"""
+Agenda de vencimentos dos empréstimos
+Mantém as datas de devolução em heaps, de modo que listar os
+empréstimos vencidos custa O(k log n) para k resultados, sem varrer
+usuários, e lembretes são disparados quando cada empréstimo vence.
+"""
+
+import heapq
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import count
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .biblioteca_melhorada import Livro, Usuario
+
+Relogio = Callable[[], datetime]
+
+PRAZO_PADRAO = timedelta(days=14)
+
+
+@dataclass(frozen=True)
+class Emprestimo:
+    """Empréstimo em aberto com sua data de vencimento."""
+
+    livro: "Livro"
+    usuario: Optional["Usuario"]
+    vencimento: datetime
+
+    def dias_atraso(self, agora: datetime) -> int:
+        """Dias completos desde o vencimento (0 se ainda não venceu)."""
+        return max(0, (agora - self.vencimento).days)
+
+
+Lembrete = Callable[[Emprestimo], None]
+
+
+class AgendaVencimentos:
+    """
+    Índice de vencimentos baseado em heaps.
+
+    Um heap atende às consultas e nunca é esvaziado; devoluções apenas
+    invalidam a entrada (remoção preguiçosa) e o heap é reconstruído
+    quando as entradas inválidas passam a ser maioria. Um segundo heap
+    guarda os lembretes ainda não disparados, é consumido por
+    ``processar`` e compactado da mesma forma.
+    """
+
+    def __init__(self, prazo: timedelta = PRAZO_PADRAO, relogio: Relogio = datetime.now):
+        """
+        Cria uma agenda vazia.
+
+        Args:
+            prazo: Duração de um empréstimo
+            relogio: Função que informa o momento atual (injetável em testes)
+        """
+        if prazo <= timedelta(0):
+            raise ValueError("Prazo de empréstimo deve ser positivo")
+        self.prazo = prazo
+        self.relogio = relogio
+        self._trava = threading.Lock()
+        self._sequencia = count()
+        self._vencimentos: List[Tuple[datetime, int, int]] = []
+        self._lembretes_pendentes: List[Tuple[datetime, int, int]] = []
+        self._ativos: Dict[int, Tuple[int, Emprestimo]] = {}
+        self._lembretes: List[Lembrete] = []
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        """Quantidade de empréstimos em aberto."""
+        return len(self._ativos)
+
+    def registrar(self, livro: "Livro", usuario: Optional["Usuario"] = None) -> Emprestimo:
+        """
+        Agenda o vencimento de um empréstimo.
+
+        Args:
+            livro: Livro emprestado (o prazo conta a partir de data_emprestimo)
+            usuario: Quem pegou o livro, se conhecido
+
+        Returns:
+            Empréstimo agendado
+        """
+        inicio = livro.data_emprestimo or self.relogio()
+        emprestimo = Emprestimo(livro, usuario, inicio + self.prazo)
+        with self._trava:
+            sequencia = next(self._sequencia)
+            entrada = (emprestimo.vencimento, sequencia, livro.codigo)
+            self._ativos[livro.codigo] = (sequencia, emprestimo)
+            heapq.heappush(self._vencimentos, entrada)
+            heapq.heappush(self._lembretes_pendentes, entrada)
+            self._compactar()  # Reagendar o mesmo livro invalida as entradas anteriores
+        return emprestimo
+
+    def remover(self, livro: "Livro") -> bool:
+        """
+        Retira um empréstimo da agenda (ex.: na devolução).
+
+        Args:
+            livro: Livro devolvido
+
+        Returns:
+            bool: True se havia um empréstimo agendado
+        """
+        with self._trava:
+            if self._ativos.pop(livro.codigo, None) is None:
+                return False
+            self._compactar()
+            return True
+
+    def _compactar(self) -> None:
+        """Reconstrói os heaps quando as entradas inválidas passam a ser maioria (trava adquirida)."""
+        limite = 2 * len(self._ativos) + 64
+        if len(self._vencimentos) > limite:
+            self._vencimentos = [
+                (emprestimo.vencimento, sequencia, codigo)
+                for codigo, (sequencia, emprestimo) in self._ativos.items()
+            ]
+            heapq.heapify(self._vencimentos)
+        if len(self._lembretes_pendentes) > limite:
+            # Só as entradas ainda válidas: lembretes já disparados não voltam
+            self._lembretes_pendentes = [
+                entrada for entrada in self._lembretes_pendentes if self._valida(entrada) is not None
+            ]
+            heapq.heapify(self._lembretes_pendentes)
+
+    def vencimento(self, livro: "Livro") -> Optional[datetime]:
+        """Data de vencimento do empréstimo do livro, se houver."""
+        ativo = self._ativos.get(livro.codigo)
+        return None if ativo is None else ativo[1].vencimento
+
+    def _valida(self, entrada: Tuple[datetime, int, int]) -> Optional[Emprestimo]:
+        ativo = self._ativos.get(entrada[2])
+        if ativo is None or ativo[0] != entrada[1]:
+            return None
+        return ativo[1]
+
+    def emprestimos_vencidos(self, ate: Optional[datetime] = None) -> List[Emprestimo]:
+        """
+        Lista os empréstimos vencidos até um momento, do mais antigo ao mais recente.
+
+        Percorre o heap como árvore a partir da raiz, visitando apenas os
+        nós que já venceram, sem alterá-lo.
+
+        Args:
+            ate: Limite de vencimento (padrão: agora, segundo o relógio)
+
+        Returns:
+            Empréstimos com vencimento até o limite
+        """
+        if ate is None:
+            ate = self.relogio()
+        vencidos = []
+        with self._trava:
+            heap = self._vencimentos
+            fronteira = [(heap[0], 0)] if heap else []
+            while fronteira:
+                entrada, posicao = heapq.heappop(fronteira)
+                if entrada[0] > ate:
+                    break
+                emprestimo = self._valida(entrada)
+                if emprestimo is not None:
+                    vencidos.append(emprestimo)
+                for filho in (2 * posicao + 1, 2 * posicao + 2):
+                    if filho < len(heap):
+                        heapq.heappush(fronteira, (heap[filho], filho))
+        return vencidos
+
+    def proximo_vencimento(self) -> Optional[datetime]:
+        """Vencimento mais próximo entre os lembretes ainda não disparados."""
+        with self._trava:
+            while self._lembretes_pendentes and self._valida(self._lembretes_pendentes[0]) is None:
+                heapq.heappop(self._lembretes_pendentes)
+            return self._lembretes_pendentes[0][0] if self._lembretes_pendentes else None
+
+    # Lembretes -------------------------------------------------------------
+
+    def ao_vencer(self, lembrete: Lembrete) -> None:
+        """
+        Registra uma função chamada uma vez para cada empréstimo que vence.
+
+        Args:
+            lembrete: Função que recebe o Emprestimo vencido
+        """
+        self._lembretes.append(lembrete)
+
+    def processar(self, agora: Optional[datetime] = None) -> int:
+        """
+        Dispara os lembretes dos empréstimos que venceram desde a última chamada.
+
+        Args:
+            agora: Momento de referência (padrão: relógio)
+
+        Returns:
+            Quantidade de empréstimos notificados
+        """
+        if agora is None:
+            agora = self.relogio()
+        vencidos = []
+        with self._trava:
+            pendentes = self._lembretes_pendentes
+            while pendentes and pendentes[0][0] <= agora:
+                emprestimo = self._valida(heapq.heappop(pendentes))
+                if emprestimo is not None:
+                    vencidos.append(emprestimo)
+
+        for emprestimo in vencidos:
+            for lembrete in self._lembretes:
+                lembrete(emprestimo)
+        return len(vencidos)
+
+    def iniciar(self, intervalo: float = 60.0) -> None:
+        """
+        Processa os lembretes periodicamente em uma thread de fundo.
+
+        Args:
+            intervalo: Segundos entre verificações
+        """
+        if self._thread is not None:
+            return
+        self._parar.clear()
+
+        def executar():
+            while not self._parar.wait(intervalo):
+                self.processar()
+
+        self._thread = threading.Thread(target=executar, name="Vencimentos", daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        """Encerra a thread de fundo, se estiver rodando."""
+        if self._thread is None:
+            return
+        self._parar.set()
+        self._thread.join()
+        self._thread = None
@@ -0,0 +1,112 @@
+"""
+Testes unitários para a análise vetorizada do histórico
+"""
+
+import pytest
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+np = pytest.importorskip("numpy")
+
+from analise_historico import DIA, HORA, AnaliseHistorico, ResumoFilial
+from biblioteca_melhorada import Livro, Obra, Usuario
+from historico import HistoricoEmprestimos
+
+
+def _analise(emprestimos, agora):
+    """Análise de um histórico com tuplas (título, filial, início, fim ou None)."""
+    historico = HistoricoEmprestimos()
+    obras = {}
+    for titulo, filial, inicio, fim in emprestimos:
+        obra = obras.setdefault(titulo, Obra(titulo, "Autor", 2000))
+        livro = Livro(titulo, "Autor", 2000)
+        obra.incluir(livro)
+        historico.emprestimo(livro, Usuario("Ana"), filial, quando=inicio)
+        if fim is not None:
+            historico.devolucao(livro, filial, quando=fim)
+    return AnaliseHistorico(historico, agora=agora)
+
+
+class TestAnaliseHistorico:
+    """Testes para a AnaliseHistorico."""
+    
+    EMPRESTIMOS = [
+        ("1984", "Central", 0.0, 2 * HORA),
+        ("Emma", "Central", HORA, 4 * HORA),
+        ("1984", "Norte", 2 * HORA, 3 * HORA),
+        ("Dom Casmurro", "Norte", 3 * HORA, None),
+        ("1984", "Central", 3 * HORA, None),
+    ]
+    
+    def test_popularidade(self):
+        """Teste ranking de títulos, empates na ordem de chegada e filtro por filial."""
+        analise = _analise(self.EMPRESTIMOS, agora=4 * HORA)
+        assert analise.popularidade() == [("1984", 3), ("Emma", 1), ("Dom Casmurro", 1)]
+        assert analise.popularidade(1) == [("1984", 3)]
+        assert analise.popularidade(filial="Norte") == [("1984", 1), ("Dom Casmurro", 1)]
+        assert analise.popularidade(filial="Sul") == []
+        assert analise.popularidade(0) == []
+    
+    def test_duracao_media(self):
+        """Teste médias apenas sobre empréstimos devolvidos."""
+        analise = _analise(self.EMPRESTIMOS, agora=4 * HORA)
+        assert analise.duracao_media() == pytest.approx(2 * HORA)
+        assert analise.duracao_media(filial="Norte") == pytest.approx(HORA)
+        assert analise.duracao_media_por_titulo() == pytest.approx({"1984": 1.5 * HORA, "Emma": 3 * HORA})
+        assert _analise([], agora=0.0).duracao_media() == 0.0
+    
+    def test_curva_de_utilizacao(self):
+        """Teste média de livros emprestados por intervalo, contando os em aberto até agora."""
+        analise = _analise(self.EMPRESTIMOS, agora=4 * HORA)
+        limites, curva = analise.utilizacao(HORA)
+        assert list(limites) == [0.0, HORA, 2 * HORA, 3 * HORA]
+        assert list(curva) == pytest.approx([1.0, 2.0, 2.0, 3.0])
+        
+        _, fracao = analise.utilizacao(2 * HORA, exemplares=4)
+        assert list(fracao) == pytest.approx([0.375, 0.625])
+        _, norte = analise.utilizacao(HORA, inicio=0.0, filial="Norte")
+        assert list(norte) == pytest.approx([0.0, 0.0, 1.0, 1.0])
+        with pytest.raises(ValueError):
+            analise.utilizacao(0)
+    
+    def test_curva_diaria_com_meio_intervalo(self):
+        """Teste empréstimo que cobre parte de um dia."""
+        analise = _analise([("1984", "Central", 0.0, 1.5 * DIA)], agora=2 * DIA)
+        _, curva = analise.utilizacao(DIA)
+        assert list(curva) == pytest.approx([1.0, 0.5])
+    
+    def test_por_filial(self):
+        """Teste resumo de cada filial."""
+        analise = _analise(self.EMPRESTIMOS, agora=4 * HORA)
+        assert analise.por_filial() == [
+            ResumoFilial("Central", emprestimos=3, em_aberto=1, duracao_media=2.5 * HORA),
+            ResumoFilial("Norte", emprestimos=2, em_aberto=1, duracao_media=HORA),
+        ]
+    
+    def test_consistente_com_laco_python(self):
+        """Teste que os resultados vetorizados batem com um cálculo direto em volume."""
+        aleatorio = np.random.default_rng(7)
+        emprestimos = []
+        for _ in range(2000):
+            inicio = float(aleatorio.uniform(0, 10 * DIA))
+            fim = inicio + float(aleatorio.exponential(DIA)) if aleatorio.random() < 0.9 else None
+            emprestimos.append((f"T{aleatorio.integers(50)}", f"F{aleatorio.integers(3)}", inicio, fim))
+        analise = _analise(emprestimos, agora=12 * DIA)
+        
+        contagens = {}
+        for titulo, _, _, _ in emprestimos:
+            contagens[titulo] = contagens.get(titulo, 0) + 1
+        assert dict(analise.popularidade(100)) == contagens
+        duracoes = [fim - inicio for _, _, inicio, fim in emprestimos if fim is not None]
+        assert analise.duracao_media() == pytest.approx(sum(duracoes) / len(duracoes))
+        
+        limites, curva = analise.utilizacao(DIA, inicio=0.0, fim=12 * DIA)
+        for limite, valor in zip(limites, curva):
+            ocupado = sum(
+                max(0.0, min(fim if fim is not None else 12 * DIA, limite + DIA) - max(inicio, limite))
+                for _, _, inicio, fim in emprestimos
+            )
+            assert valor == pytest.approx(ocupado / DIA)
@@ -0,0 +1,205 @@
+"""
+Testes unitários para a persistência em SQLite
+"""
+
+import sqlite3
+import threading
+import pytest
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from armazenamento import Armazenamento, ArmazenamentoSQLite
+from biblioteca_melhorada import Livro, Usuario, Biblioteca
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    """Arquivo de banco temporário."""
+    return str(tmp_path / "biblioteca.db")
+
+
+def _abrir(caminho):
+    """Cria uma biblioteca persistida no caminho informado."""
+    return Biblioteca("Biblioteca Central", armazenamento=ArmazenamentoSQLite(caminho))
+
+
+class TestArmazenamentoSQLite:
+    """Testes para o ArmazenamentoSQLite."""
+    
+    def test_estado_sobrevive_reinicio(self, caminho):
+        """Teste que livros, usuários e empréstimos são recarregados."""
+        biblioteca = _abrir(caminho)
+        livro1 = Livro("1984", "George Orwell", 1949, "978-0452284234")
+        livro2 = Livro("Dom Casmurro", "Machado de Assis", 1899)
+        biblioteca.adicionar_livro(livro1)
+        biblioteca.adicionar_livro(livro2)
+        biblioteca.registrar_usuario(Usuario("Ana", "ana@email.com", limite_livros=5))
+        biblioteca.emprestar_livro("9780452284234", "ana@email.com")
+        biblioteca.armazenamento.fechar()
+        
+        restaurada = _abrir(caminho)
+        assert [livro.titulo for livro in restaurada.livros] == ["1984", "Dom Casmurro"]
+        assert [livro.codigo for livro in restaurada.livros] == [livro1.codigo, livro2.codigo]
+        
+        ana = restaurada.obter_usuario("ana@email.com")
+        assert ana.limite_livros == 5
+        assert len(ana.livros_emprestados) == 1
+        emprestado = ana.livros_emprestados[0]
+        assert emprestado.disponivel is False
+        assert emprestado.data_emprestimo == livro1.data_emprestimo
+        assert restaurada.obter_estatisticas().livros_emprestados == 1
+        
+        assert restaurada.devolver_livro("9780452284234", "Ana") is True
+        restaurada.armazenamento.fechar()
+        
+        final = _abrir(caminho)
+        assert final.obter_usuario("ana").livros_emprestados == []
+        assert final.obter_estatisticas().livros_disponiveis == 2
+        final.armazenamento.fechar()
+    
+    def test_codigos_restaurados_nao_se_repetem(self, caminho):
+        """Teste que novos livros não reutilizam códigos restaurados."""
+        biblioteca = _abrir(caminho)
+        biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949))
+        biblioteca.armazenamento.fechar()
+        
+        restaurada = _abrir(caminho)
+        novo = Livro("Animal Farm", "George Orwell", 1945)
+        assert novo.codigo > restaurada.livros[0].codigo
+        restaurada.armazenamento.fechar()
+    
+    def test_remocoes_persistidas(self, caminho):
+        """Teste remoção de livros e usuários."""
+        biblioteca = _abrir(caminho)
+        livro = Livro("1984", "George Orwell", 1949)
+        usuario = Usuario("Ana")
+        biblioteca.adicionar_livro(livro)
+        biblioteca.registrar_usuario(usuario)
+        biblioteca.remover_livro(livro)
+        biblioteca.remover_usuario(usuario)
+        biblioteca.armazenamento.fechar()
+        
+        restaurada = _abrir(caminho)
+        assert restaurada.livros == []
+        assert restaurada.usuarios == []
+        restaurada.armazenamento.fechar()
+    
+    def test_emprestimo_sem_usuario_registrado(self, caminho):
+        """Teste empréstimo direto e por usuário não registrado."""
+        biblioteca = _abrir(caminho)
+        livro1 = Livro("1984", "George Orwell", 1949)
+        livro2 = Livro("Animal Farm", "George Orwell", 1945)
+        biblioteca.adicionar_livro(livro1)
+        biblioteca.adicionar_livro(livro2)
+        livro1.emprestar()
+        Usuario("Visitante").pegar_livro(livro2)
+        biblioteca.armazenamento.fechar()
+        
+        restaurada = _abrir(caminho)
+        assert restaurada.obter_estatisticas().livros_emprestados == 2
+        restaurada.armazenamento.fechar()
+    
+    def test_operacoes_em_lote_persistidas(self, caminho):
+        """Teste gravação de empréstimos e devoluções em lote."""
+        biblioteca = _abrir(caminho)
+        livros = [Livro(f"Livro {i}", "Autor", 2000 + i) for i in range(4)]
+        for livro in livros:
+            biblioteca.adicionar_livro(livro)
+        ana = Usuario("Ana", limite_livros=4)
+        biblioteca.registrar_usuario(ana)
+        biblioteca.emprestar_lote(ana, livros)
+        biblioteca.devolver_lote(ana, livros[:2])
+        biblioteca.armazenamento.fechar()
+        
+        restaurada = _abrir(caminho)
+        emprestados = restaurada.obter_usuario("ana").livros_emprestados
+        assert [livro.codigo for livro in emprestados] == [livro.codigo for livro in livros[2:]]
+        assert [livro.data_emprestimo for livro in emprestados] == [livro.data_emprestimo for livro in livros[2:]]
+        restaurada.armazenamento.fechar()
+    
+    def test_importacao_em_lote(self, caminho):
+        """Teste gravação da importação em massa."""
+        biblioteca = _abrir(caminho)
+        biblioteca.importar_livros(
+            {"titulo": f"Livro {i}", "autor": f"Autor {i % 3}", "ano": 1900 + i} for i in range(50)
+        )
+        armazenamento = biblioteca.armazenamento
+        
+        assert len(armazenamento.buscar_por_autor("autor 1")) == 17
+        assert [r.ano for r in armazenamento.buscar_por_ano(1910, 1912)] == [1910, 1911, 1912]
+        armazenamento.fechar()
+    
+    def test_escritas_acumuladas(self, caminho):
+        """Teste que inclusões só são gravadas ao completar o lote."""
+        armazenamento = ArmazenamentoSQLite(caminho, tamanho_lote=3)
+        biblioteca = Biblioteca("Biblioteca Central", armazenamento=armazenamento)
+        
+        def contar():
+            with sqlite3.connect(caminho) as conexao:
+                return conexao.execute("SELECT COUNT(*) FROM livros").fetchone()[0]
+        
+        biblioteca.adicionar_livro(Livro("A", "Autor", 2000))
+        biblioteca.adicionar_livro(Livro("B", "Autor", 2000))
+        assert contar() == 0
+        biblioteca.adicionar_livro(Livro("C", "Autor", 2000))
+        assert contar() == 3
+        armazenamento.fechar()
+    
+    def test_modo_wal_e_indices(self, caminho):
+        """Teste configuração do banco."""
+        armazenamento = ArmazenamentoSQLite(caminho)
+        with sqlite3.connect(caminho) as conexao:
+            assert conexao.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            indices = {linha[1] for linha in conexao.execute("PRAGMA index_list(livros)")}
+        assert {"idx_livros_isbn", "idx_livros_autor", "idx_livros_ano"} <= indices
+        armazenamento.fechar()
+    
+    def test_leitores_concorrentes(self, caminho):
+        """Teste consultas simultâneas pelo pool de leitura."""
+        armazenamento = ArmazenamentoSQLite(caminho, leitores=2)
+        biblioteca = Biblioteca("Biblioteca Central", armazenamento=armazenamento)
+        biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949, "978-0452284234"))
+        armazenamento.sincronizar()
+        resultados = []
+        
+        def consultar():
+            for _ in range(20):
+                resultados.append(len(armazenamento.buscar_por_isbn("978 0452284234")))
+        
+        threads = [threading.Thread(target=consultar) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert resultados == [1] * 120
+        armazenamento.fechar()
+    
+    def test_transacao_desfeita_em_erro(self, caminho):
+        """Teste rollback quando uma escrita falha."""
+        armazenamento = ArmazenamentoSQLite(caminho)
+        with pytest.raises(RuntimeError):
+            with armazenamento._transacao() as conexao:
+                conexao.execute("INSERT INTO usuarios (chave, nome, limite_livros) VALUES ('a', 'A', 3)")
+                raise RuntimeError("falha")
+        assert armazenamento.carregar().usuarios == []
+        armazenamento.fechar()
+    
+    def test_memoria_nao_suportada(self):
+        """Teste que o banco precisa ser um arquivo."""
+        with pytest.raises(ValueError, match="exige um arquivo"):
+            ArmazenamentoSQLite(":memory:")
+
+
+class TestArmazenamentoBase:
+    """Testes para a interface padrão (somente memória)."""
+    
+    def test_base_nao_guarda_nada(self):
+        """Teste que a implementação base é um no-op."""
+        with Armazenamento() as armazenamento:
+            biblioteca = Biblioteca("Biblioteca Central", armazenamento=armazenamento)
+            biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949))
+            assert armazenamento.carregar().livros == []
@@ -3,6 +3,8 @@ Testes unitários para o Sistema de Biblioteca
 Demonstra conhecimento em testes e pytest
 """
 
+import copy
+import pickle
 import pytest
 import sys
 import os
@@ -11,7 +13,10 @@ from datetime import datetime
 # Adicionar o diretório src ao path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from biblioteca_melhorada import Livro, Usuario, Biblioteca
+from biblioteca_melhorada import Livro, Usuario, Biblioteca, Estatisticas, EmprestimosUsuario, Obra
+from armazenamento import Armazenamento
+from historico import HistoricoEmprestimos
+import eventos
 
 
 class TestLivro:
@@ -81,6 +86,20 @@ class TestLivro:
         livro = Livro("1984", "George Orwell", 1949)
         esperado = "1984 (1949) - George Orwell | Status: Disponível"
         assert str(livro) == esperado
+    
+    def test_copia_e_pickle_de_livro_do_acervo(self):
+        """Teste cópia profunda e pickle de um livro cadastrado em uma biblioteca."""
+        biblioteca = Biblioteca("Biblioteca Central", sink=eventos.SinkNulo())
+        livro = Livro("1984", "George Orwell", 1949, "978-0452284234")
+        biblioteca.adicionar_livro(livro)
+        livro.emprestar()
+        
+        for copia in (copy.deepcopy(livro), pickle.loads(pickle.dumps(livro))):
+            assert copia == livro and copia.codigo == livro.codigo
+            assert copia.obra is None and copia._observadores == []
+            copia.devolver()  # Avulso: não mexe na biblioteca
+            assert biblioteca.obter_estatisticas().livros_emprestados == 1
+        assert livro.obra is not None and len(livro._observadores) == 2
 
 
 class TestUsuario:
@@ -255,6 +274,19 @@ class TestBiblioteca:
         assert livro2 in resultado
         assert "🔍 Encontrados 2 livro(s):" in captured.out
     
+    def test_buscar_livro_em_ordem_de_cadastro(self):
+        """Teste que exemplares de obras diferentes voltam intercalados, na ordem de cadastro."""
+        biblioteca = Biblioteca("Biblioteca Central", sink=eventos.SinkNulo())
+        livros = [
+            Livro("1984", "George Orwell", 1949),
+            Livro("Animal Farm", "George Orwell", 1945),
+            Livro("1984", "George Orwell", 1949),
+        ]
+        for livro in livros:
+            biblioteca.adicionar_livro(livro)
+        
+        assert [l.codigo for l in biblioteca.buscar_livro("orwell", exibir=False)] == [l.codigo for l in livros]
+    
     def test_buscar_livro_nao_encontrado(self, capsys):
         """Teste busca de livro não encontrado."""
         biblioteca = Biblioteca("Biblioteca Central")
@@ -266,6 +298,708 @@ class TestBiblioteca:
         
         assert len(resultado) == 0
         assert "❌ Nenhum livro encontrado com o termo 'inexistente'" in captured.out
+    
+    def test_adicionar_livro_duplicado(self, capsys):
+        """Teste adição do mesmo exemplar duas vezes."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        livro = Livro("1984", "George Orwell", 1949)
+        
+        biblioteca.adicionar_livro(livro)
+        biblioteca.adicionar_livro(livro)
+        captured = capsys.readouterr()
+        
+        assert len(biblioteca.livros) == 1
+        assert "❌ Livro '1984' já está no acervo" in captured.out
+    
+    def test_exemplares_iguais_sao_distintos(self):
+        """Teste dois exemplares com os mesmos dados."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        livro1 = Livro("1984", "George Orwell", 1949)
+        livro2 = Livro("1984", "George Orwell", 1949)
+        
+        biblioteca.adicionar_livro(livro1)
+        biblioteca.adicionar_livro(livro2)
+        
+        resultado = biblioteca.buscar_livro("1984")
+        assert len(resultado) == 2
+        assert resultado[0] is livro1
+        assert resultado[1] is livro2
+    
+    def test_remover_livro(self, capsys):
+        """Teste remoção de livro do acervo e do índice de busca."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        livro = Livro("1984", "George Orwell", 1949)
+        biblioteca.adicionar_livro(livro)
+        
+        resultado = biblioteca.remover_livro(livro)
+        captured = capsys.readouterr()
+        
+        assert resultado is True
+        assert biblioteca.livros == []
+        assert biblioteca.buscar_livro("orwell") == []
+        assert "🗑️ Livro '1984' removido do acervo" in captured.out
+    
+    def test_remover_livro_emprestado(self, capsys):
+        """Teste remoção de livro emprestado deve falhar."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        livro = Livro("1984", "George Orwell", 1949)
+        biblioteca.adicionar_livro(livro)
+        livro.emprestar()
+        
+        resultado = biblioteca.remover_livro(livro)
+        captured = capsys.readouterr()
+        
+        assert resultado is False
+        assert livro in biblioteca.livros
+        assert "❌ Livro '1984' está emprestado e não pode ser removido" in captured.out
+    
+    def test_remover_livro_fora_do_acervo(self):
+        """Teste remoção de livro que não pertence ao acervo."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        livro = Livro("1984", "George Orwell", 1949)
+        
+        assert biblioteca.remover_livro(livro) is False
+
+
+class TestIndicesBiblioteca:
+    """Testes para as consultas indexadas por ISBN, nome e e-mail."""
+    
+    @pytest.fixture
+    def biblioteca(self):
+        """Biblioteca com livros e usuários."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        biblioteca.adicionar_livro(Livro("Clean Code", "Robert Martin", 2008, "978-0132350884"))
+        biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949, "978-0452284234"))
+        biblioteca.registrar_usuario(Usuario("Ana Silva", "ana@email.com"))
+        biblioteca.registrar_usuario(Usuario("Bruno Costa"))
+        return biblioteca
+    
+    def test_obter_livro_por_isbn_normalizado(self, biblioteca):
+        """Teste busca por ISBN ignorando hífens e espaços."""
+        livro = biblioteca.obter_livro_por_isbn("978 0132 350884")
+        assert livro is not None
+        assert livro.titulo == "Clean Code"
+        assert biblioteca.obter_livro_por_isbn("000") is None
+    
+    def test_obter_livro_por_isbn_prefere_disponivel(self, biblioteca):
+        """Teste preferência por exemplar disponível."""
+        copia = Livro("Clean Code", "Robert Martin", 2008, "9780132350884")
+        biblioteca.adicionar_livro(copia)
+        biblioteca.obter_livro_por_isbn("978-0132350884").emprestar()
+        
+        assert biblioteca.obter_livro_por_isbn("978-0132350884") is copia
+    
+    def test_obter_usuario_por_nome_e_email(self, biblioteca):
+        """Teste busca de usuário por e-mail e por nome."""
+        assert biblioteca.obter_usuario("ANA@email.com").nome == "Ana Silva"
+        assert biblioteca.obter_usuario("bruno costa").nome == "Bruno Costa"
+        assert biblioteca.obter_usuario("ninguem") is None
+    
+    def test_email_duplicado(self, biblioteca, capsys):
+        """Teste registro com e-mail já usado."""
+        biblioteca.registrar_usuario(Usuario("Outra Ana", "Ana@Email.com"))
+        captured = capsys.readouterr()
+        
+        assert len(biblioteca.usuarios) == 2
+        assert "❌ E-mail 'Ana@Email.com' já está registrado" in captured.out
+    
+    def test_remover_usuario(self, biblioteca):
+        """Teste remoção de usuário dos índices."""
+        usuario = biblioteca.obter_usuario("ana@email.com")
+        
+        assert biblioteca.remover_usuario(usuario) is True
+        assert biblioteca.obter_usuario("ana@email.com") is None
+        assert biblioteca.obter_usuario("ana silva") is None
+        assert biblioteca.remover_usuario(usuario) is False
+    
+    def test_remover_usuario_com_emprestimos(self, biblioteca):
+        """Teste remoção de usuário com livros emprestados deve falhar."""
+        biblioteca.emprestar_livro("9780452284234", "ana@email.com")
+        usuario = biblioteca.obter_usuario("ana@email.com")
+        
+        assert biblioteca.remover_usuario(usuario) is False
+    
+    def test_remover_livro_atualiza_indice_isbn(self, biblioteca):
+        """Teste remoção de livro do índice de ISBN."""
+        livro = biblioteca.obter_livro_por_isbn("978-0452284234")
+        biblioteca.remover_livro(livro)
+        
+        assert biblioteca.obter_livro_por_isbn("978-0452284234") is None
+    
+    def test_emprestar_e_devolver_por_isbn(self, biblioteca, capsys):
+        """Teste empréstimo e devolução pelos índices."""
+        assert biblioteca.emprestar_livro("978-0452284234", "ana@email.com") is True
+        livro = biblioteca.obter_livro_por_isbn("978-0452284234")
+        assert livro.disponivel is False
+        
+        assert biblioteca.devolver_livro("9780452284234", "Ana Silva") is True
+        assert livro.disponivel is True
+    
+    def test_emprestar_livro_inexistente(self, biblioteca, capsys):
+        """Teste empréstimo de ISBN ou usuário desconhecido."""
+        assert biblioteca.emprestar_livro("000", "ana@email.com") is False
+        assert biblioteca.emprestar_livro("978-0452284234", "ninguem") is False
+        captured = capsys.readouterr()
+        
+        assert "❌ Nenhum livro com ISBN '000' no acervo" in captured.out
+        assert "❌ Usuário 'ninguem' não encontrado" in captured.out
+    
+    def test_devolver_livro_nao_emprestado(self, biblioteca, capsys):
+        """Teste devolução de ISBN que o usuário não possui."""
+        assert biblioteca.devolver_livro("978-0452284234", "ana@email.com") is False
+        assert biblioteca.devolver_livro("978-0452284234", "ninguem") is False
+        captured = capsys.readouterr()
+        
+        assert "❌ Ana Silva não possui livro com ISBN '978-0452284234'" in captured.out
+
+class TestEstatisticas:
+    """Testes para os contadores de estatísticas."""
+    
+    def test_biblioteca_vazia(self):
+        """Teste estatísticas de biblioteca vazia."""
+        estatisticas = Biblioteca("Biblioteca Central").obter_estatisticas()
+        assert estatisticas == Estatisticas(0, 0, 0, 0)
+        assert estatisticas.taxa_utilizacao == 0.0
+    
+    def test_contadores_acompanham_emprestimos(self):
+        """Teste contadores atualizados por empréstimo e devolução."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        livros = [Livro(f"Livro {i}", "Autor", 2000) for i in range(4)]
+        for livro in livros:
+            biblioteca.adicionar_livro(livro)
+        usuario = Usuario("João")
+        biblioteca.registrar_usuario(usuario)
+        
+        usuario.pegar_livro(livros[0])
+        livros[1].emprestar()
+        estatisticas = biblioteca.obter_estatisticas()
+        assert estatisticas.livros_disponiveis == 2
+        assert estatisticas.livros_emprestados == 2
+        assert estatisticas.total_usuarios == 1
+        assert estatisticas.taxa_utilizacao == 50.0
+        
+        usuario.devolver_livro(livros[0])
+        livros[1].devolver()
+        livros[1].devolver()  # Devolução repetida não altera contadores
+        assert biblioteca.obter_estatisticas().livros_disponiveis == 4
+    
+    def test_contadores_com_livro_ja_emprestado(self):
+        """Teste adição de livro que já está emprestado."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        livro = Livro("1984", "George Orwell", 1949)
+        livro.emprestar()
+        biblioteca.adicionar_livro(livro)
+        
+        assert biblioteca.obter_estatisticas().livros_emprestados == 1
+        livro.devolver()
+        assert biblioteca.obter_estatisticas().livros_disponiveis == 1
+    
+    def test_livro_removido_deixa_de_ser_contado(self):
+        """Teste que livro removido não altera mais os contadores."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        livro = Livro("1984", "George Orwell", 1949)
+        biblioteca.adicionar_livro(livro)
+        biblioteca.remover_livro(livro)
+        livro.emprestar()
+        
+        assert biblioteca.obter_estatisticas() == Estatisticas(0, 0, 0, 0)
+    
+    def test_estatisticas_exibe(self, capsys):
+        """Teste exibição das estatísticas."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        livro = Livro("1984", "George Orwell", 1949)
+        biblioteca.adicionar_livro(livro)
+        livro.emprestar()
+        
+        biblioteca.estatisticas()
+        captured = capsys.readouterr()
+        
+        assert "📤 Livros emprestados: 1" in captured.out
+        assert "📈 Taxa de utilização: 100.0%" in captured.out
+
+
+class TestEmprestimosUsuario:
+    """Testes para o registro de empréstimos por exemplar."""
+    
+    def test_exemplares_identicos_sao_distintos(self, capsys):
+        """Teste que devolver outro exemplar idêntico é recusado."""
+        copia_a = Livro("1984", "George Orwell", 1949, "978-0452284234")
+        copia_b = Livro("1984", "George Orwell", 1949, "978-0452284234")
+        ana, bruno = Usuario("Ana"), Usuario("Bruno")
+        ana.pegar_livro(copia_a)
+        bruno.pegar_livro(copia_b)
+        copia_b.data_emprestimo = copia_a.data_emprestimo
+        assert copia_a == copia_b
+        
+        assert not ana.devolver_livro(copia_b)
+        assert not copia_b.disponivel
+        assert ana.devolver_livro(copia_a)
+        assert bruno.livros_emprestados == [copia_b]
+    
+    def test_comportamento_de_sequencia(self):
+        """Teste compatibilidade com a lista usada anteriormente."""
+        livros = [Livro(f"Livro {i}", "Autor", 2000) for i in range(3)]
+        emprestimos = EmprestimosUsuario(livros)
+        
+        assert len(emprestimos) == 3
+        assert list(emprestimos) == livros
+        assert emprestimos[-1] is livros[2]
+        assert emprestimos.obter(livros[1].codigo) is livros[1]
+        emprestimos.remove(livros[1])
+        assert emprestimos == [livros[0], livros[2]]
+        with pytest.raises(ValueError):
+            emprestimos.remove(livros[1])
+        with pytest.raises(IndexError):
+            emprestimos[2]
+        assert Usuario("Ana", livros_emprestados=[livros[0]]).livros_emprestados == [livros[0]]
+    
+    def test_obter_portador(self, capsys):
+        """Teste índice reverso de quem está com cada exemplar."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        livro = Livro("1984", "George Orwell", 1949, "978-0452284234")
+        biblioteca.adicionar_livro(livro)
+        ana = Usuario("Ana")
+        biblioteca.registrar_usuario(ana)
+        
+        assert biblioteca.obter_portador(livro) is None
+        biblioteca.emprestar_livro("978-0452284234", "Ana")
+        assert biblioteca.obter_portador(livro) is ana
+        biblioteca.devolver_livro("978-0452284234", "Ana")
+        assert biblioteca.obter_portador(livro) is None
+
+
+class TestListagemOrdenada:
+    """Testes para os índices ordenados e a listagem paginada."""
+    
+    @pytest.fixture
+    def biblioteca(self, capsys):
+        """Biblioteca com livros de vários anos."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        for titulo, autor, ano in [
+            ("Dom Casmurro", "Machado de Assis", 1899),
+            ("1984", "George Orwell", 1949),
+            ("O Cortiço", "Aluísio Azevedo", 1890),
+            ("Memórias Póstumas", "Machado de Assis", 1881),
+            ("Os Sertões", "Euclides da Cunha", 1902),
+            ("A Revolução dos Bichos", "George Orwell", 1945),
+        ]:
+            biblioteca.adicionar_livro(Livro(titulo, autor, ano))
+        capsys.readouterr()
+        return biblioteca
+    
+    def test_livros_entre(self, biblioteca):
+        """Teste consulta por intervalo de anos."""
+        assert [livro.ano for livro in biblioteca.livros_entre(1890, 1902)] == [1890, 1899, 1902]
+        assert biblioteca.livros_entre(1950, 2000) == []
+    
+    def test_paginas_cobrem_o_acervo(self, biblioteca):
+        """Teste paginação com cursor em todas as ordenações."""
+        for ordem, chave in [("titulo", lambda l: l.titulo.casefold()),
+                             ("autor", lambda l: l.autor.casefold()),
+                             ("ano", lambda l: l.ano)]:
+            vistos, cursor = [], None
+            while True:
+                pagina = biblioteca.paginar_livros(ordem, cursor, limite=4)
+                vistos.extend(pagina.livros)
+                cursor = pagina.proximo_cursor
+                if cursor is None:
+                    break
+            assert vistos == sorted(biblioteca.livros, key=lambda l: (chave(l), l.codigo))
+    
+    def test_cursor_sobrevive_a_alteracoes(self, biblioteca):
+        """Teste que inclusões e remoções não quebram um cursor em uso."""
+        pagina = biblioteca.paginar_livros("ano", limite=2)
+        assert [livro.ano for livro in pagina.livros] == [1881, 1890]
+        removido = biblioteca.livros_entre(1899, 1899)[0]
+        biblioteca.remover_livro(removido)
+        biblioteca.adicionar_livro(Livro("Iracema", "José de Alencar", 1865))
+        biblioteca.adicionar_livro(Livro("O Ateneu", "Raul Pompeia", 1888))
+        biblioteca.adicionar_livro(Livro("Triste Fim", "Lima Barreto", 1911))
+        
+        seguinte = biblioteca.paginar_livros("ano", pagina.proximo_cursor, limite=2)
+        assert [livro.ano for livro in seguinte.livros] == [1902, 1911]
+    
+    def test_erros(self, biblioteca):
+        """Teste ordenação, cursor e limite inválidos."""
+        with pytest.raises(ValueError):
+            biblioteca.paginar_livros("isbn")
+        with pytest.raises(ValueError):
+            biblioteca.paginar_livros("ano", cursor="lixo")
+        cursor = biblioteca.paginar_livros("ano", limite=1).proximo_cursor
+        with pytest.raises(ValueError):
+            biblioteca.paginar_livros("titulo", cursor=cursor)
+        with pytest.raises(ValueError):
+            biblioteca.paginar_livros(limite=0)
+    
+    def test_listar_livros_paginado(self, biblioteca, capsys):
+        """Teste exibição de uma página e cursor retornado."""
+        cursor = biblioteca.listar_livros(ordem="autor", limite=2)
+        captured = capsys.readouterr()
+        assert "Aluísio Azevedo" in captured.out
+        assert "Euclides da Cunha" in captured.out
+        assert "Machado" not in captured.out
+        
+        assert biblioteca.listar_livros(ordem="autor", cursor=cursor, limite=10) is None
+        assert "Raul" not in capsys.readouterr().out
+
+
+class TestBuscaAproximada:
+    """Testes para a busca sem acentos e tolerante a erros de digitação."""
+    
+    @pytest.fixture
+    def biblioteca(self):
+        """Biblioteca com títulos acentuados."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        biblioteca.adicionar_livro(Livro("Açúcar", "Gilberto Freyre", 1939))
+        biblioteca.adicionar_livro(Livro("Dom Casmurro", "Machado de Assis", 1899))
+        biblioteca.adicionar_livro(Livro("Quincas Borba", "Machado de Assis", 1891))
+        return biblioteca
+    
+    def test_buscar_livro_sem_acentos(self, biblioteca):
+        """Teste busca exata ignorando acentos."""
+        encontrados = biblioteca.buscar_livro("acucar", exibir=False)
+        assert [livro.titulo for livro in encontrados] == ["Açúcar"]
+    
+    def test_buscar_aproximado(self, biblioteca):
+        """Teste busca com erro de digitação ordenada por relevância."""
+        encontrados = biblioteca.buscar_aproximado("Quincas Machdo", exibir=False)
+        assert [livro.titulo for livro in encontrados] == ["Quincas Borba", "Dom Casmurro"]
+        assert biblioteca.buscar_aproximado("Machdo", limite=1, exibir=False)[0].titulo == "Dom Casmurro"
+    
+    def test_sugestoes_quando_nada_encontrado(self, biblioteca, capsys):
+        """Teste sugestões exibidas quando a busca exata não encontra nada."""
+        assert biblioteca.buscar_livro("Machdo") == []
+        captured = capsys.readouterr()
+        assert "❌ Nenhum livro encontrado com o termo 'Machdo'" in captured.out
+        assert "Você quis dizer" in captured.out
+        assert "Dom Casmurro" in captured.out
+
+
+class TestObras:
+    """Testes para o modelo de obra (título) com vários exemplares."""
+    
+    def test_obra_com_exemplares(self):
+        """Teste contador de disponíveis e empréstimo de qualquer exemplar."""
+        obra = Obra("Dom Casmurro", "Machado de Assis", 1899, "978-8535910667")
+        exemplares = [Livro("Dom Casmurro", "Machado de Assis", 1899, "978-8535910667") for _ in range(2)]
+        for exemplar in exemplares:
+            obra.incluir(exemplar)
+        ana, bruno, carla = Usuario("Ana"), Usuario("Bruno"), Usuario("Carla")
+        
+        assert (len(obra), obra.disponiveis, obra.tem_disponivel) == (2, 2, True)
+        assert all(exemplar.obra is obra for exemplar in exemplares)
+        assert ana.pegar_livro(obra) is True
+        assert bruno.pegar_livro(obra) is True
+        assert obra.tem_disponivel is False
+        assert carla.pegar_livro(obra) is False
+        assert {livro.codigo for livro in [*ana.livros_emprestados, *bruno.livros_emprestados]} == \
+            {exemplar.codigo for exemplar in exemplares}
+        
+        ana.devolver_livro(ana.livros_emprestados[0])
+        assert obra.disponiveis == 1
+        assert carla.pegar_livro(obra) is True
+        assert obra._trava_contador is not Obra("Emma", "Jane Austen", 1815)._trava_contador
+    
+    def test_biblioteca_agrupa_exemplares(self):
+        """Teste exemplares iguais reunidos em uma obra com dados compartilhados."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        copias = [Livro("Dom Casmurro", "Machado de Assis", 1899, "978-8535910667") for _ in range(3)]
+        for copia in copias:
+            biblioteca.adicionar_livro(copia)
+        biblioteca.adicionar_livro(Livro("Quincas Borba", "Machado de Assis", 1891))
+        
+        obra = biblioteca.obter_obra("9788535910667")
+        assert obra.exemplares == copias
+        assert len(biblioteca.obras) == 2
+        assert all(copia.titulo is obra.titulo for copia in copias)
+        assert len(biblioteca._indice_textual) == 2
+        assert biblioteca.buscar_livro("casmurro", exibir=False) == copias
+        assert len(biblioteca.buscar_livro("machado", exibir=False)) == 4
+    
+    def test_incluir_preserva_dados_do_exemplar(self):
+        """Teste que a obra não reescreve o ISBN informado em outro formato."""
+        biblioteca = Biblioteca("Biblioteca Central", sink=eventos.SinkNulo())
+        primeiro = Livro("Dom Casmurro", "Machado de Assis", 1899, "9788535910667")
+        segundo = Livro("Dom Casmurro", "Machado de Assis", 1899, "978-85-359-1066-7")
+        biblioteca.adicionar_livro(primeiro)
+        biblioteca.adicionar_livro(segundo)
+        
+        assert segundo.obra is primeiro.obra
+        assert segundo.isbn == "978-85-359-1066-7"
+        assert segundo.titulo is primeiro.titulo and segundo.autor is primeiro.autor
+    
+    def test_emprestar_obra_pela_biblioteca(self):
+        """Teste empréstimo de qualquer exemplar livre pela biblioteca."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        for _ in range(2):
+            biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949, "978-0452284234"))
+        ana = Usuario("Ana")
+        biblioteca.registrar_usuario(ana)
+        obra = biblioteca.obter_obra("978-0452284234")
+        
+        assert biblioteca.emprestar(ana, obra) is True
+        assert biblioteca.emprestar(ana, obra) is True
+        assert biblioteca.emprestar(ana, obra) is False
+        assert obra.disponiveis == 0
+        assert biblioteca.obter_estatisticas().livros_emprestados == 2
+    
+    def test_remocao_descarta_obra_vazia(self):
+        """Teste remoção de exemplares e da obra quando fica vazia."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        primeiro = Livro("1984", "George Orwell", 1949, "978-0452284234")
+        segundo = Livro("1984", "George Orwell", 1949, "978-0452284234")
+        biblioteca.adicionar_livro(primeiro)
+        biblioteca.adicionar_livro(segundo)
+        obra = primeiro.obra
+        
+        biblioteca.remover_livro(primeiro)
+        assert primeiro.obra is None
+        assert obra.exemplares == [segundo]
+        assert biblioteca.buscar_livro("1984", exibir=False) == [segundo]
+        
+        biblioteca.remover_livro(segundo)
+        assert biblioteca.obter_obra("978-0452284234") is None
+        assert biblioteca.buscar_livro("1984", exibir=False) == []
+        assert len(biblioteca._indice_textual) == 0
+    
+    def test_mesmo_isbn_com_dados_diferentes(self):
+        """Teste obras separadas quando os dados bibliográficos divergem."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        antigo = Livro("1984", "G. Orwell", 1949, "978-0452284234")
+        novo = Livro("1984", "George Orwell", 1949, "978-0452284234")
+        biblioteca.adicionar_livro(antigo)
+        biblioteca.adicionar_livro(novo)
+        antigo.emprestar()
+        
+        assert antigo.obra is not novo.obra
+        assert biblioteca.obter_livro_por_isbn("978-0452284234") is novo
+
+class _ArmazenamentoFalho(Armazenamento):
+    """Armazenamento que falha ao gravar empréstimos e devoluções (avulsos ou em lote)."""
+    
+    def emprestimo(self, livro, usuario):
+        raise OSError("disco cheio")
+    
+    def devolucao(self, livro, usuario):
+        raise OSError("disco cheio")
+
+
+class _ArmazenamentoGravador(Armazenamento):
+    """Armazenamento que anota empréstimos e devoluções gravados."""
+    
+    def __init__(self):
+        self.gravacoes = []
+    
+    def emprestimo(self, livro, usuario):
+        self.gravacoes.append(("emprestimo", livro.codigo, livro.data_emprestimo))
+    
+    def devolucao(self, livro, usuario):
+        self.gravacoes.append(("devolucao", livro.codigo))
+
+
+class _HistoricoFalho(HistoricoEmprestimos):
+    """Histórico que falha ao registrar empréstimos e devoluções."""
+    
+    def emprestimo(self, livro, usuario=None, filial="", quando=None):
+        raise RuntimeError("histórico indisponível")
+    
+    def devolucao(self, livro, filial="", quando=None):
+        raise RuntimeError("histórico indisponível")
+
+
+class TestOperacoesEmLote:
+    """Testes para empréstimos e devoluções em lote (tudo ou nada)."""
+    
+    @staticmethod
+    def _montar(quantidade=4, **kwargs):
+        coletor = eventos.SinkColetor()
+        biblioteca = Biblioteca("Biblioteca Central", sink=coletor, **kwargs)
+        livros = [Livro(f"Livro {i}", "Autor", 2000 + i, f"isbn-{i}") for i in range(quantidade)]
+        for livro in livros:
+            biblioteca.adicionar_livro(livro)
+        ana = Usuario("Ana", limite_livros=3)
+        biblioteca.registrar_usuario(ana)
+        coletor.eventos.clear()
+        return biblioteca, coletor, livros, ana
+    
+    def test_emprestar_lote(self):
+        """Teste empréstimo de vários livros com um único evento."""
+        biblioteca, coletor, livros, ana = self._montar()
+        
+        assert biblioteca.emprestar_lote(ana, livros[:3]) is True
+        assert list(ana.livros_emprestados) == livros[:3]
+        assert all(biblioteca.obter_portador(livro) is ana for livro in livros[:3])
+        assert biblioteca.obter_estatisticas().livros_emprestados == 3
+        assert len(biblioteca.emprestimos_vencidos(datetime.max)) == 3
+        assert [type(evento) for evento in coletor.eventos] == [eventos.EmprestimoLoteRealizado]
+    
+    def test_lote_recusado_nao_empresta_nada(self):
+        """Teste que limite, indisponibilidade ou repetição recusam o lote inteiro."""
+        biblioteca, coletor, livros, ana = self._montar()
+        bruno = Usuario("Bruno")
+        biblioteca.registrar_usuario(bruno)
+        biblioteca.emprestar(bruno, livros[3])
+        coletor.eventos.clear()
+        
+        assert biblioteca.emprestar_lote(ana, livros) is False
+        assert biblioteca.emprestar_lote(ana, [livros[0], livros[1], livros[3]]) is False
+        assert biblioteca.emprestar_lote(ana, [livros[0], livros[0]]) is False
+        assert biblioteca.emprestar_lote(ana, [Livro("Fora", "Autor", 2000)]) is False
+        
+        motivos = [evento.motivo for evento in coletor.eventos]
+        assert isinstance(coletor.eventos[0], eventos.EmprestimoLoteRecusado)
+        assert "limite" in motivos[0]
+        assert "não está disponível" in motivos[1]
+        assert "mais de uma vez" in motivos[2]
+        assert "não está no acervo" in motivos[3]
+        assert len(ana.livros_emprestados) == 0
+        assert all(livro.disponivel for livro in livros[:3])
+        assert biblioteca.obter_estatisticas().livros_emprestados == 1
+    
+    def test_lote_com_obras(self):
+        """Teste que cada obra do lote recebe um exemplar livre diferente."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        for _ in range(2):
+            biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949, "978-0452284234"))
+        ana = Usuario("Ana", limite_livros=5)
+        biblioteca.registrar_usuario(ana)
+        obra = biblioteca.obter_obra("978-0452284234")
+        
+        assert biblioteca.emprestar_lote(ana, [obra, obra, obra]) is False
+        assert biblioteca.emprestar_lote(ana, [obra, obra]) is True
+        assert {livro.codigo for livro in ana.livros_emprestados} == {l.codigo for l in obra.exemplares}
+        assert obra.disponiveis == 0
+    
+    def test_falha_ao_gravar_desfaz_emprestimos(self):
+        """Teste rollback do lote quando o armazenamento falha."""
+        biblioteca, _, livros, ana = self._montar(armazenamento=_ArmazenamentoFalho())
+        
+        with pytest.raises(OSError):
+            biblioteca.emprestar_lote(ana, livros[:3])
+        assert len(ana.livros_emprestados) == 0
+        assert all(livro.disponivel for livro in livros)
+        assert biblioteca.obter_estatisticas().livros_disponiveis == 4
+        assert biblioteca.emprestimos_vencidos(datetime.max) == []
+        biblioteca.armazenamento = Armazenamento()
+        assert biblioteca.emprestar(ana, livros[0]) is True
+    
+    def test_devolver_lote(self):
+        """Teste devolução em lote e atendimento de reservas ao final."""
+        biblioteca, coletor, livros, ana = self._montar(quantidade=3)
+        bruno = Usuario("Bruno")
+        biblioteca.registrar_usuario(bruno)
+        biblioteca.emprestar_lote(ana, livros)
+        reserva = biblioteca.reservar("isbn-1", "Bruno")
+        coletor.eventos.clear()
+        
+        assert biblioteca.devolver_lote(ana, [livros[0], livros[0]]) is False
+        assert biblioteca.devolver_lote(ana, [livros[0], Livro("Outro", "Autor", 2000)]) is False
+        assert len(ana.livros_emprestados) == 3
+        
+        assert biblioteca.devolver_lote(ana, livros) is True
+        assert len(ana.livros_emprestados) == 0
+        assert biblioteca.obter_estatisticas().livros_emprestados == 0
+        assert biblioteca.reservas.separada_para(livros[1]) is reserva
+        assert [type(evento) for evento in coletor.eventos] == [
+            eventos.DevolucaoLoteRecusada, eventos.DevolucaoLoteRecusada,
+            eventos.DevolucaoLoteRealizada, eventos.ReservaDisponivel,
+        ]
+    
+    def test_falha_ao_gravar_restaura_devolucoes(self):
+        """Teste que o rollback da devolução mantém as datas de empréstimo."""
+        biblioteca, _, livros, ana = self._montar(quantidade=2)
+        biblioteca.emprestar_lote(ana, livros)
+        datas = [livro.data_emprestimo for livro in livros]
+        biblioteca.armazenamento = _ArmazenamentoFalho()
+        
+        with pytest.raises(OSError):
+            biblioteca.devolver_lote(ana, livros)
+        assert list(ana.livros_emprestados) == livros
+        assert [livro.data_emprestimo for livro in livros] == datas
+        assert all(biblioteca.obter_portador(livro) is ana for livro in livros)
+        assert biblioteca.obter_estatisticas().livros_emprestados == 2
+        assert [e.livro for e in biblioteca.emprestimos_vencidos(datetime.max)] == livros
+
+
+class TestFalhaArmazenamento:
+    """Testes de consistência quando o armazenamento falha em operações avulsas."""
+    
+    def test_falha_ao_gravar_emprestimo(self):
+        """Teste que livro, usuário, obra, portador e contadores voltam ao estado anterior."""
+        biblioteca = Biblioteca("Biblioteca Central", sink=eventos.SinkNulo(),
+                                armazenamento=_ArmazenamentoFalho())
+        livro = Livro("Dom Casmurro", "Machado de Assis", 1899, "978-8535910663")
+        ana = Usuario("Ana")
+        biblioteca.adicionar_livro(livro)
+        biblioteca.registrar_usuario(ana)
+        
+        with pytest.raises(OSError):
+            biblioteca.emprestar(ana, livro)
+        assert livro.disponivel and livro.data_emprestimo is None
+        assert len(ana.livros_emprestados) == 0
+        assert livro.obra.disponiveis == 1
+        assert biblioteca.obter_portador(livro) is None
+        assert biblioteca.obter_estatisticas().livros_emprestados == 0
+        assert biblioteca.emprestimos_vencidos(datetime.max) == []
+    
+    def test_falha_ao_gravar_devolucao(self):
+        """Teste que a devolução que não pôde ser gravada mantém o empréstimo."""
+        biblioteca = Biblioteca("Biblioteca Central", sink=eventos.SinkNulo())
+        livro = Livro("Dom Casmurro", "Machado de Assis", 1899, "978-8535910663")
+        ana = Usuario("Ana")
+        biblioteca.adicionar_livro(livro)
+        biblioteca.registrar_usuario(ana)
+        biblioteca.emprestar(ana, livro)
+        data = livro.data_emprestimo
+        biblioteca.armazenamento = _ArmazenamentoFalho()
+        
+        with pytest.raises(OSError):
+            biblioteca.devolver(ana, livro)
+        assert not livro.disponivel and livro.data_emprestimo == data
+        assert list(ana.livros_emprestados) == [livro]
+        assert livro.obra.disponiveis == 0
+        assert biblioteca.obter_portador(livro) is ana
+        assert biblioteca.obter_estatisticas().livros_emprestados == 1
+        assert [e.livro for e in biblioteca.emprestimos_vencidos(datetime.max)] == [livro]
+    
+    def test_falha_apos_gravar_desfaz_emprestimo(self):
+        """Teste que uma falha depois da gravação desfaz a gravação e a memória."""
+        armazenamento = _ArmazenamentoGravador()
+        biblioteca = Biblioteca("Biblioteca Central", sink=eventos.SinkNulo(),
+                                armazenamento=armazenamento, historico=_HistoricoFalho())
+        livro = Livro("Dom Casmurro", "Machado de Assis", 1899, "978-8535910663")
+        ana = Usuario("Ana")
+        biblioteca.adicionar_livro(livro)
+        biblioteca.registrar_usuario(ana)
+        
+        with pytest.raises(RuntimeError):
+            biblioteca.emprestar(ana, livro)
+        assert [gravacao[0] for gravacao in armazenamento.gravacoes] == ["emprestimo", "devolucao"]
+        assert livro.disponivel and livro.obra.disponiveis == 1
+        assert biblioteca.obter_portador(livro) is None
+        assert biblioteca.obter_estatisticas().livros_emprestados == 0
+        assert biblioteca.emprestimos_vencidos(datetime.max) == []
+    
+    def test_falha_apos_gravar_desfaz_devolucao(self):
+        """Teste que a devolução desfeita volta a ser gravada com a data original."""
+        armazenamento = _ArmazenamentoGravador()
+        biblioteca = Biblioteca("Biblioteca Central", sink=eventos.SinkNulo(), armazenamento=armazenamento)
+        livro = Livro("Dom Casmurro", "Machado de Assis", 1899, "978-8535910663")
+        ana = Usuario("Ana")
+        biblioteca.adicionar_livro(livro)
+        biblioteca.registrar_usuario(ana)
+        biblioteca.emprestar(ana, livro)
+        data = livro.data_emprestimo
+        vencimento = biblioteca.vencimentos.vencimento(livro)
+        biblioteca.historico = _HistoricoFalho()
+        
+        with pytest.raises(RuntimeError):
+            biblioteca.devolver(ana, livro)
+        assert armazenamento.gravacoes[-2:] == [("devolucao", livro.codigo), ("emprestimo", livro.codigo, data)]
+        assert not livro.disponivel and livro.data_emprestimo == data
+        assert biblioteca.obter_portador(livro) is ana
+        assert biblioteca.obter_estatisticas().livros_emprestados == 1
+        assert biblioteca.vencimentos.vencimento(livro) == vencimento
 
 
 # Configuração para executar os testes
@@ -0,0 +1,121 @@
+"""
+Testes unitários para o cache de resultados de busca
+"""
+
+import os
+import pytest
+import sys
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from biblioteca_melhorada import Biblioteca, Livro
+from cache_buscas import CacheBuscas
+
+
+class TestCacheBuscas:
+    """Testes para o cache LRU com invalidação por registro."""
+    
+    def test_acerto_e_falha(self):
+        """Teste contadores de acertos e falhas."""
+        cache = CacheBuscas()
+        assert cache.obter("python") is None
+        assert cache.guardar("python", (1, 2), cache.versao()) is True
+        assert cache.obter("python") == (1, 2)
+        
+        estatisticas = cache.estatisticas()
+        assert (estatisticas.acertos, estatisticas.falhas) == (1, 1)
+        assert estatisticas.taxa_acerto == 0.5
+    
+    def test_despejo_do_menos_usado(self):
+        """Teste despejo LRU ao atingir a capacidade."""
+        cache = CacheBuscas(capacidade=2)
+        cache.guardar("a", (1,), cache.versao())
+        cache.guardar("b", (2,), cache.versao())
+        cache.obter("a")
+        cache.guardar("c", (3,), cache.versao())
+        
+        assert cache.obter("b") is None
+        assert cache.obter("a") == (1,)
+        assert cache.estatisticas().despejos == 1
+        assert len(cache) == 2
+    
+    def test_validade(self):
+        """Teste descarte de resultados vencidos."""
+        agora = [0.0]
+        cache = CacheBuscas(validade=10, relogio=lambda: agora[0])
+        cache.guardar("python", (1,), cache.versao())
+        agora[0] = 11.0
+        assert cache.obter("python") is None
+        assert len(cache) == 0
+    
+    def test_invalidacao_precisa(self):
+        """Teste invalidação apenas dos termos que casam com o registro."""
+        cache = CacheBuscas()
+        for termo in ["", "py", "python", "acucar", "java"]:
+            cache.guardar(termo, (), cache.versao())
+        
+        assert cache.invalidar("Python Fluente", "Luciano Ramalho") == 3
+        assert cache.obter("java") == ()
+        assert cache.obter("python") is None
+        assert cache.invalidar("Açúcar", "Gilberto Freyre") == 1
+        assert cache.estatisticas().invalidacoes == 4
+    
+    def test_resultado_calculado_durante_alteracao_e_descartado(self):
+        """Teste que um resultado antigo não é guardado após uma alteração."""
+        cache = CacheBuscas()
+        versao = cache.versao()
+        cache.invalidar("Python Fluente")
+        assert cache.guardar("python", (), versao) is False
+        assert cache.obter("python") is None
+    
+    def test_parametros_invalidos(self):
+        """Teste validação de capacidade e validade."""
+        with pytest.raises(ValueError):
+            CacheBuscas(capacidade=0)
+        with pytest.raises(ValueError):
+            CacheBuscas(validade=0)
+
+
+class TestCacheBiblioteca:
+    """Testes para o cache usado por Biblioteca.buscar_livro."""
+    
+    @pytest.fixture
+    def biblioteca(self):
+        """Biblioteca com alguns livros."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        biblioteca.adicionar_livro(Livro("Python Fluente", "Luciano Ramalho", 2015))
+        biblioteca.adicionar_livro(Livro("Clean Code", "Robert Martin", 2008))
+        return biblioteca
+    
+    def test_busca_repetida_usa_cache(self, biblioteca):
+        """Teste acerto no cache com termos equivalentes."""
+        biblioteca.buscar_livro("python", exibir=False)
+        encontrados = biblioteca.buscar_livro("PYTHON", exibir=False)
+        assert [livro.titulo for livro in encontrados] == ["Python Fluente"]
+        assert biblioteca.cache_buscas.estatisticas().acertos == 1
+    
+    def test_emprestimo_nao_invalida(self, biblioteca):
+        """Teste que empréstimos mantêm o cache e o resultado reflete o estado atual."""
+        livro = biblioteca.buscar_livro("python", exibir=False)[0]
+        livro.emprestar()
+        
+        encontrados = biblioteca.buscar_livro("python", exibir=False)
+        assert encontrados == [livro]
+        assert not encontrados[0].disponivel
+        assert biblioteca.cache_buscas.estatisticas().invalidacoes == 0
+    
+    def test_inclusao_e_remocao_invalidam(self, biblioteca):
+        """Teste resultados atualizados após adicionar e remover livros."""
+        biblioteca.buscar_livro("python", exibir=False)
+        biblioteca.buscar_livro("code", exibir=False)
+        novo = Livro("Python Cookbook", "David Beazley", 2013)
+        biblioteca.adicionar_livro(novo)
+        
+        assert len(biblioteca.buscar_livro("python", exibir=False)) == 2
+        assert biblioteca.cache_buscas.estatisticas().invalidacoes == 1
+        
+        biblioteca.remover_livro(novo)
+        assert len(biblioteca.buscar_livro("python", exibir=False)) == 1
+        assert len(biblioteca.buscar_livro("code", exibir=False)) == 1
+        assert biblioteca.cache_buscas.estatisticas().acertos == 1
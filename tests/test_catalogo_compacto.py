@@ -0,0 +1,151 @@
+"""
+Testes unitários para o catálogo compacto (colunar)
+"""
+
+import pytest
+import sys
+import os
+import tracemalloc
+from datetime import datetime
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from biblioteca_melhorada import Livro, Usuario, Biblioteca
+from catalogo_compacto import CatalogoCompacto, LivroCompacto
+
+
+class TestCatalogoCompacto:
+    """Testes para o CatalogoCompacto e suas vistas."""
+    
+    @pytest.fixture
+    def catalogo(self):
+        """Catálogo com alguns livros."""
+        catalogo = CatalogoCompacto()
+        catalogo.adicionar_registro("Dom Casmurro", "Machado de Assis", 1899, "978-85-254-1234-5")
+        catalogo.adicionar_registro("Memórias Póstumas", "Machado de Assis", 1881)
+        catalogo.adicionar_registro("1984", "George Orwell", 1949)
+        return catalogo
+    
+    def test_vista_expoe_atributos_de_livro(self, catalogo):
+        """Teste leitura dos campos pela vista."""
+        livro = catalogo[0]
+        assert isinstance(livro, Livro)
+        assert livro.titulo == "Dom Casmurro"
+        assert livro.autor == "Machado de Assis"
+        assert livro.ano == 1899
+        assert livro.isbn == "978-85-254-1234-5"
+        assert catalogo[1].isbn is None
+        assert livro.disponivel is True
+        assert livro.data_emprestimo is None
+        assert str(livro) == "Dom Casmurro (1899) - Machado de Assis | Status: Disponível"
+    
+    def test_vista_grava_nas_colunas(self, catalogo):
+        """Teste que os campos escritos pela vista vão para as colunas."""
+        catalogo[0].titulo = "Dom Casmurro (edição comentada)"
+        catalogo[1].autor = "George Orwell"
+        catalogo[2].isbn = "978-0452284234"
+        catalogo[2].ano = 1950
+        
+        assert [livro.titulo for livro in catalogo] == \
+            ["Dom Casmurro (edição comentada)", "Memórias Póstumas", "1984"]
+        assert catalogo[1].autor is catalogo[2].autor
+        assert (catalogo[2].isbn, catalogo[2].ano) == ("978-0452284234", 1950)
+        assert "titulo" not in vars(catalogo[0])
+    
+    def test_autores_internados(self, catalogo):
+        """Teste que autores repetidos são guardados uma vez."""
+        assert len(catalogo._autores) == 2
+        assert catalogo[0].autor is catalogo[1].autor
+    
+    def test_indices(self, catalogo):
+        """Teste acesso por posição e iteração."""
+        assert len(catalogo) == 3
+        assert catalogo[-1].titulo == "1984"
+        assert [livro.ano for livro in catalogo] == [1899, 1881, 1949]
+        with pytest.raises(IndexError):
+            catalogo[3]
+    
+    def test_validacao(self, catalogo):
+        """Teste que as validações de Livro se aplicam."""
+        with pytest.raises(ValueError, match="Ano inválido"):
+            catalogo.adicionar_registro("Título", "Autor", 3000)
+        with pytest.raises(ValueError, match="Título não pode estar vazio"):
+            catalogo.adicionar_registro(" ", "Autor", 2000)
+    
+    def test_emprestar_e_devolver(self, catalogo):
+        """Teste empréstimo gravando nas colunas do catálogo."""
+        assert catalogo[0].emprestar() is True
+        assert catalogo[0].disponivel is False
+        assert isinstance(catalogo[0].data_emprestimo, datetime)
+        assert catalogo[0].emprestar() is False
+        assert catalogo.livros_disponiveis == 2
+        
+        catalogo[0].devolver()
+        assert catalogo[0].disponivel is True
+        assert catalogo[0].data_emprestimo is None
+        assert catalogo.livros_disponiveis == 3
+    
+    def test_data_emprestimo_preserva_microssegundos(self, catalogo):
+        """Teste conversão exata da data para int64."""
+        data = datetime(2024, 5, 17, 13, 45, 12, 123456)
+        catalogo[2].data_emprestimo = data
+        assert catalogo[2].data_emprestimo == data
+    
+    def test_mapa_de_bits_com_muitos_livros(self):
+        """Teste disponibilidade em posições de bytes diferentes."""
+        catalogo = CatalogoCompacto()
+        for i in range(20):
+            catalogo.adicionar_registro(f"Livro {i}", "Autor", 2000)
+        for i in range(0, 20, 3):
+            catalogo[i].emprestar()
+        
+        assert [livro.disponivel for livro in catalogo] == [i % 3 != 0 for i in range(20)]
+        assert catalogo.livros_disponiveis == 13
+    
+    def test_adicionar_copia_de_livro(self):
+        """Teste cópia de um Livro já emprestado."""
+        livro = Livro("1984", "George Orwell", 1949)
+        livro.emprestar()
+        catalogo = CatalogoCompacto()
+        
+        vista = catalogo.adicionar(livro)
+        assert isinstance(vista, LivroCompacto)
+        assert vista.disponivel is False
+        assert vista.data_emprestimo == livro.data_emprestimo
+        assert vista.codigo != livro.codigo
+    
+    def test_vistas_com_usuario_e_biblioteca(self, catalogo, capsys):
+        """Teste que as vistas funcionam com Usuario e Biblioteca."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        for livro in catalogo:
+            biblioteca.adicionar_livro(livro)
+        usuario = Usuario("João")
+        
+        assert usuario.pegar_livro(catalogo[2]) is True
+        assert biblioteca.obter_estatisticas().livros_emprestados == 1
+        assert biblioteca.buscar_livro("machado") == [catalogo[0], catalogo[1]]
+        assert biblioteca.obter_livro_por_isbn("9788525412345").titulo == "Dom Casmurro"
+        
+        assert usuario.devolver_livro(catalogo[2]) is True
+        assert biblioteca.obter_estatisticas().livros_emprestados == 0
+        assert biblioteca.remover_livro(catalogo[1]) is True
+    
+    def test_economia_de_memoria(self):
+        """Teste que o catálogo usa menos memória que a lista de dataclasses."""
+        quantidade = 2000
+        
+        tracemalloc.start()
+        livros = [Livro(f"Título número {i}", f"Autor {i % 50}", 1900 + i % 100) for i in range(quantidade)]
+        memoria_lista = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del livros
+        
+        tracemalloc.start()
+        catalogo = CatalogoCompacto()
+        for i in range(quantidade):
+            catalogo.adicionar_registro(f"Título número {i}", f"Autor {i % 50}", 1900 + i % 100)
+        memoria_catalogo = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        
+        assert memoria_catalogo * 4 < memoria_lista
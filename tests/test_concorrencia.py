@@ -0,0 +1,211 @@
+"""
+Testes de concorrência para empréstimos e devoluções
+"""
+
+import os
+import random
+import threading
+import pytest
+import sys
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import eventos
+from biblioteca_melhorada import Livro, Usuario, Biblioteca
+from concorrencia import TravaLeituraEscrita, TravasParticionadas
+
+
+@pytest.fixture(autouse=True)
+def sem_mensagens():
+    """Silencia os eventos e força trocas de thread frequentes."""
+    anterior = eventos.definir_sink_padrao(eventos.SinkNulo())
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(intervalo)
+    eventos.definir_sink_padrao(anterior)
+
+
+def _executar(quantidade, alvo):
+    """Roda o alvo em várias threads, liberadas ao mesmo tempo."""
+    barreira = threading.Barrier(quantidade)
+    erros = []
+
+    def trabalhador(indice):
+        barreira.wait()
+        try:
+            alvo(indice)
+        except Exception as erro:  # pragma: no cover - falha reportada abaixo
+            erros.append(erro)
+
+    threads = [threading.Thread(target=trabalhador, args=(i,)) for i in range(quantidade)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+        assert not thread.is_alive(), "possível deadlock"
+    assert not erros
+
+
+class TestTravasParticionadas:
+    """Testes para as travas particionadas."""
+    
+    def test_chaves_na_mesma_particao(self):
+        """Teste que chaves repetidas ou colidentes não travam duas vezes."""
+        travas = TravasParticionadas(particoes=1)
+        with travas.travar("a", "b", "a"):
+            pass
+        with travas.travar("c"):
+            pass
+    
+    def test_particoes_invalidas(self):
+        """Teste quantidade de partições inválida."""
+        with pytest.raises(ValueError):
+            TravasParticionadas(particoes=0)
+    
+    def test_ordem_inversa_sem_deadlock(self):
+        """Teste que ordens de chaves opostas não causam deadlock."""
+        travas = TravasParticionadas(particoes=8)
+        contador = []
+
+        def alvo(indice):
+            chaves = ("x", "y") if indice % 2 else ("y", "x")
+            for _ in range(500):
+                with travas.travar(*chaves):
+                    contador.append(indice)
+
+        _executar(8, alvo)
+        assert len(contador) == 8 * 500
+
+
+class TestTravaLeituraEscrita:
+    """Testes para a trava de leitores e escritor."""
+    
+    def test_leitores_simultaneos(self):
+        """Teste que vários leitores ficam dentro do bloco ao mesmo tempo."""
+        trava = TravaLeituraEscrita()
+        juntos = threading.Barrier(4)
+
+        def alvo(indice):
+            with trava.leitura():
+                juntos.wait(timeout=10)  # Quebraria se a leitura fosse exclusiva
+
+        _executar(4, alvo)
+    
+    def test_escritor_exclusivo(self):
+        """Teste que o escritor nunca convive com leitores ou outro escritor."""
+        trava = TravaLeituraEscrita()
+        dentro = {"leitores": 0, "escritores": 0}
+        violacoes = []
+        contagem = threading.Lock()
+
+        def entrar(papel, delta):
+            with contagem:
+                dentro[papel] += delta
+                if dentro["escritores"] > 1 or (dentro["escritores"] and dentro["leitores"]):
+                    violacoes.append(dict(dentro))
+
+        def alvo(indice):
+            for _ in range(300):
+                bloco, papel = (trava.escrita(), "escritores") if indice % 3 == 0 else (trava.leitura(), "leitores")
+                with bloco:
+                    entrar(papel, 1)
+                    entrar(papel, -1)
+
+        _executar(6, alvo)
+        assert violacoes == []
+
+
+class TestEmprestimosConcorrentes:
+    """Testes de estresse do motor de empréstimos."""
+    
+    def test_mesmo_exemplar_uma_vez(self):
+        """Teste que apenas um usuário consegue o mesmo exemplar."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        livro = Livro("1984", "George Orwell", 1949, "978-0452284234")
+        biblioteca.adicionar_livro(livro)
+        usuarios = [Usuario(f"Usuário {i}") for i in range(32)]
+        for usuario in usuarios:
+            biblioteca.registrar_usuario(usuario)
+
+        sucessos = []
+        _executar(32, lambda i: sucessos.append(biblioteca.emprestar(usuarios[i], livro)))
+
+        assert sucessos.count(True) == 1
+        assert sum(len(u.livros_emprestados) for u in usuarios) == 1
+        assert biblioteca.obter_estatisticas().livros_disponiveis == 0
+    
+    def test_limite_do_usuario(self):
+        """Teste que um usuário não passa do limite com pedidos simultâneos."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        livros = [Livro(f"Livro {i}", "Autor", 2000, f"isbn-{i}") for i in range(20)]
+        for livro in livros:
+            biblioteca.adicionar_livro(livro)
+        usuario = Usuario("Ana", limite_livros=3)
+        biblioteca.registrar_usuario(usuario)
+
+        _executar(20, lambda i: biblioteca.emprestar(usuario, livros[i]))
+
+        assert len(usuario.livros_emprestados) == 3
+        assert sum(not livro.disponivel for livro in livros) == 3
+        assert biblioteca.obter_estatisticas().livros_disponiveis == 17
+    
+    def test_estresse_invariantes(self):
+        """Teste empréstimos e devoluções aleatórios em muitas threads."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        isbns = [f"isbn-{i}" for i in range(10)]
+        for isbn in isbns:
+            for _ in range(3):
+                biblioteca.adicionar_livro(Livro(f"Título {isbn}", "Autor", 2000, isbn))
+        usuarios = [Usuario(f"Usuário {i}", limite_livros=2) for i in range(12)]
+        for usuario in usuarios:
+            biblioteca.registrar_usuario(usuario)
+
+        def alvo(indice):
+            aleatorio = random.Random(indice)
+            for _ in range(300):
+                usuario = aleatorio.choice(usuarios)
+                isbn = aleatorio.choice(isbns)
+                if aleatorio.random() < 0.5:
+                    biblioteca.emprestar_livro(isbn, usuario.nome)
+                else:
+                    biblioteca.devolver_livro(isbn, usuario.nome)
+
+        _executar(16, alvo)
+
+        emprestados = [livro for usuario in usuarios for livro in usuario.livros_emprestados]
+        codigos = [livro.codigo for livro in emprestados]
+        assert len(codigos) == len(set(codigos))
+        assert all(len(usuario.livros_emprestados) <= usuario.limite_livros for usuario in usuarios)
+        assert {l.codigo for l in biblioteca.livros if not l.disponivel} == set(codigos)
+        estatisticas = biblioteca.obter_estatisticas()
+        assert estatisticas.livros_disponiveis == sum(l.disponivel for l in biblioteca.livros)
+        assert estatisticas.livros_emprestados == len(codigos)
+
+    def test_consultas_durante_cadastro(self):
+        """Teste buscas e empréstimos por ISBN enquanto exemplares entram e saem do acervo."""
+        biblioteca = Biblioteca("Biblioteca Central", sink=eventos.SinkNulo())
+        usuarios = [Usuario(f"Usuário {i}", limite_livros=50) for i in range(4)]
+        for usuario in usuarios:
+            biblioteca.registrar_usuario(usuario)
+
+        def alvo(indice):
+            usuario = usuarios[indice % len(usuarios)]
+            for rodada in range(200):
+                if indice < 2:
+                    livro = Livro(f"Título {indice} {rodada}", "Autor", 1900 + rodada % 100, "isbn-1")
+                    biblioteca.adicionar_livro(livro)
+                    biblioteca.remover_livro(livro)
+                elif indice < 4:
+                    biblioteca.emprestar_livro("isbn-1", usuario.nome)
+                    biblioteca.devolver_livro("isbn-1", usuario.nome)
+                else:
+                    biblioteca.buscar_livro(f"título {rodada}", exibir=False)
+                    biblioteca.buscar_aproximado(f"titlo {rodada}", exibir=False)
+                    biblioteca.livros_entre(1900, 2000)
+
+        _executar(6, alvo)
+
+        assert all(l.disponivel for l in biblioteca.livros)
+        assert not any(usuario.livros_emprestados for usuario in usuarios)
@@ -0,0 +1,260 @@
+"""
+Testes unitários para o diário de operações com snapshots
+"""
+
+import json
+import os
+import threading
+import pytest
+import sys
+from datetime import datetime
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from biblioteca_melhorada import Livro, Usuario, Biblioteca
+from diario import ARQUIVO_DIARIO, ARQUIVO_SNAPSHOT, ArmazenamentoDiario, DiarioIndisponivel
+
+
+def _abrir(diretorio, **opcoes):
+    """Cria uma biblioteca apoiada no diário."""
+    return Biblioteca("Biblioteca Central", armazenamento=ArmazenamentoDiario(str(diretorio), **opcoes))
+
+
+def _linhas_diario(diretorio):
+    """Quantidade de operações no arquivo do diário."""
+    with open(os.path.join(diretorio, ARQUIVO_DIARIO), encoding="utf-8") as arquivo:
+        return sum(1 for _ in arquivo)
+
+
+class _ArquivoFalho:
+    """Arquivo cujas escritas falham, como um disco cheio."""
+    
+    def __init__(self):
+        self.fechado = False
+    
+    def write(self, texto):
+        raise OSError(28, "No space left on device")
+    
+    def close(self):
+        self.fechado = True
+
+
+class TestArmazenamentoDiario:
+    """Testes para o ArmazenamentoDiario."""
+    
+    def test_recuperacao_pelo_diario(self, tmp_path):
+        """Teste recuperação reaplicando todas as operações."""
+        biblioteca = _abrir(tmp_path)
+        livro = Livro("1984", "George Orwell", 1949, "978-0452284234")
+        biblioteca.adicionar_livro(livro)
+        biblioteca.adicionar_livro(Livro("Dom Casmurro", "Machado de Assis", 1899))
+        biblioteca.registrar_usuario(Usuario("Ana", "ana@email.com"))
+        biblioteca.registrar_usuario(Usuario("Bruno"))
+        biblioteca.emprestar_livro("9780452284234", "ana")
+        biblioteca.remover_usuario(biblioteca.obter_usuario("bruno"))
+        biblioteca.armazenamento.fechar()
+        
+        restaurada = _abrir(tmp_path)
+        assert [l.titulo for l in restaurada.livros] == ["1984", "Dom Casmurro"]
+        assert [u.nome for u in restaurada.usuarios] == ["Ana"]
+        ana = restaurada.obter_usuario("ana")
+        assert ana.livros_emprestados[0].codigo == livro.codigo
+        assert ana.livros_emprestados[0].data_emprestimo == livro.data_emprestimo
+        
+        restaurada.devolver_livro("9780452284234", "ana")
+        restaurada.remover_livro(restaurada.livros[1])
+        restaurada.armazenamento.fechar()
+        
+        final = _abrir(tmp_path)
+        assert final.obter_estatisticas().livros_disponiveis == 1
+        assert final.obter_usuario("ana").livros_emprestados == []
+        final.armazenamento.fechar()
+    
+    def test_snapshot_reinicia_diario(self, tmp_path):
+        """Teste que a recuperação usa o snapshot e só o final do diário."""
+        biblioteca = _abrir(tmp_path)
+        for i in range(5):
+            biblioteca.adicionar_livro(Livro(f"Livro {i}", "Autor", 2000))
+        usuario = Usuario("Ana")
+        biblioteca.registrar_usuario(usuario)
+        usuario.pegar_livro(biblioteca.livros[0])
+        
+        assert biblioteca.armazenamento.snapshot() == 7
+        assert _linhas_diario(tmp_path) == 0
+        
+        usuario.pegar_livro(biblioteca.livros[1])
+        biblioteca.armazenamento.fechar()
+        assert _linhas_diario(tmp_path) == 1
+        
+        restaurada = _abrir(tmp_path)
+        assert len(restaurada.livros) == 5
+        assert len(restaurada.obter_usuario("ana").livros_emprestados) == 2
+        assert restaurada.armazenamento.sequencia == (8, 8)
+        restaurada.armazenamento.fechar()
+    
+    def test_snapshot_cobre_operacoes_registradas(self, tmp_path):
+        """Teste que o snapshot reflete o diário, não o que a biblioteca já aplicou."""
+        biblioteca = _abrir(tmp_path)
+        livro = Livro("1984", "George Orwell", 1949)
+        biblioteca.adicionar_livro(livro)
+        # Registrado no diário, mas ainda não aplicado na biblioteca (como no meio de um empréstimo)
+        livro.data_emprestimo = datetime(2024, 3, 1, 10, 0)
+        biblioteca.armazenamento.emprestimo(livro, None)
+        
+        assert biblioteca.armazenamento.snapshot() == 2
+        biblioteca.armazenamento.fechar()
+        restaurada = _abrir(tmp_path)
+        assert restaurada.livros[0].disponivel is False
+        assert restaurada.livros[0].data_emprestimo == datetime(2024, 3, 1, 10, 0)
+        restaurada.armazenamento.fechar()
+    
+    def test_snapshot_concorrente_consistente(self, tmp_path):
+        """Teste snapshots durante empréstimos concorrentes sem perder operações."""
+        biblioteca = _abrir(tmp_path, sincrono=False, intervalo_snapshot=37)
+        for i in range(20):
+            biblioteca.adicionar_livro(Livro(f"Livro {i}", "Autor", 2000))
+        usuarios = [Usuario(f"Usuario {i}", limite_livros=20) for i in range(4)]
+        for usuario in usuarios:
+            biblioteca.registrar_usuario(usuario)
+        livros = biblioteca.livros
+        
+        def operar(indice):
+            usuario = usuarios[indice]
+            for rodada in range(100):
+                for livro in livros[indice::4]:
+                    if rodada % 2 == 0:
+                        biblioteca.emprestar(usuario, livro)
+                    else:
+                        biblioteca.devolver(usuario, livro)
+            for livro in livros[indice::8]:
+                biblioteca.emprestar(usuario, livro)
+        
+        threads = [threading.Thread(target=operar, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for _ in range(20):
+            biblioteca.armazenamento.snapshot()
+        for thread in threads:
+            thread.join()
+        biblioteca.armazenamento.fechar()
+        
+        restaurada = _abrir(tmp_path)
+        assert [(l.codigo, l.disponivel, l.data_emprestimo) for l in restaurada.livros] == \
+            [(l.codigo, l.disponivel, l.data_emprestimo) for l in livros]
+        assert [sorted(l.codigo for l in u.livros_emprestados) for u in restaurada.usuarios] == \
+            [sorted(l.codigo for l in u.livros_emprestados) for u in usuarios]
+        restaurada.armazenamento.fechar()
+    
+    def test_snapshot_automatico(self, tmp_path):
+        """Teste snapshot periódico pelo número de operações."""
+        biblioteca = _abrir(tmp_path, intervalo_snapshot=10)
+        for i in range(25):
+            biblioteca.adicionar_livro(Livro(f"Livro {i}", "Autor", 2000))
+        biblioteca.armazenamento.fechar()
+        
+        with open(os.path.join(tmp_path, ARQUIVO_SNAPSHOT), encoding="utf-8") as arquivo:
+            assert json.load(arquivo)["sequencia"] == 20
+        assert _linhas_diario(tmp_path) == 5
+        
+        restaurada = _abrir(tmp_path)
+        assert len(restaurada.livros) == 25
+        restaurada.armazenamento.fechar()
+    
+    def test_ultima_linha_incompleta_ignorada(self, tmp_path):
+        """Teste recuperação após queda no meio de uma escrita."""
+        biblioteca = _abrir(tmp_path)
+        biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949))
+        biblioteca.armazenamento.fechar()
+        with open(os.path.join(tmp_path, ARQUIVO_DIARIO), "a", encoding="utf-8") as arquivo:
+            arquivo.write('{"op": "livro", "seq": 2, "tit')
+        
+        restaurada = _abrir(tmp_path)
+        assert len(restaurada.livros) == 1
+        restaurada.armazenamento.fechar()
+    
+    def test_commit_em_grupo(self, tmp_path):
+        """Teste que operações concorrentes compartilham fsyncs."""
+        biblioteca = _abrir(tmp_path)
+        armazenamento = biblioteca.armazenamento
+        
+        def registrar(inicio):
+            for i in range(inicio, inicio + 50):
+                armazenamento.livros_adicionados([Livro(f"Livro {i}", "Autor", 2000)])
+        
+        threads = [threading.Thread(target=registrar, args=(i * 50,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert armazenamento.sequencia == (400, 400)
+        assert armazenamento.fsyncs < 400
+        armazenamento.fechar()
+        assert _linhas_diario(tmp_path) == 400
+    
+    def test_modo_assincrono(self, tmp_path):
+        """Teste que o modo assíncrono grava tudo ao fechar."""
+        biblioteca = _abrir(tmp_path, sincrono=False)
+        for i in range(100):
+            biblioteca.adicionar_livro(Livro(f"Livro {i}", "Autor", 2000))
+        biblioteca.armazenamento.fechar()
+        
+        assert _linhas_diario(tmp_path) == 100
+    
+    def test_snapshot_exige_estado_carregado(self, tmp_path):
+        """Teste snapshot antes de carregar e depois, sem biblioteca."""
+        armazenamento = ArmazenamentoDiario(str(tmp_path))
+        with pytest.raises(RuntimeError, match="estado carregado"):
+            armazenamento.snapshot()
+        
+        armazenamento.carregar()
+        assert armazenamento.snapshot() == 0
+        assert os.path.exists(os.path.join(tmp_path, ARQUIVO_SNAPSHOT))
+        armazenamento.fechar()
+    
+    def test_versao_de_snapshot_desconhecida(self, tmp_path):
+        """Teste rejeição de snapshot com versão incompatível."""
+        with open(os.path.join(tmp_path, ARQUIVO_SNAPSHOT), "w", encoding="utf-8") as arquivo:
+            json.dump({"versao": 99}, arquivo)
+        armazenamento = ArmazenamentoDiario(str(tmp_path))
+        with pytest.raises(ValueError, match="Versão de snapshot"):
+            armazenamento.carregar()
+        armazenamento.fechar()
+    
+    def test_falha_de_escrita_propagada(self, tmp_path):
+        """Teste que a falha do escritor chega a quem registra, sincroniza e fecha."""
+        biblioteca = _abrir(tmp_path)
+        livro = Livro("1984", "George Orwell", 1949)
+        biblioteca.adicionar_livro(livro)
+        biblioteca.registrar_usuario(Usuario("Ana"))
+        armazenamento = biblioteca.armazenamento
+        armazenamento._arquivo.close()
+        arquivo = armazenamento._arquivo = _ArquivoFalho()
+        
+        with pytest.raises(DiarioIndisponivel):
+            biblioteca.emprestar(biblioteca.obter_usuario("Ana"), livro)
+        assert livro.disponivel is True  # Empréstimo desfeito
+        assert isinstance(armazenamento.erro, OSError)
+        with pytest.raises(DiarioIndisponivel):
+            armazenamento.usuario_removido(Usuario("Ana"))
+        with pytest.raises(DiarioIndisponivel):
+            armazenamento.sincronizar()
+        with pytest.raises(DiarioIndisponivel):
+            armazenamento.fechar()
+        assert arquivo.fechado
+        assert not armazenamento._escritor.is_alive()
+    
+    def test_falha_de_escrita_assincrona(self, tmp_path):
+        """Teste que no modo assíncrono a falha aparece nas operações seguintes."""
+        armazenamento = ArmazenamentoDiario(str(tmp_path), sincrono=False)
+        armazenamento._arquivo.close()
+        armazenamento._arquivo = _ArquivoFalho()
+        armazenamento.livros_adicionados([Livro("1984", "George Orwell", 1949)])
+        armazenamento._escritor.join(timeout=2)
+        
+        assert isinstance(armazenamento.erro, OSError)
+        with pytest.raises(DiarioIndisponivel):
+            armazenamento.livros_adicionados([Livro("Emma", "Jane Austen", 1815)])
+        with pytest.raises(DiarioIndisponivel):
+            armazenamento.fechar()
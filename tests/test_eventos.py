@@ -0,0 +1,202 @@
+"""
+Testes unitários para os eventos e destinos (sinks)
+"""
+
+import io
+import pytest
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import eventos
+from biblioteca_melhorada import Livro, Obra, Usuario, Biblioteca
+
+
+@pytest.fixture
+def coletor():
+    """Instala um SinkColetor como destino padrão durante o teste."""
+    sink = eventos.SinkColetor()
+    anterior = eventos.definir_sink_padrao(sink)
+    yield sink
+    eventos.definir_sink_padrao(anterior)
+
+
+class TestEventos:
+    """Testes para a publicação de eventos tipados."""
+    
+    def test_eventos_de_emprestimo(self, coletor):
+        """Teste eventos publicados por pegar_livro e devolver_livro."""
+        usuario = Usuario("João", limite_livros=1)
+        livro = Livro("1984", "George Orwell", 1949)
+        outro = Livro("Animal Farm", "George Orwell", 1945)
+        
+        usuario.pegar_livro(livro)
+        usuario.pegar_livro(outro)
+        Usuario("Maria").pegar_livro(livro)
+        usuario.devolver_livro(livro)
+        usuario.devolver_livro(livro)
+        
+        tipos = [type(evento) for evento in coletor.eventos]
+        assert tipos == [
+            eventos.EmprestimoRealizado,
+            eventos.EmprestimoRecusadoLimite,
+            eventos.EmprestimoRecusadoIndisponivel,
+            eventos.DevolucaoRealizada,
+            eventos.DevolucaoRecusada,
+        ]
+        assert coletor.eventos[0].livro is livro
+        assert coletor.eventos[1].mensagem() == "❌ João atingiu o limite de 1 livros"
+    
+    def test_eventos_da_biblioteca(self, coletor):
+        """Teste eventos de cadastro na biblioteca."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        livro = Livro("1984", "George Orwell", 1949)
+        
+        biblioteca.adicionar_livro(livro)
+        biblioteca.adicionar_livro(livro)
+        biblioteca.registrar_usuario(Usuario("Ana", "ana@email.com"))
+        biblioteca.registrar_usuario(Usuario("ana"))
+        biblioteca.registrar_usuario(Usuario("Outra", "ANA@email.com"))
+        
+        mensagens = [evento.mensagem() for evento in coletor.eventos]
+        assert mensagens == [
+            "📖 Livro '1984' adicionado ao acervo",
+            "❌ Livro '1984' já está no acervo",
+            "👤 Usuário 'Ana' registrado com sucesso",
+            "❌ Usuário 'ana' já está registrado",
+            "❌ E-mail 'ANA@email.com' já está registrado",
+        ]
+    
+    def test_sink_proprio_da_biblioteca(self, coletor):
+        """Teste destino configurado por biblioteca."""
+        proprio = eventos.SinkColetor()
+        biblioteca = Biblioteca("Biblioteca Central", sink=proprio)
+        biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949))
+        
+        assert len(proprio.eventos) == 1
+        assert coletor.eventos == []
+
+    def test_operacoes_usam_sink_da_biblioteca(self, coletor, capsys):
+        """Teste empréstimos, devoluções e remoções publicados só no destino da biblioteca."""
+        proprio = eventos.SinkColetor()
+        biblioteca = Biblioteca("Biblioteca Central", sink=proprio)
+        livro = Livro("1984", "George Orwell", 1949, "978-0452284234")
+        ana = Usuario("Ana", limite_livros=1)
+        biblioteca.adicionar_livro(livro)
+        biblioteca.registrar_usuario(ana)
+
+        biblioteca.emprestar(ana, livro)
+        biblioteca.emprestar(ana, livro)
+        biblioteca.remover_livro(livro)
+        biblioteca.remover_usuario(ana)
+        biblioteca.devolver(ana, livro)
+        biblioteca.devolver(ana, livro)
+        biblioteca.devolver_livro("978-0452284234", "Ana")
+        biblioteca.emprestar_livro("000", "Ana")
+        biblioteca.emprestar_livro("978-0452284234", "ninguem")
+        biblioteca.remover_livro(livro)
+        biblioteca.remover_usuario(ana)
+
+        assert [type(evento) for evento in proprio.eventos[2:]] == [
+            eventos.EmprestimoRealizado,
+            eventos.EmprestimoRecusadoLimite,
+            eventos.LivroRemocaoRecusada,
+            eventos.UsuarioRemocaoRecusada,
+            eventos.DevolucaoRealizada,
+            eventos.DevolucaoRecusada,
+            eventos.DevolucaoRecusadaIsbn,
+            eventos.IsbnNaoEncontrado,
+            eventos.UsuarioNaoEncontrado,
+            eventos.LivroRemovido,
+            eventos.UsuarioRemovido,
+        ]
+        assert proprio.eventos[4].mensagem() == "❌ Livro '1984' está emprestado e não pode ser removido"
+        assert proprio.eventos[-1].mensagem() == "🗑️ Usuário 'Ana' removido"
+        assert coletor.eventos == []
+        assert capsys.readouterr().out == ""
+
+    def test_recusas_com_obra(self):
+        """Teste mensagens de recusa quando o pedido é por obra."""
+        obra = Obra("Dom Casmurro", "Machado de Assis", 1899)
+        ana = Usuario("Ana")
+        
+        assert eventos.EmprestimoRecusadoIndisponivel(ana, obra).mensagem() == \
+            "❌ O livro 'Dom Casmurro' não está disponível"
+        assert eventos.EmprestimoLoteRecusado(ana, [obra, Livro("1984", "George Orwell", 1949)], "indisponível").mensagem() == \
+            "❌ Empréstimo de 2 livro(s) para Ana recusado: indisponível"
+
+    def test_formatacao_sob_demanda(self):
+        """Teste que o SinkNulo nunca formata a mensagem."""
+        class EventoCaro(eventos.Evento):
+            def mensagem(self):
+                raise AssertionError("não deveria formatar")
+        
+        eventos.SinkNulo().emitir(EventoCaro())
+    
+    def test_evento_base_sem_mensagem(self):
+        """Teste que a classe base exige implementação."""
+        with pytest.raises(NotImplementedError):
+            eventos.Evento().mensagem()
+        with pytest.raises(NotImplementedError):
+            eventos.Sink().emitir(eventos.Evento())
+
+
+class TestSinks:
+    """Testes para os destinos de eventos."""
+    
+    def test_sink_console(self):
+        """Teste escrita imediata no console."""
+        fluxo = io.StringIO()
+        eventos.SinkConsole(fluxo).emitir(eventos.LivroAdicionado(Livro("1984", "George Orwell", 1949)))
+        assert fluxo.getvalue() == "📖 Livro '1984' adicionado ao acervo\n"
+    
+    def test_sink_buffer_escreve_em_lote(self):
+        """Teste que o buffer só escreve ao descarregar."""
+        fluxo = io.StringIO()
+        livro = Livro("1984", "George Orwell", 1949)
+        with eventos.SinkBuffer(fluxo, tamanho_lote=1000, intervalo=60) as sink:
+            for _ in range(3):
+                sink.emitir(eventos.LivroAdicionado(livro))
+            assert fluxo.getvalue() == ""
+            assert sink.descarregar() == 3
+            assert fluxo.getvalue().count("\n") == 3
+            sink.emitir(eventos.LivroAdicionado(livro))
+        
+        assert fluxo.getvalue().count("\n") == 4
+    
+    def test_sink_buffer_lote_cheio_acorda_thread(self):
+        """Teste escrita em segundo plano quando o lote enche."""
+        fluxo = io.StringIO()
+        sink = eventos.SinkBuffer(fluxo, tamanho_lote=2, intervalo=60)
+        livro = Livro("1984", "George Orwell", 1949)
+        sink.emitir(eventos.LivroAdicionado(livro))
+        sink.emitir(eventos.LivroAdicionado(livro))
+        sink.fechar()
+        
+        assert fluxo.getvalue().count("\n") == 2
+    
+    def test_sink_buffer_depois_de_fechar(self):
+        """Teste que eventos emitidos após fechar são escritos na hora."""
+        fluxo = io.StringIO()
+        sink = eventos.SinkBuffer(fluxo, tamanho_lote=1000, intervalo=60)
+        sink.fechar()
+        sink.emitir(eventos.LivroAdicionado(Livro("1984", "George Orwell", 1949)))
+        
+        assert fluxo.getvalue() == "📖 Livro '1984' adicionado ao acervo\n"
+    
+    def test_sink_buffer_tamanho_invalido(self):
+        """Teste validação do tamanho do lote."""
+        with pytest.raises(ValueError, match="Tamanho do lote deve ser positivo"):
+            eventos.SinkBuffer(tamanho_lote=0)
+    
+    def test_definir_sink_padrao(self):
+        """Teste troca e restauração do destino padrão."""
+        nulo = eventos.SinkNulo()
+        anterior = eventos.definir_sink_padrao(nulo)
+        try:
+            assert eventos.obter_sink_padrao() is nulo
+        finally:
+            eventos.definir_sink_padrao(anterior)
+        assert eventos.obter_sink_padrao() is anterior
@@ -0,0 +1,136 @@
+"""
+Testes unitários para a busca federada entre bibliotecas
+"""
+
+import threading
+import time
+import pytest
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import eventos
+from biblioteca_melhorada import Biblioteca, Livro
+from federacao import Federacao, relevancia
+
+
+class _FilialLenta(Biblioteca):
+    """Biblioteca que demora (ou falha) para responder às buscas."""
+    
+    def __init__(self, nome, atraso=0.0, erro=None, liberar=None):
+        super().__init__(nome, sink=eventos.SinkNulo())
+        self.atraso = atraso
+        self.erro = erro
+        self.liberar = liberar
+    
+    def buscar_livro(self, termo, exibir=True):
+        if self.liberar is not None:
+            self.liberar.wait(5)
+        time.sleep(self.atraso)
+        if self.erro is not None:
+            raise self.erro
+        return super().buscar_livro(termo, exibir)
+
+
+def _filial(nome, *livros, **opcoes):
+    """Filial com os livros informados como (título, autor, ano, isbn)."""
+    filial = _FilialLenta(nome, **opcoes)
+    for titulo, autor, ano, isbn in livros:
+        filial.adicionar_livro(Livro(titulo, autor, ano, isbn))
+    return filial
+
+
+class TestFederacao:
+    """Testes para a Federacao."""
+    
+    def test_combina_por_isbn_e_ordena(self):
+        """Teste deduplicação por ISBN, exemplares por filial e ranking."""
+        centro = _filial("Centro", ("Python Fluente", "Luciano Ramalho", 2015, "978-8575224625"),
+                         ("Aprendendo Python", "Mark Lutz", 2013, None))
+        norte = _filial("Norte", ("Python Fluente", "Luciano Ramalho", 2015, "9788575224625"),
+                        ("Python", "Guido", 2000, None))
+        norte.livros[0].emprestar()
+        
+        with Federacao([centro, norte]) as federacao:
+            busca = federacao.buscar("python", exibir=False)
+        
+        assert [resultado.titulo for resultado in busca.resultados] == [
+            "Python", "Python Fluente", "Aprendendo Python",
+        ]
+        fluente = busca.resultados[1]
+        assert sorted(fluente.filiais) == ["Centro", "Norte"]
+        assert fluente.disponiveis == 1
+        assert busca.incompletas == []
+        assert sorted(resposta.filial for resposta in busca.respostas) == ["Centro", "Norte"]
+    
+    def test_limite_e_exibicao(self, capsys):
+        """Teste top-k e uma única impressão para a rede toda."""
+        filiais = [_filial(f"F{i}", (f"Livro {i}", "Autor", 2000, f"isbn-{i}")) for i in range(4)]
+        with Federacao(filiais) as federacao:
+            busca = federacao.buscar("livro", limite=2)
+        assert len(busca.resultados) == 2
+        assert capsys.readouterr().out.count("Encontrados") == 1
+    
+    def test_consulta_em_paralelo(self):
+        """Teste que a latência total fica próxima da filial mais lenta."""
+        filiais = [_filial(f"F{i}", ("Dom Casmurro", "Machado", 1899, None), atraso=0.2) for i in range(5)]
+        with Federacao(filiais) as federacao:
+            inicio = time.monotonic()
+            busca = federacao.buscar("casmurro", exibir=False)
+            duracao = time.monotonic() - inicio
+        assert len(busca.resultados) == 1
+        assert len(busca.resultados[0].filiais) == 5
+        assert duracao < 0.6
+    
+    def test_prazo_por_filial(self):
+        """Teste resultados parciais quando uma filial estoura o prazo."""
+        liberar = threading.Event()
+        rapida = _filial("Rapida", ("1984", "George Orwell", 1949, None))
+        travada = _filial("Travada", ("1984", "George Orwell", 1949, None), liberar=liberar)
+        with Federacao([rapida, travada], tempo_limite=5.0, tempos_limite={"Travada": 0.1}) as federacao:
+            busca = federacao.buscar("1984", exibir=False)
+            assert busca.incompletas == ["Travada"]
+            assert busca.resultados[0].filiais == ["Rapida"]
+            
+            # Enquanto a busca anterior não termina, a filial não recebe outra
+            respostas = {resposta.filial: resposta for resposta in federacao.buscar_por_filial("1984")}
+            assert respostas["Travada"].expirou and respostas["Travada"].duracao == 0.0
+            assert respostas["Rapida"].completa
+            
+            liberar.set()
+            time.sleep(0.1)
+            assert federacao.buscar("1984", exibir=False).incompletas == []
+    
+    def test_respostas_parciais_e_erros(self):
+        """Teste entrega na ordem de chegada e isolamento de falhas."""
+        lenta = _filial("Lenta", ("Emma", "Jane Austen", 1815, None), atraso=0.2)
+        rapida = _filial("Rapida", ("Emma", "Jane Austen", 1815, None))
+        quebrada = _filial("Quebrada", erro=RuntimeError("banco fora do ar"))
+        recebidas = []
+        with Federacao([lenta, rapida, quebrada]) as federacao:
+            busca = federacao.buscar("emma", exibir=False, ao_receber=recebidas.append)
+        
+        assert recebidas[-1].filial == "Lenta"
+        assert [resposta.filial for resposta in recebidas] == [resposta.filial for resposta in busca.respostas]
+        erro = next(resposta for resposta in recebidas if resposta.filial == "Quebrada").erro
+        assert isinstance(erro, RuntimeError)
+        assert busca.incompletas == ["Quebrada"]
+        assert sorted(busca.resultados[0].filiais) == ["Lenta", "Rapida"]
+    
+    def test_relevancia(self):
+        """Teste pontuação por posição do termo no título."""
+        def pontos(titulo, autor="Autor"):
+            return relevancia("python", Livro(titulo, autor, 2000))
+        assert pontos("Python") > pontos("Python Fluente") > pontos("Aprendendo Python") \
+            > pontos("Guia Pythonico") > pontos("Outro", autor="Python Org")
+    
+    def test_filiais_invalidas(self):
+        """Teste validação das filiais e do prazo."""
+        with pytest.raises(ValueError):
+            Federacao([])
+        with pytest.raises(ValueError):
+            Federacao([_filial("A"), _filial("A")])
+        with pytest.raises(ValueError):
+            Federacao([_filial("A")], tempo_limite=0)
@@ -0,0 +1,142 @@
+"""
+Testes unitários para a Biblioteca fragmentada entre processos
+"""
+
+import os
+import threading
+import pytest
+import sys
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from biblioteca_melhorada import Livro, Usuario
+from fragmentos import BibliotecaFragmentada
+
+
+def _isbn_no_fragmento(biblioteca, indice, inicio=0):
+    """Primeiro ISBN sintético que cai no fragmento indicado."""
+    numero = inicio
+    while True:
+        isbn = f"978-{numero:09d}"
+        if biblioteca.fragmento_do_livro(Livro("x", "y", 2000, isbn)) == indice:
+            return isbn
+        numero += 1
+
+
+@pytest.fixture
+def biblioteca():
+    """Biblioteca com três fragmentos."""
+    with BibliotecaFragmentada("Rede de Bibliotecas", fragmentos=3) as biblioteca:
+        yield biblioteca
+
+
+class TestBibliotecaFragmentada:
+    """Testes para a BibliotecaFragmentada."""
+    
+    def test_fragmentos_invalidos(self):
+        """Teste quantidade de fragmentos inválida."""
+        with pytest.raises(ValueError):
+            BibliotecaFragmentada("Rede", fragmentos=0)
+    
+    def test_busca_e_estatisticas_combinadas(self, biblioteca):
+        """Teste consulta a todos os fragmentos."""
+        livros = [Livro(f"Livro {i}", "Autor Comum", 2000, f"isbn-{i}") for i in range(30)]
+        assert biblioteca.adicionar_livros(livros) == 30
+        biblioteca.adicionar_livro(Livro("Dom Casmurro", "Machado de Assis", 1899, "978-8535910663"))
+        assert biblioteca.registrar_usuario(Usuario("Ana"))
+        assert not biblioteca.registrar_usuario(Usuario("ana"))
+        
+        encontrados = biblioteca.buscar_livro("autor comum")
+        assert [livro.codigo for livro in encontrados] == [livro.codigo for livro in livros]
+        assert len(biblioteca.buscar_livro("livro", limite=5)) == 5
+        assert biblioteca.buscar_livro("machado")[0].titulo == "Dom Casmurro"
+        assert biblioteca.obter_livro_por_isbn("9788535910663").autor == "Machado de Assis"
+        assert biblioteca.obter_livro_por_isbn("000") is None
+        
+        estatisticas = biblioteca.obter_estatisticas()
+        assert estatisticas.total_livros == 31
+        assert estatisticas.total_usuarios == 1
+    
+    def test_busca_intercala_fragmentos_por_codigo(self, biblioteca):
+        """Teste ordem global quando exemplares da mesma obra alternam entre fragmentos."""
+        primeiro = _isbn_no_fragmento(biblioteca, 0)
+        isbns = [primeiro, _isbn_no_fragmento(biblioteca, 1),
+                 _isbn_no_fragmento(biblioteca, 0, int(primeiro[4:]) + 1)]
+        livros = [Livro(f"Python {i % 3}", "Autor", 2000, isbns[i % 3]) for i in range(9)]
+        biblioteca.adicionar_livros(livros)
+        
+        codigos = [livro.codigo for livro in livros]
+        assert [livro.codigo for livro in biblioteca.buscar_livro("python")] == codigos
+        assert [livro.codigo for livro in biblioteca.buscar_livro("python", limite=4)] == codigos[:4]
+    
+    def test_livro_sem_isbn_recusado(self, biblioteca):
+        """Teste que livros sem ISBN, inalcançáveis por empréstimo, não são distribuídos."""
+        with pytest.raises(ValueError, match="sem ISBN"):
+            biblioteca.adicionar_livros([Livro("Emma", "Jane Austen", 1815, "isbn-1"),
+                                         Livro("Persuasão", "Jane Austen", 1817)])
+        assert biblioteca.obter_estatisticas().total_livros == 0
+    
+    def test_emprestimo_no_mesmo_fragmento(self, biblioteca):
+        """Teste empréstimo e devolução quando usuário e livro estão juntos."""
+        biblioteca.registrar_usuario(Usuario("Ana"))
+        isbn = _isbn_no_fragmento(biblioteca, biblioteca.fragmento_do_usuario("Ana"))
+        biblioteca.adicionar_livro(Livro("Local", "Autor", 2000, isbn))
+        
+        assert biblioteca.emprestar_livro(isbn, "Ana")
+        assert not biblioteca.emprestar_livro(isbn, "Ana")
+        assert not biblioteca.obter_livro_por_isbn(isbn).disponivel
+        assert biblioteca.devolver_livro(isbn, "Ana")
+        assert not biblioteca.devolver_livro(isbn, "Ana")
+        assert biblioteca.obter_estatisticas().livros_emprestados == 0
+    
+    def test_emprestimo_entre_fragmentos(self, biblioteca):
+        """Teste empréstimo em duas fases com livro em outro fragmento."""
+        biblioteca.registrar_usuario(Usuario("Ana", limite_livros=2))
+        biblioteca.registrar_usuario(Usuario("Bruno"))
+        outro = (biblioteca.fragmento_do_usuario("Ana") + 1) % len(biblioteca)
+        isbns = [_isbn_no_fragmento(biblioteca, outro, inicio) for inicio in (0, 1000, 2000)]
+        for isbn in isbns:
+            biblioteca.adicionar_livro(Livro(f"Remoto {isbn}", "Autor", 2000, isbn))
+        
+        assert biblioteca.emprestar_livro(isbns[0], "Ana")
+        assert not biblioteca.emprestar_livro(isbns[0], "Bruno")
+        assert biblioteca.emprestar_livro(isbns[1], "Ana")
+        assert not biblioteca.emprestar_livro(isbns[2], "Ana")  # Limite atingido
+        assert biblioteca.obter_estatisticas().livros_emprestados == 2
+        
+        assert not biblioteca.devolver_livro(isbns[0], "Bruno")
+        assert biblioteca.devolver_livro(isbns[0], "Ana")
+        assert biblioteca.obter_livro_por_isbn(isbns[0]).disponivel
+        assert biblioteca.emprestar_livro(isbns[2], "Ana")
+        assert not biblioteca.emprestar_livro(isbns[0], "Fulano")
+    
+    def test_limite_com_pedidos_concorrentes(self, biblioteca):
+        """Teste que as reservas impedem ultrapassar o limite."""
+        biblioteca.registrar_usuario(Usuario("Ana", limite_livros=3))
+        isbns = [f"isbn-{i}" for i in range(24)]
+        biblioteca.adicionar_livros(Livro(f"Livro {i}", "Autor", 2000, isbn) for i, isbn in enumerate(isbns))
+        
+        resultados = []
+        threads = [
+            threading.Thread(target=lambda isbn=isbn: resultados.append(biblioteca.emprestar_livro(isbn, "Ana")))
+            for isbn in isbns
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert resultados.count(True) == 3
+        assert biblioteca.obter_estatisticas().livros_emprestados == 3
+    
+    def test_email_unico_entre_fragmentos(self, biblioteca):
+        """Teste que o mesmo e-mail não é aceito em fragmentos diferentes."""
+        nomes = [f"Usuário {i}" for i in range(10)]
+        ana = nomes[0]
+        outro = next(nome for nome in nomes if biblioteca.fragmento_do_usuario(nome) != biblioteca.fragmento_do_usuario(ana))
+        
+        assert biblioteca.registrar_usuario(Usuario(ana, "ana@email.com"))
+        assert not biblioteca.registrar_usuario(Usuario(outro, "ANA@email.com"))
+        assert not biblioteca.registrar_usuario(Usuario(ana, "outra@email.com"))
+        assert biblioteca.registrar_usuario(Usuario(outro, "outra@email.com"))
@@ -0,0 +1,112 @@
+"""
+Testes unitários para o histórico colunar de empréstimos
+"""
+
+import copy
+import math
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from biblioteca_melhorada import Livro, Usuario, Biblioteca
+from historico import SEM_USUARIO, HistoricoEmprestimos
+
+
+class TestHistoricoEmprestimos:
+    """Testes para o HistoricoEmprestimos."""
+    
+    def test_registra_emprestimo_e_devolucao(self):
+        """Teste linha aberta no empréstimo e fechada na devolução."""
+        historico = HistoricoEmprestimos(relogio=lambda: 500.0)
+        livro = Livro("1984", "George Orwell", 1949)
+        historico.emprestimo(livro, Usuario("Ana"), "Central", quando=100.0)
+        historico.emprestimo(Livro("Emma", "Jane Austen", 1815), filial="Norte", quando=200.0)
+        assert (len(historico), historico.em_aberto) == (2, 2)
+        
+        assert historico.devolucao(livro, "Norte") is False  # Outra filial
+        assert historico.devolucao(livro, "Central") is True
+        assert historico.devolucao(livro, "Central") is False
+        colunas = historico.colunas()
+        assert list(colunas.inicios) == [100.0, 200.0]
+        assert colunas.fins[0] == 500.0 and math.isnan(colunas.fins[1])
+        assert list(colunas.usuarios) == [0, SEM_USUARIO]
+        assert colunas.nomes_usuarios == ["Ana"]
+        assert [colunas.nomes_filiais[i] for i in colunas.filiais] == ["Central", "Norte"]
+        assert historico.em_aberto == 1
+    
+    def test_exemplares_da_mesma_obra_somam_no_titulo(self):
+        """Teste que o título é o da obra, não o do exemplar."""
+        historico = HistoricoEmprestimos()
+        biblioteca = Biblioteca("Central", historico=historico)
+        for _ in range(2):
+            biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949, "978-0452284234"))
+        ana, bruno = Usuario("Ana"), Usuario("Bruno")
+        biblioteca.registrar_usuario(ana)
+        biblioteca.registrar_usuario(bruno)
+        obra = biblioteca.obter_obra("978-0452284234")
+        biblioteca.emprestar(ana, obra)
+        biblioteca.emprestar(bruno, obra)
+        
+        colunas = historico.colunas()
+        assert list(colunas.titulos) == [0, 0]
+        assert colunas.nomes_titulos == ["1984"]
+        assert colunas.nomes_filiais == ["Central"]
+        assert len(set(colunas.livros)) == 2
+    
+    def test_biblioteca_registra_operacoes(self):
+        """Teste empréstimos e devoluções avulsos e em lote, sem registrar rollbacks."""
+        historico = HistoricoEmprestimos()
+        biblioteca = Biblioteca("Central", historico=historico)
+        livros = [Livro(f"Livro {i}", "Autor", 2000) for i in range(3)]
+        for livro in livros:
+            biblioteca.adicionar_livro(livro)
+        ana = Usuario("Ana", limite_livros=2)
+        biblioteca.registrar_usuario(ana)
+        
+        biblioteca.emprestar(ana, livros[0])
+        biblioteca.devolver(ana, livros[0])
+        assert biblioteca.emprestar_lote(ana, livros) is False
+        biblioteca.emprestar_lote(ana, livros[1:])
+        biblioteca.devolver_lote(ana, livros[1:])
+        
+        colunas = historico.colunas()
+        assert list(colunas.livros) == [livro.codigo for livro in livros]
+        assert not any(math.isnan(fim) for fim in colunas.fins)
+        assert historico.em_aberto == 0
+    
+    def test_filiais_com_o_mesmo_codigo(self):
+        """Teste que a devolução em uma filial não fecha o empréstimo de outra."""
+        historico = HistoricoEmprestimos()
+        central = Biblioteca("Central", historico=historico)
+        norte = Biblioteca("Norte", historico=historico)
+        livro = Livro("1984", "George Orwell", 1949)
+        replica = copy.copy(livro)  # Mesmo código, como em uma réplica ou outro armazenamento
+        central.adicionar_livro(livro)
+        norte.adicionar_livro(replica)
+        ana, bruno = Usuario("Ana"), Usuario("Bruno")
+        central.registrar_usuario(ana)
+        norte.registrar_usuario(bruno)
+        
+        central.emprestar(ana, livro)
+        norte.emprestar(bruno, replica)
+        norte.devolver(bruno, replica)
+        
+        colunas = historico.colunas()
+        assert list(colunas.livros) == [livro.codigo, livro.codigo]
+        assert math.isnan(colunas.fins[0]) and not math.isnan(colunas.fins[1])
+        assert historico.em_aberto == 1
+    
+    def test_copia_independente_e_limpeza(self):
+        """Teste que o retrato não muda com registros posteriores."""
+        historico = HistoricoEmprestimos()
+        historico.emprestimo(Livro("1984", "George Orwell", 1949), quando=1.0)
+        colunas = historico.colunas()
+        historico.emprestimo(Livro("Emma", "Jane Austen", 1815), quando=2.0)
+        assert len(colunas) == 1
+        
+        historico.limpar()
+        assert (len(historico), historico.em_aberto) == (0, 0)
+        assert historico.colunas().nomes_titulos == []
+
@@ -0,0 +1,119 @@
+"""
+Testes unitários para a importação em massa de livros
+"""
+
+import io
+import json
+import pytest
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from biblioteca_melhorada import Biblioteca
+from importacao import em_lotes, ler_registros
+
+
+CSV = """titulo,autor,ano,isbn
+Dom Casmurro,Machado de Assis,1899,978-85-254-1234-5
+,Sem Título,2000,
+O Cortiço,Aluísio Azevedo,1890,
+Futuro,Autor,3000,
+Ano Ruim,Autor,abc,
+"""
+
+
+class TestLeituraRegistros:
+    """Testes para a leitura em fluxo."""
+    
+    def test_ler_csv_de_caminho(self, tmp_path):
+        """Teste leitura de CSV deduzindo o formato pela extensão."""
+        caminho = tmp_path / "acervo.csv"
+        caminho.write_text(CSV, encoding="utf-8")
+        
+        registros = list(ler_registros(caminho))
+        assert len(registros) == 5
+        assert registros[0] == (1, {"titulo": "Dom Casmurro", "autor": "Machado de Assis",
+                                    "ano": "1899", "isbn": "978-85-254-1234-5"})
+    
+    def test_ler_jsonl_ignora_linhas_vazias(self):
+        """Teste leitura de JSONL a partir de arquivo aberto."""
+        arquivo = io.StringIO('{"titulo": "A"}\n\nnão é json\n')
+        registros = list(ler_registros(arquivo, "jsonl"))
+        
+        assert registros[0] == (1, {"titulo": "A"})
+        assert registros[1][0] == 3
+        assert isinstance(registros[1][1], ValueError)
+    
+    def test_formatos_invalidos(self, tmp_path):
+        """Teste validação de formato."""
+        with pytest.raises(ValueError, match="Formato deve ser um de"):
+            list(ler_registros([], "xml"))
+        with pytest.raises(ValueError, match="Formato não reconhecido"):
+            list(ler_registros(tmp_path / "acervo.txt"))
+        with pytest.raises(ValueError, match="Informe o formato"):
+            list(ler_registros(io.StringIO("")))
+    
+    def test_em_lotes(self):
+        """Teste agrupamento em lotes."""
+        assert [len(lote) for lote in em_lotes(range(7), 3)] == [3, 3, 1]
+        with pytest.raises(ValueError, match="Tamanho do lote deve ser positivo"):
+            list(em_lotes(range(3), 0))
+
+
+class TestImportarLivros:
+    """Testes para Biblioteca.importar_livros."""
+    
+    def test_importar_csv(self, tmp_path, capsys):
+        """Teste importação com linhas rejeitadas à parte."""
+        caminho = tmp_path / "acervo.csv"
+        caminho.write_text(CSV, encoding="utf-8")
+        biblioteca = Biblioteca("Biblioteca Central")
+        
+        relatorio = biblioteca.importar_livros(str(caminho), tamanho_lote=2)
+        captured = capsys.readouterr()
+        
+        assert relatorio.importados == 2
+        assert relatorio.total == 5
+        assert [rejeitado.linha for rejeitado in relatorio.rejeitados] == [2, 4, 5]
+        assert relatorio.rejeitados[0].motivo == "Campos obrigatórios ausentes: titulo"
+        assert "Ano inválido" in relatorio.rejeitados[1].motivo
+        assert "📦 Lote importado: 1 livro(s), 1 rejeitado(s)" in captured.out
+        assert "📖" not in captured.out
+    
+    def test_livros_importados_entram_nos_indices(self):
+        """Teste índices e contadores atualizados pela importação."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        biblioteca.importar_livros([
+            {"titulo": "1984", "autor": "George Orwell", "ano": 1949, "isbn": "978-0452284234"},
+            {"titulo": "Animal Farm", "autor": "George Orwell", "ano": 1945},
+        ])
+        
+        assert len(biblioteca.buscar_livro("orwell")) == 2
+        assert biblioteca.obter_livro_por_isbn("9780452284234").titulo == "1984"
+        assert biblioteca.obter_estatisticas().livros_disponiveis == 2
+        
+        livro = biblioteca.obter_livro_por_isbn("9780452284234")
+        livro.emprestar()
+        assert biblioteca.obter_estatisticas().livros_emprestados == 1
+    
+    def test_importar_jsonl_com_registros_invalidos(self, tmp_path):
+        """Teste rejeição de JSON inválido, tipos errados e campos ausentes."""
+        caminho = tmp_path / "acervo.jsonl"
+        linhas = [
+            json.dumps({"titulo": "1984", "autor": "George Orwell", "ano": 1949}),
+            "{quebrado",
+            json.dumps(["não", "é", "objeto"]),
+            json.dumps({"titulo": "Sem autor", "ano": 2000}),
+        ]
+        caminho.write_text("\n".join(linhas), encoding="utf-8")
+        biblioteca = Biblioteca("Biblioteca Central")
+        
+        relatorio = biblioteca.importar_livros(caminho)
+        
+        assert relatorio.importados == 1
+        motivos = [rejeitado.motivo for rejeitado in relatorio.rejeitados]
+        assert "JSON inválido" in motivos[0]
+        assert "Registro deve ser um objeto" in motivos[1]
+        assert "Campos obrigatórios ausentes: autor" in motivos[2]
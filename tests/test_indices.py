@@ -0,0 +1,168 @@
+"""
+Testes unitários para os índices da Biblioteca
+"""
+
+import pytest
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from indices import IndiceOrdenado, IndiceTextual
+
+
+class TestIndiceTextual:
+    """Testes para o índice invertido de n-gramas."""
+    
+    @pytest.fixture
+    def indice(self):
+        """Índice com alguns registros."""
+        indice = IndiceTextual()
+        indice.adicionar(10, "1984", "George Orwell")
+        indice.adicionar(20, "Animal Farm", "George Orwell")
+        indice.adicionar(30, "Dom Casmurro", "Machado de Assis")
+        return indice
+    
+    def test_busca_por_substring(self, indice):
+        """Teste busca por trecho no meio de uma palavra."""
+        assert indice.buscar("rwel") == [10, 20]
+        assert indice.buscar("smur") == [30]
+    
+    def test_busca_termos_curtos(self, indice):
+        """Teste busca com termos menores que o n-grama."""
+        assert indice.buscar("1") == [10]
+        assert indice.buscar("do") == [30]
+    
+    def test_busca_case_insensitive(self, indice):
+        """Teste busca ignorando maiúsculas."""
+        assert indice.buscar("MACHADO") == [30]
+    
+    def test_busca_nao_atravessa_campos(self, indice):
+        """Teste que o termo não casa com a junção de título e autor."""
+        assert indice.buscar("1984george") == []
+    
+    def test_busca_termo_vazio_retorna_todos(self, indice):
+        """Teste termo vazio (mesma semântica de substring)."""
+        assert indice.buscar("") == [10, 20, 30]
+    
+    def test_ordem_de_indexacao(self):
+        """Teste resultados na ordem em que foram indexados."""
+        indice = IndiceTextual()
+        indice.adicionar(5, "Livro B", "Autor")
+        indice.adicionar(1, "Livro A", "Autor")
+        assert indice.buscar("livro") == [5, 1]
+    
+    def test_remover(self, indice):
+        """Teste remoção de registro do índice."""
+        assert indice.remover(10) is True
+        assert indice.buscar("orwell") == [20]
+        assert indice.remover(10) is False
+        assert len(indice) == 2
+    
+    def test_equivalente_a_varredura(self):
+        """Teste resultado idêntico à busca linear original."""
+        registros = {
+            1: ("O Cortiço", "Aluísio Azevedo"),
+            2: ("Auto da Compadecida", "Ariano Suassuna"),
+            3: ("Clean Code", "Robert C. Martin"),
+            4: ("Python Fluente", "Luciano Ramalho"),
+        }
+        indice = IndiceTextual()
+        for codigo, (titulo, autor) in registros.items():
+            indice.adicionar(codigo, titulo, autor)
+        
+        for termo in ["o", "an", "ção", "uto da", "ramalho", "c. m", "zz"]:
+            esperado = [
+                codigo for codigo, (titulo, autor) in registros.items()
+                if termo.lower() in titulo.lower() or termo.lower() in autor.lower()
+            ]
+            assert indice.buscar(termo) == esperado
+
+    
+    def test_busca_ignora_acentos(self):
+        """Teste busca sem acentos encontrando títulos acentuados e vice-versa."""
+        indice = IndiceTextual()
+        indice.adicionar(1, "Açúcar Amargo", "João Ninguém")
+        indice.adicionar(2, "Acucar", "Sem Acento")
+        
+        assert indice.buscar("acucar") == [1, 2]
+        assert indice.buscar("AÇÚCAR") == [1, 2]
+        assert indice.buscar("joao") == [1]
+        assert IndiceTextual.normalizar("ﬁm Ç") == "fim c"
+    
+    def test_busca_aproximada_tolera_erros(self, indice):
+        """Teste busca aproximada com erro de digitação."""
+        resultado = indice.buscar_aproximado("Machdo")
+        assert [codigo for codigo, _ in resultado] == [30]
+        assert 0 < resultado[0][1] < 1
+        assert indice.buscar_aproximado("xyzw") == []
+    
+    def test_busca_aproximada_ordena_por_relevancia(self):
+        """Teste ordenação pela média das melhores similaridades."""
+        indice = IndiceTextual()
+        indice.adicionar(1, "Memórias Póstumas", "Machado de Assis")
+        indice.adicionar(2, "Dom Casmurro", "Machado de Assis")
+        indice.adicionar(3, "Dom Quixote", "Cervantes")
+        
+        resultado = indice.buscar_aproximado("dom casmuro", limite=2)
+        assert [codigo for codigo, _ in resultado] == [2, 3]
+        assert resultado[0][1] > resultado[1][1]
+        assert indice.buscar_aproximado("memorias postumas")[0] == (1, 1.0)
+    
+    def test_busca_aproximada_apos_remocao(self, indice):
+        """Teste vocabulário atualizado ao remover registros."""
+        indice.remover(30)
+        assert indice.buscar_aproximado("casmurro") == []
+        assert "casmurro" not in indice._palavras
+    
+    def test_candidatas_limitadas(self):
+        """Teste limite de palavras candidatas por consulta."""
+        indice = IndiceTextual()
+        indice.MAXIMO_CANDIDATOS = 5
+        for codigo in range(50):
+            indice.adicionar(codigo, f"livro{codigo:03d}", "autor")
+        
+        semelhantes = indice.palavras_semelhantes("livro007", minimo=0.0)
+        assert 0 < len(semelhantes) <= indice.MAXIMO_PALAVRAS
+        assert semelhantes[0] == (1.0, "livro007")
+
+
+class TestIndiceOrdenado:
+    """Testes para o IndiceOrdenado."""
+    
+    def test_ordem_com_muitos_blocos(self):
+        """Teste ordenação, remoção e divisão de blocos."""
+        import random
+        aleatorio = random.Random(7)
+        indice = IndiceOrdenado()
+        entradas = [(aleatorio.randrange(100), codigo) for codigo in range(5000)]
+        for chave, codigo in entradas:
+            indice.adicionar(chave, codigo)
+        for chave, codigo in entradas[::3]:
+            assert indice.remover(chave, codigo)
+        assert not indice.remover(-1, 0)
+        
+        restantes = sorted(set(entradas) - set(entradas[::3]))
+        assert len(indice) == len(restantes)
+        assert len(indice._blocos) > 1
+        assert list(indice.iterar()) == restantes
+    
+    def test_iterar_a_partir_de_cursor(self):
+        """Teste continuação exclusiva a partir de uma entrada."""
+        indice = IndiceOrdenado()
+        for codigo, chave in enumerate(["c", "a", "b", "a"]):
+            indice.adicionar(chave, codigo)
+        
+        assert list(indice.iterar(("a", 1), inclusivo=False)) == [("a", 3), ("b", 2), ("c", 0)]
+        assert list(indice.iterar(("a", 3))) == [("a", 3), ("b", 2), ("c", 0)]
+        assert list(indice.iterar(("z", 0))) == []
+    
+    def test_intervalo(self):
+        """Teste consulta por intervalo inclusivo."""
+        indice = IndiceOrdenado()
+        for codigo, ano in enumerate([1899, 1890, 1901, 1900, 1889]):
+            indice.adicionar(ano, codigo)
+        
+        assert list(indice.intervalo(1890, 1900)) == [1, 0, 3]
+        assert list(indice.intervalo(1950, 2000)) == []
@@ -0,0 +1,127 @@
+"""
+Testes unitários para as métricas de operação
+"""
+
+import os
+import pytest
+import sys
+import urllib.request
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import metricas
+from biblioteca_melhorada import Biblioteca, Livro, Usuario
+from metricas import Histograma, Metricas
+
+
+@pytest.fixture
+def registro():
+    """Instrumentação ligada durante o teste."""
+    registro = metricas.ativar()
+    yield registro
+    metricas.desativar()
+
+
+class TestHistograma:
+    """Testes para o histograma com erro relativo limitado."""
+    
+    def test_baldes_contiguos(self):
+        """Teste que cada valor cai em um balde cujo limite o contém."""
+        anterior = -1
+        for valor in range(5000):
+            indice = Histograma.balde(valor)
+            assert indice in (anterior, anterior + 1)
+            assert valor <= Histograma.limite_superior(indice)
+            anterior = indice
+    
+    def test_percentis_com_erro_limitado(self):
+        """Teste percentis dentro do erro relativo de 12,5%."""
+        histograma = Histograma()
+        for valor in range(1, 100_001):
+            histograma.registrar(valor * 1000)
+        
+        for fracao in (0.5, 0.9, 0.99):
+            exato = fracao * 100_000 * 1000
+            assert abs(histograma.percentil(fracao) - exato) / exato <= 0.125
+        assert histograma.percentil(1.0) == histograma.maximo == 100_000_000
+        assert histograma.minimo == 1000
+        assert Histograma().percentil(0.5) == 0
+    
+    def test_acumulado_exato_em_potencias_de_dois(self):
+        """Teste contagem exata abaixo de uma potência de dois."""
+        histograma = Histograma()
+        for valor in range(3000):
+            histograma.registrar(valor)
+        assert histograma.acumulado_ate(1024) == 1024
+        assert histograma.acumulado_ate(2048) == 2048
+
+
+class TestMetricas:
+    """Testes para o registro e a instrumentação."""
+    
+    def test_instrumentacao_conta_resultados(self, registro):
+        """Teste contagem de execuções, recusas e latências."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        biblioteca.adicionar_livro(Livro("Python Fluente", "Luciano Ramalho", 2015, "111"))
+        biblioteca.registrar_usuario(Usuario("Ana", "ana@email.com"))
+        
+        assert biblioteca.emprestar_livro("111", "ana") is True
+        assert biblioteca.emprestar_livro("111", "ana") is False
+        biblioteca.buscar_livro("python", exibir=False)
+        
+        retrato = registro.instantaneo()
+        emprestimos = retrato["Biblioteca.emprestar_livro"]
+        assert (emprestimos.total, emprestimos.recusadas, emprestimos.erros) == (2, 1, 0)
+        assert 0 < emprestimos.minimo <= emprestimos.p50 <= emprestimos.maximo
+        assert retrato["Biblioteca.buscar_livro"].total == 1
+        pegar = retrato["Usuario.pegar_livro"]
+        assert (pegar.total, pegar.recusadas) == (2, 1)
+    
+    def test_erros_contados(self, registro):
+        """Teste contagem de exceções sem engoli-las."""
+        biblioteca = Biblioteca("Biblioteca Central")
+        with pytest.raises(ValueError):
+            biblioteca.paginar_livros(limite=0)
+        with pytest.raises(AttributeError):
+            biblioteca.adicionar_livro(None)
+        assert registro.instantaneo()["Biblioteca.adicionar_livro"].erros == 1
+    
+    def test_desativar_restaura_originais(self):
+        """Teste que, desligada, a instrumentação não deixa rastros."""
+        original = Biblioteca.__dict__["buscar_livro"]
+        metricas.ativar()
+        assert Biblioteca.__dict__["buscar_livro"] is not original
+        assert metricas.metricas_ativas() is not None
+        metricas.desativar()
+        assert Biblioteca.__dict__["buscar_livro"] is original
+        assert metricas.metricas_ativas() is None
+    
+    def test_formato_prometheus(self, registro, tmp_path):
+        """Teste exportação em texto e gravação em arquivo."""
+        registro.registrar("teste", 1500)
+        registro.registrar("teste", 3000, metricas.RECUSADO)
+        texto = registro.para_prometheus()
+        
+        assert '# TYPE biblioteca_operacao_segundos histogram' in texto
+        assert 'biblioteca_operacoes_total{operacao="teste",resultado="recusado"} 1' in texto
+        assert 'biblioteca_operacao_segundos_bucket{operacao="teste",le="2.048e-06"} 1' in texto
+        assert 'biblioteca_operacao_segundos_bucket{operacao="teste",le="+Inf"} 2' in texto
+        assert 'biblioteca_operacao_segundos_count{operacao="teste"} 2' in texto
+        
+        caminho = tmp_path / "biblioteca.prom"
+        registro.escrever(str(caminho))
+        assert caminho.read_text(encoding="utf-8") == texto
+    
+    def test_servir_por_http(self):
+        """Teste exposição das métricas em um socket local."""
+        registro = Metricas()
+        registro.registrar("teste", 1000)
+        servidor = registro.servir()
+        try:
+            endereco = f"http://127.0.0.1:{servidor.server_address[1]}/metrics"
+            with urllib.request.urlopen(endereco, timeout=5) as resposta:
+                assert "biblioteca_operacoes_total" in resposta.read().decode("utf-8")
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
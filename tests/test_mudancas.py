@@ -0,0 +1,133 @@
+"""
+Testes unitários para o fluxo de mudanças (change data capture)
+"""
+
+import threading
+import time
+import pytest
+import sys
+import os
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import eventos
+from biblioteca_melhorada import Livro, Usuario, Biblioteca
+from mudancas import FluxoMudancas, MudancasDescartadas
+
+
+@pytest.fixture(autouse=True)
+def sem_mensagens():
+    """Silencia os eventos publicados no destino padrão."""
+    anterior = eventos.definir_sink_padrao(eventos.SinkNulo())
+    yield
+    eventos.definir_sink_padrao(anterior)
+
+
+class TestFluxoMudancas:
+    """Testes para o FluxoMudancas."""
+
+    def test_registra_mutacoes_em_ordem(self):
+        """Teste versões consecutivas para cadastro, empréstimo e devolução."""
+        fluxo = FluxoMudancas()
+        biblioteca = Biblioteca("Central", sink=eventos.SinkNulo(), mudancas=fluxo)
+        livro = Livro("1984", "George Orwell", 1949, "978-0452284234")
+        ana = Usuario("Ana", "ana@email.com")
+        biblioteca.adicionar_livro(livro)
+        biblioteca.registrar_usuario(ana)
+        biblioteca.emprestar(ana, livro)
+        biblioteca.devolver(ana, livro)
+        biblioteca.remover_livro(livro)
+        biblioteca.remover_usuario(ana)
+
+        mudancas = list(fluxo.mudancas_desde(0))
+        assert [m.versao for m in mudancas] == [1, 2, 3, 4, 5, 6]
+        assert [m.operacao for m in mudancas] == [
+            "livro", "usuario", "emprestimo", "devolucao", "remover_livro", "remover_usuario",
+        ]
+        assert mudancas[0].dados["isbn"] == "978-0452284234"
+        assert mudancas[1].dados == {"nome": "Ana", "email": "ana@email.com", "limite": 3}
+        assert mudancas[2].dados["usuario"] == "Ana" and mudancas[2].dados["data"] is not None
+        assert [m.versao for m in fluxo.mudancas_desde(4)] == [5, 6]
+        assert fluxo.versao == 6
+
+    def test_lotes_e_recusas(self):
+        """Teste lote registrado em versões consecutivas e lote recusado fora do fluxo."""
+        fluxo = FluxoMudancas()
+        biblioteca = Biblioteca("Central", sink=eventos.SinkNulo(), mudancas=fluxo)
+        livros = [Livro(f"Livro {i}", "Autor", 2000) for i in range(3)]
+        biblioteca.importar_livros(
+            {"titulo": livro.titulo, "autor": livro.autor, "ano": livro.ano} for livro in livros
+        )
+        livros = biblioteca.livros
+        ana = Usuario("Ana", limite_livros=2)
+        biblioteca.registrar_usuario(ana)
+        inicio = fluxo.versao
+
+        assert biblioteca.emprestar_lote(ana, livros) is False  # Acima do limite
+        assert fluxo.versao == inicio
+        assert biblioteca.emprestar_lote(ana, livros[:2]) is True
+        assert biblioteca.devolver_lote(ana, livros[:2]) is True
+        mudancas = list(fluxo.mudancas_desde(inicio))
+        assert [m.operacao for m in mudancas] == ["emprestimo"] * 2 + ["devolucao"] * 2
+        assert [m.dados["codigo"] for m in mudancas] == [l.codigo for l in livros[:2]] * 2
+
+    def test_anexar_registra_estado_atual(self):
+        """Teste que o estado existente vira as primeiras mudanças."""
+        biblioteca = Biblioteca("Central", sink=eventos.SinkNulo())
+        livro = Livro("Emma", "Jane Austen", 1815)
+        ana = Usuario("Ana")
+        biblioteca.adicionar_livro(livro)
+        biblioteca.registrar_usuario(ana)
+        biblioteca.emprestar(ana, livro)
+
+        fluxo = FluxoMudancas()
+        fluxo.anexar(biblioteca)
+        mudancas = list(fluxo.mudancas_desde(0))
+        assert [m.operacao for m in mudancas] == ["livro", "usuario", "emprestimo"]
+        assert mudancas[2].dados == {
+            "codigo": livro.codigo, "usuario": "Ana", "data": livro.data_emprestimo,
+        }
+
+    def test_consumidor_espera_novas_mudancas(self):
+        """Teste fluxo contínuo: espera pela próxima mudança e termina ao fechar."""
+        fluxo = FluxoMudancas()
+        biblioteca = Biblioteca("Central", sink=eventos.SinkNulo(), mudancas=fluxo)
+        assert list(fluxo.mudancas_desde(0)) == []
+
+        recebidas = []
+
+        def consumir():
+            for mudanca in fluxo.mudancas_desde(0, tempo_limite=None):
+                recebidas.append(mudanca.versao)
+
+        consumidor = threading.Thread(target=consumir)
+        consumidor.start()
+        time.sleep(0.05)
+        biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949))
+        biblioteca.adicionar_livro(Livro("Emma", "Jane Austen", 1815))
+        fluxo.fechar()
+        consumidor.join(timeout=2)
+        assert not consumidor.is_alive()
+        assert recebidas == [1, 2]
+
+        inicio = time.perf_counter()
+        assert list(fluxo.mudancas_desde(2, tempo_limite=0.05)) == []
+        assert time.perf_counter() - inicio < 0.05  # Fechado: não espera
+
+    def test_retencao(self):
+        """Teste descarte das mudanças antigas e versões inválidas."""
+        fluxo = FluxoMudancas(retencao=2)
+        biblioteca = Biblioteca("Central", sink=eventos.SinkNulo(), mudancas=fluxo)
+        for i in range(5):
+            biblioteca.adicionar_livro(Livro(f"Livro {i}", "Autor", 2000))
+
+        assert fluxo.versao == 5
+        assert len(fluxo) == 2 and fluxo.versao_minima == 3
+        assert [m.versao for m in fluxo.mudancas_desde(3)] == [4, 5]
+        with pytest.raises(MudancasDescartadas):
+            list(fluxo.mudancas_desde(2))
+        with pytest.raises(ValueError):
+            list(fluxo.mudancas_desde(6))
+        with pytest.raises(ValueError):
+            FluxoMudancas(retencao=0)
@@ -0,0 +1,164 @@
+"""
+Testes unitários para as réplicas de leitura
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import eventos
+from armazenamento import ArmazenamentoSQLite
+from biblioteca_melhorada import Livro, Usuario, Biblioteca
+from mudancas import FluxoMudancas, MudancasDescartadas
+from replicacao import Replica
+
+
+@pytest.fixture(autouse=True)
+def sem_mensagens():
+    """Silencia os eventos publicados no destino padrão."""
+    anterior = eventos.definir_sink_padrao(eventos.SinkNulo())
+    yield
+    eventos.definir_sink_padrao(anterior)
+
+
+def _biblioteca(nome, **opcoes):
+    return Biblioteca(nome, sink=eventos.SinkNulo(), **opcoes)
+
+
+def _retrato(biblioteca):
+    """Estado observável por leitores: acervo, usuários, portadores e estatísticas."""
+    return (
+        [(l.codigo, l.titulo, l.disponivel, l.data_emprestimo) for l in biblioteca.livros],
+        [(u.nome, u.email, sorted(l.codigo for l in u.livros_emprestados)) for u in biblioteca.usuarios],
+        biblioteca.obter_estatisticas(),
+    )
+
+
+class TestReplica:
+    """Testes para a Replica."""
+
+    def test_seguidora_reproduz_a_principal(self):
+        """Teste cadastro, empréstimos avulsos e em lote, devoluções e remoções."""
+        fluxo = FluxoMudancas()
+        principal = _biblioteca("Principal", mudancas=fluxo)
+        seguidora = _biblioteca("Réplica")
+        replica = Replica(fluxo, seguidora)
+
+        livros = [Livro(f"Python {i}", "Autor", 2000 + i, f"isbn-{i}") for i in range(5)]
+        for livro in livros:
+            principal.adicionar_livro(livro)
+        ana, bruno = Usuario("Ana", "ana@email.com"), Usuario("Bruno")
+        principal.registrar_usuario(ana)
+        principal.registrar_usuario(bruno)
+        principal.emprestar(ana, livros[0])
+        principal.emprestar_lote(bruno, livros[1:3])
+        assert replica.sincronizar() == fluxo.versao == 10
+        assert _retrato(seguidora) == _retrato(principal)
+
+        principal.devolver(ana, livros[0])
+        principal.devolver_lote(bruno, [livros[1]])
+        livros[4].emprestar()  # Sem usuário
+        principal.remover_livro(livros[3])
+        principal.remover_usuario(ana)
+        assert replica.atraso == 5
+        replica.sincronizar()
+        assert replica.atraso == 0
+        assert _retrato(seguidora) == _retrato(principal)
+        assert seguidora.obter_portador(seguidora.obter_livro(livros[2].codigo)).nome == "Bruno"
+        assert [l.titulo for l in seguidora.buscar_livro("python", exibir=False)] == \
+            ["Python 0", "Python 1", "Python 2", "Python 4"]
+        futuro = datetime(2100, 1, 1)
+        assert [(e.livro.codigo, e.vencimento) for e in seguidora.emprestimos_vencidos(ate=futuro)] == \
+            [(e.livro.codigo, e.vencimento) for e in principal.emprestimos_vencidos(ate=futuro)]
+
+    def test_seguidora_silenciosa_por_padrao(self, capsys):
+        """Teste que a seguidora sem destino próprio não escreve no console."""
+        eventos.definir_sink_padrao(eventos.SinkConsole())
+        fluxo = FluxoMudancas()
+        principal = _biblioteca("Principal", mudancas=fluxo)
+        seguidora = Biblioteca("Réplica")
+        coletor = eventos.SinkColetor()
+        proprio = Biblioteca("Outra réplica", sink=coletor)
+        Replica(fluxo, proprio)
+
+        principal.adicionar_livro(Livro("1984", "George Orwell", 1949))
+        assert Replica(fluxo, seguidora).sincronizar() == 1
+        assert isinstance(seguidora.sink, eventos.SinkNulo)
+        assert proprio.sink is coletor
+        assert capsys.readouterr().out == ""
+
+    def test_replica_do_estado_existente(self, tmp_path):
+        """Teste réplica vazia a partir de uma principal restaurada do armazenamento."""
+        caminho = str(tmp_path / "biblioteca.db")
+        with ArmazenamentoSQLite(caminho) as armazenamento:
+            anterior = _biblioteca("Principal", armazenamento=armazenamento)
+            livro = Livro("1984", "George Orwell", 1949)
+            ana = Usuario("Ana")
+            anterior.adicionar_livro(livro)
+            anterior.registrar_usuario(ana)
+            anterior.emprestar(ana, livro)
+
+        fluxo = FluxoMudancas()
+        with ArmazenamentoSQLite(caminho) as armazenamento:
+            principal = _biblioteca("Principal", armazenamento=armazenamento, mudancas=fluxo)
+            assert [m.operacao for m in fluxo.mudancas_desde(0)] == ["livro", "usuario", "emprestimo"]
+            seguidora = _biblioteca("Réplica")
+            Replica(fluxo, seguidora).sincronizar()
+            assert _retrato(seguidora) == _retrato(principal)
+
+    def test_thread_acompanha_o_fluxo(self):
+        """Teste aplicação contínua e leitura após escrita com aguardar()."""
+        fluxo = FluxoMudancas()
+        principal = _biblioteca("Principal", mudancas=fluxo)
+        seguidora = _biblioteca("Réplica")
+
+        with Replica(fluxo, seguidora, espera=0.01) as replica:
+            with pytest.raises(RuntimeError):
+                replica.sincronizar()
+            for i in range(50):
+                principal.adicionar_livro(Livro(f"Livro {i}", "Autor", 2000))
+            ana = Usuario("Ana")
+            principal.registrar_usuario(ana)
+            principal.emprestar(ana, principal.livros[7])
+            assert replica.aguardar(fluxo.versao, tempo_limite=2)
+            assert replica.atraso == 0
+            assert _retrato(seguidora) == _retrato(principal)
+
+        principal.adicionar_livro(Livro("Depois", "Autor", 2000))
+        assert replica.aguardar(fluxo.versao, tempo_limite=0.05) is False  # Parada
+        assert replica.erro is None
+
+    def test_replica_atrasada_alem_da_retencao(self):
+        """Teste erro quando as mudanças necessárias já foram descartadas."""
+        fluxo = FluxoMudancas(retencao=2)
+        principal = _biblioteca("Principal", mudancas=fluxo)
+        for i in range(5):
+            principal.adicionar_livro(Livro(f"Livro {i}", "Autor", 2000))
+
+        replica = Replica(fluxo, _biblioteca("Réplica"))
+        with pytest.raises(MudancasDescartadas):
+            replica.sincronizar()
+        with replica:
+            assert replica.aguardar(fluxo.versao, tempo_limite=2) is False
+        assert isinstance(replica.erro, MudancasDescartadas)
+
+    def test_divergencia(self):
+        """Teste erro quando a seguidora foi alterada por fora da réplica."""
+        fluxo = FluxoMudancas()
+        principal = _biblioteca("Principal", mudancas=fluxo)
+        seguidora = _biblioteca("Réplica")
+        replica = Replica(fluxo, seguidora)
+        livro = Livro("1984", "George Orwell", 1949)
+        ana = Usuario("Ana")
+        principal.adicionar_livro(livro)
+        principal.registrar_usuario(ana)
+        replica.sincronizar()
+
+        seguidora.remover_livro(seguidora.obter_livro(livro.codigo))
+        principal.emprestar(ana, livro)
+        with pytest.raises(RuntimeError):
+            replica.sincronizar()
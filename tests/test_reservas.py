@@ -0,0 +1,189 @@
+"""
+Testes unitários para as reservas (fila de espera) por título
+"""
+
+import os
+import pytest
+import sys
+from datetime import datetime, timedelta
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import eventos
+from biblioteca_melhorada import Livro, Usuario, Biblioteca
+from reservas import AGUARDANDO, CANCELADA, EXPIRADA, RETIRADA, SEPARADA, CentralReservas
+from vencimentos import AgendaVencimentos
+
+ISBN = "978-0452284234"
+
+
+class Relogio:
+    """Relógio controlado pelo teste."""
+    
+    def __init__(self):
+        self.agora = datetime(2024, 3, 1, 10, 0)
+    
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def cenario():
+    """Biblioteca com um exemplar emprestado e três usuários."""
+    relogio = Relogio()
+    coletor = eventos.SinkColetor()
+    biblioteca = Biblioteca(
+        "Biblioteca Central", sink=coletor,
+        vencimentos=AgendaVencimentos(relogio=relogio),
+    )
+    livro = Livro("1984", "George Orwell", 1949, ISBN)
+    biblioteca.adicionar_livro(livro)
+    usuarios = [Usuario(nome) for nome in ("Ana", "Bruno", "Carla")]
+    for usuario in usuarios:
+        biblioteca.registrar_usuario(usuario)
+    biblioteca.emprestar_livro(ISBN, "Ana")
+    return biblioteca, livro, usuarios, relogio, coletor
+
+
+class TestCentralReservas:
+    """Testes para a CentralReservas."""
+    
+    def test_prioridade_e_ordem_de_chegada(self):
+        """Teste que prioridade menor vem antes e empates seguem a chegada."""
+        central = CentralReservas()
+        livro = Livro("1984", "George Orwell", 1949, ISBN)
+        comum = [central.reservar(Usuario(f"U{i}"), ISBN) for i in range(3)]
+        urgente = central.reservar(Usuario("Urgente"), "9780452284234", prioridade=-1)
+        
+        atendidas = []
+        for _ in range(4):
+            reserva = central.livro_devolvido(livro)
+            atendidas.append(reserva)
+            central.retirar(reserva)
+        assert atendidas == [urgente] + comum
+        assert all(reserva.estado == RETIRADA for reserva in atendidas)
+        assert central.livro_devolvido(livro) is None
+    
+    def test_reserva_duplicada_e_cancelamento(self):
+        """Teste que cada usuário tem uma reserva ativa por título."""
+        central = CentralReservas()
+        ana = Usuario("Ana")
+        reserva = central.reservar(ana, ISBN)
+        assert central.reservar(Usuario("ANA"), ISBN) is None
+        assert central.cancelar(reserva)
+        assert not central.cancelar(reserva)
+        assert reserva.estado == CANCELADA
+        assert central.aguardando(ISBN) == 0
+        assert central.reservar(ana, ISBN) is not None
+    
+    def test_mais_requisitados_incremental(self):
+        """Teste do ranking de títulos com mais reservas aguardando."""
+        central = CentralReservas()
+        reservas = {}
+        for isbn, quantidade in (("A", 3), ("B", 5), ("C", 1), ("D", 3)):
+            reservas[isbn] = [central.reservar(Usuario(f"{isbn}{i}"), isbn) for i in range(quantidade)]
+        assert central.mais_requisitados(3) == [("B", 5), ("A", 3), ("D", 3)]
+        
+        for reserva in reservas["B"][:4]:
+            central.cancelar(reserva)
+        assert central.mais_requisitados() == [("A", 3), ("D", 3), ("B", 1), ("C", 1)]
+    
+    def test_mais_requisitados_em_ordem(self):
+        """Teste ranking com contagens esparsas e títulos que saem da fila."""
+        central = CentralReservas()
+        for isbn, quantidade in (("Z", 1), ("M", 200), ("A", 1), ("K", 200)):
+            for i in range(quantidade):
+                central.reservar(Usuario(f"{isbn}{i}"), isbn)
+        assert central.mais_requisitados(3) == [("K", 200), ("M", 200), ("A", 1)]
+        
+        central.cancelar(central.reserva_de(Usuario("K0"), "K"))
+        assert central.mais_requisitados(2) == [("M", 200), ("K", 199)]
+        assert central._contagens == [1, 199, 200]
+    
+    def test_fila_grande(self):
+        """Teste fila com dezenas de milhares de reservas e cancelamentos."""
+        central = CentralReservas()
+        livro = Livro("1984", "George Orwell", 1949, ISBN)
+        reservas = [central.reservar(Usuario(f"Usuário {i}"), ISBN) for i in range(30_000)]
+        for indice, reserva in enumerate(reservas):
+            if indice % 4:
+                central.cancelar(reserva)
+        
+        assert central.aguardando(ISBN) == 7_500
+        assert len(central._filas["9780452284234"]) < 2 * 7_500 + 17
+        reserva = central.livro_devolvido(livro)
+        assert reserva is reservas[0]
+        assert reserva.estado == SEPARADA
+
+
+class TestReservasBiblioteca:
+    """Testes das reservas integradas à Biblioteca."""
+    
+    def test_devolucao_separa_para_proximo(self, cenario):
+        """Teste separação automática na devolução."""
+        biblioteca, livro, (ana, bruno, carla), relogio, coletor = cenario
+        reserva = biblioteca.reservar(ISBN, "Bruno")
+        assert reserva.estado == AGUARDANDO
+        
+        biblioteca.devolver_livro(ISBN, "Ana")
+        assert reserva.estado == SEPARADA
+        assert reserva.livro is livro
+        # A separação acontece durante a devolução, antes de ela ser anunciada
+        assert [type(e) for e in coletor.eventos[-2:]] == [eventos.ReservaDisponivel, eventos.DevolucaoRealizada]
+        
+        assert not biblioteca.emprestar_livro(ISBN, "Carla")
+        assert isinstance(coletor.eventos[-1], eventos.EmprestimoRecusadoReservado)
+        assert not biblioteca.remover_livro(livro)
+        assert biblioteca.emprestar_livro(ISBN, "Bruno")
+        assert reserva.estado == RETIRADA
+        assert biblioteca.obter_portador(livro) is bruno
+    
+    def test_reserva_recusada(self, cenario):
+        """Teste reservas recusadas e consultas inválidas."""
+        biblioteca, livro, usuarios, relogio, coletor = cenario
+        assert biblioteca.reservar(ISBN, "Bruno") is not None
+        assert biblioteca.reservar(ISBN, "bruno") is None
+        assert coletor.eventos[-1].motivo == "reserva já existente"
+        
+        biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949, ISBN))  # Separado para Bruno
+        biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949, ISBN))
+        assert biblioteca.reservar(ISBN, "Carla") is None
+        assert coletor.eventos[-1].motivo == "há exemplar disponível"
+        assert biblioteca.reservar("000", "Carla") is None
+    
+    def test_exemplar_novo_separado_para_reserva(self, cenario):
+        """Teste que exemplares incluídos com a fila aguardando são separados."""
+        biblioteca, livro, usuarios, relogio, coletor = cenario
+        primeira = biblioteca.reservar(ISBN, "Bruno")
+        segunda = biblioteca.reservar(ISBN, "Carla")
+        
+        novo = Livro("1984", "George Orwell", 1949, ISBN)
+        biblioteca.adicionar_livro(novo)
+        assert (primeira.estado, primeira.livro) == (SEPARADA, novo)
+        assert isinstance(coletor.eventos[-1], eventos.ReservaDisponivel)
+        assert coletor.eventos[-1].livro is novo
+        assert coletor.eventos[-1].mensagem().startswith("📬 '1984' separado para Bruno")
+        
+        biblioteca.importar_livros([{"titulo": "1984", "autor": "George Orwell", "ano": 1949, "isbn": ISBN}])
+        assert segunda.estado == SEPARADA
+        assert biblioteca.reservas.aguardando(ISBN) == 0
+    
+    def test_expiracao_passa_ao_proximo(self, cenario):
+        """Teste prazo de retirada com relógio injetado."""
+        biblioteca, livro, usuarios, relogio, coletor = cenario
+        primeira = biblioteca.reservar(ISBN, "Bruno")
+        segunda = biblioteca.reservar(ISBN, "Carla")
+        biblioteca.devolver_livro(ISBN, "Ana")
+        
+        relogio.agora += timedelta(days=2)
+        assert biblioteca.processar_reservas() == 0
+        relogio.agora += timedelta(days=2)
+        assert biblioteca.processar_reservas() == 1
+        assert primeira.estado == EXPIRADA
+        assert segunda.estado == SEPARADA
+        assert biblioteca.reservas.separada_para(livro) is segunda
+        
+        assert biblioteca.cancelar_reserva(segunda)
+        assert biblioteca.reservas.separada_para(livro) is None
+        assert biblioteca.emprestar_livro(ISBN, "Bruno")
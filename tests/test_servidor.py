@@ -0,0 +1,151 @@
+"""
+Testes unitários para o servidor assíncrono da Biblioteca
+"""
+
+import asyncio
+import os
+import pytest
+import sys
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import eventos
+from biblioteca_melhorada import Livro, Usuario, Biblioteca
+from servidor import ClienteBiblioteca, ServidorBiblioteca
+
+
+@pytest.fixture
+def biblioteca():
+    """Biblioteca silenciosa com dois exemplares e um usuário."""
+    anterior = eventos.definir_sink_padrao(eventos.SinkNulo())
+    biblioteca = Biblioteca("Biblioteca Central", sink=eventos.SinkNulo())
+    biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949, "978-0452284234"))
+    biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949, "978-0452284234"))
+    biblioteca.adicionar_livro(Livro("Dom Casmurro", "Machado de Assis", 1899, "978-8535910663"))
+    biblioteca.registrar_usuario(Usuario("Ana", "ana@email.com", limite_livros=1))
+    yield biblioteca
+    eventos.definir_sink_padrao(anterior)
+
+
+def _rodar(biblioteca, cenario, **opcoes):
+    """Executa um cenário com servidor e cliente no mesmo laço de eventos."""
+    async def principal():
+        async with ServidorBiblioteca(biblioteca, **opcoes) as servidor:
+            cliente = await ClienteBiblioteca.conectar(servidor.host, servidor.porta)
+            try:
+                return await cenario(servidor, cliente)
+            finally:
+                await cliente.fechar()
+    return asyncio.run(principal())
+
+
+class TestServidorBiblioteca:
+    """Testes para o ServidorBiblioteca."""
+    
+    def test_busca_e_estatisticas(self, biblioteca):
+        """Teste das operações de leitura."""
+        async def cenario(servidor, cliente):
+            busca = await cliente.pedir("buscar", termo="machado")
+            estatisticas = await cliente.pedir("estatisticas")
+            return busca, estatisticas
+
+        busca, estatisticas = _rodar(biblioteca, cenario)
+        assert busca["ok"]
+        assert [livro["titulo"] for livro in busca["resultado"]] == ["Dom Casmurro"]
+        assert estatisticas["resultado"]["total_livros"] == 3
+        assert estatisticas["resultado"]["taxa_utilizacao"] == 0.0
+    
+    def test_leituras_na_replica(self, biblioteca):
+        """Teste buscas e estatísticas atendidas por outra biblioteca."""
+        replica = Biblioteca("Réplica", sink=eventos.SinkNulo())
+        replica.adicionar_livro(Livro("Memórias Póstumas", "Machado de Assis", 1881))
+
+        async def cenario(servidor, cliente):
+            busca = await cliente.pedir("buscar", termo="machado")
+            estatisticas = await cliente.pedir("estatisticas")
+            emprestimo = await cliente.pedir("emprestar", isbn="978-8535910663", usuario="Ana")
+            return busca, estatisticas, emprestimo
+
+        busca, estatisticas, emprestimo = _rodar(biblioteca, cenario, leitura=replica)
+        assert [livro["titulo"] for livro in busca["resultado"]] == ["Memórias Póstumas"]
+        assert estatisticas["resultado"]["total_livros"] == 1
+        assert emprestimo["ok"]
+        assert biblioteca.obter_estatisticas().livros_emprestados == 1
+    
+    def test_emprestimo_e_devolucao(self, biblioteca):
+        """Teste do ciclo de empréstimo com mensagens de erro."""
+        async def cenario(servidor, cliente):
+            return [
+                await cliente.pedir("emprestar", isbn="9780452284234", usuario="ana@email.com"),
+                await cliente.pedir("emprestar", isbn="978-8535910663", usuario="Ana"),
+                await cliente.pedir("emprestar", isbn="000", usuario="Ana"),
+                await cliente.pedir("emprestar", isbn="000", usuario="Bruno"),
+                await cliente.pedir("devolver", isbn="978-0452284234", usuario="Ana"),
+                await cliente.pedir("devolver", isbn="978-0452284234", usuario="Ana"),
+            ]
+
+        respostas = _rodar(biblioteca, cenario)
+        assert respostas[0] == {"id": 1, "ok": True, "resultado": {"emprestado": True}}
+        assert respostas[1]["erro"] == "Limite de empréstimos atingido"
+        assert respostas[2]["erro"] == "Nenhum livro com este ISBN"
+        assert respostas[3]["erro"] == "Usuário não encontrado"
+        assert respostas[4]["resultado"] == {"devolvido": True}
+        assert respostas[5]["erro"] == "Usuário não possui livro com este ISBN"
+        assert biblioteca.obter_estatisticas().livros_disponiveis == 3
+    
+    def test_pedidos_invalidos(self, biblioteca):
+        """Teste respostas para pedidos malformados."""
+        async def cenario(servidor, cliente):
+            return [
+                await cliente.pedir("apagar_tudo"),
+                await cliente.pedir("buscar"),
+                await cliente.pedir("buscar", termo="a", limite=-1),
+            ]
+
+        respostas = _rodar(biblioteca, cenario)
+        assert all(not resposta["ok"] for resposta in respostas)
+        assert respostas[0]["erro"] == "Operação desconhecida: 'apagar_tudo'"
+        assert respostas[1]["erro"] == "Campo 'termo' ausente ou inválido"
+    
+    def test_json_invalido(self, biblioteca):
+        """Teste linha que não é JSON."""
+        async def principal():
+            async with ServidorBiblioteca(biblioteca) as servidor:
+                leitor, escritor = await asyncio.open_connection(servidor.host, servidor.porta)
+                escritor.write(b"isto nao e json\n")
+                resposta = await leitor.readline()
+                escritor.close()
+                return resposta
+
+        assert b"JSON inv" in asyncio.run(principal())
+    
+    def test_pedido_sem_iniciar(self, biblioteca):
+        """Teste erro claro ao enfileirar antes de iniciar o servidor."""
+        servidor = ServidorBiblioteca(biblioteca)
+        with pytest.raises(RuntimeError, match="Servidor não iniciado"):
+            asyncio.run(servidor._enfileirar(b'{"op": "estatisticas"}'))
+    
+    def test_pedidos_concorrentes_em_lotes(self, biblioteca):
+        """Teste que pedidos simultâneos são agrupados e respondidos em ordem."""
+        async def cenario(servidor, cliente):
+            pedidos = [cliente.pedir("buscar", termo="orwell", limite=1) for _ in range(200)]
+            respostas = await asyncio.gather(*pedidos)
+            return servidor, respostas
+
+        servidor, respostas = _rodar(biblioteca, cenario, tamanho_lote=64, limite_fila=16)
+        assert [resposta["id"] for resposta in respostas] == list(range(1, 201))
+        assert all(len(resposta["resultado"]) == 1 for resposta in respostas)
+        assert servidor.pedidos == 200
+        assert servidor.lotes < 200
+    
+    def test_processar_lote_reaproveita_busca(self, biblioteca, monkeypatch):
+        """Teste que buscas iguais no mesmo lote consultam o índice uma vez."""
+        chamadas = []
+        original = biblioteca.buscar_livro
+        monkeypatch.setattr(biblioteca, "buscar_livro", lambda *a, **k: chamadas.append(a) or original(*a, **k))
+        servidor = ServidorBiblioteca(biblioteca)
+
+        respostas = servidor.processar_lote([{"id": i, "op": "buscar", "termo": "1984"} for i in range(5)])
+        assert len(chamadas) == 1
+        assert all(len(resposta["resultado"]) == 2 for resposta in respostas)
@@ -0,0 +1,89 @@
+"""
+Testes unitários para o snapshot binário mapeado em memória
+"""
+
+import os
+import pytest
+import sys
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from biblioteca_melhorada import Livro, Usuario, Biblioteca
+from snapshot_binario import CatalogoMapeado, escrever_snapshot
+
+
+@pytest.fixture
+def biblioteca():
+    """Biblioteca com alguns livros e um empréstimo."""
+    biblioteca = Biblioteca("Biblioteca Central")
+    biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949, "978-0452284234"))
+    biblioteca.adicionar_livro(Livro("A Revolução dos Bichos", "George Orwell", 1945, "978-0451526342"))
+    biblioteca.adicionar_livro(Livro("Dom Casmurro", "Machado de Assis", 1899))
+    biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949, "9780452284234"))
+    biblioteca.registrar_usuario(Usuario("Ana"))
+    biblioteca.emprestar_livro("978-0452284234", "Ana")
+    return biblioteca
+
+
+class TestCatalogoMapeado:
+    """Testes para escrita e leitura do snapshot binário."""
+    
+    def test_ida_e_volta(self, biblioteca, tmp_path):
+        """Teste que os livros voltam com os mesmos dados."""
+        caminho = str(tmp_path / "catalogo.bin")
+        assert escrever_snapshot(biblioteca, caminho) == 4
+        
+        with CatalogoMapeado(caminho) as catalogo:
+            assert len(catalogo) == 4
+            for original, lido in zip(biblioteca.livros, catalogo):
+                assert lido == original
+                assert lido.codigo == original.codigo
+            assert catalogo[-1].codigo == biblioteca.livros[-1].codigo
+            with pytest.raises(IndexError):
+                catalogo[4]
+    
+    def test_busca_igual_a_biblioteca(self, biblioteca, tmp_path):
+        """Teste que a busca tem a mesma semântica do índice em memória."""
+        caminho = str(tmp_path / "catalogo.bin")
+        escrever_snapshot(biblioteca, caminho)
+        
+        with CatalogoMapeado(caminho) as catalogo:
+            for termo in ("", "o", "or", "orw", "ORWELL", "casmurro", "ção dos", "bichos x", "zzz"):
+                esperados = sorted(livro.codigo for livro in biblioteca.buscar_livro(termo, exibir=False))
+                assert [livro.codigo for livro in catalogo.buscar_livro(termo)] == esperados
+    
+    def test_isbn_prefere_exemplar_disponivel(self, biblioteca, tmp_path):
+        """Teste consulta por ISBN normalizado."""
+        caminho = str(tmp_path / "catalogo.bin")
+        escrever_snapshot(biblioteca, caminho)
+        
+        with CatalogoMapeado(caminho) as catalogo:
+            livro = catalogo.obter_livro_por_isbn("978 0452284234")
+            assert livro.disponivel
+            assert livro.codigo == biblioteca.livros[3].codigo
+            assert catalogo.obter_livro_por_isbn("978-0451526342").titulo == "A Revolução dos Bichos"
+            assert catalogo.obter_livro_por_isbn("000") is None
+    
+    def test_preserva_emprestimo(self, biblioteca, tmp_path):
+        """Teste que disponibilidade e data de empréstimo são gravadas."""
+        caminho = str(tmp_path / "catalogo.bin")
+        escrever_snapshot(biblioteca, caminho)
+        
+        with CatalogoMapeado(caminho) as catalogo:
+            emprestado = catalogo[0]
+            assert not emprestado.disponivel
+            assert emprestado.data_emprestimo == biblioteca.livros[0].data_emprestimo
+            assert catalogo[2].data_emprestimo is None
+    
+    def test_arquivo_invalido(self, tmp_path):
+        """Teste rejeição de arquivos que não são snapshots."""
+        caminho = tmp_path / "outro.bin"
+        caminho.write_bytes(b"nada disso" * 10)
+        with pytest.raises(ValueError):
+            CatalogoMapeado(str(caminho))
+        
+        vazio = tmp_path / "vazio.bin"
+        vazio.write_bytes(b"")
+        with pytest.raises(ValueError):
+            CatalogoMapeado(str(vazio))
@@ -0,0 +1,173 @@
+"""
+Testes unitários para a agenda de vencimentos
+"""
+
+import os
+import pytest
+import sys
+from datetime import datetime, timedelta
+
+# Adicionar o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from armazenamento import ArmazenamentoSQLite
+from biblioteca_melhorada import Livro, Usuario, Biblioteca
+from vencimentos import AgendaVencimentos
+
+
+class Relogio:
+    """Relógio controlado pelo teste."""
+    
+    def __init__(self, agora):
+        self.agora = agora
+    
+    def __call__(self):
+        return self.agora
+    
+    def avancar(self, **duracao):
+        self.agora += timedelta(**duracao)
+
+
+INICIO = datetime(2024, 3, 1, 10, 0)
+
+
+def _emprestado(titulo, dias_atras=0):
+    """Livro emprestado há alguns dias."""
+    livro = Livro(titulo, "Autor", 2000)
+    livro.disponivel = False
+    livro.data_emprestimo = INICIO - timedelta(days=dias_atras)
+    return livro
+
+
+class TestAgendaVencimentos:
+    """Testes para a AgendaVencimentos."""
+    
+    def test_prazo_invalido(self):
+        """Teste prazo não positivo."""
+        with pytest.raises(ValueError):
+            AgendaVencimentos(prazo=timedelta(0))
+    
+    def test_vencidos_em_ordem(self):
+        """Teste consulta dos vencidos do mais antigo ao mais recente."""
+        agenda = AgendaVencimentos(prazo=timedelta(days=7), relogio=Relogio(INICIO))
+        livros = [_emprestado(f"Livro {dias}", dias) for dias in (3, 10, 8, 30, 0)]
+        for livro in livros:
+            agenda.registrar(livro)
+        
+        vencidos = agenda.emprestimos_vencidos()
+        assert [e.livro.titulo for e in vencidos] == ["Livro 30", "Livro 10", "Livro 8"]
+        assert vencidos[0].dias_atraso(INICIO) == 23
+        assert agenda.vencimento(livros[0]) == INICIO + timedelta(days=4)
+        
+        todos = agenda.emprestimos_vencidos(ate=INICIO + timedelta(days=7))
+        assert len(todos) == 5
+    
+    def test_devolucao_remove_da_agenda(self):
+        """Teste que devoluções e novos empréstimos invalidam entradas antigas."""
+        agenda = AgendaVencimentos(prazo=timedelta(days=7), relogio=Relogio(INICIO))
+        livro = _emprestado("1984", 10)
+        agenda.registrar(livro)
+        assert agenda.remover(livro)
+        assert not agenda.remover(livro)
+        assert agenda.emprestimos_vencidos() == []
+        
+        livro.data_emprestimo = INICIO
+        agenda.registrar(livro)
+        assert agenda.emprestimos_vencidos() == []
+        assert len(agenda) == 1
+    
+    def test_heap_compactado(self):
+        """Teste reconstrução do heap após muitas devoluções."""
+        agenda = AgendaVencimentos(relogio=Relogio(INICIO))
+        livros = [_emprestado(f"Livro {i}", i % 30) for i in range(500)]
+        for livro in livros:
+            agenda.registrar(livro)
+        for livro in livros[:450]:
+            agenda.remover(livro)
+        
+        assert len(agenda._vencimentos) < 200
+        esperados = sorted(
+            (l for l in livros[450:] if l.data_emprestimo + agenda.prazo <= INICIO),
+            key=lambda l: l.data_emprestimo,
+        )
+        assert [e.livro.data_emprestimo for e in agenda.emprestimos_vencidos()] == \
+            [l.data_emprestimo for l in esperados]
+    
+    def test_lembretes_pendentes_compactados(self):
+        """Teste que devoluções e reagendamentos não acumulam lembretes."""
+        agenda = AgendaVencimentos(relogio=Relogio(INICIO))
+        livro = _emprestado("Livro")
+        for _ in range(1000):
+            agenda.registrar(livro)
+        for i in range(1000):
+            outro = _emprestado(f"Livro {i}")
+            agenda.registrar(outro)
+            agenda.remover(outro)
+        
+        assert len(agenda._lembretes_pendentes) < 200
+        assert len(agenda._vencimentos) < 200
+        assert agenda.processar(INICIO + agenda.prazo) == 1
+    
+    def test_lembretes_disparam_uma_vez(self):
+        """Teste lembretes com relógio injetado."""
+        relogio = Relogio(INICIO)
+        agenda = AgendaVencimentos(prazo=timedelta(days=7), relogio=relogio)
+        avisados = []
+        agenda.ao_vencer(lambda emprestimo: avisados.append(emprestimo.livro.titulo))
+        devolvido = _emprestado("Devolvido", 0)
+        agenda.registrar(_emprestado("A", 0))
+        agenda.registrar(_emprestado("B", -2))
+        agenda.registrar(devolvido)
+        agenda.remover(devolvido)
+        
+        assert agenda.processar() == 0
+        assert agenda.proximo_vencimento() == INICIO + timedelta(days=7)
+        relogio.avancar(days=7)
+        assert agenda.processar() == 1
+        assert agenda.processar() == 0
+        relogio.avancar(days=2)
+        agenda.processar()
+        assert avisados == ["A", "B"]
+        assert agenda.proximo_vencimento() is None
+
+
+class TestVencimentosBiblioteca:
+    """Testes da agenda integrada à Biblioteca."""
+    
+    def test_emprestimos_vencidos(self, capsys):
+        """Teste que empréstimos e devoluções alimentam a agenda."""
+        relogio = Relogio(datetime.now())
+        biblioteca = Biblioteca("Biblioteca Central", vencimentos=AgendaVencimentos(relogio=relogio))
+        biblioteca.adicionar_livro(Livro("1984", "George Orwell", 1949, "978-0452284234"))
+        biblioteca.adicionar_livro(Livro("Dom Casmurro", "Machado de Assis", 1899, "978-8535910663"))
+        ana = Usuario("Ana")
+        biblioteca.registrar_usuario(ana)
+        biblioteca.emprestar_livro("978-0452284234", "Ana")
+        biblioteca.emprestar_livro("978-8535910663", "Ana")
+        
+        assert biblioteca.emprestimos_vencidos() == []
+        relogio.avancar(days=15)
+        vencidos = biblioteca.emprestimos_vencidos()
+        assert [e.livro.titulo for e in vencidos] == ["1984", "Dom Casmurro"]
+        assert vencidos[0].usuario is ana
+        
+        biblioteca.devolver_livro("978-0452284234", "Ana")
+        assert [e.livro.titulo for e in biblioteca.emprestimos_vencidos()] == ["Dom Casmurro"]
+    
+    def test_restaurar_agenda_uma_vez(self, tmp_path):
+        """Teste que a restauração agenda cada empréstimo uma única vez."""
+        caminho = str(tmp_path / "biblioteca.db")
+        with ArmazenamentoSQLite(caminho) as armazenamento:
+            anterior = Biblioteca("Biblioteca Central", armazenamento=armazenamento)
+            livro = Livro("1984", "George Orwell", 1949)
+            anterior.adicionar_livro(livro)
+            anterior.registrar_usuario(Usuario("Ana"))
+            anterior.emprestar(anterior.obter_usuario("Ana"), livro)
+        
+        agenda = AgendaVencimentos()
+        with ArmazenamentoSQLite(caminho) as armazenamento:
+            Biblioteca("Biblioteca Central", armazenamento=armazenamento, vencimentos=agenda)
+        
+        assert len(agenda) == 1
+        assert len(agenda._vencimentos) == len(agenda._lembretes_pendentes) == 1
+        assert agenda.emprestimos_vencidos(ate=datetime(2100, 1, 1))[0].usuario.nome == "Ana"